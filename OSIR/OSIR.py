@@ -10,6 +10,7 @@ from osir_lib.logger import AppLogger
 # TOREMOVE
 import osir_service.agent.AgentService as tasks
 from osir_service.ipc.OsirIpc import OsirIpc
+from osir_service.orchestration.TaskService import TaskService
 import osir_service.watchdog.MonitorCase as MonitorCase
 import osir_service.smb.SMBService as SmbMounter
 
@@ -107,6 +108,9 @@ def main():
         logger.info("Launching IPC Service")
         OsirIpc(host='0.0.0.0', port=8989).start()
 
+        logger.info("Restoring fair dispatch lanes")
+        TaskService.start_dispatcher()
+
         logger.info("Launching web app...")
         cli.main_run(["/OSIR/OSIR/src/osir_web/osir_web/OsirWeb.py"])
 
@@ -8,7 +8,7 @@ from fastapi import (
 from osir_service.ipc.model.OsirIpcResponse import OsirIpcResponse
 from osir_api.api.OsirApiExceptions import UnexpectedException, UnexpectedExceptionResponse
 from osir_api.api.OsirApiResponse import handle_response
-from osir_api.api.model.OsirApiCaseModel import GetCaseListResponse, PostCaseCreateResponse, GetCaseHandlerResponse
+from osir_api.api.model.OsirApiCaseModel import GetCaseListResponse, PostCaseCreateResponse, GetCaseHandlerResponse, PostCaseWeightRequest, PostCaseWeightResponse
 from osir_api.api.OsirApiMetadata import API_VERSION
 from osir_api.api.model.OsirApiTaskModel import GetTasksListResponse, GetTaskStatsResponse
 from osir_api.api.OsirIpcCall import OsirIpcCall
@@ -43,6 +43,19 @@ def retrieved_case_handler(case_name: str):
 def stats_case(case_name: str):
     return OsirIpcCall("get_task_stats", params={"case_name": case_name})
 
+@router.get("/case/{case_name}/dedup",
+            response_model=OsirIpcResponse,
+            responses={500: {"model": UnexpectedExceptionResponse}})
+def dedup_stats_case(case_name: str):
+    """Dedup index and hash cache hit/miss counters of the case, per module and hash mode."""
+    return OsirIpcCall("get_dedup_stats", params={"case_name": case_name})
+
+@router.post("/case/{case_name}/weight",
+             response_model=PostCaseWeightResponse,
+             responses={500: {"model": UnexpectedExceptionResponse}})
+def set_case_weight(case_name: str, request: PostCaseWeightRequest):
+    return OsirIpcCall("set_case_weight", params={"case_name": case_name, "weight": request.weight})
+
 @router.post("/case/{case_name}/handler/run",
              response_model=GetCaseHandlerResponse,
              responses={500: {"model": UnexpectedExceptionResponse}})
@@ -0,0 +1,52 @@
+import asyncio
+import json
+import os
+import time
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from osir_api.api.OsirIpcCall import OsirIpcCall
+from osir_service.orchestration.TaskEventHub import TaskEventHub
+
+router = APIRouter()
+
+
+async def _stats_events(view):
+    """Sends the view statistics when they change, at most every OSIR_EVENTS_MIN_INTERVAL seconds."""
+    min_interval = float(os.getenv("OSIR_EVENTS_MIN_INTERVAL", "1"))
+    heartbeat = float(os.getenv("OSIR_EVENTS_HEARTBEAT", "15"))
+    sent_version, sent_at = None, 0.0
+    while True:
+        if view.synced and (view.version != sent_version or time.monotonic() - sent_at >= heartbeat):
+            sent_version, sent_at = view.version, time.monotonic()
+            yield f"event: stats\ndata: {json.dumps(view.snapshot())}\n\n"
+        else:
+            view.read_at = time.monotonic()
+        await asyncio.sleep(min_interval)
+
+
+def _stream(view):
+    return StreamingResponse(
+        _stats_events(view),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/handler/{handler_id}/events")
+def events_handler(handler_id: str):
+    try:
+        view = TaskEventHub.get().view(handler_id=handler_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid handler id: {handler_id}")
+    return _stream(view)
+
+
+@router.get("/case/{case_name}/events")
+def events_case(case_name: str):
+    cases = OsirIpcCall("get_cases", response_only=True) or []
+    case_uuid = next((case["case_uuid"] for case in cases if case["name"] == case_name), None)
+    if case_uuid is None:
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_name}")
+    return _stream(TaskEventHub.get().view(case_uuid=case_uuid))
@@ -1,8 +1,8 @@
-import base64
 import os
 from typing import Optional
 
-from fastapi import APIRouter, File, Form, Query, UploadFile
+from fastapi import APIRouter, File, Form, Header, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
 from osir_api.api.OsirApiExceptions import UnexpectedExceptionResponse
 from osir_api.api.model.OsirApiFilesModel import (
@@ -18,8 +18,7 @@ from osir_api.api.model.OsirApiFilesModel import (
     TransferRequest,
     UnarchiveRequest,
 )
-from fastapi import Response
-from osir_api.api.OsirIpcCall import OsirIpcCall
+from osir_api.api.OsirIpcCall import OsirIpcCall, OsirIpcStreamCall
 from osir_lib.logger import AppLogger
 
 logger = AppLogger(__name__).get_logger()
@@ -101,20 +100,57 @@ def create_folder(body: CreateItemRequest):
 
 
 @router.get("/files/download",
-            responses={400: {}, 404: {}, 500: {"model": UnexpectedExceptionResponse}})
-async def download_file(path: str = Query(..., description="Full path to the file (including storage prefix)")):
-    # Appel IPC pour récupérer le contenu et le mime_type
-    ipc_response = OsirIpcCall("files_download", params={"path": path}, response_only=True)
-    # Retourner une réponse FastAPI avec les données binaires
+            responses={206: {}, 400: {}, 404: {}, 416: {}, 500: {"model": UnexpectedExceptionResponse}})
+def download_file(
+    path: str = Query(..., description="Full path to the file (including storage prefix)"),
+    range: Optional[str] = Header(None, description="Single byte range, e.g. 'bytes=0-1023', 'bytes=1024-' or 'bytes=-512'"),
+):
+    # Malformed or unsupported ranges are ignored: the whole file is sent.
+    byte_range = _parse_range(range) if range else {}
+    params = {"path": path, **byte_range}
+
+    # The file is streamed from the IPC socket straight to the HTTP client.
+    ipc_response, body = OsirIpcStreamCall("files_download", params=params)
+
     filename = os.path.basename(ipc_response["filename"])
-    content = base64.b64decode(ipc_response["content"])
-    return Response(
-        content=content,
-        media_type=ipc_response["mimeType"],
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
+    size, start, end = ipc_response["size"], ipc_response["start"], ipc_response["end"]
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Content-Length": str(end - start + 1),
+        "Accept-Ranges": "bytes",
+    }
+    status_code = 200
+    if byte_range:
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    return StreamingResponse(body, status_code=status_code, media_type=ipc_response["mimeType"], headers=headers)
+
+
+def _parse_range(value: str) -> dict:
+    """
+    Parses a single `bytes=` Range header into files_download params.
+
+    Returns {} for a header that is malformed or not supported (other unit,
+    several ranges, non-numeric or reversed bounds), which RFC 9110 says to
+    ignore. Unsatisfiable ranges (start past the end of the file) are left to
+    files_download, which answers 416.
+    """
+    unit, _, spec = value.partition("=")
+    first, sep, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if unit.strip().lower() != "bytes" or not sep or "," in spec:
+        return {}
+    if not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return {}
+    if not first:
+        return {"suffix": int(last)}
+    params = {"start": int(first)}
+    if last:
+        if int(last) < params["start"]:
+            return {}
+        params["end"] = int(last)
+    return params
 
 
 @router.get("/files/search",
@@ -125,8 +161,19 @@ def search_files(
     filter: Optional[str] = Query(None, description="Search query string (e.g. '*.pdf')"),
     deep: bool = Query(False, description="Search subdirectories recursively"),
     size: Optional[str] = Query("all", description="File size filter", enum=["all", "small", "medium", "large"]),
+    mode: Optional[str] = Query("auto", description="Match mode ('auto' uses glob when the query has wildcards)", enum=["auto", "prefix", "substring", "glob"]),
+    offset: int = Query(0, ge=0, description="Number of matches to skip"),
+    limit: int = Query(200, ge=1, le=1000, description="Maximum number of matches returned"),
 ):
-    return OsirIpcCall("files_search", params={"path": path, "filter": filter, "deep": deep, "size": size}, response_only=True)
+    return OsirIpcCall("files_search", params={
+        "path": path,
+        "filter": filter,
+        "deep": deep,
+        "size": size,
+        "mode": mode,
+        "offset": offset,
+        "limit": limit,
+    }, response_only=True)
 
 
 @router.post("/files/save",
@@ -1,9 +1,10 @@
 import os
+from typing import Optional
 from fastapi import APIRouter
 
 from osir_api.api.OsirApiExceptions import UnexpectedException, UnexpectedExceptionResponse
 from osir_api.api.OsirApiResponse import handle_response
-from osir_api.api.model.OsirApiModuleModel import GetModuleListResponse, GetModuleExistsResponse, PostModuleRunRequest, PostModuleInfoRequest, PostModuleRunResponse, PostModuleRunOnFileResponse
+from osir_api.api.model.OsirApiModuleModel import GetModuleListResponse, GetModuleExistsResponse, PostModuleRunRequest, PostModuleInfoRequest, PostModuleRunResponse, PostModuleRunOnFileResponse, GetModuleProfilesResponse
 from osir_api.api.OsirIpcCall import OsirIpcCall
 
 from osir_lib.core.FileManager import FileManager
@@ -18,6 +19,13 @@ def get_modules():
     return OsirIpcCall("get_modules")
 
 
+@router.get("/module/profiles",
+            response_model=GetModuleProfilesResponse,
+            responses={500: {"model": UnexpectedExceptionResponse}})
+def module_profiles(module: Optional[str] = None):
+    return OsirIpcCall("get_module_profiles", params={"module": module})
+
+
 @router.post("/module/info",
             response_model=GetModuleExistsResponse,
             responses={500: {"model": UnexpectedExceptionResponse}})
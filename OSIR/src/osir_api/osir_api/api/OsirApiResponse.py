@@ -12,9 +12,16 @@ def handle_response(response: OsirIpcResponse, response_only: bool = False):
 
     if response.status != 200:
         response.message = "Oups... Something went wrong !"
+        headers = None
+        if response.status == 416:
+            # RFC 9110 15.5.17: the current length of the file, for the client to retry.
+            size = (response.response.get("details") or {}).get("size")
+            if size is not None:
+                headers = {"Content-Range": f"bytes */{size}"}
         raise HTTPException(
             status_code=response.status,
-            detail=response.response["error"]
+            detail=response.response["error"],
+            headers=headers
         )
     
     if response_only:
@@ -12,4 +12,20 @@ router = APIRouter()
             response_model=OsirIpcResponse,
             responses={500: {"model": UnexpectedExceptionResponse}})
 def osir_is_active():
-    return OsirIpcCall("socket_on") 
+    return OsirIpcCall("socket_on")
+
+
+@router.get("/metrics",
+            response_model=OsirIpcResponse,
+            responses={500: {"model": UnexpectedExceptionResponse}})
+def osir_ipc_metrics():
+    """Per-action IPC latency metrics and database pool usage of the master."""
+    return OsirIpcCall("get_ipc_metrics")
+
+
+@router.get("/dispatch",
+            response_model=OsirIpcResponse,
+            responses={500: {"model": UnexpectedExceptionResponse}})
+def osir_dispatch_stats():
+    """Fair dispatch lanes of the master: waiting inputs, weight and throughput per case and handler."""
+    return OsirIpcCall("get_dispatch_stats")
@@ -1,12 +1,33 @@
 
-from fastapi import APIRouter
+from typing import List, Optional
 
-from osir_api.api.model.OsirApiTaskModel import GetTaskInfoResponse
+from fastapi import APIRouter, Query
+
+from osir_api.api.model.OsirApiTaskModel import GetTaskInfoResponse, GetTasksPageResponse
 from osir_api.api.OsirApiExceptions import UnexpectedExceptionResponse
 from osir_api.api.OsirIpcCall import OsirIpcCall
 
 router = APIRouter()
 
+@router.get("/tasks",
+            response_model=GetTasksPageResponse,
+            responses={400: {}, 500: {"model": UnexpectedExceptionResponse}})
+def list_tasks(
+    case_name: Optional[str] = Query(None, description="Tasks of this case"),
+    handler_id: Optional[str] = Query(None, description="Tasks of this handler"),
+    module: Optional[List[str]] = Query(None, description="Tasks of these modules"),
+    status: Optional[List[str]] = Query(None, description="Tasks with these processing statuses"),
+    agent: Optional[str] = Query(None, description="Tasks run by this agent"),
+    input: Optional[str] = Query(None, description="Tasks whose input contains this string"),
+    since: Optional[str] = Query(None, description="Tasks created at or after this time (ISO 8601)"),
+    until: Optional[str] = Query(None, description="Tasks created before this time (ISO 8601)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+):
+    params = {"case_name": case_name, "handler_id": handler_id, "module": module, "status": status,
+              "agent": agent, "input": input, "since": since, "until": until, "cursor": cursor, "limit": limit}
+    return OsirIpcCall("list_tasks", params={k: v for k, v in params.items() if v is not None})
+
 @router.get("/tasks/{task_id}/info",
             response_model=GetTaskInfoResponse,
             responses={500: {"model": UnexpectedExceptionResponse}})
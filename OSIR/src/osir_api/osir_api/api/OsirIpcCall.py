@@ -22,3 +22,24 @@ def OsirIpcCall(action: str, params: Optional[dict] = {}, response_only: bool =
     except Exception as e:
         logger.error_handler(e)
         raise UnexpectedException(str(e))
+
+
+def OsirIpcStreamCall(action: str, params: Optional[dict] = {}) -> tuple[dict, Generator]:
+    """
+    Sends an IPC request to a streaming action.
+    Returns the response payload and a generator over the binary body.
+    Raises HTTPException on an error status and UnexpectedException on any other error.
+    """
+    try:
+        request = OsirIpcRequest(action=action, params=params)
+        meta, body = OsirSocket().stream(request)
+    except Exception as e:
+        logger.error_handler(e)
+        raise UnexpectedException(str(e))
+
+    response = OsirIpcResponse.model_validate(meta)
+    if response.status != 200:
+        # Error replies carry an empty body: drain it so the connection is closed.
+        for _ in body:
+            pass
+    return handle_response(response, response_only=True), body
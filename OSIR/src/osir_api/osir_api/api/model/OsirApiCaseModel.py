@@ -1,5 +1,6 @@
 
-from typing import List
+from typing import Any, Dict, List
+from pydantic import BaseModel, Field
 from osir_service.postgres.model.OsirDbCaseModel import OsirDbCaseModel
 from osir_service.ipc.model.OsirIpcResponse import OsirIpcResponse
 from osir_service.postgres.model.OsirDbHandlerModel import OsirDbHandlerModel
@@ -62,4 +63,30 @@ Response model:
 
 
 class GetCaseHandlerResponse(OsirIpcResponse):
-    response: List[OsirDbHandlerModel]
\ No newline at end of file
+    response: List[OsirDbHandlerModel]
+
+
+""" 
+==========================================
+API Endpoint: POST /api/case/{case_name}/weight
+==========================================
+Description: Sets the fair dispatch share of a case: a case of weight 2
+gets twice the task inputs of a case of weight 1 (default).
+
+Request model:
+  - PARAMS: case_name
+  - PostCaseWeightRequest
+
+Response model:
+  - PostCaseWeightResponse
+
+==========================================
+"""
+
+
+class PostCaseWeightRequest(BaseModel):
+    weight: float = Field(gt=0, allow_inf_nan=False)
+
+
+class PostCaseWeightResponse(OsirIpcResponse):
+    response: Dict[str, Any]
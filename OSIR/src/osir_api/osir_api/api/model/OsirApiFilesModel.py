@@ -98,6 +98,10 @@ class SearchResult(BaseModel):
     dirname: str
     files: List[DirEntry]
     storages: List[str]
+    total: int = 0
+    offset: int = 0
+    limit: int = 0
+    truncated: bool = False
 
 
 """
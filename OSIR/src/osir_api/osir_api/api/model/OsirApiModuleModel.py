@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional, Union
+from typing import List, Optional, Union
 from osir_service.ipc.model.OsirIpcResponse import OsirIpcResponse
 from osir_lib.core.model.OsirModuleModel import OsirModuleModel
 from osir_service.postgres.model.OsirDbHandlerModel import OsirDbHandlerModel
@@ -137,3 +137,39 @@ Response model:
 
 class PostModuleRunOnFileResponse(OsirIpcResponse):
     response: OsirDbTaskModel
+
+"""
+==========================================
+API Endpoint: GET /api/module/profiles
+==========================================
+Description: Learned resource profiles of the modules, per input size
+bucket (bucket b covers inputs of [2^(b-1), 2^b) bytes, -1 unknown size).
+
+Request model:
+  - QUERY: module (optional)
+
+Response model:
+  - GetModuleProfilesResponse
+
+==========================================
+"""
+
+
+class OsirModuleProfileModel(BaseModel):
+    module: str
+    size_bucket: int
+    samples: int
+    avg_input_bytes: float
+    avg_wall_seconds: float
+    avg_cpu_seconds: float
+    avg_cpu_cores: Optional[float] = None
+    avg_read_bytes: float
+    avg_write_bytes: float
+    avg_io_bytes_per_sec: Optional[float] = None
+    avg_peak_rss_bytes: float
+    peak_rss_max: int
+    updated_at: Optional[str] = None
+
+
+class GetModuleProfilesResponse(OsirIpcResponse):
+    response: List[OsirModuleProfileModel]
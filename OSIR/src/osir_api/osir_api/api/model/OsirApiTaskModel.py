@@ -1,6 +1,6 @@
 from typing import Any, Dict, List
 from osir_service.ipc.model.OsirIpcResponse import OsirIpcResponse
-from osir_service.postgres.model.OsirDbTaskModel import OsirDbTaskModel
+from osir_service.postgres.model.OsirDbTaskModel import OsirDbTaskModel, OsirDbTaskPageModel
 
 """ 
 ==========================================
@@ -42,13 +42,42 @@ class GetTasksListResponse(OsirIpcResponse):
     response: List[OsirDbTaskModel]
 
 
+""" 
+==========================================
+API Endpoint: GET /tasks
+==========================================
+Description: List tasks, newest first, one page at a time (keyset
+pagination). Tasks are returned without trace: open a task with
+GET /tasks/{task_id}/info to read it.
+
+Request model:
+  - QUERY: case_name, handler_id, module (repeatable), status (repeatable),
+           agent, input (substring), since, until (ISO 8601),
+           cursor (next_cursor of the previous page), limit (1-1000)
+
+Response model:
+  - GetTasksPageResponse (next_cursor is null on the last page)
+
+==========================================
+"""
+
+
+class GetTasksPageResponse(OsirIpcResponse):
+    response: OsirDbTaskPageModel
+
+
 """ 
 ==========================================
 API Endpoints: POST /handler/{handler_id}/stats
                GET  /case/{case_name}/stats
 ==========================================
 Description: Aggregated task statistics (counts per status, per module,
-throughput) computed in SQL on the celery-joined effective statuses.
+throughput) read from the task counters rollup.
+
+The same statistics are pushed as server-sent events by
+GET /handler/{handler_id}/events and GET /case/{case_name}/events
+(`event: stats`, data = the response object below), on every task status
+change and at least every OSIR_EVENTS_HEARTBEAT seconds.
 
 Response model:
   - GetTaskStatsResponse
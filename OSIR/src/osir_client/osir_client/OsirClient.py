@@ -34,6 +34,10 @@ def main():
     case_create = case_sub.add_parser("create", help="Create a new case")
     case_create.add_argument("-c", "--case-name", required=True, help="Name of the case to create")
 
+    case_weight = case_sub.add_parser("weight", help="Set the fair dispatch share of a case (default 1)")
+    case_weight.add_argument("-c", "--case-name", required=True, help="Case name")
+    case_weight.add_argument("-W", "--weight", type=float, required=True, help="Share of the case, e.g. 2 = twice the default")
+
     # --- MODULE ---
     module_parser = subparsers.add_parser("module", help="Manage and run modules")
     module_sub = module_parser.add_subparsers(dest="action", required=True)
@@ -54,6 +58,9 @@ def main():
     module_run.add_argument("-i", "--input-path", required=False, help="Optional path to input file to upload.")
     module_run.add_argument("-w", "--wait", action="store_true", help="Wait for completion")
 
+    module_profiles = module_sub.add_parser("profiles", help="Show the learned resource profiles of the modules")
+    module_profiles.add_argument("-m", "--module-name", required=False, help="Only this module")
+
     # --- PROFILE ---
     profile_parser = subparsers.add_parser("profile", help="Manage and run profiles")
     profile_sub = profile_parser.add_subparsers(dest="action", required=True)
@@ -83,8 +90,16 @@ def main():
     task_parser = subparsers.add_parser("task", help="Manage tasks")
     task_sub = task_parser.add_subparsers(dest="action", required=True)
 
-    task_list = task_sub.add_parser("list", help="List all tasks")
+    task_list = task_sub.add_parser("list", help="List tasks, newest first, one page at a time")
     task_list.add_argument("-c", "--case-name", required=True, help="Case name")
+    task_list.add_argument("-m", "--module", action="append", help="Module (repeatable)")
+    task_list.add_argument("-s", "--status", action="append", help="Processing status (repeatable)")
+    task_list.add_argument("-a", "--agent", help="Agent")
+    task_list.add_argument("--input", help="Input contains")
+    task_list.add_argument("--since", help="Created at or after (ISO 8601)")
+    task_list.add_argument("--until", help="Created before (ISO 8601)")
+    task_list.add_argument("--cursor", help="Cursor of the next page, printed under the table")
+    task_list.add_argument("-n", "--limit", type=int, default=100, help="Page size (max 1000)")
 
     task_info = task_sub.add_parser("info", help="Get task info")
     task_info.add_argument("-i", "--task-id", required=True, help="Task UUID")
@@ -98,6 +113,8 @@ def main():
     stats_parser.add_argument("-H", "--handler-id", required=False, help="Handler UUID (handler stats)")
     stats_parser.add_argument("-w", "--watch", type=int, metavar="SECONDS", required=False,
                               help="Refresh the view every N seconds")
+    stats_parser.add_argument("-d", "--dispatch", action="store_true",
+                              help="Fair dispatch lanes: waiting tasks and throughput per case")
 
     args = parser.parse_args()
 
@@ -116,6 +133,10 @@ def main():
                 case = osir.cases.create(args.case_name)
                 logger.info(f"Case '{case.name}' created with UUID: {case.case_uuid}")
 
+            elif args.action == "weight":
+                weight = osir.cases.get(args.case_name).set_weight(args.weight)
+                logger.info(f"Case '{args.case_name}' weight: {weight}")
+
         # --- MODULE ---
         elif args.command == "module":
             if args.action == "list":
@@ -163,6 +184,9 @@ def main():
                 else:
                     handler.status(wait_end=args.wait)
 
+            elif args.action == "profiles":
+                osir.cases.modules.profiles(getattr(args, "module_name", None))
+
         # --- PROFILE ---
         elif args.command == "profile":
             if args.action == "list":
@@ -197,7 +221,10 @@ def main():
         # --- TASK ---
         elif args.command == "task":
             if args.action == "list":
-                osir.cases.get(args.case_name).tasks.list()
+                osir.cases.get(args.case_name).tasks.list(
+                    module=args.module, status=args.status, agent=args.agent, input=args.input,
+                    since=args.since, until=args.until, cursor=args.cursor, limit=args.limit
+                )
     
             elif args.action == "info":
                 task = osir.cases.tasks.get_task_info(args.task_id)
@@ -207,7 +234,9 @@ def main():
         elif args.command == "stats":
             from osir_client.client.OsirCliStats import OsirCliStats
             stats = OsirCliStats(osir)
-            if args.handler_id or args.case_name:
+            if args.dispatch:
+                stats.show_dispatch(watch=args.watch)
+            elif args.handler_id or args.case_name:
                 stats.show(
                     case_name=args.case_name,
                     handler_id=args.handler_id,
@@ -11,7 +11,7 @@ from osir_client.client.OsirCliDisplay import OsirCliDisplay
 from osir_lib.logger.logger import CustomLogger
 from osir_lib.logger import AppLogger
 
-from osir_api.api.model.OsirApiCaseModel import GetCaseListResponse, PostCaseCreateResponse
+from osir_api.api.model.OsirApiCaseModel import GetCaseListResponse, PostCaseCreateResponse, PostCaseWeightResponse
 
 logger: CustomLogger = AppLogger(__name__).get_logger()
 
@@ -108,4 +108,23 @@ class OsirCliCase(BaseModel):
             return self
         except Exception as e:
             logger.error(f"Failed to create case: {e}")
-            return self
\ No newline at end of file
+            return self
+
+    def set_weight(self, weight: float) -> Optional[float]:
+        """
+        Set the fair dispatch share of the case (1 by default).
+        POST /api/case/{case_name}/weight
+        """
+        if self.name is None:
+            logger.error("You can't set the weight of a not setup case")
+            return None
+        try:
+            response = self._api.post(
+                f"/api/case/{self.name}/weight",
+                response_model=PostCaseWeightResponse,
+                json={"weight": weight}
+            )
+            return response.response.get("weight")
+        except Exception as e:
+            logger.error(f"Failed to set case weight: {e}")
+            return None
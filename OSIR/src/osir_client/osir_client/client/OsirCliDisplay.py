@@ -97,6 +97,19 @@ class OsirCliDisplay:
             line.append(f"  ETA: ~{int(eta_min)} min", style="magenta")
         console.print(line)
 
+        # --- fair dispatch line (tasks held by the master before the broker) ---
+        dispatch_cases = (stats.get("dispatch") or {}).get("cases") or {}
+        if dispatch_cases:
+            waiting = sum(c.get("waiting_inputs", 0) for c in dispatch_cases.values())
+            released = sum(c.get("published_last_min", 0) for c in dispatch_cases.values())
+            weights = {c.get("weight", 1.0) for c in dispatch_cases.values()}
+            line = Text()
+            line.append(f"fair dispatch: {waiting} waiting", style="cyan")
+            line.append(f"  released: {released}/min", style="green")
+            if len(weights) == 1:
+                line.append(f"  weight: {weights.pop():g}", style="dim")
+            console.print(line)
+
         # --- per module breakdown ---
         if by_module:
             modules = Table(
@@ -127,6 +140,44 @@ class OsirCliDisplay:
                 )
             console.print(modules)
 
+    @staticmethod
+    def dispatch_stats(stats: dict, case_names: Optional[dict] = None) -> None:
+        """Render the fair dispatch lanes of the master, one row per case then per handler."""
+        case_names = case_names or {}
+        table = Table(
+            title=f"⚖️  Fair dispatch (window {stats.get('window', '?')} msg/queue)",
+            box=box.ROUNDED,
+            title_style="bold cyan",
+        )
+        table.add_column("Case / handler", style="magenta")
+        table.add_column("Weight", justify="right")
+        table.add_column("Waiting", justify="right", style="cyan")
+        table.add_column("Released/min", justify="right", style="green")
+        table.add_column("Released", justify="right", style="bold white")
+
+        cases = stats.get("cases") or {}
+        if not cases:
+            console.print("[yellow]No handler task went through the fair dispatcher.[/yellow]")
+            return
+
+        for case_uuid, case in sorted(cases.items(), key=lambda item: -item[1].get("published_last_min", 0)):
+            table.add_row(
+                Text(case_names.get(case_uuid, case_uuid), style="bold magenta"),
+                f"{case.get('weight', 1.0):g}",
+                str(case.get("waiting_inputs", 0)),
+                str(case.get("published_last_min", 0)),
+                str(case.get("published", 0)),
+            )
+            for handler_id, handler in (case.get("handlers") or {}).items():
+                table.add_row(
+                    Text(f"  {handler_id}", style="dim"),
+                    "",
+                    str(handler.get("waiting_inputs", 0)),
+                    str(handler.get("published_last_min", 0)),
+                    str(handler.get("published", 0)),
+                )
+        console.print(table)
+
     @staticmethod
     def cases(cases: list) -> None:
         table = Table(
@@ -169,7 +220,7 @@ class OsirCliDisplay:
         console.print(table)
 
     @staticmethod
-    def tasks(tasks: list) -> None:
+    def tasks(tasks: list, next_cursor: str = None) -> None:
         table = Table(
             title="📋 Tasks",
             box=box.ROUNDED,
@@ -192,6 +243,8 @@ class OsirCliDisplay:
             )
 
         console.print(table)
+        if next_cursor:
+            console.print(f"[dim]More tasks: --cursor {next_cursor}[/dim]")
 
     @staticmethod
     def modules(tree: "OsirModuleGroupModel", title: str = "Modules") -> None:
@@ -216,6 +269,62 @@ class OsirCliDisplay:
         console.print(table)
 
 
+    @staticmethod
+    def module_profiles(profiles: list) -> None:
+        """Renders the learned resource profiles, one row per module and input size bucket."""
+        if not profiles:
+            console.print("[yellow]No module profile learned yet.[/yellow]")
+            return
+
+        def _fmt_bytes(value) -> str:
+            value = float(value or 0)
+            for unit in ("B", "KiB", "MiB", "GiB"):
+                if value < 1024:
+                    return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+                value /= 1024
+            return f"{value:.1f} TiB"
+
+        def _fmt_bucket(bucket: int) -> str:
+            if bucket < 0:
+                return "unknown"
+            if bucket == 0:
+                return "empty"
+            return f"< {_fmt_bytes(2 ** bucket)}"
+
+        table = Table(
+            title="📈 Module resource profiles",
+            box=box.ROUNDED,
+            title_style="bold cyan"
+        )
+        table.add_column("Module", style="magenta")
+        table.add_column("Input size", style="cyan")
+        table.add_column("Runs", justify="right", style="bold white")
+        table.add_column("Wall", justify="right")
+        table.add_column("CPU", justify="right")
+        table.add_column("Cores", justify="right")
+        table.add_column("Read", justify="right")
+        table.add_column("Write", justify="right")
+        table.add_column("I/O rate", justify="right")
+        table.add_column("RSS avg", justify="right", style="yellow")
+        table.add_column("RSS max", justify="right", style="red")
+
+        for p in profiles:
+            table.add_row(
+                p.module,
+                _fmt_bucket(p.size_bucket),
+                str(p.samples),
+                f"{p.avg_wall_seconds:.1f}s",
+                f"{p.avg_cpu_seconds:.1f}s",
+                f"{p.avg_cpu_cores:.2f}" if p.avg_cpu_cores is not None else "N/A",
+                _fmt_bytes(p.avg_read_bytes),
+                _fmt_bytes(p.avg_write_bytes),
+                f"{_fmt_bytes(p.avg_io_bytes_per_sec)}/s" if p.avg_io_bytes_per_sec is not None else "N/A",
+                _fmt_bytes(p.avg_peak_rss_bytes),
+                _fmt_bytes(p.peak_rss_max),
+            )
+
+        console.print(table)
+
     @staticmethod
     def profiles(profiles: list) -> None:
         table = Table(
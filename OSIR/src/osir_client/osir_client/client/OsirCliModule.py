@@ -8,7 +8,7 @@ from osir_lib.core.model.OsirModuleModel import OsirModuleModel
 
 from osir_client.client.OsirCliHandler import OsirCliHandler
 from osir_client.client.OsirCliDisplay import OsirCliDisplay
-from osir_api.api.model.OsirApiModuleModel import GetModuleListResponse, GetModuleExistsResponse, PostModuleRunResponse, PostModuleRunOnFileResponse
+from osir_api.api.model.OsirApiModuleModel import GetModuleListResponse, GetModuleExistsResponse, PostModuleRunResponse, PostModuleRunOnFileResponse, GetModuleProfilesResponse
 
 logger: CustomLogger = AppLogger().get_logger()
 
@@ -49,6 +49,20 @@ class OsirCliModule(BaseModel):
             OsirCliDisplay.modules(response.response)
         return response.response
 
+    def profiles(self, module_name: Optional[str] = None, print: bool = True) -> list:
+        """
+        Retrieve the learned resource profiles of the modules.
+        GET /api/module/profiles
+        """
+        response: GetModuleProfilesResponse = self._api.get(
+            "/api/module/profiles",
+            response_model=GetModuleProfilesResponse,
+            params={"module": module_name} if module_name else None
+        )
+        if print:
+            OsirCliDisplay.module_profiles(response.response)
+        return response.response
+
     def _upload(self, case_name: str, file_path: str) -> str:
         """
             Upload a file to the case and return the server-side matched path.
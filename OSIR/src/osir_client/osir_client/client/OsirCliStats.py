@@ -4,24 +4,31 @@ Interactive task-statistics navigator for OSIR.
 Lets an analyst browse cases, list their handlers (running first), select a
 handler (or the whole case) and display aggregated task statistics computed
 server-side: counts per status, per-module breakdown, throughput and ETA.
-Supports a watch mode that refreshes the view periodically.
+Supports a watch mode that renders the task status stream of the API (server-
+sent events pushed on every status change), or refreshes the view periodically
+against servers without it.
 
 All data is fetched through the OSIR REST API via OsirClient:
     GET  /api/case                       -> cases
     POST /api/case/{name}/handler        -> handlers of a case
     POST /api/handler/{id}/stats         -> stats for one handler
     GET  /api/case/{name}/stats          -> stats for a whole case
+    GET  /api/handler/{id}/events        -> live stats stream for one handler
+    GET  /api/case/{name}/events         -> live stats stream for a whole case
+    GET  /api/dispatch                   -> fair dispatch lanes of the master
 """
 from __future__ import annotations
 
 import time
 from typing import TYPE_CHECKING, List, Optional
 
+import requests
 from rich.console import Console
 from rich.text import Text
 
 from osir_api.api.model.OsirApiCaseModel import GetCaseListResponse, GetCaseHandlerResponse
 from osir_api.api.model.OsirApiTaskModel import GetTaskStatsResponse
+from osir_service.ipc.model.OsirIpcResponse import OsirIpcResponse
 from osir_client.client.OsirCliDisplay import OsirCliDisplay, _status_text
 
 from osir_lib.logger import AppLogger
@@ -78,6 +85,10 @@ class OsirCliStats:
         )
         return response.response or {}
 
+    def _fetch_dispatch_stats(self) -> dict:
+        response: OsirIpcResponse = self._api.get("/api/dispatch", response_model=OsirIpcResponse)
+        return response.response or {}
+
     # ------------------------------------------------------------------ #
     # One-shot / watch display (also used by the non-interactive CLI)
     # ------------------------------------------------------------------ #
@@ -101,12 +112,16 @@ class OsirCliStats:
 
         if handler_id:
             fetch = lambda: self._fetch_handler_stats(handler_id)  # noqa: E731
+            events = f"/api/handler/{handler_id}/events"
             title = f"Handler {handler_id}"
         else:
             fetch = lambda: self._fetch_case_stats(case_name)  # noqa: E731
+            events = f"/api/case/{case_name}/events"
             title = f"Case {case_name}"
 
         try:
+            if watch:
+                self._watch_stream(events, title)
             while True:
                 stats = fetch()
                 if watch:
@@ -121,6 +136,41 @@ class OsirCliStats:
         except KeyboardInterrupt:
             console.print()
 
+    def _watch_stream(self, endpoint: str, title: str) -> None:
+        """Renders the stats pushed by the API; returns when the stream is unavailable or closed."""
+        try:
+            for event, stats in self._api.stream(endpoint):
+                if event != "stats":
+                    continue
+                console.clear()
+                OsirCliDisplay.task_stats(stats, title=title)
+                console.print(Text("live — Ctrl+C to stop", style="dim italic"))
+            logger.warning("Task status stream closed, polling instead")
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Task status stream unavailable ({e}), polling instead")
+
+    def show_dispatch(self, watch: Optional[int] = None) -> None:
+        """Display the fair dispatch lanes of every case (per-case throughput).
+
+        Args:
+            watch: refresh interval in seconds; None = render once.
+        """
+        try:
+            while True:
+                stats = self._fetch_dispatch_stats()
+                case_names = {str(case.case_uuid): case.name for case in self._fetch_cases()}
+                if watch:
+                    console.clear()
+                OsirCliDisplay.dispatch_stats(stats, case_names=case_names)
+                if not watch:
+                    return
+                console.print(
+                    Text(f"refresh every {watch}s — Ctrl+C to stop", style="dim italic")
+                )
+                time.sleep(watch)
+        except KeyboardInterrupt:
+            console.print()
+
     # ------------------------------------------------------------------ #
     # Interactive navigation
     # ------------------------------------------------------------------ #
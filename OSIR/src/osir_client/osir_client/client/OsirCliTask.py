@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING, List, Optional
 from pydantic import BaseModel, PrivateAttr
 
-from osir_api.api.model.OsirApiTaskModel import GetTaskInfoResponse, GetTasksListResponse
+from osir_api.api.model.OsirApiTaskModel import GetTaskInfoResponse, GetTasksPageResponse
 from osir_api.api.model.OsirApiHandlerModel import GetHandlerStatusResponse
 
 from osir_service.postgres.model.OsirDbTaskModel import OsirDbTaskModel
@@ -40,29 +40,44 @@ class OsirCliTask(BaseModel):
             OsirCliDisplay.task_info(response.response)
         return response.response
 
-    def list(self, case_name: Optional[str] = None) -> List["OsirDbTaskModel"]:
+    def list(
+        self,
+        case_name: Optional[str] = None,
+        module: Optional[List[str]] = None,
+        status: Optional[List[str]] = None,
+        agent: Optional[str] = None,
+        input: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> "OsirCliTask":
         """
-        List all tasks for a given case.
-        POST /api/case/{case_name}/tasks
+        List the tasks of a case, newest first, one page at a time.
+        GET /api/tasks
+
+        Pass the next cursor printed under the table to read the next page.
         """
         try:
-            if self.ctx is None or self.ctx.name is None:
-                logger.error("You can't run a profile on a not setup case")
-                return self
-
             if not case_name:
+                if self.ctx is None or self.ctx.name is None:
+                    logger.error("You can't list the tasks of a not setup case")
+                    return self
                 case_name = self._context.name
 
-            response: GetTasksListResponse = self._api.get(
-                f"/api/case/{case_name}/tasks",
-                response_model=GetTasksListResponse
+            params = {"case_name": case_name, "module": module, "status": status, "agent": agent,
+                      "input": input, "since": since, "until": until, "cursor": cursor, "limit": limit}
+            response: GetTasksPageResponse = self._api.get(
+                "/api/tasks",
+                response_model=GetTasksPageResponse,
+                params={k: v for k, v in params.items() if v is not None}
             )
 
-            OsirCliDisplay.tasks(response.response)
+            OsirCliDisplay.tasks(response.response.tasks, next_cursor=response.response.next_cursor)
             return self
 
         except Exception as e:
-            logger.error(f"Failed to list handlers: {e}")
+            logger.error(f"Failed to list tasks: {e}")
             return self
 
     def _get_handler_task_ids(self, handler_id: str) -> List[str]:
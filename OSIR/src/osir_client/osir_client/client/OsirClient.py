@@ -1,4 +1,5 @@
 
+import json
 import requests
 from typing import Optional, Type, TypeVar
 from pydantic import BaseModel, PrivateAttr
@@ -41,6 +42,31 @@ class OsirClient(BaseModel):
     def post(self, endpoint: str, response_model: Type[T], json: Optional[dict] = None) -> T:
         return self._request("POST", endpoint, response_model=response_model, json=json)
 
+    def stream(self, endpoint: str, timeout: float = 60):
+        """
+            Server-sent events of an endpoint, as (event, data) tuples, data parsed from JSON.
+            GET /api/handler/{id}/events, GET /api/case/{name}/events
+
+            timeout is the longest silence tolerated between two events (the
+            server sends a heartbeat every OSIR_EVENTS_HEARTBEAT seconds).
+        """
+        url = f"{self.api_url}/{endpoint.lstrip('/')}"
+        with requests.get(url, stream=True, timeout=(10, timeout),
+                          headers={"Accept": "text/event-stream"}) as resp:
+            resp.raise_for_status()
+            event, data = "message", []
+            for line in resp.iter_lines(decode_unicode=True):
+                if line:
+                    field, _, value = line.partition(":")
+                    if field == "event":
+                        event = value.strip()
+                    elif field == "data":
+                        data.append(value[1:] if value.startswith(" ") else value)
+                    continue
+                if data:
+                    yield event, json.loads("\n".join(data))
+                event, data = "message", []
+
     def upload(self, endpoint: str, files: dict, data: dict) -> None:
         """
             Multipart file upload.
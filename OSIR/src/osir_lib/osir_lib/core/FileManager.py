@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-import yaml
+from osir_lib.core.OsirConfigRegistry import OsirConfigRegistry
 from osir_lib.core.OsirConstants import OSIR_PATHS
 from osir_lib.logger import AppLogger
 
@@ -13,8 +13,9 @@ class FileManager:
         """
             Generic private method for locating YAML configuration files within the project structure.
 
-            This method uses a recursive, case-insensitive search (via pathlib.rglob) to find 
-            module or task definitions. Within the OSIR ecosystem, this ensures that the 
+            This method uses a case-insensitive lookup in the OsirConfigRegistry index of
+            base_dir (walked once, refreshed when a directory changes) to find module or
+            task definitions. Within the OSIR ecosystem, this ensures that the 
             orchestrator can dynamically locate tool configurations regardless of their 
             nesting level in the modules directory.
 
@@ -29,23 +30,17 @@ class FileManager:
             Raises:
                 FileNotFoundError: If the specified file cannot be located within the base_dir hierarchy.
         """
-        base_path = base_dir
-        candidate = base_path / name
+        candidate = base_dir / name
         if candidate.exists() and candidate.is_file():
             return candidate
 
-        def case_insensitive_pattern(filename: str) -> str:
-            return "".join(f"[{c.lower()}{c.upper()}]" if c.isalpha() else c for c in filename)
+        path = OsirConfigRegistry.get(base_dir).find(name)
+        if path is not None:
+            return path
 
-        pattern = case_insensitive_pattern(name)
-
-        for path in base_dir.rglob(pattern):
-            if path.is_file():
-                return path
-
-        logger.error(f"No {name} in directory {base_path}")
+        logger.error(f"No {name} in directory {base_dir}")
         if raise_error:
-            raise FileNotFoundError(f"No {name} in directory {base_path}")
+            raise FileNotFoundError(f"No {name} in directory {base_dir}")
 
         return None
 
@@ -167,8 +162,7 @@ class FileManager:
         Returns:
             dict: The parsed YAML content.
         """
-        with open(filepath, 'r') as file:
-            return yaml.safe_load(file)
+        return OsirConfigRegistry.load_yaml(filepath)
 
     @staticmethod
     def create_case(directory: str, case_name: str):
@@ -194,11 +188,11 @@ class FileManager:
 
     @staticmethod
     def all_profiles(relative: bool = False):
-        return FileManager.get_yaml_files(OSIR_PATHS.PROFILES_DIR, relative=relative)
+        return OsirConfigRegistry.get(OSIR_PATHS.PROFILES_DIR).files(relative=relative)
 
     @staticmethod
     def all_modules(relative: bool = False):
-        return FileManager.get_yaml_files(OSIR_PATHS.MODULES_DIR, relative=relative)
+        return OsirConfigRegistry.get(OSIR_PATHS.MODULES_DIR).files(relative=relative)
     
     def all_cases():
         return FileManager.get_subdirectories(OSIR_PATHS.CASES_DIR)
\ No newline at end of file
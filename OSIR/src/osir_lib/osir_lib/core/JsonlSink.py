@@ -0,0 +1,188 @@
+import gzip
+import json
+import os
+import queue
+import threading
+
+from osir_lib.logger import AppLogger, CustomLogger
+
+try:
+    import orjson
+except ImportError:  # stdlib encoder
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger: CustomLogger = AppLogger().get_logger()
+
+_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def encode_record(record) -> bytes:
+    """
+    Serializes a record as one JSONL line.
+
+    orjson is used when installed; records it cannot encode (lone surrogates,
+    integers over 64 bits...) go through the stdlib encoder.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return (json.dumps(record) + "\n").encode("utf-8", "surrogateescape")
+
+
+class JsonlSink:
+    """
+    Batched JSONL output of a module.
+
+    The producer (the parsing loop) only appends records to a list: every
+    OSIR_SINK_BATCH records the list is handed to a writer thread as a
+    whole, which serializes the records into a buffer written out every
+    OSIR_SINK_BUFFER_BYTES. At most OSIR_SINK_QUEUE_BATCHES batches wait
+    for the writer, which bounds the memory when the disk is the slowest.
+
+    Options, also read from the environment when not given:
+        - compression (OSIR_SINK_COMPRESSION): none, gzip or zstd (zstandard
+          package, gzip when missing). The suffix of the codec is appended
+          to the output path.
+        - fsync (OSIR_SINK_FSYNC): none, close (once the output is complete)
+          or batch (after every buffer written).
+
+    put(None) or close() writes what is left and returns once the output is
+    complete. A write error is raised by the next put() or by close().
+    """
+
+    def __init__(self, path: str, compression: str = None, fsync: str = None):
+        self.compression = (compression or os.getenv("OSIR_SINK_COMPRESSION", "none")).lower()
+        self.fsync = (fsync or os.getenv("OSIR_SINK_FSYNC", "none")).lower()
+        self.batch_records = max(1, int(os.getenv("OSIR_SINK_BATCH", "2000")))
+        self.buffer_bytes = max(1, int(os.getenv("OSIR_SINK_BUFFER_BYTES", str(4 * 1024 * 1024))))
+
+        if self.compression not in _SUFFIXES:
+            raise ValueError(f"Unknown sink compression: {self.compression}")
+        if self.fsync not in ("none", "close", "batch"):
+            raise ValueError(f"Unknown sink fsync policy: {self.fsync}")
+        if self.compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, writing gzip output instead")
+            self.compression = "gzip"
+
+        self.path = f"{path}{_SUFFIXES[self.compression]}"
+        self.records = 0
+        self._batch = []
+        self._queue = queue.Queue(maxsize=max(1, int(os.getenv("OSIR_SINK_QUEUE_BATCHES", "8"))))
+        self._error = None
+        self._closed = False
+
+        self._raw = open(self.path, "ab")
+        if self.compression == "gzip":
+            self._out = gzip.GzipFile(fileobj=self._raw, mode="ab", compresslevel=6)
+        elif self.compression == "zstd":
+            self._out = zstandard.ZstdCompressor(level=3).stream_writer(self._raw, closefd=False)
+        else:
+            self._out = self._raw
+
+        self._thread = threading.Thread(target=self._run, name="osir-jsonl-sink", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def put(self, record):
+        """Adds a record. None closes the sink (end of the module output)."""
+        if record is None:
+            self.close()
+            return
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_records:
+            self._handoff()
+
+    def put_many(self, records):
+        """Adds records."""
+        self._batch.extend(records)
+        if len(self._batch) >= self.batch_records:
+            self._handoff()
+
+    def write_raw(self, data):
+        """Adds JSONL already serialized (whole lines, str or bytes)."""
+        if self._batch:
+            self._handoff()
+        if isinstance(data, str):
+            data = data.encode("utf-8", "surrogateescape")
+        if data:
+            self._send(bytes(data))
+
+    def close(self):
+        """Writes the remaining records and closes the output."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._batch and self._error is None:
+                self._handoff()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            try:
+                if self._out is not self._raw:
+                    self._out.close()
+                self._raw.flush()
+                if self.fsync != "none":
+                    os.fsync(self._raw.fileno())
+            finally:
+                self._raw.close()
+
+        if self._error is not None:
+            raise self._error
+        logger.debug(f"{self.records} record(s) written to {self.path}")
+
+    def _handoff(self):
+        batch, self._batch = self._batch, []
+        self._send(batch)
+
+    def _send(self, item):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(item)
+
+    def _run(self):
+        buffer = bytearray()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                continue  # drained until close()
+            try:
+                if isinstance(item, bytes):
+                    buffer += item
+                else:
+                    for record in item:
+                        buffer += encode_record(record)
+                    self.records += len(item)
+                if len(buffer) >= self.buffer_bytes:
+                    self._write(buffer)
+                    buffer.clear()
+            except Exception as exc:
+                self._error = exc
+
+        if buffer and self._error is None:
+            try:
+                self._write(buffer)
+            except Exception as exc:
+                self._error = exc
+
+    def _write(self, data: bytearray):
+        self._out.write(data)
+        if self.fsync == "batch":
+            self._out.flush()
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
@@ -1,13 +1,10 @@
 import datetime
 import gzip
-import json
-import queue
 import re
-import threading
 import lzma
 
+from osir_lib.core.JsonlSink import JsonlSink
 from osir_lib.core.OsirModule import OsirModule
-from osir_lib.core.OsirDecorator import timeit
 from osir_lib.logger import AppLogger, CustomLogger
 
 logger: CustomLogger = AppLogger().get_logger()
@@ -27,6 +24,7 @@ class LogUtils:
 
     def __init__(self, ctx: OsirModule):
         self.ctx: OsirModule = ctx
+        self._output_sinks = []
 
     @staticmethod
     def get_severity(line):
@@ -157,40 +155,63 @@ class LogUtils:
         else:
             return max(regex_match)
 
-    @timeit
-    def _thread_save_jsonl(self, queue, output_path=None):
-        try:
-            if not output_path:
-                output_path = self.ctx.output.output_file
-
-            with open(output_path, "a", encoding='utf-8') as file:  # ouvert une seule fois
-                while True:
-                    data = queue.get()
-                    if data is None:
-                        queue.task_done()
-                        break
-                    try:
-                        json.dump(data, file)
-                        file.write('\n')
-                    finally:
-                        queue.task_done()
-
-        except Exception as exc:
-            logger.error_handler(exc)
+    def open_output_sink(self, output_path=None, **options) -> JsonlSink:
+        """
+        Opens the batched JSONL output of the module (see JsonlSink).
+
+        The module output file is updated with the suffix of the compression.
+        Modules indexed by json2splunk (splunk section) keep a plain JSONL
+        output unless a compression is given: their outputs are selected by
+        name (.jsonl) and read as text.
+
+        Args:
+            output_path (Optional[str]): Output file, the module output file by default.
+            **options: compression and fsync of the sink, from the environment by default.
+
+        Returns:
+            JsonlSink: The sink, closed by put(None), close() or close_output_sinks().
+        """
+        module_output = not output_path
+        if module_output:
+            output_path = self.ctx.output.output_file
+        if not options.get("compression") and getattr(self.ctx, "splunk", None):
+            options["compression"] = "none"
+
+        sink = JsonlSink(output_path, **options)
+        if module_output:
+            self.ctx.output.output_file = sink.path
+
+        if getattr(self, "_output_sinks", None) is None:
+            self._output_sinks = []
+        self._output_sinks.append(sink)
+        return sink
+
+    def close_output_sinks(self):
+        """
+        Closes the sinks left open, e.g. by a module that raised before put(None).
+
+        Called by the osir_internal_module wrapper once the module returned or
+        raised: what was written is flushed and compressed outputs are properly
+        ended. Errors are logged, not raised.
+        """
+        sinks, self._output_sinks = getattr(self, "_output_sinks", None) or [], []
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as exc:
+                logger.error(f"Could not complete the output {sink.path}: {exc}")
 
     def start_writer_thread(self, output_path=None):
         """
-        Starts a writer thread that will handle saving data to JSONL files.
+        Starts the writer of the module output, see open_output_sink.
+
+        Records are given with put(record); put(None) writes what is left and
+        returns once the output file is complete.
 
         Returns:
-            Queue: A queue that will hold data to be processed by the writer thread.
-        """
-        # TODO : SET THIS VALUE IN A CONFIG FILE
-        MAX_QUEUE_SIZE = 100000
-        q = queue.Queue(maxsize=MAX_QUEUE_SIZE)
-        writer_thread = threading.Thread(target=self._thread_save_jsonl, args=(q, output_path))
-        writer_thread.start()
-        return q
+            JsonlSink: The sink receiving the records.
+        """
+        return self.open_output_sink(output_path)
 
     def safe_search(self, pattern: str, log: str) -> str:
         """
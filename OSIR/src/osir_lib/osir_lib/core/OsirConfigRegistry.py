@@ -0,0 +1,159 @@
+import copy
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+# A file modified within this many seconds of being stat'ed may change again
+# without its mtime moving (coarse timestamps): it is not trusted for caching.
+RACY_WINDOW = 2.0
+
+
+class OsirConfigRegistry:
+    """
+        Process-wide index of a configuration tree (modules, profiles, setup).
+
+        The tree is walked once; lookups by file name are then a dict access
+        instead of a case-insensitive rglob. Every directory mtime is recorded:
+        at most every OSIR_CONFIG_REGISTRY_REFRESH seconds the directories are
+        stat'ed again and the tree is walked again when one of them changed
+        (file added, removed or renamed).
+
+        Parsed YAML files are cached as well, keyed by path and validated by
+        the file size and mtime, so each file is parsed once per process and
+        again only after an edit.
+    """
+
+    _registries: dict = {}
+    _registries_lock = threading.Lock()
+
+    _yaml_cache: dict = {}
+    _yaml_lock = threading.Lock()
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self.refresh_interval = float(os.getenv("OSIR_CONFIG_REGISTRY_REFRESH", "2.0"))
+
+        self._lock = threading.Lock()
+        self._by_name: dict[str, Path] = {}
+        self._files: list[Path] = []
+        self._dir_mtimes: dict[str, Optional[int]] = {}
+        self._checked_at = None
+
+    @classmethod
+    def get(cls, base_dir: Path) -> "OsirConfigRegistry":
+        key = str(base_dir)
+        registry = cls._registries.get(key)
+        if registry is None:
+            with cls._registries_lock:
+                registry = cls._registries.get(key)
+                if registry is None:
+                    registry = cls._registries[key] = cls(base_dir)
+        return registry
+
+    def find(self, name: str) -> Optional[Path]:
+        """
+            Locates a file of the tree by name, case-insensitively.
+
+            Args:
+                name (str): A file name ('lnk.yml') or a path relative to the
+                    tree ('windows/lnk.yml').
+
+            Returns:
+                Path: The file, or None when the tree holds no such file.
+        """
+        self._refresh()
+        key = name.replace("\\", "/").lower()
+        if "/" not in key:
+            return self._by_name.get(key)
+
+        key = key.lstrip("/")
+        for path in self._files:
+            relative = path.relative_to(self.base_dir).as_posix().lower()
+            # Whole path components only: 'windows/lnk.yml' is not 'xwindows/lnk.yml'.
+            if relative == key or relative.endswith("/" + key):
+                return path
+        return None
+
+    def files(self, relative: bool = False) -> list[str]:
+        """Returns every .yml file of the tree, as relative paths or base names."""
+        self._refresh()
+        return [
+            path.relative_to(self.base_dir).as_posix() if relative else path.name
+            for path in self._files
+            if path.name.endswith(".yml")
+        ]
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.refresh_interval:
+                return
+            if self._checked_at is None or self._tree_changed():
+                self._scan()
+            self._checked_at = time.monotonic()
+
+    def _tree_changed(self) -> bool:
+        for directory, mtime_ns in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return not self._dir_mtimes and self.base_dir.is_dir()
+
+    def _scan(self):
+        by_name = {}
+        files = []
+        dir_mtimes = {}
+        for root, dirs, names in os.walk(self.base_dir, followlinks=True):
+            dirs.sort()
+            try:
+                mtime_ns = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            dir_mtimes[root] = mtime_ns if time.time() - mtime_ns / 1e9 >= RACY_WINDOW else None
+            for name in sorted(names):
+                path = Path(root) / name
+                files.append(path)
+                by_name.setdefault(name.lower(), path)
+
+        self._by_name = by_name
+        self._files = files
+        self._dir_mtimes = dir_mtimes
+        logger.debug(f"Config registry of {self.base_dir}: {len(files)} files indexed")
+
+    @classmethod
+    def load_yaml(cls, path) -> dict:
+        """
+            Parses a YAML file, reusing the previous parse while the file is unchanged.
+
+            Args:
+                path (str | Path): The YAML file.
+
+            Returns:
+                The parsed content. A copy is returned: callers may modify it.
+        """
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        signature = (st.st_size, st.st_mtime_ns)
+
+        cached = cls._yaml_cache.get(key)
+        if cached is None or cached[0] != signature:
+            with open(key, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+            if time.time() - st.st_mtime >= RACY_WINDOW:
+                with cls._yaml_lock:
+                    cls._yaml_cache[key] = (signature, data)
+        else:
+            data = cached[1]
+        return copy.deepcopy(data)
@@ -1,9 +1,10 @@
+from collections import deque
 from datetime import datetime
 import functools
 import inspect
-from io import StringIO
 import io
 import logging
+import os
 import threading
 import time
 from typing import Any, Optional
@@ -13,6 +14,64 @@ from osir_service.postgres.OsirDbConstants import ProcessingStatus
 logger = AppLogger().get_logger()
 
 
+class TraceCapture(io.TextIOBase):
+    """
+        Log capture of a module run, capped at OSIR_TRACE_MAX_CHARS characters:
+        the first half of the budget keeps the head of the trace (module
+        start, configuration), the second half a rolling tail (the last
+        lines before the end or the error). What falls in between is dropped
+        and replaced by a marker line.
+    """
+
+    def __init__(self):
+        max_chars = int(os.getenv("OSIR_TRACE_MAX_CHARS", "1000000"))
+        self.head_limit = max_chars // 2
+        self.tail_limit = max_chars - self.head_limit
+        self.dropped = 0
+        self._head = []
+        self._head_size = 0
+        self._tail = deque()
+        self._tail_size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        size = len(s)
+        if self._head_size < self.head_limit:
+            head = s[:self.head_limit - self._head_size]
+            self._head.append(head)
+            self._head_size += len(head)
+            s = s[len(head):]
+            if not s:
+                return size
+
+        self._tail.append(s)
+        self._tail_size += len(s)
+        while self._tail_size > self.tail_limit:
+            excess = self._tail_size - self.tail_limit
+            first = self._tail[0]
+            if len(first) <= excess:
+                self._tail.popleft()
+                excess = len(first)
+            else:
+                self._tail[0] = first[excess:]
+            self._tail_size -= excess
+            self.dropped += excess
+        return size
+
+    def getvalue(self) -> str:
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if not self.dropped:
+            return head + tail
+        # Cut on whole lines around the marker.
+        head, _, partial_head = head.rpartition("\n")
+        partial_tail, _, tail = tail.partition("\n")
+        dropped = self.dropped + len(partial_head) + len(partial_tail)
+        return f"{head}\n[... {dropped} characters of trace dropped ...]\n{tail}"
+
+
 def timeit(func):
     """
         Decorator that measures and logs the execution time of a specific function.
@@ -73,7 +132,7 @@ def osir_internal_module(cls_or_func=None, *, trace: Optional[bool] = True):
             task_id = available_vars.get('task_id')
 
             # 2. Configure in-memory log capture
-            log_capture = io.StringIO()
+            log_capture = TraceCapture()
             capture_handler = logging.StreamHandler(log_capture)
             db_fmt = logging.Formatter('[%(levelname)s][%(asctime)s] - %(filename)s:%(lineno)d - %(funcName)s - %(message)s')
             capture_handler.setFormatter(db_fmt)
@@ -95,6 +154,7 @@ def osir_internal_module(cls_or_func=None, *, trace: Optional[bool] = True):
                 if k in sig.parameters
             }
 
+            instance = None
             try:
                 # 4. Execution logic
                 if isinstance(cls_or_func, type):
@@ -113,7 +173,10 @@ def osir_internal_module(cls_or_func=None, *, trace: Optional[bool] = True):
                 raise e
 
             finally:
-                # 5. Finalization and handler cleanup
+                # 5. Finalization and handler cleanup: outputs left open by the
+                #    module (LogUtils sinks) are completed even when it raised
+                if instance is not None and hasattr(instance, "close_output_sinks"):
+                    instance.close_output_sinks()
                 end_time = datetime.now()
                 main_logger.removeHandler(capture_handler)
 
@@ -144,7 +207,7 @@ def trace_func():
             task_id = kwargs.pop('task_id', None)
 
             # Setup logging capture
-            log_capture = StringIO()
+            log_capture = TraceCapture()
             capture_handler = logging.StreamHandler(log_capture)
             db_fmt = logging.Formatter('[%(levelname)s][%(asctime)s] - %(filename)s:%(lineno)d - %(funcName)s - %(message)s')
             capture_handler.setFormatter(db_fmt)
@@ -0,0 +1,124 @@
+import importlib.util
+import os
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from osir_lib.core.FileManager import FileManager
+from osir_lib.core.OsirConfigRegistry import OsirConfigRegistry
+from osir_lib.core.OsirConstants import OSIR_PATHS
+from osir_lib.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+
+class OsirInternalModules:
+    """
+        Per-process registry of the internal module entry points (callables
+        marked `__osir_internal__`).
+
+        A module file is located through the OsirConfigRegistry index of
+        PY_MODULES_DIR and executed once; its entry point is then reused by
+        every task of the process until the source file mtime changes. Worker
+        processes can pre-warm the registry before forking their pool, so
+        heavy imports (dissect.target, live response parsers...) are paid
+        once per worker instead of once per task.
+    """
+
+    _entries: dict = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls, name: str) -> Optional[Callable]:
+        """
+            Returns the entry point of an internal module.
+
+            Args:
+                name (str): Module name, i.e. the name of the .py file.
+
+            Returns:
+                Optional[Callable]: The decorated entry point, or None when the file
+                is missing, fails to import or has no entry point.
+        """
+        target_file = cls._find(name)
+        if target_file is None:
+            logger.error(f"File {name}.py not found in {OSIR_PATHS.PY_MODULES_DIR}")
+            return None
+
+        try:
+            mtime_ns = os.stat(target_file).st_mtime_ns
+        except OSError as e:
+            logger.error(f"Error while loading internal module {target_file}: {e}")
+            return None
+
+        cached = cls._entries.get(name)
+        if cached is not None and cached[0] == (str(target_file), mtime_ns):
+            return cached[1]
+
+        with cls._lock:
+            cached = cls._entries.get(name)
+            if cached is not None and cached[0] == (str(target_file), mtime_ns):
+                return cached[1]
+
+            started = time.perf_counter()
+            entry = cls._exec(name, target_file)
+            if entry is not None:
+                cls._entries[name] = ((str(target_file), mtime_ns), entry)
+                logger.debug(f"Internal module {name} loaded in {time.perf_counter() - started:.2f}s")
+            return entry
+
+    @classmethod
+    def prewarm(cls, profiles: Iterable[str]):
+        """
+            Loads the internal modules of the given profiles.
+
+            Args:
+                profiles (Iterable[str]): Profile names. Unknown profiles and
+                    modules failing to load are logged and skipped.
+        """
+        names = set()
+        for profile in profiles:
+            profile_path = FileManager.get_profile_path(profile, raise_error=False)
+            if profile_path is None:
+                continue
+            for module in FileManager.load_yaml_file(profile_path).get("modules") or []:
+                try:
+                    configuration = FileManager.load_yaml_file(FileManager.get_module_path(module))["configuration"]
+                except Exception as e:
+                    logger.warning(f"Cannot pre-warm module {module}: {e}")
+                    continue
+                if "internal" in (configuration.get("processor_type") or []):
+                    names.add(configuration.get("alt_module") or configuration["module"])
+
+        for name in sorted(names):
+            cls.load(name)
+        logger.info(f"Internal modules pre-warmed: {', '.join(sorted(cls._entries)) or 'none'}")
+
+    @staticmethod
+    def _find(name: str):
+        path = OsirConfigRegistry.get(OSIR_PATHS.PY_MODULES_DIR).find(f"{name}.py")
+        # The index is case-insensitive, module files are not.
+        if path is None or path.name != f"{name}.py":
+            return None
+        return path
+
+    @staticmethod
+    def _exec(name: str, target_file) -> Optional[Callable]:
+        try:
+            spec = importlib.util.spec_from_file_location(name, target_file)
+            if spec and spec.loader:
+                module = importlib.util.module_from_spec(spec)
+                # Inject into sys.modules to handle relative imports within the library
+                sys.modules[name] = module
+                spec.loader.exec_module(module)
+
+                for attr_name in dir(module):
+                    attr = getattr(module, attr_name)
+                    if getattr(attr, "__osir_internal__", False):
+                        return attr
+
+        except Exception as e:
+            logger.error(f"Error while loading internal module {target_file}: {e}")
+
+        return None
@@ -18,4 +18,5 @@ class OsirConfigurationModel(BaseModel):
     processor_type: list[PROCESSOR_TYPE]
     processor_os: PROCESSOR_OS
     alt_module: Optional[str] = None
-    hold_consumers: Optional[bool] = False
\ No newline at end of file
+    hold_consumers: Optional[bool] = False
+    batch_size: Optional[int] = 1
\ No newline at end of file
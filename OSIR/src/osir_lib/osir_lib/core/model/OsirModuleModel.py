@@ -1,6 +1,4 @@
-import importlib
 from pathlib import Path
-import sys
 import yaml
 import os
 from typing import Callable, Optional, Pattern
@@ -8,6 +6,7 @@ from pydantic import BaseModel, PrivateAttr, ValidationError
 
 from osir_lib.core.FileManager import FileManager
 from osir_lib.core.OsirConstants import OSIR_PATHS
+from osir_lib.core.OsirInternalModules import OsirInternalModules
 from osir_lib.core.model.OsirEndpointModel import OsirEndpointModel
 from osir_lib.core.model.OsirInputModel import OsirInputModel
 from osir_lib.core.model.OsirOutputModel import OsirOutputModel
@@ -73,9 +72,8 @@ class OsirModuleModel(BaseModel):
             raise FileNotFoundError(f"YAML file not found: {path}")
 
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                data['filename'] = os.path.basename(path)
+            data = FileManager.load_yaml_file(path)
+            data['filename'] = os.path.basename(path)
             if not isinstance(data, dict):
                 raise ValueError(f"YAML content must be a dictionary, got {type(data)}")
 
@@ -116,7 +114,8 @@ class OsirModuleModel(BaseModel):
             If a module is marked as 'internal', this method searches for a 
             corresponding .py file in the PY_MODULES_DIR. It specifically looks 
             for a class or function decorated with @osir_internal_module (identified 
-            by the __osir_internal__ attribute).
+            by the __osir_internal__ attribute). Loaded entry points are cached per
+            process by OsirInternalModules.
 
             Args:
                 alt_module (str, optional): An alternative module name to search for.
@@ -124,33 +123,4 @@ class OsirModuleModel(BaseModel):
             Returns:
                 Optional[Callable]: The decorated executable logic, or None if not found.
         """
-        # Define the module name to search for
-        module_name = alt_module if alt_module else self.module_name
-        root_path = Path(OSIR_PATHS.PY_MODULES_DIR)
-
-        # Recursive search for the Python source file
-        target_file = next(root_path.rglob(f"{module_name}.py"), None)
-
-        if not target_file:
-            logger.error(f"File {module_name}.py not found in {root_path}")
-            return None
-
-        try:
-            # Dynamic import logic
-            spec = importlib.util.spec_from_file_location(module_name, target_file)
-            if spec and spec.loader:
-                module = importlib.util.module_from_spec(spec)
-                # Inject into sys.modules to handle relative imports within the library
-                sys.modules[module_name] = module
-                spec.loader.exec_module(module)
-
-                # Scan module attributes for the OSIR internal decorator marker
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if getattr(attr, "__osir_internal__", False):
-                        return attr
-
-        except Exception as e:
-            logger.error(f"Error while loading internal module {target_file}: {e}")
-
-        return None
+        return OsirInternalModules.load(alt_module if alt_module else self.module_name)
@@ -49,9 +49,8 @@ class OsirProfileModel(BaseModel):
             raise FileNotFoundError(f"YAML file not found: {path}")
 
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                data['filename'] = os.path.basename(path)
+            data = FileManager.load_yaml_file(path)
+            data['filename'] = os.path.basename(path)
             if not isinstance(data, dict):
                 raise ValueError(f"YAML content must be a dictionary, got {type(data)}")
 
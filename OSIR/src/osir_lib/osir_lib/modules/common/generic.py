@@ -1,7 +1,12 @@
+import os
 import re
+from collections import Counter
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
+from osir_lib.core.JsonlSink import encode_record
+
 
 # ---------------------------------------------------------------------------
 # Timestamp patterns — ordonnés par priorité (1 = meilleur / plus précis)
@@ -103,6 +108,177 @@ _TIMESTAMP_PATTERNS = [
      None),  # parser spécial
 ]
 
+_PATTERNS_BY_NAME = {name: (pattern, fmts) for _, name, pattern, fmts in _TIMESTAMP_PATTERNS}
+_PATTERN_NAMES = [name for _, name, _, _ in sorted(_TIMESTAMP_PATTERNS, key=lambda p: p[0])]
+assert all(pattern.groups == 1 for _, _, pattern, _ in _TIMESTAMP_PATTERNS)
+
+# ---------------------------------------------------------------------------
+# Regex combinée : une alternative par pattern, dans l'ordre de priorité.
+# Chaque alternative parcourt toute la ligne (.*?) avant de céder la main à la
+# suivante : le premier pattern trouvé est donc le meilleur, et la recherche
+# s'arrête là au lieu d'évaluer les 15 regex sur chaque ligne.
+# m.lastindex donne le rang du pattern retenu (un seul groupe par pattern).
+# ---------------------------------------------------------------------------
+_COMBINED_PATTERN = re.compile(
+    "|".join(
+        f"(?:.*?{_PATTERNS_BY_NAME[name][0].pattern})" for name in _PATTERN_NAMES
+    ),
+    re.DOTALL,
+)
+
+# Apprentissage du format dominant d'un fichier
+SAMPLE_LINES = int(os.getenv("OSIR_GENERIC_SAMPLE_LINES", "1000"))
+LEARN_RATIO = float(os.getenv("OSIR_GENERIC_LEARN_RATIO", "0.8"))
+
+# Découpage
+CHUNK_LINES = int(os.getenv("OSIR_GENERIC_CHUNK_LINES", "20000"))
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+_FRACTION = re.compile(r'[.,](\d+)')
+
+
+def find_timestamp(line: str, learned: str | None = None) -> tuple[re.Match, str] | None:
+    """Retourne (match, nom du format) du meilleur timestamp de la ligne.
+
+    Si un format dominant a été appris pour le fichier, il est essayé en
+    premier : l'horodatage d'en-tête n'est ainsi plus supplanté par un
+    timestamp de priorité supérieure présent dans le message.
+    """
+    if learned is not None:
+        m = _PATTERNS_BY_NAME[learned][0].search(line)
+        if m:
+            return m, learned
+
+    m = _COMBINED_PATTERN.match(line)
+    if m is None:
+        return None
+    return m, _PATTERN_NAMES[m.lastindex - 1]
+
+
+def learn_format(lines) -> str | None:
+    """Apprend le format dominant d'un échantillon de lignes (None si aucun ne domine)."""
+    counts = Counter()
+    total = 0
+    for line in lines:
+        line = line.rstrip("\n\r")
+        if not line.strip():
+            continue
+        total += 1
+        found = find_timestamp(line)
+        if found:
+            counts[found[1]] += 1
+
+    if not counts:
+        return None
+    name, count = counts.most_common(1)[0]
+    return name if count >= LEARN_RATIO * total else None
+
+
+def _fast_parse(raw: str, name: str) -> datetime | None:
+    """Chemin rapide sans strptime pour les layouts ISO 8601 et syslog.
+
+    Lève ValueError quand la chaîne sort du cas simple : l'appelant retombe
+    alors sur les formats strptime.
+    """
+    if name in ("iso8601_tz", "iso8601"):
+        fraction = _FRACTION.search(raw, 19)
+        # strptime (%f) refuse plus de 6 chiffres : même résultat ici.
+        if fraction and len(fraction.group(1)) > 6:
+            raise ValueError(raw)
+        return datetime.fromisoformat(raw)
+
+    # syslog : "Jan 15 14:23:01[.123]"  /  syslog_year : "2024 Jan 15 14:23:01"
+    parts = raw.split()
+    year = 1900
+    if name == "syslog_year":
+        year = int(parts.pop(0))
+    month, day, clock = parts
+    hour, minute, second = clock.split(":")
+    microsecond = 0
+    if name == "syslog_ms":
+        second, fraction = second.split(".")
+        if len(fraction) > 6:
+            raise ValueError(raw)
+        microsecond = int(fraction.ljust(6, "0"))
+    return datetime(year, _MONTHS[month.lower()], int(day), int(hour), int(minute), int(second), microsecond)
+
+
+_FAST_PATH = ("iso8601_tz", "iso8601", "syslog", "syslog_ms", "syslog_year")
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(raw: str, name: str) -> str | None:
+    """Convertit la chaîne brute en datetime ISO 8601 (str) selon le type de pattern.
+
+    Mis en cache : dans un log, le même horodatage revient sur de nombreuses lignes.
+    """
+    if name == "tai64n":
+        # TAI64N : @<16 hex = secondes TAI><8 hex = nanosecondes>
+        # TAI epoch = Unix epoch + 2^62
+        try:
+            secs = int(raw[1:17], 16) - (2 ** 62)
+            return datetime.fromtimestamp(secs, tz=timezone.utc).isoformat()
+        except (ValueError, OSError, OverflowError):
+            return None
+
+    if name in ("epoch_float", "epoch_int"):
+        try:
+            return datetime.fromtimestamp(float(raw), tz=timezone.utc).isoformat()
+        except (ValueError, OSError, OverflowError):
+            return None
+
+    if name in _FAST_PATH:
+        try:
+            return _fast_parse(raw, name).isoformat()
+        except (ValueError, KeyError):
+            pass
+
+    normalized = raw.replace("Z", "+00:00")
+    for fmt in _PATTERNS_BY_NAME[name][1]:
+        try:
+            s = normalized.replace(",", ".") if "%f" in fmt else normalized
+            return datetime.strptime(s, fmt).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_line(line: str, learned: str | None = None) -> dict:
+    """
+    Analyse une ligne de log et retourne un dict avec :
+    - timestamp_raw  : chaîne brute trouvée (None si absent)
+    - timestamp      : datetime ISO 8601 str (None si absent ou non parseable)
+    - timestamp_fmt  : nom du format détecté (None si absent)
+    - message        : reste de la ligne après le timestamp
+    """
+    line = line.rstrip("\n\r")
+
+    found = find_timestamp(line, learned)
+    if found is None:
+        return {
+            "timestamp_raw": None,
+            "timestamp": None,
+            "timestamp_fmt": None,
+            "message": line,
+        }
+
+    match, name = found
+    raw_ts = match.group(match.lastindex)
+    message = line[match.end():].lstrip(" :-")
+
+    return {
+        "timestamp_raw": raw_ts,
+        "timestamp": parse_timestamp(raw_ts, name),
+        "timestamp_fmt": name,
+        "message": message,
+    }
+
+
+def parse_chunk(lines: list, learned: str | None = None) -> bytes:
+    """Parse un bloc de lignes et retourne les enregistrements JSONL correspondants."""
+    return b"".join(encode_record(parse_line(line, learned)) for line in lines if line.strip())
+
 
 
 from osir_lib.core.OsirDecorator import osir_internal_module
@@ -136,20 +312,27 @@ class SqliteModule(LogUtils):
     def __call__(self) -> bool:
         """
         Execute the internal processor of the module.
+
+        The dominant timestamp format is learned from the first lines of the
+        file, then lines are parsed and written in blocks of CHUNK_LINES. The
+        module runs in Celery prefork children, which cannot start processes:
+        parallelism comes from the workers running other inputs.
+
         Returns:
             bool: True if the processing completes successfully, False otherwise.
         """
         try:
             logger.debug(f"Processing Started: \n File Input: {self.module.input.file} \n")
 
-            writer_queue = self.start_writer_thread()
+            chunks = self._iter_chunks()
+            first = next(chunks, [])
+            learned = learn_format(first[:SAMPLE_LINES])
+            logger.debug(f"Learned timestamp format: {learned}")
 
-            for line in self.get_log():
-                if not line.strip():
-                    continue
-                writer_queue.put(self.parse_line(line))
-
-            writer_queue.put(None)
+            with self.open_output_sink() as output:
+                output.write_raw(parse_chunk(first, learned))
+                for chunk in chunks:
+                    output.write_raw(parse_chunk(chunk, learned))
 
             logger.debug(f"Processing Done: \n File Input: {self.module.input.file} \n")
 
@@ -158,77 +341,22 @@ class SqliteModule(LogUtils):
             return False
 
         return True
-    
+
+    def _iter_chunks(self):
+        """Yields the lines of the input in blocks of CHUNK_LINES."""
+        chunk = []
+        for line in self.get_log():
+            chunk.append(line)
+            if len(chunk) >= CHUNK_LINES:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
     # ---------------------------------------------------------------------------
     # Parser
     # ---------------------------------------------------------------------------
 
-    def _parse_timestamp(self, raw: str, fmt_list: list | None, name: str) -> datetime | None:
-        """Convertit la chaîne brute en datetime selon le type de pattern."""
-        if name == "tai64n":
-            # TAI64N : @<16 hex = secondes TAI><8 hex = nanosecondes>
-            # TAI epoch = Unix epoch + 2^62
-            try:
-                secs = int(raw[1:17], 16) - (2 ** 62)
-                return datetime.fromtimestamp(secs, tz=timezone.utc)
-            except (ValueError, OSError):
-                return None
-
-        if name in ("epoch_float", "epoch_int"):
-            try:
-                return datetime.fromtimestamp(float(raw), tz=timezone.utc)
-            except (ValueError, OSError):
-                return None
-
-        normalized = raw.replace("Z", "+00:00")
-        for fmt in fmt_list:
-            try:
-                s = normalized.replace(",", ".") if "%f" in fmt else normalized
-                return datetime.strptime(s, fmt)
-            except ValueError:
-                continue
-        return None
-
-
     def parse_line(self, line: str) -> dict:
-        """
-        Analyse une ligne de log et retourne un dict avec :
-        - timestamp_raw  : chaîne brute trouvée (None si absent)
-        - timestamp      : datetime ISO 8601 str (None si absent ou non parseable)
-        - timestamp_fmt  : nom du format détecté (None si absent)
-        - message        : reste de la ligne après le timestamp
-        """
-        line = line.rstrip("\n\r")
-
-        best_priority = None
-        best_match = None
-        best_name = None
-        best_fmts = None
-
-        for priority, name, pattern, fmts in _TIMESTAMP_PATTERNS:
-            m = pattern.search(line)
-            if m and (best_priority is None or priority < best_priority):
-                best_priority = priority
-                best_match = m
-                best_name = name
-                best_fmts = fmts
-
-        if best_match is None:
-            return {
-                "timestamp_raw": None,
-                "timestamp": None,
-                "timestamp_fmt": None,
-                "message": line,
-            }
-
-        raw_ts = best_match.group(1)
-        dt = self._parse_timestamp(raw_ts, best_fmts, best_name)
-        message = line[best_match.end():].lstrip(" :-")
-
-        return {
-            "timestamp_raw": raw_ts,
-            "timestamp": dt.isoformat() if dt else None,
-            "timestamp_fmt": best_name,
-            "message": message,
-        }
\ No newline at end of file
+        """Analyse une ligne de log (voir parse_line au niveau du module)."""
+        return parse_line(line)
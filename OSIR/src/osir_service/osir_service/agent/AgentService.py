@@ -1,4 +1,3 @@
-import json
 import multiprocessing
 import sys
 import signal
@@ -6,6 +5,7 @@ import os
 import time
 from celery import Celery
 from celery import current_task
+from celery.signals import task_failure
 from os import environ, cpu_count
 
 from osir_lib.core.OsirConstants import OSIR_PATHS
@@ -14,6 +14,11 @@ from osir_lib.core.OsirModule import OsirModule
 from osir_lib.core.OsirAgentConfig import OsirAgentConfig
 from osir_lib.core.OsirUtils import capture_log_output
 from osir_lib.core.OsirDecorator import pop_task_trace
+from osir_lib.core.OsirInternalModules import OsirInternalModules
+from osir_service.agent.ModuleTemplateCache import ModuleTemplateCache
+from osir_service.agent.TaskOutputManifest import collect_task_outputs
+from osir_service.agent.TaskResourceMeter import TaskResourceMeter, input_size, size_bucket
+from osir_service.orchestration.FairDispatcher import PRIORITY_QUEUE_SUFFIX
 from osir_service.orchestration.TaskProcessorService import InternalProcessor
 from osir_service.orchestration.TaskProcessorService import ExternalProcessor
 from osir_service.postgres.OsirDbConstants import ProcessingStatus
@@ -21,6 +26,8 @@ from osir_service.postgres.OsirDb import OsirDb
 
 logger = AppLogger().get_logger()
 
+BATCH_TASK_NAMES = ("internal_batch_processor_task", "external_batch_processor_task")
+
 
 class CeleryWorker:
     """
@@ -62,6 +69,9 @@ class CeleryWorker:
             result_expires=None,  # No TTL purge: results are cleaned per-case
             database_short_lived_sessions=True,
         )
+        if os.getenv("OSIR_PRESSURE_AUTOSCALE", "1") != "0":
+            # Pool size bounded by host pressure (PSI + load), see PressureAutoscaler.
+            self.app.conf.worker_autoscaler = "osir_service.agent.PressureAutoscaler:PressureAutoscaler"
         self.app.amqp.argsrepr_maxsize = 10000
 
         self._register_tasks()
@@ -82,12 +92,9 @@ class CeleryWorker:
                 None
         """
         if module_instance.input.match:
-            # file_opened = self._is_file_opened(module_instance.input.file)
-            file_opened = db.task.check_input(case_uuid, module_instance.input.match, exclude_task_id=exclude_task_id)
-            while file_opened:
-                logger.debug(f"{module_instance.module_name} - input {module_instance.input.match} is opened by another module. Waiting...")
-                time.sleep(3)
-                file_opened = db.task.check_input(case_uuid, module_instance.input.match, exclude_task_id=exclude_task_id)
+            waited = db.task.wait_for_input(case_uuid, module_instance.input.match, exclude_task_id=exclude_task_id)
+            if waited >= 1:
+                logger.debug(f"{module_instance.module_name} - input {module_instance.input.match} released after {waited:.1f}s")
 
     def _compute_parallel_capacity(self, standalone: bool, windows_cores: int):
         """
@@ -209,12 +216,13 @@ class CeleryWorker:
             """
             task_id = current_task.request.id
             worker_name = current_task.request.hostname
+            started_ns = time.time_ns()
+            module_instance = None
+            meter = TaskResourceMeter()
 
             try:
                 # logger.debug(f"Task ID inside the task: {task_id}")
-                module_dict = json.loads(module_bytes)
-                module_dict['case_path'] = case_path
-                module_instance = OsirModule.model_validate(module_dict)
+                module_instance = ModuleTemplateCache.build(module_bytes, case_path, input_dir)
 
                 if module_instance.configuration.processor_os == 'windows' and not OsirAgentConfig().windows_configured:
                     raise RuntimeError(
@@ -246,22 +254,27 @@ class CeleryWorker:
                         f"Running internal module '{module_instance.module_name}' "
                         f"using implementation '{impl_name}.py'"
                     )
-                    processor.run_module()
+                    with meter:
+                        processor.run_module()
             except Exception as exc:
+                self._report_outputs(case_uuid, [(task_id, module_instance, started_ns, False)])
                 with capture_log_output(logger) as log_buffer:
                     logger.error_handler(exc)
                     captured_trace = log_buffer.getvalue()
                 _, trace = pop_task_trace(task_id)
-                module_logs = "\n".join(trace["logs"]) if trace else captured_trace.strip()
+                module_logs = self._offload_failure_trace(case_uuid, task_id, trace) if trace else captured_trace.strip()
                 # Re-raise so Celery records FAILURE + traceback (module logs
                 # are chained into the stored traceback through the message).
                 raise RuntimeError(f"internal_processor failed:\n{module_logs}") from exc
 
             status, trace = pop_task_trace(task_id)
             if status is ProcessingStatus.PROCESSING_FAILED:
-                module_logs = "\n".join(trace["logs"]) if trace else "module returned False"
+                self._report_outputs(case_uuid, [(task_id, module_instance, started_ns, False)])
+                module_logs = self._offload_failure_trace(case_uuid, task_id, trace) if trace else "module returned False"
                 raise RuntimeError(f"internal_processor failed:\n{module_logs}")
-            return trace or "internal_processor done"
+            self._report_outputs(case_uuid, [(task_id, module_instance, started_ns, True)])
+            self._record_profiles([(module_instance, meter.usage)])
+            return self._offload_trace(case_uuid, task_id, trace) or "internal_processor done"
 
         @self.app.task(name="external_processor_task")
         def task_external_processor(input_dir, case_path, module_bytes, case_uuid):
@@ -272,12 +285,13 @@ class CeleryWorker:
             """
             task_id = current_task.request.id
             worker_name = current_task.request.hostname
+            started_ns = time.time_ns()
+            module_instance = None
+            meter = TaskResourceMeter()
 
             try:
                 logger.debug(f"This task is running on worker: {task_id}")
-                module_dict = json.loads(module_bytes)
-                module_dict['case_path'] = case_path
-                module_instance = OsirModule.model_validate(module_dict)
+                module_instance = ModuleTemplateCache.build(module_bytes, case_path, input_dir)
 
                 if module_instance.configuration.processor_os == 'windows' and not OsirAgentConfig().windows_configured:
                     raise RuntimeError(
@@ -304,28 +318,368 @@ class CeleryWorker:
                 # watchdog path already delays unstable files before task push
                 self._wait_for_input_stable(module_instance)
 
-                processor.run_module()
+                with meter:
+                    processor.run_module()
             except Exception as exc:
+                self._report_outputs(case_uuid, [(task_id, module_instance, started_ns, False)])
                 with capture_log_output(logger) as log_buffer:
                     logger.error_handler(exc)
                     captured_trace = log_buffer.getvalue()
                 _, trace = pop_task_trace(task_id)
-                module_logs = "\n".join(trace["logs"]) if trace else captured_trace.strip()
+                module_logs = self._offload_failure_trace(case_uuid, task_id, trace) if trace else captured_trace.strip()
                 raise RuntimeError(f"external_processor failed:\n{module_logs}") from exc
 
             status, trace = pop_task_trace(task_id)
             if status is ProcessingStatus.PROCESSING_FAILED:
-                module_logs = "\n".join(trace["logs"]) if trace else "module returned False"
+                self._report_outputs(case_uuid, [(task_id, module_instance, started_ns, False)])
+                module_logs = self._offload_failure_trace(case_uuid, task_id, trace) if trace else "module returned False"
                 raise RuntimeError(f"external_processor failed:\n{module_logs}")
-            return trace or "external_processor done"
+            self._report_outputs(case_uuid, [(task_id, module_instance, started_ns, True)])
+            self._record_profiles([(module_instance, meter.usage)])
+            return self._offload_trace(case_uuid, task_id, trace) or "external_processor done"
+
+        @self.app.task(name="internal_batch_processor_task", ignore_result=True)
+        def task_internal_batch_processor(inputs, case_path, module_bytes, case_uuid):
+            """ celery task - internal_processor over several inputs of one module
+
+                The batch itself stores no result: every input is reported in
+                celery_taskmeta under its own task id (see _run_batch).
+            """
+            return self._run_batch("internal", inputs, case_path, module_bytes, case_uuid)
+
+        @self.app.task(name="external_batch_processor_task", ignore_result=True)
+        def task_external_batch_processor(inputs, case_path, module_bytes, case_uuid):
+            """ celery task - external_processor over several inputs of one module
+
+                One tool run per input: only the broker message, the payload
+                parsing and the runtime info update are shared.
+            """
+            return self._run_batch("external", inputs, case_path, module_bytes, case_uuid)
+
+        @task_failure.connect(weak=False)
+        def on_batch_failure(sender=None, task_id=None, exception=None, args=None, **kwargs):
+            """
+                A batch task that died (time limit, lost worker process...) stores no
+                result of its own: its inputs not reported yet are marked as failed.
+            """
+            if getattr(sender, "name", None) not in BATCH_TASK_NAMES or not args:
+                return
+            inputs, case_uuid = args[0], args[3]
+            self._fail_unfinished_inputs(
+                case_uuid,
+                [input_task_id for input_task_id, _ in inputs],
+                f"{sender.name} {task_id} stopped before the input finished: {exception!r}",
+            )
+
+    def _run_batch(self, processor_type, inputs, case_path, module_bytes, case_uuid):
+        """
+            Runs a batch task: the inputs of one module, one after the other.
+
+            Args:
+                processor_type (str): 'internal' or 'external'.
+                inputs (list): (task_id, input match) of every input, task_id being
+                    the osir_tasks row created for that input by push_tasks_bulk.
+                case_path (str): The case path.
+                module_bytes (str): Module payload (template reference) shared by all inputs.
+                case_uuid (str): The UUID of the case.
+
+            Returns:
+                dict: Number of inputs and of inputs processed successfully.
+        """
+        worker_name = current_task.request.hostname
+        backend = self.app.backend
+        label = f"{processor_type}_processor"
+        processor_class = InternalProcessor if processor_type == "internal" else ExternalProcessor
+
+        resolved = []
+        runtime_rows = []
+        # (task_id, succeeded, trace, result when there is no trace) of every
+        # finished input; reported holds the ids whose final state is stored.
+        finished = []
+        reported = set()
+        for task_id, match in inputs:
+            try:
+                # Each input gets its own OsirModule, built from the cached
+                # template: endpoint, user and output paths derive from the match.
+                module_instance = ModuleTemplateCache.build(module_bytes, case_path, match)
+
+                if module_instance.configuration.processor_os == 'windows' and not OsirAgentConfig().windows_configured:
+                    raise RuntimeError(
+                        f"Windows module '{module_instance.module_name}' cannot run on this agent: "
+                        "Windows machine is not configured. Re-run agent setup and configure a Windows machine."
+                    )
+
+                processor = processor_class(case_path, module_instance, task_id=task_id, agent_name=worker_name)
+            except Exception as exc:
+                finished.append(self._fail_batch_input(task_id, exc))
+                continue
+
+            resolved.append((task_id, module_instance, processor))
+            runtime_rows.append((task_id, worker_name, self._get_output_path(module_instance, processor_type)))
+
+        try:
+            with OsirDb() as db:
+                db.task.set_runtime_info_bulk(runtime_rows)
+        except Exception as exc:
+            # Runtime info is metadata only: the inputs are still processed.
+            logger.error(f"Could not record runtime info of batch ({len(runtime_rows)} input(s)): {exc}")
+
+        done = 0
+        reports = []
+        usages = []
+        try:
+            for entry in finished:
+                self._report_batch_input(backend, label, entry, reported)
+
+            for task_id, module_instance, processor in resolved:
+                backend.mark_as_started(task_id, pid=os.getpid(), hostname=worker_name)
+                started_ns = time.time_ns()
+                meter = TaskResourceMeter()
+                try:
+                    with OsirDb() as db:
+                        self._is_item_in_use(case_uuid, module_instance, db, exclude_task_id=task_id)
+
+                    self._wait_for_input_stable(module_instance)
+
+                    if processor_type == "external" or processor.available:
+                        with meter:
+                            processor.run_module()
+                except Exception as exc:
+                    reports.append((task_id, module_instance, started_ns, False))
+                    entry = self._fail_batch_input(task_id, exc)
+                else:
+                    status, trace = pop_task_trace(task_id)
+                    if status is ProcessingStatus.PROCESSING_FAILED:
+                        reports.append((task_id, module_instance, started_ns, False))
+                        entry = (task_id, False, trace, "module returned False")
+                    else:
+                        reports.append((task_id, module_instance, started_ns, True))
+                        usages.append((module_instance, meter.usage))
+                        entry = (task_id, True, trace, f"{label} done")
+                        done += 1
+
+                # Reported right away, the trace is stored with the others.
+                finished.append(entry)
+                self._report_batch_input(backend, label, entry, reported)
+        finally:
+            # Whatever stopped the batch, no input stays STARTED.
+            for task_id, _ in inputs:
+                if task_id not in reported:
+                    self._mark_input_failed(backend, task_id, f"{label} failed:\nbatch stopped before the input finished")
+
+            # One insert for the traces of the whole batch. The results were
+            # reported with the stored trace summary: when the insert failed
+            # they are reported again with the whole trace.
+            if not self._store_traces(case_uuid, [(task_id, trace) for task_id, _, trace, _ in finished]):
+                for entry in finished:
+                    if entry[2] and entry[0] in reported:
+                        self._report_batch_input(backend, label, entry, reported, stored=False)
+
+            self._report_outputs(case_uuid, reports)
+            self._record_profiles(usages)
+
+        logger.debug(f"Batch of {len(inputs)} input(s) finished: {done} done")
+        return {"inputs": len(inputs), "done": done}
+
+    def _report_batch_input(self, backend, label, entry, reported: set, stored=True):
+        """
+            Stores the final state of a batch input in celery_taskmeta and adds it
+            to reported. A failed store is logged: the input is then marked as
+            failed when the batch ends.
+        """
+        task_id, succeeded, trace, fallback = entry
+        try:
+            if succeeded:
+                backend.mark_as_done(task_id, self._trace_result(trace, stored) or fallback)
+            else:
+                module_logs = self._failure_excerpt(trace, stored) if trace else fallback
+                message = f"{label} failed:\n{module_logs}"
+                backend.mark_as_failure(task_id, RuntimeError(message), traceback=message)
+        except Exception as exc:
+            logger.error(f"Could not report the result of batch input {task_id}: {exc}")
+            return
+        reported.add(task_id)
+
+    @staticmethod
+    def _mark_input_failed(backend, task_id, message):
+        try:
+            backend.mark_as_failure(task_id, RuntimeError(message), traceback=message)
+        except Exception as exc:
+            logger.error(f"Could not mark batch input {task_id} as failed: {exc}")
 
-    def _start_single_worker(self, argv):
+    def _fail_unfinished_inputs(self, case_uuid, task_ids, message):
+        """Marks as failed the inputs, among task_ids, that are not in a final state yet."""
+        try:
+            with OsirDb() as db:
+                pending = db.task_output.pending_tasks(str(case_uuid), task_ids)
+        except Exception as exc:
+            logger.error(f"Could not read the state of {len(task_ids)} batch input(s), marking them as failed: {exc}")
+            pending = set(task_ids)
+        for task_id in task_ids:
+            if task_id in pending:
+                self._mark_input_failed(self.app.backend, task_id, message)
+
+    def _fail_batch_input(self, task_id, exc):
+        """Returns the finished entry of a batch input that raised, with the trace a single task would store."""
+        with capture_log_output(logger) as log_buffer:
+            logger.error_handler(exc)
+            captured_trace = log_buffer.getvalue()
+        _, trace = pop_task_trace(task_id)
+        return task_id, False, trace, captured_trace.strip()
+
+    def _store_traces(self, case_uuid, traces) -> bool:
+        """
+            Stores the module traces of finished tasks in osir_task_traces (see
+            OsirDbTaskTrace) with a single insert.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                traces (list): (task_id, trace) of every task, empty traces are skipped.
+
+            Returns:
+                bool: False when the traces could not be stored and must stay in the results.
+        """
+        rows = [(case_uuid, task_id, trace) for task_id, trace in traces if trace]
+        if not rows:
+            return True
+        try:
+            with OsirDb() as db:
+                db.task_trace.add(rows)
+        except Exception as exc:
+            logger.error(f"Could not store the traces of {len(rows)} task(s), kept in their results: {exc}")
+            return False
+        return True
+
+    def _offload_trace(self, case_uuid, task_id, trace):
+        """
+            Stores the module trace of a task and returns the summary kept as
+            its Celery result, or the trace itself when it could not be stored.
+        """
+        if not trace:
+            return trace
+        return self._trace_result(trace, self._store_traces(case_uuid, [(task_id, trace)]))
+
+    def _offload_failure_trace(self, case_uuid, task_id, trace) -> str:
+        """Stores the module trace of a failed task and returns the excerpt chained into its Celery traceback."""
+        return self._failure_excerpt(trace, self._store_traces(case_uuid, [(task_id, trace)]))
+
+    @staticmethod
+    def _trace_result(trace, stored):
+        """Celery result of a task: a summary of its trace once stored, the trace itself otherwise."""
+        if not trace or not stored:
+            return trace
+        summary = {k: v for k, v in trace.items() if k != "logs"}
+        summary["log_lines"] = len(trace.get("logs") or [])
+        summary["trace_stored"] = True
+        return summary
+
+    @staticmethod
+    def _failure_excerpt(trace, stored) -> str:
+        """
+            Celery traceback of a failed task: the last OSIR_TRACE_RESULT_LINES
+            lines of its stored trace, or the whole trace when it was not stored.
+        """
+        logs = trace.get("logs") or []
+        if not stored:
+            return "\n".join(logs)
+        excerpt_lines = int(os.getenv("OSIR_TRACE_RESULT_LINES", "20"))
+        if len(logs) <= excerpt_lines:
+            return "\n".join(logs)
+        return "\n".join([f"[... {len(logs) - excerpt_lines} line(s), see the task trace ...]"] + logs[-excerpt_lines:])
+
+    def _report_outputs(self, case_uuid, reports):
+        """
+            Stores the output manifests of finished tasks, read by the watchdog of
+            the case to dispatch consumer modules without waiting for a scan.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                reports (list): (task_id, module_instance, started_ns, succeeded) of every task.
+                    module_instance is None when the module could not be built.
+        """
+        rows = []
+        for task_id, module_instance, started_ns, succeeded in reports:
+            entries, truncated = [], False
+            if succeeded and module_instance is not None:
+                try:
+                    entries, truncated = collect_task_outputs(module_instance, started_ns)
+                except Exception as exc:
+                    logger.warning(f"Could not list outputs of task {task_id}: {exc}")
+                    truncated = True
+            module_name = module_instance.module_name if module_instance is not None else None
+            rows.append((str(case_uuid), str(task_id), module_name, succeeded, truncated, entries))
+
+        try:
+            with OsirDb() as db:
+                db.task_output.add(rows)
+        except Exception as exc:
+            # Consumers are still found by the watchdog scan.
+            logger.error(f"Could not record output manifests of {len(rows)} task(s): {exc}")
+
+    def _record_profiles(self, usages):
+        """
+            Adds the resources measured for successful task runs to the learned
+            module profiles (see OsirDbModuleProfile).
+
+            Args:
+                usages (list): (module_instance, TaskResourceMeter usage) of every run.
+                    Runs without usage (module not run) are skipped.
+        """
+        samples = []
+        for module_instance, usage in usages:
+            if not usage:
+                continue
+            size = input_size(module_instance)
+            samples.append(dict(
+                usage,
+                module=module_instance.module_name,
+                size_bucket=size_bucket(size),
+                input_bytes=size,
+            ))
+        if not samples:
+            return
+
+        try:
+            with OsirDb() as db:
+                db.module_profile.record(samples)
+        except Exception as exc:
+            # Profiles only tune the scheduling: the tasks themselves are done.
+            logger.error(f"Could not record resource profiles of {len(samples)} task(s): {exc}")
+
+    @staticmethod
+    def _get_output_path(module_instance, processor_type):
+        """Output path recorded in osir_tasks, as resolved by the single-input tasks."""
+        if processor_type == "internal":
+            if module_instance.output.type == 'multiple_files':
+                return module_instance.output.dir
+            elif module_instance.output.type != 'None':
+                return module_instance.output.file
+            return "N/A"
+
+        if module_instance.output.type == 'multiple_files':
+            return module_instance.output.output_dir_without_suffix
+        elif module_instance.output.type != 'None':
+            return module_instance.output.output_file_without_suffix
+        return "Module without Output"
+
+    def _start_single_worker(self, argv, queue=None):
         """
         Starts a single Celery worker with the given command-line arguments.
 
         Args:
             argv (list): A list of command-line arguments to configure the Celery worker.
+            queue (str, optional): The queue consumed by the worker, read by its autoscaler.
         """
+        if queue:
+            os.environ["OSIR_WORKER_QUEUE"] = queue
+        # Internal modules loaded here are inherited by the prefork pool
+        # children, which then skip their import on the first task.
+        prewarm_profiles = [p.strip() for p in os.getenv("OSIR_PREWARM_PROFILES", "").split(",") if p.strip()]
+        if prewarm_profiles:
+            try:
+                OsirInternalModules.prewarm(prewarm_profiles)
+            except Exception as exc:
+                logger.warning(f"Internal modules pre-warm failed: {exc}")
         self.app.worker_main(argv)
 
     def start_worker(self):
@@ -409,17 +763,20 @@ class CeleryWorker:
         log_file.touch(exist_ok=True)
 
         for config in worker_configs:
+            # Per-queue bounds override: OSIR_AUTOSCALE_<QUEUE>="max,min".
+            config['autoscale'] = os.getenv(f"OSIR_AUTOSCALE_{config['queue'].upper()}", config['autoscale'])
             argv = [
                 'worker',
                 '--loglevel=info',
                 f'--hostname={config["hostname"]}',
-                '-Q', config['queue'],
+                # Interactive runs skip the fair dispatch window through the priority queue.
+                '-Q', f"{config['queue']}{PRIORITY_QUEUE_SUFFIX},{config['queue']}",
                 '--time-limit=36000',
                 '-E',
                 f'--autoscale={config["autoscale"]}',
                 f'--logfile={log_file}'
             ]
-            process = multiprocessing.Process(target=self._start_single_worker, args=(argv,))
+            process = multiprocessing.Process(target=self._start_single_worker, args=(argv, config['queue']))
             processes.append(process)
             process.start()
 
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from osir_lib.core.OsirInput import OsirInput
+from osir_lib.core.OsirModule import OsirModule
+from osir_lib.core.OsirOutput import OsirOutput
+from osir_lib.core.OsirTool import OsirTool
+from osir_lib.logger import AppLogger
+from osir_service.postgres.OsirDb import OsirDb
+
+logger = AppLogger(__name__).get_logger()
+
+
+class _ModuleTemplate:
+    """A module template and the OsirModule validated from it, shared by every task of the template."""
+
+    def __init__(self, template_hash: str, raw: dict):
+        self.template_hash = template_hash
+        self.raw = raw
+        self.prototype = None
+        self.tool = None
+        self._lock = threading.Lock()
+
+    def instantiate(self, case_path: str, match: str, call_input: dict = None) -> OsirModule:
+        """
+            Builds the module of one task.
+
+            call_input holds the input.file/dir of the task, which are not part
+            of the template (see TaskService.get_module_ref).
+
+            The first task fully validates the template (module file and
+            internal module lookup, tool binary resolution). Later tasks copy
+            that prototype and only rebuild the per-task parts: input, output
+            and tool, then endpoint/user resolution and path templating
+            through link_and_update.
+        """
+        task_input = dict(self.raw['input'], **(call_input or {}), match=match)
+        if self.prototype is None:
+            with self._lock:
+                if self.prototype is None:
+                    module_dict = dict(self.raw)
+                    module_dict['case_path'] = case_path
+                    module_dict['input'] = task_input
+                    prototype = OsirModule.model_validate(module_dict)
+
+                    if self.raw.get('tool'):
+                        # Same resolution as OsirModule.__init__, done once.
+                        tool = dict(self.raw['tool'])
+                        if self.raw.get('env'):
+                            tool['env'] = self.raw['env']
+                        resolved = OsirTool.model_validate(tool)
+                        resolved.init_tool(prototype.configuration.processor_os)
+                        tool['path'] = resolved.path
+                        self.tool = tool
+                    self.prototype = prototype
+
+        module = self.prototype.model_copy()
+        module.case_path = Path(case_path)
+        module.input = OsirInput.model_validate(task_input)
+        module.output = OsirOutput.model_validate(self.raw['output'])
+        module.tool = OsirTool.model_validate(self.tool) if self.tool else None
+        return module.link_and_update()
+
+
+class ModuleTemplateCache:
+    """
+        Process-wide cache of the module templates referenced by tasks.
+
+        Templates are content-addressed (see TaskService.get_module_ref): a hash
+        always designates the same definition, so a cached template never needs
+        invalidation, and an edited module simply arrives under a new hash. On a
+        miss the template is fetched from osir_module_templates. The
+        OSIR_MODULE_TEMPLATE_CACHE_SIZE most recently used templates are kept.
+    """
+
+    _templates: "OrderedDict[str, _ModuleTemplate]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def build(cls, module_bytes: str, case_path: str, match: str) -> OsirModule:
+        """
+            Builds the module of a task from its payload.
+
+            Args:
+                module_bytes (str): The task payload, a template reference or a
+                    full module JSON (tasks pushed before template references).
+                case_path (str): The case path.
+                match (str): The task input.
+
+            Returns:
+                OsirModule: The validated module of the task.
+        """
+        payload = json.loads(module_bytes)
+        if "template" not in payload:
+            payload['case_path'] = case_path
+            return OsirModule.model_validate(payload)
+
+        return cls.get(payload["template"], payload.get("filename")).instantiate(case_path, match, payload.get("input"))
+
+    @classmethod
+    def get(cls, template_hash: str, filename: str = None) -> _ModuleTemplate:
+        max_templates = int(os.getenv("OSIR_MODULE_TEMPLATE_CACHE_SIZE", "128"))
+        with cls._lock:
+            template = cls._templates.get(template_hash)
+            if template is not None:
+                cls._templates.move_to_end(template_hash)
+                return template
+
+        with OsirDb() as db:
+            payload = db.module_template.get(template_hash)
+        if payload is None:
+            raise LookupError(f"Unknown template {template_hash} for module {filename}")
+        logger.debug(f"Module template {filename} ({template_hash}) fetched")
+
+        with cls._lock:
+            template = cls._templates.get(template_hash)
+            if template is None:
+                template = cls._templates[template_hash] = _ModuleTemplate(template_hash, json.loads(payload))
+            cls._templates.move_to_end(template_hash)
+            while len(cls._templates) > max_templates:
+                cls._templates.popitem(last=False)
+        return template
@@ -0,0 +1,144 @@
+import os
+import time
+
+from celery.worker.autoscale import Autoscaler
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger(__name__).get_logger()
+
+PSI_RESOURCES = ("cpu", "io", "memory")
+
+
+def read_pressure() -> dict:
+    """
+        Reads the Linux pressure stall information (PSI) of the host.
+
+        Returns:
+            dict: resource -> 'some' avg10 (percentage of the last 10s during which
+            at least one task stalled on the resource), None when unavailable
+            (kernel without PSI, restricted container).
+    """
+    pressure = {}
+    for resource in PSI_RESOURCES:
+        pressure[resource] = None
+        try:
+            with open(f"/proc/pressure/{resource}", "r") as f:
+                for line in f:
+                    if line.startswith("some "):
+                        fields = dict(item.split("=", 1) for item in line.split()[1:])
+                        pressure[resource] = float(fields["avg10"])
+                        break
+        except (OSError, ValueError, KeyError):
+            pass
+    return pressure
+
+
+class PressureAutoscaler(Autoscaler):
+    """
+        Celery autoscaler bounding the pool of a worker by the host pressure.
+
+        The stock autoscaler sizes the pool on the number of reserved tasks,
+        between the --autoscale min and max. This one also keeps a limit
+        between those bounds, re-evaluated every OSIR_PRESSURE_INTERVAL seconds
+        from PSI (/proc/pressure) and the load average:
+          - one of the watched resources above its high threshold: the limit
+            drops by one process;
+          - every resource below its low threshold: the limit grows by one.
+        The limit is applied as the worker max concurrency, so the prefetch
+        count follows it and the worker stops taking tasks it cannot run.
+        Busy processes are never killed, the pool shrinks as they finish.
+
+        Each queue watches OSIR_PRESSURE_RESOURCES_<QUEUE> (default
+        cpu,io,memory; the load average counts as cpu). Decisions are logged
+        and reported in the worker stats (`celery inspect stats`, autoscaler).
+    """
+
+    def __init__(self, pool, max_concurrency, min_concurrency=0, worker=None, **kwargs):
+        super().__init__(pool, max_concurrency, min_concurrency, worker=worker, **kwargs)
+        self.queue = os.getenv("OSIR_WORKER_QUEUE", "")
+        self.max_bound = max_concurrency
+        self.interval = float(os.getenv("OSIR_PRESSURE_INTERVAL", "10"))
+        self.high = float(os.getenv("OSIR_PRESSURE_HIGH", "40"))
+        self.low = float(os.getenv("OSIR_PRESSURE_LOW", "10"))
+        self.load_high = float(os.getenv("OSIR_PRESSURE_LOAD_HIGH", "1.5"))
+        self.load_low = float(os.getenv("OSIR_PRESSURE_LOAD_LOW", "0.8"))
+
+        resources = os.getenv(f"OSIR_PRESSURE_RESOURCES_{self.queue.upper()}", "cpu,io,memory")
+        self.resources = [r.strip() for r in resources.split(",") if r.strip() in PSI_RESOURCES]
+
+        self.pressure: dict = {}
+        self.load_per_core = None
+        self.decisions = {"shrink": 0, "grow": 0, "hold": 0}
+        self.last_decision = None
+        self._checked_at = 0.0
+
+    def body(self):
+        # Thread mode: update() takes the mutex, apply the limit outside of it.
+        self._apply_pressure()
+        with self.mutex:
+            super().maybe_scale()
+        time.sleep(1.0)
+
+    def maybe_scale(self, req=None):
+        # Event loop mode: called on every task message and every keepalive.
+        self._apply_pressure()
+        super().maybe_scale(req)
+
+    def _apply_pressure(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return
+        self._checked_at = now
+
+        self.pressure = read_pressure()
+        try:
+            self.load_per_core = os.getloadavg()[0] / max(1, os.cpu_count() or 1)
+        except OSError:
+            self.load_per_core = None
+
+        signals = {r: self.pressure.get(r) for r in self.resources}
+        high = [r for r, value in signals.items() if value is not None and value >= self.high]
+        low = all(value is None or value <= self.low for value in signals.values())
+        if "cpu" in self.resources and self.load_per_core is not None:
+            if self.load_per_core >= self.load_high:
+                high.append("load")
+            low = low and self.load_per_core <= self.load_low
+
+        limit = self.max_concurrency
+        if high and limit > max(1, self.min_concurrency):
+            decision, limit = "shrink", limit - 1
+        elif not high and low and limit < self.max_bound:
+            decision, limit = "grow", limit + 1
+        else:
+            decision = "hold"
+
+        self.decisions[decision] += 1
+        self.last_decision = {
+            "at": time.time(),
+            "decision": decision,
+            "limit": limit,
+            "pressured": high,
+        }
+        if decision == "hold":
+            return
+
+        logger.info(
+            f"Worker {self.queue or 'pool'}: {decision} to {limit} process(es) "
+            f"(pressure={signals}, load_per_core={self.load_per_core and round(self.load_per_core, 2)}, "
+            f"pressured={high or 'none'})"
+        )
+        self.update(max=limit)
+
+    def info(self):
+        info = super().info()
+        info.update({
+            "queue": self.queue,
+            "max_bound": self.max_bound,
+            "resources": self.resources,
+            "pressure": self.pressure,
+            "load_per_core": self.load_per_core,
+            "decisions": dict(self.decisions),
+            "last_decision": self.last_decision,
+        })
+        return info
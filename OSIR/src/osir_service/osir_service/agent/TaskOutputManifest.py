@@ -0,0 +1,93 @@
+import os
+
+from osir_lib.core.OsirUtils import normalize_osir_path
+from osir_lib.logger import AppLogger
+
+logger = AppLogger(__name__).get_logger()
+
+# Entries changed slightly before the task start are still listed: the share
+# server clock may lag behind the agent clock.
+CLOCK_SLACK_NS = 2_000_000_000
+
+
+def collect_task_outputs(module_instance, started_ns: int) -> tuple[list, bool]:
+    """
+        Lists the files and directories a task wrote.
+
+        A single_file module reports its output file. A multiple_files module
+        reports every entry of the output directory of the task (output_dir,
+        resolved for this input) whose inode changed since the task started:
+        ctime moves on creation, on moves into the directory (Restore_FS
+        --move) and on extraction, whatever mtime the archive sets.
+        Directories that received new entries are reported as well.
+
+        Tasks of a module without per-input output_dir share the directory:
+        entries written by concurrent tasks may be listed too, the watchdog
+        still waits for them to be stable before dispatching them.
+
+        Args:
+            module_instance (OsirModule): The module of the task.
+            started_ns (int): Task start, as time.time_ns().
+
+        Returns:
+            tuple[list, bool]: [path, 'file' | 'directory'] entries (paths under
+            /OSIR/share), and True when the listing exceeded
+            OSIR_TASK_MANIFEST_MAX_ENTRIES and was dropped.
+    """
+    output = module_instance.output
+    if output.type == 'multiple_files':
+        root = output.output_dir
+        if root and not os.path.isdir(str(root)):
+            # Windows modules: output_dir is the UNC view of the same directory.
+            root = output.output_dir_without_suffix
+    elif output.type != 'None' and output.output_file_without_suffix:
+        # output_file also carries the compression suffix of a LogUtils sink.
+        path = str(output.output_file)
+        if not os.path.isfile(path):
+            path = str(output.output_file_without_suffix)
+        return ([[normalize_osir_path(path), 'file']] if os.path.isfile(path) else []), False
+    else:
+        return [], False
+
+    if not root or not os.path.isdir(str(root)):
+        return [], False
+    root = str(root)
+
+    max_entries = int(os.getenv("OSIR_TASK_MANIFEST_MAX_ENTRIES", "100000"))
+    since_ns = started_ns - CLOCK_SLACK_NS
+    entries = []
+    stack = [root]
+
+    try:
+        if os.stat(root).st_ctime_ns >= since_ns:
+            entries.append([normalize_osir_path(root), 'directory'])
+    except OSError:
+        pass
+
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if is_dir:
+                            stack.append(entry.path)
+                        elif not entry.is_file(follow_symlinks=False):
+                            continue
+                        if entry.stat(follow_symlinks=False).st_ctime_ns < since_ns:
+                            continue
+                    except OSError:
+                        continue
+
+                    entries.append([normalize_osir_path(entry.path), 'directory' if is_dir else 'file'])
+                    if len(entries) > max_entries:
+                        logger.debug(
+                            f"{module_instance.module_name} output manifest exceeds {max_entries} entries, "
+                            f"left to the watchdog scan"
+                        )
+                        return [], True
+        except OSError:
+            continue
+
+    return entries, False
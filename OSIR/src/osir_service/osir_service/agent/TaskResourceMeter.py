@@ -0,0 +1,161 @@
+import os
+import resource
+import threading
+import time
+
+import psutil
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger(__name__).get_logger()
+
+
+def _read_proc_io() -> tuple[int, int]:
+    """Bytes read from / written to storage by this process and its reaped children."""
+    read_bytes = write_bytes = 0
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key == "read_bytes":
+                    read_bytes = int(value)
+                elif key == "write_bytes":
+                    write_bytes = int(value)
+    except (OSError, ValueError):
+        pass
+    return read_bytes, write_bytes
+
+
+def _cpu_seconds() -> float:
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def input_size(module_instance) -> int | None:
+    """
+        Size in bytes of the input of a task, None when it cannot be measured.
+
+        A directory input is summed over at most OSIR_PROFILE_SIZE_SCAN_MAX
+        entries: past that, its size is left unknown rather than walking a
+        whole extraction tree for a statistic.
+    """
+    match = module_instance.input.match if module_instance.input else None
+    if not match:
+        return None
+    path = str(match)
+    try:
+        if os.path.isfile(path):
+            return os.path.getsize(path)
+        if not os.path.isdir(path):
+            return None
+    except OSError:
+        return None
+
+    max_entries = int(os.getenv("OSIR_PROFILE_SIZE_SCAN_MAX", "10000"))
+    total, seen = 0, 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    seen += 1
+                    if seen > max_entries:
+                        return None
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+def size_bucket(size: int | None) -> int:
+    """Power-of-two bucket of an input size: b covers [2^(b-1), 2^b) bytes, 0 is empty, -1 unknown."""
+    return -1 if size is None else int(size).bit_length()
+
+
+class TaskResourceMeter:
+    """
+        Measures the resources used by one task run.
+
+        Used as a context manager around processor.run_module():
+          - wall time;
+          - CPU time (user + system) of the pool process and of the tools it
+            ran, from getrusage(RUSAGE_SELF / RUSAGE_CHILDREN) deltas;
+          - storage I/O from /proc/self/io, which includes reaped children;
+          - peak RSS of the pool process and its child processes, sampled every
+            OSIR_PROFILE_SAMPLE_INTERVAL seconds above the RSS the process had
+            when the task started, and completed by the ru_maxrss of the
+            children when a child of this task set a new high-water mark.
+
+        Counters are per process rather than from the container cgroup: the
+        pool processes of a worker share the agent cgroup, while a prefork
+        process runs one task at a time.
+    """
+
+    def __init__(self):
+        self.sample_interval = float(os.getenv("OSIR_PROFILE_SAMPLE_INTERVAL", "0.5"))
+        self.usage: dict = {}
+        self._process = psutil.Process(os.getpid())
+        self._stop = threading.Event()
+        self._thread = None
+        self._peak_rss = 0
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        self._cpu = _cpu_seconds()
+        self._io = _read_proc_io()
+        self._children_maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        try:
+            self._base_rss = self._process.memory_info().rss
+        except psutil.Error:
+            self._base_rss = 0
+        self._peak_rss = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="osir-resource-meter", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+        read_bytes, write_bytes = _read_proc_io()
+        children_maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak_rss = self._peak_rss
+        if children_maxrss > self._children_maxrss:
+            # ru_maxrss is in KiB on Linux.
+            peak_rss = max(peak_rss, children_maxrss * 1024)
+
+        self.usage = {
+            "wall_seconds": time.monotonic() - self._started,
+            "cpu_seconds": max(0.0, _cpu_seconds() - self._cpu),
+            "read_bytes": max(0, read_bytes - self._io[0]),
+            "write_bytes": max(0, write_bytes - self._io[1]),
+            "peak_rss_bytes": peak_rss,
+        }
+        return False
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            self._sample()
+
+    def _sample(self):
+        try:
+            rss = self._process.memory_info().rss - self._base_rss
+            for child in self._process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    continue
+        except psutil.Error:
+            return
+        self._peak_rss = max(self._peak_rss, rss)
@@ -0,0 +1,253 @@
+import fnmatch
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger(__name__).get_logger()
+
+SEARCH_MODES = ("auto", "prefix", "substring", "glob")
+
+SIZE_FILTERS = {
+    "all": lambda size: True,
+    "small": lambda size: size <= 1024 * 1024,
+    "medium": lambda size: 1024 * 1024 < size <= 10 * 1024 * 1024,
+    "large": lambda size: size > 10 * 1024 * 1024,
+}
+
+
+class IndexedFile(NamedTuple):
+    """A search hit: directory relative to the case root, basename, size and mtime (seconds)."""
+    rel_dir: str
+    name: str
+    size: int
+    mtime: int
+
+
+class SearchPage(NamedTuple):
+    files: List[IndexedFile]
+    total: int
+    truncated: bool
+
+
+class _IndexedDir:
+    """Files and subdirectories of one directory, as of its last listing."""
+    __slots__ = ("mtime_ns", "subdirs", "names", "lower", "sizes", "mtimes")
+
+    def __init__(self, mtime_ns: Optional[int]):
+        self.mtime_ns = mtime_ns
+        self.subdirs: set = set()
+        self.names: list = []
+        self.lower: list = []
+        self.sizes: list = []
+        self.mtimes: list = []
+
+
+class CaseFileIndex:
+    """
+        In-memory filename / size / mtime index of one case, used by the file search.
+
+        The index is built with a single walk of the case, then kept up to date
+        incrementally: at most every OSIR_FILE_INDEX_REFRESH seconds every
+        indexed directory is stat'ed and only the directories whose mtime
+        changed are listed again (same pruning as CaseSnapshot). Files rewritten
+        in place do not change their directory mtime: their size is refreshed
+        the next time the directory is listed.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.refresh_interval = float(os.getenv("OSIR_FILE_INDEX_REFRESH", "2.0"))
+        self.racy_window = float(os.getenv("OSIR_SNAPSHOT_RACY_WINDOW", "2.0"))
+
+        self._lock = threading.Lock()
+        self._dirs: dict[str, _IndexedDir] = {}
+        self._order: List[str] = []
+        self._refreshed_at = 0.0
+
+    def refresh(self, force: bool = False):
+        """Brings the index up to date, at most once per refresh interval unless forced."""
+        if not force and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < self.refresh_interval:
+                return
+            started = time.perf_counter()
+            # Queries iterate the previous dict while this one is updated.
+            dirs = dict(self._dirs)
+            if not dirs:
+                self._scan_tree(dirs, "")
+                listed = len(dirs)
+            else:
+                listed = self._revalidate(dirs)
+            if listed:
+                self._order = sorted(dirs)
+            self._dirs = dirs
+            self._refreshed_at = time.monotonic()
+            if listed:
+                logger.debug(
+                    f"File index of {self.root} refreshed: {listed} directories listed, "
+                    f"{len(dirs)} indexed in {time.perf_counter() - started:.2f}s"
+                )
+
+    def search(self, rel_base: str, query: Optional[str], mode: str = "auto", deep: bool = False,
+               size_filter: str = "all", offset: int = 0, limit: int = 200, cap: int = 10000) -> SearchPage:
+        """
+            Searches file names below a directory of the case.
+
+            Args:
+                rel_base (str): Directory to search, relative to the case root ("" for the root).
+                query (str, optional): Name query, case-insensitive. Empty matches every file.
+                mode (str): 'prefix', 'substring', 'glob', or 'auto' (glob when the
+                    query contains a wildcard, substring otherwise).
+                deep (bool): Also search the subdirectories of rel_base.
+                size_filter (str): 'all', 'small', 'medium' or 'large'.
+                offset (int): Number of matches to skip.
+                limit (int): Maximum number of matches returned.
+                cap (int): Matches are counted up to this number only.
+
+            Returns:
+                SearchPage: The requested page, the total number of matches (at most
+                `cap`) and whether more matches exist beyond the cap.
+        """
+        self.refresh()
+        dirs, order = self._dirs, self._order
+        matches = self._matcher(query, mode)
+        size_ok = SIZE_FILTERS.get(size_filter, SIZE_FILTERS["all"])
+        rel_base = rel_base.strip("/")
+
+        if deep:
+            prefix = f"{rel_base}/" if rel_base else ""
+            scope = (rel for rel in order if rel == rel_base or rel.startswith(prefix))
+        else:
+            scope = (rel_base,) if rel_base in dirs else ()
+
+        page = []
+        total = 0
+        for rel in scope:
+            entry = dirs.get(rel)
+            if entry is None:
+                continue
+            for i, lower in enumerate(entry.lower):
+                if not matches(lower) or not size_ok(entry.sizes[i]):
+                    continue
+                if total == cap:
+                    return SearchPage(page, total, True)
+                if offset <= total < offset + limit:
+                    page.append(IndexedFile(rel, entry.names[i], entry.sizes[i], entry.mtimes[i]))
+                total += 1
+        return SearchPage(page, total, False)
+
+    @staticmethod
+    def _matcher(query: Optional[str], mode: str) -> Callable[[str], bool]:
+        if not query:
+            return lambda name: True
+        query = query.lower()
+        if mode == "auto":
+            mode = "glob" if any(c in query for c in "*?[") else "substring"
+        if mode == "prefix":
+            return lambda name: name.startswith(query)
+        if mode == "glob":
+            return re.compile(fnmatch.translate(query)).match
+        return lambda name: query in name
+
+    def _stat_mtime(self, path: str) -> Optional[int]:
+        """Directory mtime, or None when it is too recent to be trusted for pruning."""
+        mtime_ns = os.stat(path).st_mtime_ns
+        if time.time() - mtime_ns / 1e9 < self.racy_window:
+            return None
+        return mtime_ns
+
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _revalidate(self, dirs: dict) -> int:
+        """Lists again the directories whose mtime changed. Returns the number listed."""
+        listed = 0
+        for rel in sorted(dirs, key=len):
+            entry = dirs.get(rel)
+            if entry is None:
+                continue  # Dropped with a removed parent.
+            try:
+                mtime_ns = os.stat(self._abs(rel)).st_mtime_ns
+            except OSError:
+                self._drop(dirs, rel)
+                continue
+            if entry.mtime_ns is not None and entry.mtime_ns == mtime_ns:
+                continue
+            listed += self._scan_tree(dirs, rel)
+        return listed
+
+    def _scan_tree(self, dirs: dict, rel_root: str) -> int:
+        """Lists rel_root, then every subdirectory not indexed yet. Returns the number listed."""
+        stack = [rel_root]
+        listed = 0
+        while stack:
+            rel = stack.pop()
+            path = self._abs(rel)
+            try:
+                entry = _IndexedDir(self._stat_mtime(path))
+                with os.scandir(path) as it:
+                    children = list(it)
+            except OSError:
+                self._drop(dirs, rel)
+                continue
+            listed += 1
+
+            for child in children:
+                try:
+                    if child.is_dir():
+                        # Like os.walk: symlinked directories are not followed.
+                        if not child.is_symlink():
+                            entry.subdirs.add(child.name)
+                    elif child.is_file():
+                        st = child.stat()
+                        entry.names.append(child.name)
+                        entry.lower.append(child.name.lower())
+                        entry.sizes.append(st.st_size)
+                        entry.mtimes.append(int(st.st_mtime))
+                except OSError:
+                    continue
+
+            previous = dirs.get(rel)
+            dirs[rel] = entry
+            for name in entry.subdirs:
+                child_rel = f"{rel}/{name}" if rel else name
+                if child_rel not in dirs:
+                    stack.append(child_rel)
+            if previous is not None:
+                for name in previous.subdirs - entry.subdirs:
+                    self._drop(dirs, f"{rel}/{name}" if rel else name)
+        return listed
+
+    @staticmethod
+    def _drop(dirs: dict, rel: str):
+        """Removes a directory and everything indexed below it."""
+        entry = dirs.pop(rel, None)
+        if entry is None:
+            return
+        for name in entry.subdirs:
+            CaseFileIndex._drop(dirs, f"{rel}/{name}" if rel else name)
+
+
+class OsirFileIndex:
+    """Process-wide registry of CaseFileIndex, keeping the OSIR_FILE_INDEX_MAX_CASES most recently searched cases."""
+
+    _indexes: "OrderedDict[str, CaseFileIndex]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, root: str) -> CaseFileIndex:
+        max_cases = int(os.getenv("OSIR_FILE_INDEX_MAX_CASES", "8"))
+        with cls._lock:
+            index = cls._indexes.get(root)
+            if index is None:
+                index = cls._indexes[root] = CaseFileIndex(root)
+            cls._indexes.move_to_end(root)
+            while len(cls._indexes) > max_cases:
+                cls._indexes.popitem(last=False)
+        return index
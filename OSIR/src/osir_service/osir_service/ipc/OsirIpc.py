@@ -1,21 +1,28 @@
 import socket
 import json
+import math
+import queue
+import selectors
 import threading
 import time
 import re
 import os
-from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, PrivateAttr
 
 from osir_lib.core.FileManager import FileManager
 from osir_lib.core.model.OsirModuleModel import OsirModuleModel
 from osir_service.ipc.model.OsirExceptions import OsirException
 from osir_service.ipc.model.OsirIpcResponse import OsirIpcResponse
 from osir_service.ipc.model.OsirIpcRequest import OsirIpcRequest
+from osir_service.ipc.model.OsirIpcStream import OsirIpcStream
 from osir_service.postgres.OsirDb import OsirDb
 from osir_service.watchdog.MonitorCase import MonitorCase
 from osir_service.ipc.OsirSocket import OsirSocket
+from osir_service.ipc.OsirIpcMetrics import OsirIpcMetrics
 from osir_service.postgres.model.OsirDbHandlerModel import OsirDbHandlerModel
 from osir_service.orchestration.TaskService import TaskService
+from osir_service.orchestration.FairDispatcher import FairDispatcher
 from osir_service.ipc.model.OsirFileModel import FsData
 
 from osir_service.ipc.model.OsirAction import OSIR_ACTIONS, register_action
@@ -26,17 +33,31 @@ from osir_service.ipc.OsirIpcFiles import OsirIpcFiles
 
 logger = AppLogger(__name__).get_logger()
 
+IPC_WORKERS = int(os.getenv("OSIR_IPC_WORKERS", "16"))
+IPC_IDLE_TIMEOUT = float(os.getenv("OSIR_IPC_IDLE_TIMEOUT", "300"))
+IPC_IO_TIMEOUT = float(os.getenv("OSIR_IPC_IO_TIMEOUT", "120"))
+# Streamed replies (downloads, archives) can run for a long time on slow
+# clients: each chunk gets OSIR_IPC_STREAM_TIMEOUT seconds, and at most
+# OSIR_IPC_MAX_STREAMS of them hold a worker at once.
+IPC_STREAM_TIMEOUT = float(os.getenv("OSIR_IPC_STREAM_TIMEOUT", "600"))
+IPC_MAX_STREAMS = max(1, int(os.getenv("OSIR_IPC_MAX_STREAMS", str(max(1, IPC_WORKERS // 4)))))
+
 
 class OsirIpc(BaseModel):
     """
     Core IPC (Inter-Process Communication) service for the OSIR framework.
     Listens on a TCP socket and dispatches JSON requests to registered action handlers.
+    Connections are kept alive and served concurrently by a pool of OSIR_IPC_WORKERS threads.
     """
 
     host: str
     port: int
     
     _files_handler: OsirIpcFiles = OsirIpcFiles()
+    _metrics: OsirIpcMetrics = PrivateAttr(default_factory=OsirIpcMetrics)
+    _stream_slots: threading.BoundedSemaphore = PrivateAttr(
+        default_factory=lambda: threading.BoundedSemaphore(IPC_MAX_STREAMS)
+    )
 
     def listen(self):
         """
@@ -58,33 +79,144 @@ class OsirIpc(BaseModel):
                 time.sleep(5)
 
     def _accept_loop(self, s: socket.socket):
-        """Accepts and handles incoming client connections."""
-        while True:
-            try:
-                conn, addr = s.accept()
-                logger.info(f"Connected by {addr}")
-                with conn:
-                    self._request_loop(conn)
-            except Exception as e:
-                logger.error(f"Error accepting connection: {e}")
-                continue
+        """
+        Accepts client connections and dispatches their requests to a worker pool.
 
-    def _request_loop(self, conn: socket.socket):
-        """Processes incoming requests on an established connection."""
-        while True:
+        Idle keep-alive connections wait in a selector and hold no worker: a
+        connection is handed to a worker when a request arrives and given back
+        once the reply is sent. Slow handlers (deep searches, archives, large
+        downloads) therefore never block the other clients.
+        """
+        s.setblocking(False)
+        selector = selectors.DefaultSelector()
+        wakeup_recv, wakeup_send = socket.socketpair()
+        wakeup_recv.setblocking(False)
+        wakeup_send.setblocking(False)
+        released = queue.SimpleQueue()
+
+        def release(conn: socket.socket):
+            # Called from workers: only the loop thread touches the selector.
+            released.put(conn)
             try:
-                request = OsirSocket.recv_json(conn)
+                wakeup_send.send(b"\0")
+            except BlockingIOError:
+                pass
+
+        selector.register(s, selectors.EVENT_READ)
+        selector.register(wakeup_recv, selectors.EVENT_READ)
+        executor = ThreadPoolExecutor(max_workers=IPC_WORKERS, thread_name_prefix="osir-ipc")
+        try:
+            while True:
+                for key, _ in selector.select(timeout=min(IPC_IDLE_TIMEOUT, 30)):
+                    if key.fileobj is s:
+                        self._accept(s, selector)
+                    elif key.fileobj is wakeup_recv:
+                        try:
+                            while wakeup_recv.recv(4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+                        while not released.empty():
+                            selector.register(released.get(), selectors.EVENT_READ, time.monotonic())
+                    else:
+                        selector.unregister(key.fileobj)
+                        executor.submit(self._serve_request, key.fileobj, release)
+                self._close_idle(selector)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            for key in list(selector.get_map().values()):
+                if key.fileobj not in (s, wakeup_recv):
+                    key.fileobj.close()
+            selector.close()
+            wakeup_recv.close()
+            wakeup_send.close()
+
+    @staticmethod
+    def _accept(s: socket.socket, selector: selectors.BaseSelector):
+        """Accepts a pending connection and waits for its first request."""
+        try:
+            conn, addr = s.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        except Exception as e:
+            logger.error(f"Error accepting connection: {e}")
+            return
+        logger.debug(f"Connected by {addr}")
+        conn.setblocking(True)
+        selector.register(conn, selectors.EVENT_READ, time.monotonic())
+
+    @staticmethod
+    def _close_idle(selector: selectors.BaseSelector):
+        """Closes keep-alive connections idle for more than OSIR_IPC_IDLE_TIMEOUT seconds."""
+        now = time.monotonic()
+        for key in list(selector.get_map().values()):
+            if key.data is not None and now - key.data > IPC_IDLE_TIMEOUT:
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+
+    def _serve_request(self, conn: socket.socket, release):
+        """Reads one request from a ready connection, replies and hands the connection back."""
+        try:
+            conn.settimeout(IPC_IO_TIMEOUT)
+            request = OsirSocket.recv_json(conn)
+        except ConnectionError:
+            logger.debug("Client disconnected.")
+            conn.close()
+            return
+        except Exception as e:
+            logger.error(f"Error reading request: {e}")
+            conn.close()
+            return
+
+        started = time.perf_counter()
+        status = None
+        streaming = self._is_streaming(request)
+        stream_slot = streaming and self._stream_slots.acquire(blocking=False)
+        self._metrics.begin()
+        try:
+            if streaming and not stream_slot:
+                response = OsirException.TOO_MANY_STREAMS(IPC_MAX_STREAMS)
+            else:
                 response = self.action(request)
-                
-                if response is not None:
-                    OsirSocket.send_json(conn, response, pydantic=True)
-                
-            except ConnectionError:
-                logger.debug("Client disconnected.")
-                break
-            except Exception as e:
-                logger.error(f"Error handling request: {e}")
-                break
+            if isinstance(response, OsirIpcStream):
+                # Reset to OSIR_IPC_IO_TIMEOUT by the next request.
+                conn.settimeout(IPC_STREAM_TIMEOUT)
+            self._send_response(conn, request, response)
+            status = response.response.status if isinstance(response, OsirIpcStream) else response.status
+        except ConnectionError:
+            logger.debug("Client disconnected.")
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error handling request: {e}")
+            conn.close()
+        else:
+            release(conn)
+        finally:
+            if stream_slot:
+                self._stream_slots.release()
+            action = request.get("action") if isinstance(request, dict) else None
+            self._metrics.record(
+                action if action in OSIR_ACTIONS else "unknown_action",
+                time.perf_counter() - started,
+                status,
+            )
+
+    def _send_response(self, conn: socket.socket, request, response):
+        """Sends a reply with the framing expected by the client of the action."""
+        if isinstance(response, OsirIpcStream):
+            OsirSocket.send_message(conn, response.header(), response.iter_body())
+        elif self._is_streaming(request):
+            # Streaming clients always expect the message framing, errors included.
+            OsirSocket.send_message(conn, OsirIpcStream(response=response).header())
+        else:
+            OsirSocket.send_json(conn, response, pydantic=True)
+
+    @staticmethod
+    def _is_streaming(request) -> bool:
+        """Returns True if the request targets an action registered with streaming=True."""
+        if not isinstance(request, dict):
+            return False
+        return OSIR_ACTIONS.get(request.get("action"), {}).get("streaming", False)
 
     def start(self):
         """Launches the IPC listener in a dedicated background thread."""
@@ -141,6 +273,13 @@ class OsirIpc(BaseModel):
         resp.message = "SOCKET READY"
         return resp
 
+    @register_action('get_ipc_metrics')
+    def _handle_get_ipc_metrics(self, req: OsirIpcRequest, resp: OsirIpcResponse):
+        resp.message = "IPC metrics retrieved"
+        resp.response = self._metrics.snapshot()
+        resp.response["db_pool"] = OsirDb.pool_stats()
+        return resp
+
     @register_action('exec_module', required_fields=['modules', 'case_path'])
     def _handle_exec_module(self, req: OsirIpcRequest, resp: OsirIpcResponse):
         if req.params.get('input_path'):
@@ -352,6 +491,9 @@ class OsirIpc(BaseModel):
             to_delete = db.handler.get(handler_id=handler_uuid)
 
             if to_delete:
+                dispatcher = FairDispatcher.current()
+                if dispatcher is not None:
+                    dispatcher.drop(handler_id=handler_uuid)
                 db.task.delete(handler_id=handler_uuid)
                 db.handler.delete(handler_id=handler_uuid)
 
@@ -385,6 +527,35 @@ class OsirIpc(BaseModel):
             resp.response = db.task.list(case_uuid=case_uuid)
         return resp
 
+    @register_action('list_tasks')
+    def _handle_list_tasks(self, req: OsirIpcRequest, resp: OsirIpcResponse):
+        params = req.params
+        with OsirDb() as db:
+            case_uuid = params.get('case_uuid')
+            if not case_uuid and params.get('case_name'):
+                case = db.case.get(name=params['case_name'])
+                if not case:
+                    return OsirException.CASE_NOT_FOUND(params['case_name'])
+                case_uuid = case.case_uuid
+            try:
+                page = db.task.page(
+                    case_uuid=case_uuid,
+                    handler_id=params.get('handler_id'),
+                    module=params.get('module'),
+                    processing_status=params.get('status'),
+                    agent=params.get('agent'),
+                    input_contains=params.get('input'),
+                    since=params.get('since'),
+                    until=params.get('until'),
+                    cursor=params.get('cursor'),
+                    limit=params.get('limit') or 100,
+                )
+            except ValueError as e:
+                return OsirException.VALIDATION_ERROR(str(e))
+        resp.message = "Tasks retrieved"
+        resp.response = page.model_dump()
+        return resp
+
     @register_action('get_task_stats')
     def _handle_get_task_stats(self, req: OsirIpcRequest, resp: OsirIpcResponse):
         with OsirDb() as db:
@@ -398,6 +569,44 @@ class OsirIpc(BaseModel):
                 case_uuid = case.case_uuid
             resp.message = "Task stats retrieved"
             resp.response = db.task.stats(handler_id=handler_id, case_uuid=case_uuid)
+
+        dispatcher = FairDispatcher.current()
+        if dispatcher is not None and isinstance(resp.response, dict):
+            resp.response["dispatch"] = dispatcher.stats(case_uuid=case_uuid, handler_id=handler_id)
+        return resp
+
+    @register_action('get_dedup_stats', required_fields=['case_name'])
+    def _handle_get_dedup_stats(self, req: OsirIpcRequest, resp: OsirIpcResponse):
+        with OsirDb() as db:
+            case = db.case.get(name=req.params['case_name'])
+            if not case:
+                return OsirException.CASE_NOT_FOUND(req.params['case_name'])
+            resp.message = "Dedup stats retrieved"
+            resp.response = db.dedup.stats(str(case.case_uuid))
+        return resp
+
+    @register_action('get_dispatch_stats')
+    def _handle_get_dispatch_stats(self, req: OsirIpcRequest, resp: OsirIpcResponse):
+        dispatcher = FairDispatcher.current()
+        resp.message = "Dispatch stats retrieved"
+        resp.response = dispatcher.stats() if dispatcher is not None else {"cases": {}}
+        return resp
+
+    @register_action('set_case_weight', required_fields=['case_name', 'weight'])
+    def _handle_set_case_weight(self, req: OsirIpcRequest, resp: OsirIpcResponse):
+        with OsirDb() as db:
+            case = db.case.get(name=req.params['case_name'])
+        if not case:
+            return OsirException.CASE_NOT_FOUND(req.params['case_name'])
+        try:
+            weight = float(req.params['weight'])
+        except (TypeError, ValueError):
+            weight = 0
+        if not math.isfinite(weight) or weight <= 0:
+            return OsirException.VALIDATION_ERROR("weight must be a finite number greater than 0")
+        FairDispatcher.set_weight(case.case_uuid, weight)
+        resp.message = f"Case weight set to {weight}"
+        resp.response = {"case_uuid": str(case.case_uuid), "weight": weight}
         return resp
 
     @register_action('get_task_log', required_fields=['task_id'])
@@ -462,6 +671,13 @@ class OsirIpc(BaseModel):
         resp.response = result
         return resp
 
+    @register_action('get_module_profiles')
+    def _handle_get_module_profiles(self, req: OsirIpcRequest, resp: OsirIpcResponse):
+        with OsirDb() as db:
+            resp.message = "Module profiles retrieved"
+            resp.response = db.module_profile.list(module=req.params.get('module'))
+        return resp
+
     # ==================== FILES HANDLERS ====================
     # These handlers delegate to OsirIpcFiles instance
 
@@ -505,7 +721,7 @@ class OsirIpc(BaseModel):
     def _handle_files_create_folder(self, req: OsirIpcRequest, resp: OsirIpcResponse):
         return self._files_handler.handle_files_create_folder(req, resp)
 
-    @register_action('files_download', required_fields=['path'])
+    @register_action('files_download', required_fields=['path'], streaming=True)
     def _handle_files_download(self, req: OsirIpcRequest, resp: OsirIpcResponse):
         return self._files_handler.handle_files_download(req, resp)
 
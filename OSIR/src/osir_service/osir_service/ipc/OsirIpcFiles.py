@@ -2,18 +2,25 @@
 IPC handlers for file operations in OSIR.
 """
 
-import base64
+import os
 
 from osir_service.ipc.model.OsirFileModel import FsData
+from osir_service.ipc.model.OsirIpcStream import OsirIpcStream
 from osir_service.ipc.model.OsirIpcRequest import OsirIpcRequest
 from osir_service.ipc.model.OsirIpcResponse import OsirIpcResponse
 from osir_service.ipc.model.OsirExceptions import OsirException
+from osir_lib.core.FileManager import FileManager
 from osir_lib.core.OsirConstants import OSIR
 
 from osir_lib.logger import AppLogger
 
 logger = AppLogger(__name__).get_logger()
 
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("OSIR_DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+SEARCH_PAGE_SIZE = int(os.getenv("OSIR_FILE_SEARCH_PAGE_SIZE", "200"))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("OSIR_FILE_SEARCH_MAX_PAGE_SIZE", "1000"))
+SEARCH_CAP = int(os.getenv("OSIR_FILE_SEARCH_CAP", "10000"))
+
 class OsirIpcFiles:
     """
     File operation handlers for IPC.
@@ -215,21 +222,56 @@ class OsirIpcFiles:
             return OsirException.FILE_OPERATION_ERROR(str(e), "create_folder")
     
     @staticmethod
-    def handle_files_download(req: OsirIpcRequest, resp: OsirIpcResponse = None) -> OsirIpcResponse:
-        """Handler for downloading a file."""
+    def handle_files_download(req: OsirIpcRequest, resp: OsirIpcResponse = None) -> OsirIpcStream | OsirIpcResponse:
+        """Handler for downloading a file, optionally restricted to a byte range.
+
+        Params:
+            path: Full path to the file (including storage prefix).
+            start, end: Optional inclusive byte range (HTTP Range semantics).
+                `end` defaults to the last byte; `suffix` instead asks for the
+                last N bytes of the file.
+
+        The content is never loaded in memory: it is read and sent in
+        DOWNLOAD_CHUNK_SIZE chunks while the reply is written on the socket.
+        """
         try:
             path = req.params.get('path', '')
-            
+
             if not path:
                 return OsirException.MISSING_PARAMETER("path")
-            
-            content, mime_type, filename = FsData.download_file(path)
-            return OsirIpcResponse(
-                response={
-                    "content": base64.b64encode(content).decode('utf-8'),
-                    "mimeType": mime_type,
-                    "filename": filename
-                }
+
+            file_path, size, mime_type = FsData.download_file(path)
+
+            start = req.params.get('start')
+            end = req.params.get('end')
+            suffix = req.params.get('suffix')
+
+            if suffix is not None:
+                start, end = max(size - int(suffix), 0), size - 1
+            elif start is not None:
+                start = int(start)
+                end = min(int(end), size - 1) if end is not None else size - 1
+            else:
+                start, end = 0, size - 1
+
+            is_range = suffix is not None or req.params.get('start') is not None
+            if is_range and (start < 0 or start >= size or end < start):
+                return OsirException.RANGE_NOT_SATISFIABLE(start, size)
+
+            length = max(end - start + 1, 0)
+
+            return OsirIpcStream(
+                response=OsirIpcResponse(
+                    response={
+                        "mimeType": mime_type,
+                        "filename": str(file_path),
+                        "size": size,
+                        "start": start,
+                        "end": start + length - 1,
+                    }
+                ),
+                body=OsirIpcFiles._read_range(file_path, start, length),
+                body_size=length,
             )
         except ValueError as e:
             return OsirException.VALIDATION_ERROR(str(e))
@@ -237,22 +279,53 @@ class OsirIpcFiles:
             return OsirException.FILE_NOT_FOUND(str(e))
         except Exception as e:
             return OsirException.IO_ERROR(str(e))
-    
+
+    @staticmethod
+    def _read_range(file_path, start: int, length: int):
+        """Lazily yields `length` bytes of a file from `start`, chunk by chunk."""
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
     @staticmethod
     def handle_files_search(req: OsirIpcRequest, resp: OsirIpcResponse = None) -> OsirIpcResponse:
-        """Handler for searching files."""
+        """Handler for searching files.
+
+        Params:
+            path, filter, deep, size: Search scope and criteria.
+            mode: 'auto' (default), 'prefix', 'substring' or 'glob'.
+            offset, limit: Page of matches to return. `limit` defaults to
+                SEARCH_PAGE_SIZE and is capped to SEARCH_MAX_PAGE_SIZE.
+
+        Matches are counted up to SEARCH_CAP; `truncated` tells if there are more.
+        """
         try:
             path = req.params.get('path', '')
             filter_expr = req.params.get('filter', None)
             deep = req.params.get('deep', False)
             size_filter = req.params.get('size', 'all')
-            
-            files = FsData.search_files(path, filter_expr, deep, size_filter)
+            mode = req.params.get('mode') or 'auto'
+            offset = max(int(req.params.get('offset') or 0), 0)
+            limit = min(max(int(req.params.get('limit') or SEARCH_PAGE_SIZE), 1), SEARCH_MAX_PAGE_SIZE)
+
+            files, total, truncated = FsData.search_files(
+                path, filter_expr, deep, size_filter, mode=mode, offset=offset, limit=limit, cap=SEARCH_CAP
+            )
             return OsirIpcResponse(
                 response={
                     "dirname": path,
                     "files": [f.model_dump() for f in files],
-                    "storages": FsData.from_path(path).storages
+                    "storages": FileManager.all_cases(),
+                    "total": total,
+                    "offset": offset,
+                    "limit": limit,
+                    "truncated": truncated,
                 }
             )
         except ValueError as e:
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import deque
+
+
+class OsirIpcMetrics:
+    """
+        Per-action latency metrics of the IPC server.
+
+        For every action: request and error counts (status >= 400), total and
+        max latency, and p50/p95/p99 computed over the last `window` requests.
+        Latencies cover the whole request, including sending the reply, so
+        streamed downloads are accounted for their full transfer time.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._actions: dict[str, dict] = {}
+        self._in_flight = 0
+
+    def begin(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def record(self, action: str, elapsed: float, status: int):
+        """Accounts one completed request of `action` that took `elapsed` seconds."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            stats = self._actions.get(action)
+            if stats is None:
+                stats = self._actions[action] = {
+                    "count": 0,
+                    "errors": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "recent": deque(maxlen=self.window),
+                }
+            stats["count"] += 1
+            if status is None or status >= 400:
+                stats["errors"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+            stats["recent"].append(elapsed)
+
+    def snapshot(self) -> dict:
+        """Returns the metrics as a JSON-serializable dict, latencies in milliseconds."""
+        with self._lock:
+            actions = {
+                action: (stats["count"], stats["errors"], stats["total"], stats["max"], sorted(stats["recent"]))
+                for action, stats in self._actions.items()
+            }
+            in_flight = self._in_flight
+
+        result = {}
+        for action, (count, errors, total, max_latency, recent) in sorted(actions.items()):
+            result[action] = {
+                "count": count,
+                "errors": errors,
+                "avg_ms": round(total / count * 1000, 3),
+                "max_ms": round(max_latency * 1000, 3),
+                "p50_ms": self._percentile(recent, 0.50),
+                "p95_ms": self._percentile(recent, 0.95),
+                "p99_ms": self._percentile(recent, 0.99),
+            }
+
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "in_flight": in_flight,
+            "actions": result,
+        }
+
+    @staticmethod
+    def _percentile(values: list, q: float) -> float:
+        if not values:
+            return 0.0
+        index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+        return round(values[index] * 1000, 3)
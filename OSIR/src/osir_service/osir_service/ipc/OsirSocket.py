@@ -1,16 +1,106 @@
 import json
+import os
+import select
 import socket
-from typing import Generator
+import threading
+import time
+from collections import deque
+from typing import Callable, Generator, Iterable
 
 from pydantic import BaseModel
 
 from osir_service.ipc.model.OsirIpcRequest import OsirIpcRequest
 
 
+class OsirSocketPool:
+    """
+        Process-wide pool of keep-alive connections to an OsirIpc server, one per (host, port).
+
+        - Size: at most OSIR_IPC_CLIENT_POOL_SIZE idle connections are kept.
+          Borrowing never blocks: when none is idle a new connection is opened.
+        - Staleness: idle connections are dropped after OSIR_IPC_CLIENT_IDLE_TIMEOUT
+          seconds, which must stay below the server OSIR_IPC_IDLE_TIMEOUT, and a
+          connection that became readable while idle (closed by the server) is
+          never reused.
+        - Fork safety: a forked child starts with an empty pool.
+    """
+
+    _pools: dict = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, address: tuple):
+        self.address = address
+        self.max_idle = int(os.getenv("OSIR_IPC_CLIENT_POOL_SIZE", "8"))
+        self.idle_timeout = float(os.getenv("OSIR_IPC_CLIENT_IDLE_TIMEOUT", "60"))
+
+        self._lock = threading.Lock()
+        self._idle: deque = deque()
+        self._pid = os.getpid()
+
+    @classmethod
+    def get(cls, host: str, port: int) -> "OsirSocketPool":
+        key = (host, port)
+        pool = cls._pools.get(key)
+        if pool is None:
+            with cls._pools_lock:
+                pool = cls._pools.get(key)
+                if pool is None:
+                    pool = cls._pools[key] = cls(key)
+        return pool
+
+    def connect(self) -> socket.socket:
+        """Opens a new connection to the server."""
+        conn = socket.create_connection(self.address)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def acquire(self) -> tuple[socket.socket, bool]:
+        """Borrows a connection. Returns it with True if it was reused from the pool."""
+        if self._pid != os.getpid():
+            # Closing inherited sockets only drops the child's descriptors.
+            for conn, _ in self._idle:
+                conn.close()
+            self._idle = deque()
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, released_at = self._idle.pop()
+            if time.monotonic() - released_at > self.idle_timeout or self._is_stale(conn):
+                conn.close()
+                continue
+            return conn, True
+
+        return self.connect(), False
+
+    def release(self, conn: socket.socket):
+        """Gives a connection back after a complete reply was read from it."""
+        with self._lock:
+            if self._pid == os.getpid() and len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    @staticmethod
+    def _is_stale(conn: socket.socket) -> bool:
+        # Nothing is pending on an idle connection: readable means EOF or reset.
+        try:
+            poller = select.poll()
+            poller.register(conn, select.POLLIN)
+            return bool(poller.poll(0))
+        except (OSError, ValueError):
+            return True
+
+
 class OsirSocket(BaseModel):
     """
         Handles low-level JSON socket communication for the OSIR IPC layer.
 
+        Requests are sent on keep-alive connections borrowed from OsirSocketPool.
+
         Attributes:
             host (str): The hostname or IP address of the OSIR Master node.
                 Defaults to 'master-master' (internal Docker networking).
@@ -57,23 +147,46 @@ class OsirSocket(BaseModel):
 
     @staticmethod
     def recv_message(conn) -> tuple[dict, Generator]:
-        """Receives a unified message: JSON header + lazy binary body generator."""
+        """
+            Receives a unified message: JSON header + lazy binary body generator.
+
+            The body is always read up to its 0-length terminator chunk, so the
+            connection is ready for the next message once the generator is exhausted.
+        """
         header_size = int.from_bytes(OsirSocket._recv_exact(conn, 4), "big")
         meta = json.loads(OsirSocket._recv_exact(conn, header_size).decode("utf-8"))
-        body_size = meta.get("body_size", 0)
 
         def _stream_body():
-            received = 0
-            while received < body_size:
+            while True:
                 chunk_size = int.from_bytes(OsirSocket._recv_exact(conn, 4), "big")
                 if chunk_size == 0:
                     break
-                chunk = OsirSocket._recv_exact(conn, chunk_size)
-                received += chunk_size
-                yield chunk
+                yield OsirSocket._recv_exact(conn, chunk_size)
 
         return meta, _stream_body()
 
+    @staticmethod
+    def send_message(conn, meta: dict, body: Iterable[bytes] = ()):
+        """
+            Sends a unified message: JSON header + binary body.
+
+            Framing:
+                [4-byte header size][JSON header, with `body_size`]
+                then for each chunk [4-byte chunk size][chunk bytes]
+                and a final 0-length chunk marking the end of the body.
+
+            Args:
+                conn (socket.socket): The connection to send data over.
+                meta (dict): JSON-serializable header. `body_size` is the announced body length.
+                body (Iterable[bytes]): Body chunks, consumed lazily.
+        """
+        header = json.dumps(meta).encode("utf-8")
+        conn.sendall(len(header).to_bytes(4, "big") + header)
+        for chunk in body:
+            if chunk:
+                conn.sendall(len(chunk).to_bytes(4, "big") + chunk)
+        conn.sendall((0).to_bytes(4, "big"))
+
     @staticmethod
     def send_json(conn, obj, pydantic=False):
         """
@@ -105,9 +218,85 @@ class OsirSocket(BaseModel):
             Returns:
                 str: The JSON-formatted response string from the Master service.
         """
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.connect((self.host, self.port))
-            self.send_json(s, osir_ipc.model_dump())
-            reply = self.recv_json(s)
-            return json.dumps(reply) + "\n"
+        conn, reply = self._request(osir_ipc, self.recv_json)
+        OsirSocketPool.get(self.host, self.port).release(conn)
+        return json.dumps(reply) + "\n"
+
+    def stream(self, osir_ipc: OsirIpcRequest) -> tuple[dict, Generator]:
+        """
+            Sends an IPC request to a streaming action and returns its reply.
+
+            Args:
+                osir_ipc (OsirIpcRequest): The validated request object.
+
+            Returns:
+                tuple[dict, Generator]: The reply header (an OsirIpcResponse dump plus
+                    `body_size`) and a generator over the body chunks. The connection
+                    goes back to the pool once the generator is exhausted, and is
+                    closed if the generator is closed before.
+        """
+        conn, (meta, body) = self._request(osir_ipc, self.recv_message)
+        pool = OsirSocketPool.get(self.host, self.port)
 
+        def _body():
+            try:
+                yield from body
+            except BaseException:
+                conn.close()
+                raise
+            pool.release(conn)
+
+        return meta, _body()
+
+    def _request(self, osir_ipc: OsirIpcRequest, receive: Callable):
+        """
+            Sends a request on a pooled connection and reads the reply with `receive`.
+
+            A reused connection is retried once on a new one only when the
+            request could not be sent or the connection was closed before the
+            first byte of the reply: the master never processed the request.
+            Any other receive error (timeout, truncated reply) is raised, the
+            request may have run.
+
+            Returns:
+                tuple: The connection, still borrowed, and the value returned by `receive`.
+        """
+        pool = OsirSocketPool.get(self.host, self.port)
+        conn, reused = pool.acquire()
+        request = osir_ipc.model_dump()
+        try:
+            try:
+                self.send_json(conn, request)
+            except OSError:
+                if not reused:
+                    raise
+            else:
+                if self._wait_reply(conn):
+                    return conn, receive(conn)
+                if not reused:
+                    raise ConnectionError("Connection closed by the master before any reply.")
+        except Exception:
+            conn.close()
+            raise
+        conn.close()
+
+        # The master closed the kept-alive connection right after the
+        # staleness check: the request never reached it, retry once.
+        conn = pool.connect()
+        try:
+            self.send_json(conn, request)
+            return conn, receive(conn)
+        except Exception:
+            conn.close()
+            raise
+
+    @staticmethod
+    def _wait_reply(conn) -> bool:
+        """
+            Blocks until the reply starts. Returns False if the connection was
+            closed (EOF or reset) before its first byte. Other errors are raised.
+        """
+        try:
+            return bool(conn.recv(1, socket.MSG_PEEK))
+        except (ConnectionResetError, ConnectionAbortedError):
+            return False
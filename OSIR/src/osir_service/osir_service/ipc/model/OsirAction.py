@@ -1,19 +1,22 @@
 OSIR_ACTIONS: dict[str, dict] = {}
 
 
-def register_action(*action_names, required_fields: list[str] = None):
+def register_action(*action_names, required_fields: list[str] = None, streaming: bool = False):
     """
     Decorator that registers a method as a handler for one or more IPC action names.
 
     Args:
         *action_names: One or more action name strings to bind to this handler.
         required_fields: List of OsirIpcRequest fields that must be present and non-empty.
+        streaming: The handler returns an OsirIpcStream and every reply of the action,
+            errors included, uses the chunked message framing (OsirSocket.send_message).
     """
     def decorator(func):
         for name in action_names:
             OSIR_ACTIONS[name] = {
                 "handler": func,
                 "required_fields": required_fields or [],
+                "streaming": streaming,
             }
         return func
     return decorator
\ No newline at end of file
@@ -252,3 +252,35 @@ class OsirException:
                 }
             }
         )
+
+    @staticmethod
+    def RANGE_NOT_SATISFIABLE(start: int, size: int) -> OsirIpcResponse:
+        """Requested byte range lies outside of the file."""
+        return OsirIpcResponse(
+            version=OSIR.VERSION,
+            status=416,
+            message=f"Range not satisfiable: start {start} for a {size} bytes file",
+            response={
+                "error": f"RANGE NOT SATISFIABLE: start {start} for a {size} bytes file",
+                "type": "RANGE_NOT_SATISFIABLE",
+                "details": {
+                    "size": size
+                }
+            }
+        )
+
+    @staticmethod
+    def TOO_MANY_STREAMS(limit: int) -> OsirIpcResponse:
+        """Every streaming slot of the IPC server is in use."""
+        return OsirIpcResponse(
+            version=OSIR.VERSION,
+            status=503,
+            message=f"Too many downloads in progress (limit: {limit}), retry later",
+            response={
+                "error": f"TOO MANY STREAMS: {limit} downloads already in progress",
+                "type": "TOO_MANY_STREAMS",
+                "details": {
+                    "limit": limit
+                }
+            }
+        )
@@ -7,6 +7,7 @@ import os
 import tarfile
 import zipfile
 import shutil
+from osir_service.ipc.OsirFileIndex import SEARCH_MODES, SIZE_FILTERS, CaseFileIndex, IndexedFile, OsirFileIndex
 from osir_lib.logger import AppLogger
 
 logger = AppLogger(__name__).get_logger()
@@ -36,7 +37,6 @@ class DirEntry(BaseModel):
 
     @classmethod
     def from_path(cls, path: Path, case_name: str) -> "DirEntry":
-        mimetypes.init()
         virt_path = DirEntry.get_virt_path(case_name, path)
         parent_virt_path = ""
 
@@ -65,6 +65,25 @@ class DirEntry(BaseModel):
             previewUrl=None
         )
 
+    @classmethod
+    def from_index(cls, hit: IndexedFile, case_root: Path, case_name: str) -> "DirEntry":
+        """Build a file entry from a file index hit, without stat'ing the file again."""
+        rel_path = f"{hit.rel_dir}/{hit.name}" if hit.rel_dir else hit.name
+        return cls(
+            dir=f"{case_name}://{hit.rel_dir or '.'}",
+            basename=hit.name,
+            extension=Path(hit.name).suffix,
+            path=f"{case_name}://{rel_path}",
+            storage=case_name,
+            type="file",
+            visibility="public",
+            file_size=hit.size,
+            last_modified=hit.mtime,
+            mime_type=mimetypes.guess_type(hit.name)[0],
+            read_only=not os.access(case_root / rel_path, os.W_OK),
+            previewUrl=None
+        )
+
 
 class FsData(BaseModel):
     storages: List[str]
@@ -357,8 +376,11 @@ class FsData(BaseModel):
         return DirEntry.from_path(new_dir, case_name)
 
     @staticmethod
-    def download_file(storage_path: str) -> Tuple[bytes, str]:
-        """Download a file and return its content and mime type."""
+    def download_file(storage_path: str) -> Tuple[Path, int, str]:
+        """Resolve a file to download and return its real path, size and mime type.
+
+        The content is not read here: callers stream it (see OsirIpcFiles.handle_files_download).
+        """
         case_name, virt_path = FsData.get_real_path(storage_path)
         file_path = FsData.get_path(case_name, virt_path)
         
@@ -372,15 +394,18 @@ class FsData(BaseModel):
         if not file_path.is_file():
             raise ValueError(f"Path is not a file: {storage_path}")
         
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
         mime_type = mimetypes.guess_type(str(file_path))[0] or 'application/octet-stream'
-        return content, mime_type, file_path
+        return file_path, file_path.stat().st_size, mime_type
 
     @staticmethod
-    def search_files(storage_path: str, filter_expr: Optional[str] = None, deep: bool = False, size_filter: str = 'all') -> List[DirEntry]:
-        """Search for files in a directory."""
+    def search_files(storage_path: str, filter_expr: Optional[str] = None, deep: bool = False, size_filter: str = 'all',
+                     mode: str = 'auto', offset: int = 0, limit: int = 200, cap: int = 10000) -> Tuple[List[DirEntry], int, bool]:
+        """Search for files in a directory. Deep searches use the case file index,
+        a single directory is listed directly.
+
+        Returns the requested page of entries, the number of matches (at most `cap`)
+        and whether the search was truncated at `cap`.
+        """
         case_name, virt_path = FsData.get_real_path(storage_path)
         base_path = FsData.get_path(case_name, virt_path)
 
@@ -391,49 +416,50 @@ class FsData(BaseModel):
         if not base_path.exists() or not base_path.is_dir():
             raise ValueError(f"Path not found or not a directory: {storage_path}")
 
-        results = []
-
-        def matches_filter(file_path: Path, filter_expr: str) -> bool:
-            """Check if the file matches the filter (starts with, contains, or equals)."""
-            file_name = file_path.name.lower()
-            filter_lower = filter_expr.lower()
-            return (
-                file_name.startswith(filter_lower) or
-                filter_lower in file_name or
-                file_name == filter_lower
-            )
-
-        def matches_size(file_path: Path, size_filter: str) -> bool:
-            """Check if the file matches the size filter."""
-            file_size = file_path.stat().st_size
-            if size_filter == 'small':
-                return file_size <= 1024 * 1024
-            elif size_filter == 'medium':
-                return 1024 * 1024 < file_size <= 10 * 1024 * 1024
-            elif size_filter == 'large':
-                return file_size > 10 * 1024 * 1024
-            else:  # 'all'
-                return True
-
-        if deep:
-            for root, dirs, files in os.walk(base_path):
-                for file in files:
-                    file_path = Path(root) / file
-                    if filter_expr and not matches_filter(file_path, filter_expr):
-                        continue
-                    if not matches_size(file_path, size_filter):
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        case_root = Path(OSIR_PATHS.CASES_DIR / case_name).resolve()
+        rel_base = base_path.relative_to(case_root).as_posix()
+        rel_base = "" if rel_base == "." else rel_base
+
+        if not deep:
+            return FsData._search_dir(base_path, rel_base, case_root, case_name, filter_expr,
+                                      mode, size_filter, offset, limit, cap)
+
+        page = OsirFileIndex.get(str(case_root)).search(
+            rel_base=rel_base,
+            query=filter_expr,
+            mode=mode,
+            deep=True,
+            size_filter=size_filter,
+            offset=offset,
+            limit=limit,
+            cap=cap,
+        )
+        files = [DirEntry.from_index(hit, case_root, case_name) for hit in page.files]
+        return files, page.total, page.truncated
+
+    @staticmethod
+    def _search_dir(base_path: Path, rel_base: str, case_root: Path, case_name: str, filter_expr: Optional[str],
+                    mode: str, size_filter: str, offset: int, limit: int, cap: int) -> Tuple[List[DirEntry], int, bool]:
+        """Searches the files of a single directory with one scandir, without building the case file index."""
+        matches = CaseFileIndex._matcher(filter_expr, mode)
+        size_ok = SIZE_FILTERS.get(size_filter, SIZE_FILTERS["all"])
+
+        hits = []
+        with os.scandir(base_path) as it:
+            for child in it:
+                try:
+                    if not child.is_file() or not matches(child.name.lower()):
                         continue
-                    entry = DirEntry.from_path(file_path, case_name)
-                    results.append(entry)
-        else:
-            for item in base_path.iterdir():
-                if not item.is_file():
-                    continue
-                if filter_expr and not matches_filter(item, filter_expr):
-                    continue
-                if not matches_size(item, size_filter):
+                    st = child.stat()
+                except OSError:
                     continue
-                entry = DirEntry.from_path(item, case_name)
-                results.append(entry)
+                if size_ok(st.st_size):
+                    hits.append(IndexedFile(rel_base, child.name, st.st_size, int(st.st_mtime)))
 
-        return results
\ No newline at end of file
+        hits.sort(key=lambda hit: hit.name)
+        truncated = len(hits) > cap
+        files = [DirEntry.from_index(hit, case_root, case_name) for hit in hits[offset:min(offset + limit, cap)]]
+        return files, min(len(hits), cap), truncated
@@ -0,0 +1,33 @@
+from typing import Any, Iterable
+
+from pydantic import BaseModel, ConfigDict
+
+from osir_service.ipc.model.OsirIpcResponse import OsirIpcResponse
+
+
+class OsirIpcStream(BaseModel):
+    """
+        Reply of a streaming IPC action (see register_action(streaming=True)).
+
+        Sent with the unified message framing of OsirSocket.send_message: the
+        response envelope is the JSON header, the body is streamed as
+        length-prefixed chunks, so large payloads never have to fit in memory.
+
+        Attributes:
+            response (OsirIpcResponse): Envelope sent as the message header.
+            body (Iterable[bytes]): Lazy body, consumed while sending.
+            body_size (int): Announced body size, in bytes.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    response: OsirIpcResponse = OsirIpcResponse()
+    body: Any = ()
+    body_size: int = 0
+
+    def header(self) -> dict:
+        header = self.response.model_dump(mode="json")
+        header["body_size"] = self.body_size
+        return header
+
+    def iter_body(self) -> Iterable[bytes]:
+        return self.body
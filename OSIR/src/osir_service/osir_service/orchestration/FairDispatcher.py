@@ -0,0 +1,401 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from osir_lib.logger import AppLogger
+from osir_service.postgres.OsirDb import OsirDb
+
+logger = AppLogger(__name__).get_logger()
+
+# Window of the publish history used for the throughput figures.
+THROUGHPUT_WINDOW = 60.0
+
+# Interactive runs are published to "<queue>_priority", consumed by the
+# workers of <queue> next to it (see CeleryWorker.start_worker).
+PRIORITY_QUEUE_SUFFIX = "_priority"
+
+
+class FairMessage:
+    """A Celery task message: a single task, or a batch task of `cost` inputs."""
+    __slots__ = ("task_name", "args", "task_id", "queue", "cost")
+
+    def __init__(self, task_name, args, task_id, queue, cost=1):
+        self.task_name = task_name
+        self.args = args
+        self.task_id = task_id
+        self.queue = queue
+        self.cost = cost
+
+
+class _LaneStats:
+    def __init__(self):
+        self.published = 0
+        self.history: deque = deque()  # (monotonic, inputs published)
+        self.active_at = time.monotonic()
+
+    def record(self, now: float, inputs: int):
+        self.published += inputs
+        self.history.append((now, inputs))
+        self.active_at = now
+
+    def rate(self, now: float) -> int:
+        while self.history and now - self.history[0][0] > THROUGHPUT_WINDOW:
+            self.history.popleft()
+        return sum(inputs for _, inputs in self.history)
+
+
+class FairDispatcher:
+    """
+        Weighted fair dispatch of the handler tasks in front of Celery.
+
+        Every handler publishes into the same shared Celery queues, so the
+        first big case pushed used to fill them and keep every worker busy
+        while the tasks of later cases waited behind it. Handler tasks are
+        now held here, one lane per (Celery queue, case, handler), and a
+        dispatcher thread only tops up each Celery queue to
+        OSIR_FAIR_WINDOW ready messages (passive queue declare), picking the
+        messages with deficit round robin:
+          - cases take turns, each turn a case earns OSIR_FAIR_QUANTUM inputs
+            times its weight (set_weight, 1 by default) and spends them on
+            its messages (a batch message costs its number of inputs);
+          - the handlers of a case take turns within the case share.
+        Interactive runs (TaskService.push_task without handler: exec_module
+        on a file, web actions) bypass the lanes and are published right
+        away to the priority queue of their Celery queue, which the workers
+        consume next to the shared one: they never wait behind the window.
+
+        Waiting messages are also stored in osir_fair_lanes (OsirDbFairLane)
+        unless OSIR_FAIR_DURABLE=0: the next master restores the lanes left
+        by a stopped one (recover), along with the case weights. A row is deleted once its message is
+        published, so a master stopped in between publishes it again.
+        stats() reports per case and handler the waiting inputs, the inputs
+        published and those published over the last minute.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+    # Case shares, stored in osir_fair_weights and restored by recover.
+    _weights: dict[str, float] = {}
+
+    def __init__(self, app):
+        self.app = app
+        self.window = int(os.getenv("OSIR_FAIR_WINDOW", "32"))
+        self.quantum = float(os.getenv("OSIR_FAIR_QUANTUM", "16"))
+        self.poll_interval = float(os.getenv("OSIR_FAIR_POLL", "0.5"))
+        self.durable = os.getenv("OSIR_FAIR_DURABLE", "1") != "0"
+
+        # celery queue -> case_uuid -> handler_id -> deque of FairMessage, in round robin order.
+        self._queues: dict[str, OrderedDict] = {}
+        self._deficits: dict[tuple, float] = {}
+        self._stats: dict[tuple, _LaneStats] = {}
+        self._stats_ttl = float(os.getenv("OSIR_FAIR_STATS_TTL", "3600"))
+        self._pruned_at = time.monotonic()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="osir-fair-dispatch", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def enabled() -> bool:
+        return os.getenv("OSIR_FAIR_DISPATCH", "1") != "0"
+
+    @classmethod
+    def get(cls, app) -> "FairDispatcher":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(app)
+        return cls._instance
+
+    @classmethod
+    def recover(cls, app) -> int:
+        """
+            Restores the case weights and the lanes stored by a previous master
+            (see OsirDbFairLane). Returns the number of messages restored.
+        """
+        dispatcher = cls.get(app)
+        try:
+            with OsirDb() as db:
+                cls._weights.update(db.fair_lane.weights())
+        except Exception as e:
+            logger.error(f"Fair dispatch: unable to restore the case weights: {e}")
+
+        if not dispatcher.durable:
+            return 0
+        try:
+            with OsirDb() as db:
+                rows = db.fair_lane.list()
+        except Exception as e:
+            logger.error(f"Fair dispatch: unable to restore the waiting messages: {e}")
+            return 0
+
+        lanes = {}
+        for row in rows:
+            lanes.setdefault((row["case_uuid"], row["handler_id"]), []).append(FairMessage(
+                row["task_name"],
+                args=tuple(row["args"]),
+                task_id=row["task_id"],
+                queue=row["queue"],
+                cost=row["cost"],
+            ))
+        for (case_uuid, handler_id), messages in lanes.items():
+            dispatcher._enqueue(case_uuid, handler_id, messages)
+        if rows:
+            logger.info(f"Fair dispatch: {len(rows)} waiting message(s) of {len(lanes)} handler(s) restored")
+        return len(rows)
+
+    @classmethod
+    def current(cls):
+        """The dispatcher of this process, None when no handler task went through it."""
+        return cls._instance
+
+    @staticmethod
+    def publish(app, messages: list, priority: bool = False):
+        """Publishes messages right away, over a single producer, to the priority queues if priority."""
+        with app.producer_or_acquire() as producer:
+            for message in messages:
+                app.send_task(
+                    message.task_name,
+                    args=message.args,
+                    task_id=message.task_id,
+                    queue=message.queue + PRIORITY_QUEUE_SUFFIX if priority else message.queue,
+                    producer=producer,
+                )
+
+    def submit(self, case_uuid, handler_id, messages: list):
+        """Queues the messages of a handler in its lanes."""
+        if not messages:
+            return
+        case_uuid, handler_id = str(case_uuid), str(handler_id)
+        if self.durable:
+            try:
+                with OsirDb() as db:
+                    db.fair_lane.add(case_uuid, handler_id, messages)
+            except Exception as e:
+                # Dispatch goes on, these messages are only lost on a master restart.
+                logger.warning(f"Fair dispatch: unable to store {len(messages)} waiting message(s): {e}")
+        self._enqueue(case_uuid, handler_id, messages)
+
+    def _enqueue(self, case_uuid: str, handler_id: str, messages: list):
+        with self._cond:
+            self._prune_stats()
+            self._stats.setdefault((case_uuid, handler_id), _LaneStats()).active_at = time.monotonic()
+            for message in messages:
+                cases = self._queues.setdefault(message.queue, OrderedDict())
+                cases.setdefault(case_uuid, OrderedDict()).setdefault(handler_id, deque()).append(message)
+            self._cond.notify()
+
+    @classmethod
+    def set_weight(cls, case_uuid, weight: float):
+        """
+            Sets the share of a case: a case of weight 2 gets twice the inputs of a case of weight 1.
+            The weight is stored, so it outlives a master restart.
+
+            Raises:
+                ValueError: If weight is not a finite number greater than 0.
+        """
+        weight = float(weight)
+        if not math.isfinite(weight) or weight <= 0:
+            raise ValueError(f"Invalid case weight: {weight}")
+        weight = max(0.01, weight)
+        with OsirDb() as db:
+            db.fair_lane.set_weight(str(case_uuid), weight)
+        if weight == 1.0:
+            cls._weights.pop(str(case_uuid), None)
+        else:
+            cls._weights[str(case_uuid)] = weight
+        logger.info(f"Fair dispatch: case {case_uuid} weight set to {weight}")
+
+    def drop(self, handler_id=None, case_uuid=None) -> int:
+        """Forgets the waiting messages of a handler or of a case. Returns the number of messages dropped."""
+        handler_id = str(handler_id) if handler_id else None
+        case_uuid = str(case_uuid) if case_uuid else None
+        if not handler_id and not case_uuid:
+            return 0
+
+        dropped = 0
+        with self._cond:
+            for cases in self._queues.values():
+                for case, handlers in list(cases.items()):
+                    if case_uuid and case != case_uuid:
+                        continue
+                    for handler in list(handlers):
+                        if handler_id and handler != handler_id:
+                            continue
+                        dropped += len(handlers.pop(handler))
+                    if not handlers:
+                        del cases[case]
+            for key in list(self._stats):
+                if (not case_uuid or key[0] == case_uuid) and (not handler_id or key[1] == handler_id):
+                    del self._stats[key]
+
+        if self.durable:
+            try:
+                with OsirDb() as db:
+                    db.fair_lane.delete(handler_id=handler_id, case_uuid=case_uuid)
+            except Exception as e:
+                logger.warning(f"Fair dispatch: unable to delete the stored waiting messages: {e}")
+
+        if dropped:
+            logger.info(f"Fair dispatch: {dropped} waiting message(s) dropped")
+        return dropped
+
+    def stats(self, case_uuid=None, handler_id=None) -> dict:
+        """
+            Dispatch figures per case and handler: waiting messages and inputs
+            (per Celery queue), inputs published, inputs published over the
+            last minute.
+        """
+        now = time.monotonic()
+        case_uuid = str(case_uuid) if case_uuid else None
+        handler_id = str(handler_id) if handler_id else None
+
+        cases = {}
+        with self._cond:
+            for (case, handler), lane_stats in self._stats.items():
+                if (case_uuid and case != case_uuid) or (handler_id and handler != handler_id):
+                    continue
+                waiting = {}
+                for queue, queue_cases in self._queues.items():
+                    messages = queue_cases.get(case, {}).get(handler)
+                    if messages:
+                        waiting[queue] = sum(message.cost for message in messages)
+
+                case_stats = cases.setdefault(case, {
+                    "weight": self._weights.get(case, 1.0),
+                    "waiting_inputs": 0,
+                    "published": 0,
+                    "published_last_min": 0,
+                    "handlers": {},
+                })
+                handler_stats = {
+                    "waiting_inputs": sum(waiting.values()),
+                    "waiting_by_queue": waiting,
+                    "published": lane_stats.published,
+                    "published_last_min": lane_stats.rate(now),
+                }
+                case_stats["handlers"][handler] = handler_stats
+                for key in ("waiting_inputs", "published", "published_last_min"):
+                    case_stats[key] += handler_stats[key]
+
+        return {"window": self.window, "quantum": self.quantum, "cases": cases}
+
+    def _prune_stats(self):
+        """Forgets the counters of the handlers idle for OSIR_FAIR_STATS_TTL seconds."""
+        now = time.monotonic()
+        if now - self._pruned_at < THROUGHPUT_WINDOW:
+            return
+        self._pruned_at = now
+        waiting = {
+            (case, handler)
+            for cases in self._queues.values()
+            for case, handlers in cases.items()
+            for handler in handlers
+        }
+        for key, lane_stats in list(self._stats.items()):
+            if key not in waiting and now - lane_stats.active_at > self._stats_ttl:
+                del self._stats[key]
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not any(self._queues.values()):
+                    self._cond.wait()
+            try:
+                self._dispatch_once()
+            except Exception as e:
+                logger.error(f"Fair dispatch failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def _dispatch_once(self):
+        with self.app.producer_or_acquire() as producer:
+            with self._cond:
+                queues = [queue for queue, cases in self._queues.items() if cases]
+
+            for queue in queues:
+                credit = self.window - self._queue_depth(producer.connection, queue)
+                if credit <= 0:
+                    continue
+
+                selected = self._select(queue, credit)
+                sent = 0
+                try:
+                    for _, _, message in selected:
+                        self.app.send_task(
+                            message.task_name,
+                            args=message.args,
+                            task_id=message.task_id,
+                            queue=message.queue,
+                            producer=producer,
+                        )
+                        sent += 1
+                finally:
+                    self._account(selected[:sent], selected[sent:])
+
+    @staticmethod
+    def _queue_depth(connection, queue: str) -> int:
+        """Ready messages of a broker queue, 0 when the queue is not declared yet."""
+        channel = connection.channel()
+        try:
+            _, depth, _ = channel.queue_declare(queue=queue, passive=True)
+            return depth
+        except Exception:
+            return 0
+        finally:
+            try:
+                channel.close()
+            except Exception:
+                pass
+
+    def _select(self, queue: str, credit: int) -> list:
+        """Picks up to `credit` messages of a Celery queue: deficit round robin over cases, round robin over handlers."""
+        selected = []
+        with self._cond:
+            cases = self._queues.get(queue)
+            while cases and credit > 0:
+                case, handlers = next(iter(cases.items()))
+                key = (queue, case)
+                deficit = self._deficits.get(key, 0.0) + self.quantum * self._weights.get(case, 1.0)
+
+                while handlers and credit > 0:
+                    handler, messages = next(iter(handlers.items()))
+                    if messages[0].cost > deficit:
+                        break
+                    message = messages.popleft()
+                    deficit -= message.cost
+                    credit -= 1
+                    selected.append((case, handler, message))
+                    if messages:
+                        handlers.move_to_end(handler)
+                    else:
+                        del handlers[handler]
+
+                if handlers:
+                    self._deficits[key] = deficit
+                    cases.move_to_end(case)
+                else:
+                    self._deficits.pop(key, None)
+                    del cases[case]
+        return selected
+
+    def _account(self, published: list, unsent: list):
+        """Counts the published messages and puts the unsent ones back at the head of their lanes."""
+        now = time.monotonic()
+        with self._cond:
+            for case, handler, message in published:
+                lane_stats = self._stats.get((case, handler))
+                if lane_stats is not None:
+                    lane_stats.record(now, message.cost)
+            for case, handler, message in reversed(unsent):
+                if (case, handler) not in self._stats:
+                    continue  # dropped meanwhile
+                cases = self._queues.setdefault(message.queue, OrderedDict())
+                cases.setdefault(case, OrderedDict()).setdefault(handler, deque()).appendleft(message)
+
+        if self.durable and published:
+            try:
+                with OsirDb() as db:
+                    db.fair_lane.remove([message.task_id for _, _, message in published])
+            except Exception as e:
+                logger.warning(f"Fair dispatch: unable to delete the rows of {len(published)} published message(s): {e}")
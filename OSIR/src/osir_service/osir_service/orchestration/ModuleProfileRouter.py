@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+from osir_lib.logger import AppLogger
+from osir_service.postgres.OsirDb import OsirDb
+
+logger = AppLogger(__name__).get_logger()
+
+
+class ModuleProfileRouter:
+    """
+        Routes tasks with the learned module profiles (see OsirDbModuleProfile).
+
+        disk_only / no_multithread are set by hand in the module YAML. A
+        module that is not flagged but whose learned profile for the input
+        size at hand needs more than one pool slot can take on an agent
+        (average peak RSS above OSIR_PROFILE_SLOT_RSS_MB, or storage
+        throughput above OSIR_PROFILE_SLOT_IO_MBPS) is sent to the
+        no_multithread queue of its OS, which runs one task at a time per
+        agent, instead of the multithread queue where it would share the
+        host with a full pool of other tasks.
+
+        Only profiles backed by OSIR_PROFILE_MIN_SAMPLES runs are trusted.
+        They are reloaded every OSIR_PROFILE_REFRESH seconds. The input size
+        is only looked up (stat) for modules whose decision depends on it.
+        OSIR_PROFILE_ROUTING=0 disables the routing.
+    """
+
+    _lock = threading.Lock()
+    _loaded_at = 0.0
+    _heavy: dict[str, dict[int, bool]] = {}
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return os.getenv("OSIR_PROFILE_ROUTING", "1") != "0"
+
+    @classmethod
+    def route(cls, queue: str, module_name: str, match=None, input_size=None) -> str:
+        """
+            Returns the queue a task should be sent to.
+
+            Args:
+                queue (str): Queue from the module configuration (TaskService.get_queue_name).
+                module_name (str): The module of the task.
+                match: The task input, stat'ed when input_size is not given.
+                input_size (int, optional): Input size in bytes, when already known.
+        """
+        if "_no_multithread" in queue or "_multithread" not in queue or not cls.enabled():
+            return queue
+
+        buckets = cls._profiles().get(module_name)
+        if not buckets or not any(buckets.values()):
+            return queue
+
+        if all(buckets.values()):
+            heavy = True
+        else:
+            if input_size is None and match:
+                try:
+                    input_size = os.path.getsize(match) if os.path.isfile(match) else None
+                except OSError:
+                    input_size = None
+            heavy = cls._is_heavy(buckets, -1 if input_size is None else int(input_size).bit_length())
+
+        if not heavy:
+            return queue
+        return queue.replace("_multithread", "_no_multithread", 1)
+
+    @staticmethod
+    def _is_heavy(buckets: dict[int, bool], bucket: int) -> bool:
+        if bucket in buckets:
+            return buckets[bucket]
+        if bucket < 0:
+            # Unknown size (directory input): be conservative.
+            return any(buckets.values())
+        # Closest learned size, the larger one on a tie.
+        closest = min((b for b in buckets if b >= 0), key=lambda b: (abs(b - bucket), -b), default=None)
+        return buckets[closest] if closest is not None else any(buckets.values())
+
+    @classmethod
+    def _profiles(cls) -> dict[str, dict[int, bool]]:
+        """module -> size bucket -> needs a dedicated slot, reloaded every OSIR_PROFILE_REFRESH seconds."""
+        refresh = float(os.getenv("OSIR_PROFILE_REFRESH", "60"))
+        if time.monotonic() - cls._loaded_at < refresh:
+            return cls._heavy
+
+        with cls._lock:
+            if time.monotonic() - cls._loaded_at < refresh:
+                return cls._heavy
+
+            rss_budget = float(os.getenv("OSIR_PROFILE_SLOT_RSS_MB", "2048")) * 1024 * 1024
+            io_budget = float(os.getenv("OSIR_PROFILE_SLOT_IO_MBPS", "150")) * 1024 * 1024
+            min_samples = int(os.getenv("OSIR_PROFILE_MIN_SAMPLES", "3"))
+
+            heavy = {}
+            try:
+                with OsirDb() as db:
+                    rows = db.module_profile.list()
+            except Exception as e:
+                # Keep the previous profiles, retry at the next refresh.
+                logger.warning(f"Module profiles unavailable ({e}), routing on module configuration only")
+                cls._loaded_at = time.monotonic()
+                return cls._heavy
+
+            for row in rows:
+                if row["samples"] < min_samples:
+                    continue
+                heavy.setdefault(row["module"], {})[row["size_bucket"]] = (
+                    (row["avg_peak_rss_bytes"] or 0) > rss_budget
+                    or (row["avg_io_bytes_per_sec"] or 0) > io_budget
+                )
+
+            routed = sorted(m for m, buckets in heavy.items() if any(buckets.values()))
+            if routed != sorted(m for m, buckets in cls._heavy.items() if any(buckets.values())):
+                logger.info(f"Module profiles: tasks of {', '.join(routed) or 'no module'} may need a dedicated slot")
+
+            cls._heavy = heavy
+            cls._loaded_at = time.monotonic()
+            return cls._heavy
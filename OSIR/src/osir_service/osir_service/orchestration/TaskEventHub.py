@@ -0,0 +1,318 @@
+import json
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from osir_lib.logger import AppLogger
+from osir_service.postgres.OsirDb import OsirDb
+from osir_service.postgres.OsirDbTask import TASK_EVENTS_CHANNEL, THROUGHPUT_RING_MINUTES
+
+logger = AppLogger(__name__).get_logger()
+
+STATUSES = ["task_created", "processing_started", "processing_done", "processing_failed"]
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, like the timestamps returned by OsirDbTask.stats().
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _parse(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+class TaskStatsView:
+    """
+        Live task statistics of a handler or of a case, in the shape of
+        OsirDbTask.stats(): loaded once from the rollup, then moved by the
+        counter changes received by the TaskEventHub.
+    """
+
+    def __init__(self, scope: str, key: str):
+        self.scope = scope
+        self.key = key
+        self.version = 0
+        self.synced_at = None
+        self.read_at = time.monotonic()
+        self._scope = {}
+        self._counts: dict[str, dict[str, int]] = {}
+        self._first_task_at = None
+        self._last_finished_at = None
+        # minute -> [done, failed], oldest first.
+        self._throughput: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def synced(self) -> bool:
+        """False until the first load (and after a lost listener, until reloaded)."""
+        return self.synced_at is not None
+
+    def matches(self, case_uuid: str, handler_id: str) -> bool:
+        return (handler_id if self.scope == "handler" else case_uuid) == self.key
+
+    def load(self, stats: dict):
+        with self._lock:
+            self._scope = stats["scope"]
+            self._counts = {
+                module: {status: counts.get(status, 0) for status in STATUSES}
+                for module, counts in stats["by_module"].items()
+            }
+            self._first_task_at = _parse(stats["first_task_at"])
+            self._last_finished_at = _parse(stats["last_finished_at"])
+            self._throughput = OrderedDict(
+                (_parse(row["minute"]), [row["done"], row["failed"]]) for row in stats.get("throughput") or []
+            )
+            self.synced_at = time.monotonic()
+            self.version += 1
+
+    def apply(self, module: str, status: str, delta: int):
+        now = _utcnow()
+        with self._lock:
+            counts = self._counts.setdefault(module, dict.fromkeys(STATUSES, 0))
+            counts[status] = counts.get(status, 0) + delta
+
+            if delta > 0 and status == "task_created" and self._first_task_at is None:
+                self._first_task_at = now
+            if delta > 0 and status in ("processing_done", "processing_failed"):
+                self._last_finished_at = now
+                minute = now.replace(second=0, microsecond=0)
+                self._throughput.setdefault(minute, [0, 0])[0 if status == "processing_done" else 1] += delta
+                oldest = minute - timedelta(minutes=THROUGHPUT_RING_MINUTES)
+                while self._throughput and next(iter(self._throughput)) <= oldest:
+                    self._throughput.popitem(last=False)
+            self.version += 1
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(c["task_created"] + c["processing_started"] for c in self._counts.values())
+
+    def snapshot(self) -> dict:
+        """The statistics, derived like OsirDbTask.stats() does from the counters."""
+        self.read_at = time.monotonic()
+        now = _utcnow()
+        with self._lock:
+            by_status = dict.fromkeys(STATUSES, 0)
+            by_module = {}
+            for module, counts in self._counts.items():
+                total = sum(max(0, counts[s]) for s in STATUSES)
+                if not total:
+                    continue
+                by_module[module] = {s: max(0, counts[s]) for s in STATUSES} | {"total": total}
+                for s in STATUSES:
+                    by_status[s] += by_module[module][s]
+            throughput = list(self._throughput.items())
+            first_task_at, last_finished_at = self._first_task_at, self._last_finished_at
+            scope = dict(self._scope)
+
+        total = sum(by_status.values())
+        finished = by_status["processing_done"] + by_status["processing_failed"]
+        running = total > 0 and by_status["task_created"] + by_status["processing_started"] > 0
+
+        current_minute = now.replace(second=0, microsecond=0)
+        previous_share = 1.0 - (now - current_minute).total_seconds() / 60.0
+        done_last_min = failed_last_min = 0.0
+        for minute, (done, failed) in throughput:
+            if minute == current_minute:
+                done_last_min += done
+                failed_last_min += failed
+            elif (current_minute - minute).total_seconds() == 60.0:
+                done_last_min += done * previous_share
+                failed_last_min += failed * previous_share
+
+        duration_seconds = None
+        if total and first_task_at is not None:
+            if running:
+                duration_seconds = max((now - first_task_at).total_seconds(), 0.0)
+            elif last_finished_at is not None:
+                duration_seconds = max((last_finished_at - first_task_at).total_seconds(), 0.0)
+
+        def _iso(value):
+            return value.isoformat() if value is not None else None
+
+        return {
+            "scope": scope,
+            "total": total,
+            "by_status": by_status,
+            "by_module": by_module,
+            "done_last_min": round(done_last_min),
+            "failed_last_min": round(failed_last_min),
+            "throughput": [
+                {"minute": _iso(minute), "done": done, "failed": failed}
+                for minute, (done, failed) in throughput
+            ],
+            "first_task_at": _iso(first_task_at),
+            "last_finished_at": _iso(last_finished_at),
+            "running": running,
+            "duration_seconds": round(duration_seconds, 1) if duration_seconds is not None else None,
+            "progress_pct": round(100.0 * finished / total, 1) if total else 0.0,
+        }
+
+
+class TaskEventHub:
+    """
+        Task status stream of a process (API, web).
+
+        The task counters rollup notifies its changes on TASK_EVENTS_CHANNEL,
+        one notification per task transition (see OsirDbTask.create_stats_tables). One listener thread per process
+        holds a LISTEN connection and moves the TaskStatsView of the handlers
+        and cases being watched, so any number of dashboards and CLI watchers
+        read the same in-memory statistics instead of querying Postgres on
+        timers.
+
+        A view is loaded from OsirDbTask.stats() when first requested, then
+        reloaded every OSIR_EVENTS_RESYNC seconds, when its last task
+        finishes and after a lost listener connection, which bounds the drift
+        of a change counted both by a load and by the stream. Views not read
+        for OSIR_EVENTS_VIEW_TTL seconds are dropped.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.resync_interval = float(os.getenv("OSIR_EVENTS_RESYNC", "60"))
+        self.view_ttl = float(os.getenv("OSIR_EVENTS_VIEW_TTL", "120"))
+        self._views: dict[tuple[str, str], TaskStatsView] = {}
+        self._lock = threading.Lock()
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+        self._thread = threading.Thread(target=self._run, name="osir-task-events", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get(cls) -> "TaskEventHub":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def view(self, handler_id=None, case_uuid=None) -> TaskStatsView:
+        """
+            Returns the live statistics of a handler (priority) or of a case.
+
+            Raises:
+                ValueError: If neither id is given or the id is not a UUID.
+        """
+        if handler_id:
+            scope, key = "handler", str(uuid.UUID(str(handler_id)))
+        elif case_uuid:
+            scope, key = "case", str(uuid.UUID(str(case_uuid)))
+        else:
+            raise ValueError("view() requires handler_id or case_uuid")
+
+        with self._lock:
+            view = self._views.get((scope, key))
+            if view is None:
+                view = self._views[(scope, key)] = TaskStatsView(scope, key)
+                created = True
+            else:
+                created = False
+        view.read_at = time.monotonic()
+        if created:
+            self._wake()
+        return view
+
+    def _wake(self):
+        try:
+            self._wake_send.send(b"\0")
+        except BlockingIOError:
+            pass
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning(f"Task event listener lost ({e}), reconnecting")
+            with self._lock:
+                for view in self._views.values():
+                    view.synced_at = None
+            time.sleep(5)
+
+    def _listen(self):
+        db = OsirDb()
+        try:
+            db.execute_query(f"LISTEN {TASK_EVENTS_CHANNEL}")
+            conn = db.conn
+            logger.debug(f"Listening on {TASK_EVENTS_CHANNEL}")
+            while True:
+                self._sync_views(conn)
+                ready = select.select([conn, self._wake_recv], [], [], 1.0)[0]
+                if self._wake_recv in ready:
+                    try:
+                        while self._wake_recv.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                if conn in ready:
+                    self._receive(conn)
+        finally:
+            try:
+                if db.conn is not None and db.conn.closed == 0:
+                    db.execute_query(f"UNLISTEN {TASK_EVENTS_CHANNEL}", max_retries=1)
+            except Exception as e:
+                logger.debug(f"Failed to UNLISTEN {TASK_EVENTS_CHANNEL}: {e}")
+            db.close()
+
+    def _receive(self, conn):
+        conn.poll()
+        notifies = list(conn.notifies)
+        conn.notifies.clear()
+        if not notifies:
+            return
+
+        changes = []
+        for notify in notifies:
+            try:
+                change = json.loads(notify.payload)
+                changes.extend(
+                    (change["c"], change["h"], change["m"], status, int(delta))
+                    for status, delta in change["d"].items()
+                )
+            except (ValueError, KeyError, TypeError, AttributeError):
+                logger.debug(f"Ignoring malformed task event: {notify.payload}")
+
+        with self._lock:
+            views = list(self._views.values())
+        for view in views:
+            touched = False
+            for case_uuid, handler_id, module, status, delta in changes:
+                if view.matches(case_uuid, handler_id):
+                    view.apply(module, status, delta)
+                    touched = True
+            # Settle the final figures with a load once the last task is over.
+            if touched and view.synced and view.pending() <= 0 and time.monotonic() - view.synced_at > 5:
+                view.synced_at = None
+
+    def _sync_views(self, conn):
+        now = time.monotonic()
+        with self._lock:
+            for key, view in list(self._views.items()):
+                if now - view.read_at > self.view_ttl:
+                    del self._views[key]
+            due = [
+                view for view in self._views.values()
+                if view.synced_at is None or now - view.synced_at >= self.resync_interval
+            ]
+        if not due:
+            return
+
+        # Changes already received are applied first: the loads include them.
+        self._receive(conn)
+        with OsirDb() as db:
+            for view in due:
+                try:
+                    if view.scope == "handler":
+                        view.load(db.task.stats(handler_id=view.key))
+                    else:
+                        view.load(db.task.stats(case_uuid=view.key))
+                except Exception as e:
+                    logger.warning(f"Could not load task stats of {view.scope} {view.key}: {e}")
+                    view.synced_at = now - self.resync_interval + 5
@@ -1,7 +1,4 @@
-import importlib
-import sys
-
-from osir_lib.core.OsirConstants import OSIR_PATHS
+from osir_lib.core.OsirInternalModules import OsirInternalModules
 from osir_lib.core.OsirModule import OsirModule
 from osir_lib.logger import AppLogger
 
@@ -64,42 +61,18 @@ class InternalProcessor:
     def load_module(self):
         """
         Dynamically loads a Python module for processing based on the module instance's specifications.
+        The entry point is loaded once per worker process (see OsirInternalModules).
 
         Returns:
             PyModule: An instance of the PyModule if successfully loaded, None otherwise.
         """
 
-        modules_directory = OSIR_PATHS.PY_MODULES_DIR
-        # target_file = next(modules_directory.rglob(f"{self._module_instance.module_name}.py"), None)
-
-        # 1. Determine which module name to look for (alt_module takes priority)
+        # alt_module takes priority over the module name
         target_name = (
             getattr(self._module_instance.configuration, "alt_module", None)
             or self._module_instance.module_name
-        )        
-        # 2. Search for the .py file
-        target_file = next(modules_directory.rglob(f"{target_name}.py"), None)
-
-        if not target_file:
-            logger.error(f"File {target_name}.py not found in {modules_directory}")
-            return None
-
-        try:
-            spec = importlib.util.spec_from_file_location(self._module_instance.module_name, target_file)
-            if spec and spec.loader:
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[self._module_instance.module_name] = module
-                spec.loader.exec_module(module)
-
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if getattr(attr, "__osir_internal__", False):
-                        return attr
-
-        except Exception as e:
-            print(f"Error while loading internal module - {target_file}: {e}")
-
-        return None
+        )
+        return OsirInternalModules.load(target_name)
 
     def module_exists(self):
         """
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import os
 import threading
 import uuid
@@ -8,6 +10,8 @@ from celery import Celery
 from osir_lib.core.model.OsirModuleModel import OsirModuleModel
 from osir_lib.logger import AppLogger
 from osir_service.postgres.OsirDb import OsirDb
+from osir_service.orchestration.ModuleProfileRouter import ModuleProfileRouter
+from osir_service.orchestration.FairDispatcher import FairDispatcher, FairMessage
 
 logger = AppLogger(__name__).get_logger()
 
@@ -21,6 +25,20 @@ _celery_app_lock = threading.Lock()
 
 _windows_configured_cache = None
 
+# Input fields set per task or per call (matched path, file or directory of
+# an interactive run): kept out of the module templates.
+_CALL_INPUT_FIELDS = ("match", "file", "dir")
+
+# Hashes of the module templates already registered by this process.
+_published_templates = set()
+_published_templates_lock = threading.Lock()
+
+# Celery task running several inputs of the same module, per single-input task.
+BATCH_TASK_NAMES = {
+    "internal_processor_task": "internal_batch_processor_task",
+    "external_processor_task": "external_batch_processor_task",
+}
+
 
 def _default_result_backend() -> str:
     """Build the PostgreSQL result-backend URL from the same configuration
@@ -96,6 +114,48 @@ class TaskService:
         else:
             return f"{module.configuration.processor_os}_multithread"
 
+    @staticmethod
+    def get_module_ref(module_dump: dict) -> str:
+        """
+            Returns the task payload referencing a module template.
+
+            Tasks no longer carry the full module: the template (the module
+            without the per-call input fields: input.match, which is passed as
+            the task's first argument, and input.file/dir, which travel in the
+            payload) is registered once in osir_module_templates under the hash
+            of its canonical JSON, and the payload only holds (filename, hash).
+            Agents resolve it through their local template cache.
+
+            Args:
+                module_dump (dict): model_dump(mode="json") of the module.
+
+            Returns:
+                str: JSON payload {"filename": ..., "template": <hash>}, plus
+                "input" with input.file/dir when they are set.
+        """
+        template = dict(module_dump)
+        template["input"] = {k: v for k, v in module_dump["input"].items() if k not in _CALL_INPUT_FIELDS}
+        payload = json.dumps(template, sort_keys=True, separators=(",", ":"))
+        template_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+        if template_hash not in _published_templates:
+            with _published_templates_lock:
+                if template_hash not in _published_templates:
+                    with OsirDb() as db:
+                        db.module_template.register(
+                            template_hash,
+                            template.get("filename"),
+                            template["configuration"]["module"],
+                            payload,
+                        )
+                    _published_templates.add(template_hash)
+
+        ref = {"filename": template.get("filename"), "template": template_hash}
+        call_input = {k: module_dump["input"][k] for k in ("file", "dir") if module_dump["input"].get(k) is not None}
+        if call_input:
+            ref["input"] = call_input
+        return json.dumps(ref)
+
     @staticmethod
     def _fail_windows_task(db, case_uuid, handler_uuid, module_name: str, input_match: str) -> str:
         """Create a task row and immediately mark it failed (through the
@@ -128,6 +188,16 @@ class TaskService:
         )
         return custom_task_id
 
+    @staticmethod
+    def start_dispatcher() -> int:
+        """
+            Starts the fair dispatcher of the master and restores the messages
+            left in its lanes by a previous run. Returns the number restored.
+        """
+        if not FairDispatcher.enabled():
+            return 0
+        return FairDispatcher.recover(_get_celery_app())
+
     @staticmethod
     def push_task(case_path, module_instance: OsirModuleModel, case_uuid, handler_uuid=None):
         """
@@ -139,6 +209,10 @@ class TaskService:
                 case_uuid (str): A unique identifier for the case associated with the task.
                 handler_uuid: Handler this task belongs to.
 
+            A handler task goes through the fair dispatcher (see FairDispatcher).
+            A task without handler is an interactive run (exec_module on a file,
+            web actions): it is published right away to the priority queue.
+
             Environment Variables:
                 CELERY_BROKER_URL (str): The URL of the Celery message broker.
                 CELERY_RESULT_BACKEND (str): The URL of the backend used to store task results.
@@ -170,12 +244,25 @@ class TaskService:
                 input=module_instance.input.match
             )
 
-        app.send_task(
+        message = FairMessage(
             TaskService.get_task_name(module_instance),
-            args=(module_instance.input.match, case_path, module_instance.model_dump_json(), case_uuid),
+            args=(
+                module_instance.input.match,
+                case_path,
+                TaskService.get_module_ref(module_instance.model_dump(mode="json")),
+                case_uuid,
+            ),
             task_id=custom_task_id,
-            queue=TaskService.get_queue_name(module_instance),
+            queue=ModuleProfileRouter.route(
+                TaskService.get_queue_name(module_instance),
+                module_instance.module_name,
+                str(module_instance.input.match),
+            ),
         )
+        if handler_uuid and FairDispatcher.enabled():
+            FairDispatcher.get(app).submit(case_uuid, handler_uuid, [message])
+        else:
+            FairDispatcher.publish(app, [message], priority=not handler_uuid)
 
         logger.info(
             f"Task pushed: module={module_instance.module_name} "
@@ -203,8 +290,24 @@ class TaskService:
                     queue         -> celery queue name
                     module_name   -> module name
                     match         -> input.match (file path)
-                    payload_json  -> serialized OsirModuleModel JSON
+                    payload_json  -> module payload (see get_module_ref)
                     processor_os  -> module processor_os ('linux'/'windows'/...)
+                    batch_size    -> optional, configuration.batch_size of the module
+                    input_size    -> optional, input size in bytes when already known
+
+            The queue of an item may be swapped for the no_multithread queue
+            of its OS when the learned profile of the module says its tasks
+            need a dedicated slot (see ModuleProfileRouter).
+
+            Items of a module with batch_size > 1 are packed, batch_size at a
+            time, into one batch task per (task, queue, module). Each input still
+            gets its own osir_tasks row and its own celery_taskmeta state
+            (reported by the worker), so handler stats and per-input outputs are
+            unchanged. Inputs of a batch share the payload of its first input.
+
+            Messages of a handler go through the fair dispatcher (see
+            FairDispatcher), which releases them to the broker in turn with
+            the other cases and handlers.
 
             Returns:
                 list[str]: task ids of the dispatched (non-failed) tasks.
@@ -244,19 +347,57 @@ class TaskService:
                     db, case_uuid, handler_uuid, it["module_name"], it["match"]
                 )
 
-        # Single producer => one connection/channel for the whole batch.
-        with app.producer_or_acquire() as producer:
-            for it in dispatchable:
-                app.send_task(
-                    it["task_name"],
-                    args=(it["match"], case_path, it["payload_json"], case_uuid),
-                    task_id=it["task_id"],
-                    queue=it["queue"],
-                    producer=producer,
-                )
+        singles = []
+        batched = {}
+        for it in dispatchable:
+            it["queue"] = ModuleProfileRouter.route(
+                it["queue"], it["module_name"], it["match"], it.get("input_size")
+            )
+            if (it.get("batch_size") or 1) > 1 and it["task_name"] in BATCH_TASK_NAMES:
+                batched.setdefault((it["task_name"], it["queue"], it["module_name"]), []).append(it)
+            else:
+                singles.append(it)
+
+        messages = [
+            FairMessage(
+                it["task_name"],
+                args=(it["match"], case_path, it["payload_json"], case_uuid),
+                task_id=it["task_id"],
+                queue=it["queue"],
+            )
+            for it in singles
+        ]
+
+        for (task_name, queue, _), group in batched.items():
+            size = group[0]["batch_size"]
+            for start in range(0, len(group), size):
+                chunk = group[start:start + size]
+                messages.append(FairMessage(
+                    BATCH_TASK_NAMES[task_name],
+                    args=(
+                        [(it["task_id"], it["match"]) for it in chunk],
+                        case_path,
+                        chunk[0]["payload_json"],
+                        case_uuid,
+                    ),
+                    task_id=str(uuid.uuid4()),
+                    queue=queue,
+                    cost=len(chunk),
+                ))
+
+        if handler_uuid and FairDispatcher.enabled():
+            FairDispatcher.get(app).submit(case_uuid, handler_uuid, messages)
+            state = "queued for fair dispatch"
+        else:
+            # Single producer => one connection/channel for the whole batch.
+            FairDispatcher.publish(app, messages, priority=not handler_uuid)
+            state = "published to broker"
 
         # One summary line per batch: per-task logging at this rate costs
         # more than the AMQP publish itself (console + file handler I/O).
-        logger.debug(f"Bulk push: {len(dispatchable)} task(s) published to broker")
+        logger.debug(
+            f"Bulk push: {len(dispatchable)} task(s) {state} "
+            f"in {len(messages)} message(s)"
+        )
 
         return [it["task_id"] for it in dispatchable]
@@ -8,10 +8,17 @@ import threading
 import psycopg2
 import psycopg2.extras
 
+from osir_service.postgres.OsirDbPool import OsirDbPool
 from osir_service.postgres.OsirDbSnapshot import OsirDbSnapshot
 from osir_service.postgres.OsirDbTask import OsirDbTask
 from osir_service.postgres.OsirDbHandler import OsirDbHandler
 from osir_service.postgres.OsirDbCase import OsirDbCase
+from osir_service.postgres.OsirDbDedup import OsirDbDedup
+from osir_service.postgres.OsirDbModuleTemplate import OsirDbModuleTemplate
+from osir_service.postgres.OsirDbTaskOutput import OsirDbTaskOutput
+from osir_service.postgres.OsirDbTaskTrace import OsirDbTaskTrace
+from osir_service.postgres.OsirDbModuleProfile import OsirDbModuleProfile
+from osir_service.postgres.OsirDbFairLane import OsirDbFairLane
 
 psycopg2.extras.register_uuid()
 
@@ -55,6 +62,7 @@ class OsirDb:
         self.host_hostname = os.getenv('HOST_HOSTNAME', 'missing HOST_HOSTNAME env var')  # Default to '%h' if the env var is not set
 
         self.conn = None
+        self._pool = OsirDbPool.get(self.host, self.dbname, self.port, self.user, self.password)
         self._ensure_connection()
         self.module = module_name
 
@@ -62,6 +70,12 @@ class OsirDb:
         self.handler = OsirDbHandler(self)
         self.task = OsirDbTask(self)
         self.snapshot = OsirDbSnapshot(self)
+        self.dedup = OsirDbDedup(self)
+        self.module_template = OsirDbModuleTemplate(self)
+        self.task_output = OsirDbTaskOutput(self)
+        self.task_trace = OsirDbTaskTrace(self)
+        self.module_profile = OsirDbModuleProfile(self)
+        self.fair_lane = OsirDbFairLane(self)
 
         schema_key = (self.host, self.dbname, self.port)
         if schema_key not in OsirDb._schema_initialized:
@@ -70,8 +84,15 @@ class OsirDb:
                     self.snapshot.create_table()
                     self.task.create_table()
                     self.task.create_celery_tables()
+                    self.task.create_stats_tables()
                     self.handler.create_table()
                     self.case.create_table()
+                    self.dedup.create_table()
+                    self.module_template.create_table()
+                    self.task_output.create_table()
+                    self.task_trace.create_table()
+                    self.module_profile.create_table()
+                    self.fair_lane.create_table()
                     OsirDb._schema_initialized.add(schema_key)
 
     def __enter__(self):
@@ -82,20 +103,13 @@ class OsirDb:
         return False
     
     def _ensure_connection(self):
-        """Checks if connection is alive; if not, creates a new one."""
+        """Checks if the borrowed connection is alive; if not, borrows another one from the pool."""
         try:
             # Check if conn exists and is healthy
             if self.conn is None or self.conn.closed != 0:
-                # logger.info("Connecting to PostgreSQL...")
-                self.conn = psycopg2.connect(
-                    dbname=self.dbname,
-                    user=self.user,
-                    password=self.password,
-                    host=self.host,
-                    port=self.port
-                )
-                self.conn.autocommit = True
-                # logger.info("Database connection established.")
+                if self.conn is not None:
+                    self._discard_connection()
+                self.conn = self._pool.acquire()
             return self.conn
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
@@ -140,12 +154,7 @@ class OsirDb:
                 logger.warning(f"Connection lost (Attempt {attempt + 1}/{max_retries}): {e}")
 
                 # Force a reset of the connection object so the next loop reconnects
-                if self.conn:
-                    try:
-                        self.conn.close()
-                    except Exception as exc:
-                        logger.debug("Failed to close connection: %s", exc)
-                self.conn = None
+                self._discard_connection()
 
                 # Exponential backoff (2s, 4s, 8s...)
                 time.sleep(2 ** attempt)
@@ -187,12 +196,7 @@ class OsirDb:
                 last_exception = e
                 logger.warning(f"Connection lost (Attempt {attempt + 1}/{max_retries}): {e}")
 
-                if self.conn:
-                    try:
-                        self.conn.close()
-                    except Exception as exc:
-                        logger.debug("Failed to close connection: %s", exc)
-                self.conn = None
+                self._discard_connection()
 
                 time.sleep(2 ** attempt)
                 continue
@@ -204,8 +208,27 @@ class OsirDb:
         logger.error(f"Bulk query permanently failed after {max_retries} attempts.")
         raise last_exception
 
+    def _discard_connection(self):
+        """Drops the borrowed connection instead of returning it to the pool."""
+        if self.conn is not None:
+            self._pool.discard(self.conn)
+        self.conn = None
+
     def close(self):
-        """Cleanly close the connection."""
-        if self.conn:
-            self.conn.close()
-            # logger.info("Database connection closed.")
+        """Gives the borrowed connection back to the pool."""
+        if self.conn is not None:
+            self._pool.release(self.conn)
+            self.conn = None
+
+    def __del__(self):
+        # OsirDb() used without a context manager must not leak its borrowed
+        # connection outside the pool accounting.
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def pool_stats() -> dict:
+        """Connection pool metrics of the current process."""
+        return OsirDbPool.stats()
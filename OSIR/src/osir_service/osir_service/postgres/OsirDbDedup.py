@@ -0,0 +1,258 @@
+import hashlib
+import uuid
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+
+def path_key(path: str) -> uuid.UUID:
+    """md5 of a path, stored as UUID: full paths can exceed the btree tuple size limit."""
+    return uuid.UUID(bytes=hashlib.md5(path.encode("utf-8", "surrogateescape")).digest())
+
+
+class OsirDbDedup:
+    """
+        Persistent content-hash dedup index of the watchdog, scoped per case.
+
+        - `osir_dedup_index`: one row per (module, size, hash_mode, hash) already
+          pushed for a case, with the first path seen. Survives handler runs, so
+          re-running a profile or adding the same archive twice skips artifacts
+          already processed.
+        - `osir_hash_cache`: last hash computed for a path, valid as long as the
+          file size and mtime are unchanged. Unchanged files are never re-read.
+        - `osir_dedup_stats`: index and cache hit/miss counters per module and
+          hash mode, to judge whether full-file hashing is worth its cost.
+    """
+
+    def __init__(self, db_osir):
+        self.db = db_osir
+
+    def create_table(self):
+        try:
+            self.db.execute_query("""
+                CREATE TABLE IF NOT EXISTS osir_dedup_index (
+                    case_uuid UUID NOT NULL,
+                    module TEXT NOT NULL,
+                    file_size BIGINT NOT NULL,
+                    hash_mode TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    first_path TEXT NOT NULL,
+                    handler_id UUID,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (case_uuid, module, file_size, hash_mode, file_hash)
+                )
+            """)
+            self.db.execute_query("""
+                CREATE TABLE IF NOT EXISTS osir_hash_cache (
+                    case_uuid UUID NOT NULL,
+                    path_key UUID NOT NULL,
+                    hash_mode TEXT NOT NULL,
+                    file_size BIGINT NOT NULL,
+                    mtime_ns BIGINT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    PRIMARY KEY (case_uuid, path_key, hash_mode)
+                )
+            """)
+            self.db.execute_query("""
+                CREATE TABLE IF NOT EXISTS osir_dedup_stats (
+                    case_uuid UUID NOT NULL,
+                    module TEXT NOT NULL,
+                    hash_mode TEXT NOT NULL,
+                    index_hits BIGINT NOT NULL DEFAULT 0,
+                    index_misses BIGINT NOT NULL DEFAULT 0,
+                    cache_hits BIGINT NOT NULL DEFAULT 0,
+                    cache_misses BIGINT NOT NULL DEFAULT 0,
+                    bytes_hashed BIGINT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (case_uuid, module, hash_mode)
+                )
+            """)
+        except Exception as e:
+            logger.error(f"Error creating dedup tables: {e}")
+            raise
+
+    def get_cached_hashes(self, case_uuid: str, paths: Iterable[str]) -> Dict[Tuple[str, str], Tuple[int, int, str]]:
+        """
+            Retrieves the cached hashes of a batch of paths.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                paths (Iterable[str]): Paths to look up.
+
+            Returns:
+                Dict[Tuple[str, str], Tuple[int, int, str]]: (path, hash_mode) -> (file_size, mtime_ns, file_hash).
+                The caller must check size and mtime against the file on disk.
+        """
+        keys = {path_key(p): p for p in paths}
+        if not keys:
+            return {}
+        try:
+            rows = self.db.execute_query("""
+                SELECT path_key, hash_mode, file_size, mtime_ns, file_hash
+                FROM osir_hash_cache
+                WHERE case_uuid = %s AND path_key = ANY(%s)
+            """, (case_uuid, list(keys)), fetch="fetchall")
+        except Exception as e:
+            logger.error(f"Error fetching cached hashes: {e}")
+            return {}
+
+        return {
+            (keys[row["path_key"]], row["hash_mode"]): (row["file_size"], row["mtime_ns"], row["file_hash"])
+            for row in rows
+            if row["path_key"] in keys
+        }
+
+    def store_hashes(self, case_uuid: str, rows: List[Tuple[str, str, int, int, str]]):
+        """
+            Caches freshly computed hashes.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                rows (List[Tuple[str, str, int, int, str]]): (path, hash_mode, file_size, mtime_ns, file_hash).
+        """
+        if not rows:
+            return
+        # One row per key: ON CONFLICT DO UPDATE cannot touch a row twice.
+        unique = {(path_key(path), mode): (size, mtime_ns, digest) for path, mode, size, mtime_ns, digest in rows}
+        try:
+            self.db.execute_values_query("""
+                INSERT INTO osir_hash_cache (case_uuid, path_key, hash_mode, file_size, mtime_ns, file_hash)
+                VALUES %s
+                ON CONFLICT (case_uuid, path_key, hash_mode) DO UPDATE SET
+                    file_size = EXCLUDED.file_size,
+                    mtime_ns = EXCLUDED.mtime_ns,
+                    file_hash = EXCLUDED.file_hash
+            """, [
+                (case_uuid, key, mode, size, mtime_ns, digest)
+                for (key, mode), (size, mtime_ns, digest) in unique.items()
+            ], page_size=5000)
+        except Exception as e:
+            logger.error(f"Error caching hashes: {e}")
+
+    def claim(self, case_uuid: str, handler_id: Optional[str], rows: List[Tuple[str, int, str, str, str]]) -> Set[Tuple[str, int, str, str, str]]:
+        """
+            Registers dedup keys and returns the ones this call registered first.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                handler_id (str, optional): The handler pushing the tasks.
+                rows (List[Tuple[str, int, str, str, str]]): (module, file_size, hash_mode, file_hash, path).
+
+            Returns:
+                Set[Tuple[str, int, str, str, str]]: The rows that were not known yet. Any other
+                row is a duplicate of an artifact already pushed for this case.
+        """
+        if not rows:
+            return set()
+        try:
+            inserted = self.db.execute_query("""
+                INSERT INTO osir_dedup_index (case_uuid, module, file_size, hash_mode, file_hash, first_path, handler_id)
+                SELECT %s, r.module, r.file_size, r.hash_mode, r.file_hash, r.path, %s
+                FROM unnest(%s::text[], %s::bigint[], %s::text[], %s::text[], %s::text[])
+                    AS r (module, file_size, hash_mode, file_hash, path)
+                ON CONFLICT (case_uuid, module, file_size, hash_mode, file_hash) DO NOTHING
+                RETURNING module, file_size, hash_mode, file_hash, first_path
+            """, (
+                case_uuid,
+                handler_id,
+                [r[0] for r in rows],
+                [r[1] for r in rows],
+                [r[2] for r in rows],
+                [r[3] for r in rows],
+                [r[4] for r in rows],
+            ), fetch="fetchall")
+        except Exception as e:
+            # Dedup must never drop a task: on failure, nothing is a duplicate.
+            logger.error(f"Error registering dedup keys: {e}")
+            return set(rows)
+
+        return {
+            (row["module"], row["file_size"], row["hash_mode"], row["file_hash"], row["first_path"])
+            for row in inserted
+        }
+
+    def release(self, case_uuid: str, handler_id: Optional[str], rows: Iterable[Tuple[str, int, str, str, str]]):
+        """
+            Forgets dedup keys registered by claim() whose tasks could not be pushed,
+            so the next match of the artifact is pushed again.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                handler_id (str, optional): The handler that claimed the keys.
+                rows (Iterable[Tuple[str, int, str, str, str]]): (module, file_size, hash_mode, file_hash, path)
+                    as returned by claim().
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        try:
+            self.db.execute_query("""
+                DELETE FROM osir_dedup_index d
+                USING unnest(%s::text[], %s::bigint[], %s::text[], %s::text[], %s::text[])
+                    AS r (module, file_size, hash_mode, file_hash, path)
+                WHERE d.case_uuid = %s
+                  AND d.module = r.module
+                  AND d.file_size = r.file_size
+                  AND d.hash_mode = r.hash_mode
+                  AND d.file_hash = r.file_hash
+                  AND d.first_path = r.path
+                  AND d.handler_id IS NOT DISTINCT FROM %s::uuid
+            """, (
+                [r[0] for r in rows],
+                [r[1] for r in rows],
+                [r[2] for r in rows],
+                [r[3] for r in rows],
+                [r[4] for r in rows],
+                case_uuid,
+                handler_id,
+            ))
+        except Exception as e:
+            logger.error(f"Error releasing dedup keys: {e}")
+
+    def add_stats(self, case_uuid: str, counters: Dict[Tuple[str, str], Dict[str, int]]):
+        """
+            Adds hit/miss counters.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                counters (Dict[Tuple[str, str], Dict[str, int]]): (module, hash_mode) -> increments of
+                    index_hits, index_misses, cache_hits, cache_misses, bytes_hashed.
+        """
+        if not counters:
+            return
+        fields = ("index_hits", "index_misses", "cache_hits", "cache_misses", "bytes_hashed")
+        try:
+            self.db.execute_values_query(f"""
+                INSERT INTO osir_dedup_stats (case_uuid, module, hash_mode, {", ".join(fields)})
+                VALUES %s
+                ON CONFLICT (case_uuid, module, hash_mode) DO UPDATE SET
+                    {", ".join(f"{f} = osir_dedup_stats.{f} + EXCLUDED.{f}" for f in fields)}
+            """, [
+                (case_uuid, module, mode, *(values.get(f, 0) for f in fields))
+                for (module, mode), values in counters.items()
+            ])
+        except Exception as e:
+            logger.error(f"Error updating dedup stats: {e}")
+
+    def stats(self, case_uuid: str) -> List[dict]:
+        """
+            Dedup counters of a case, per module and hash mode.
+
+            Returns:
+                List[dict]: Rows with module, hash_mode, index_hits, index_misses,
+                cache_hits, cache_misses, bytes_hashed and index_hit_ratio.
+        """
+        rows = self.db.execute_query("""
+            SELECT module, hash_mode, index_hits, index_misses, cache_hits, cache_misses, bytes_hashed,
+                   ROUND(index_hits::numeric / NULLIF(index_hits + index_misses, 0), 4)::float8 AS index_hit_ratio
+            FROM osir_dedup_stats
+            WHERE case_uuid = %s
+            ORDER BY module, hash_mode
+        """, (case_uuid,), fetch="fetchall")
+        return rows or []
+
+    def delete(self, case_uuid: str):
+        """Forgets every dedup key, cached hash and counter of a case (see OsirDbTask.delete)."""
+        for table in ("osir_dedup_index", "osir_hash_cache", "osir_dedup_stats"):
+            self.db.execute_query(f"DELETE FROM {table} WHERE case_uuid = %s", (case_uuid,))
@@ -0,0 +1,116 @@
+import json
+from typing import Dict, List, Optional
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+
+class OsirDbFairLane:
+    """
+        Handler task messages waiting in the fair dispatch lanes of the master.
+
+        FairDispatcher adds a row per message when a handler submits it and
+        deletes it once the message is published to the broker, so the lanes
+        left by a stopped master are restored, in submission order, by the
+        next one (see FairDispatcher.recover).
+
+        The case weights (FairDispatcher.set_weight) are stored in
+        osir_fair_weights and restored the same way.
+    """
+
+    def __init__(self, db_osir):
+        self.db = db_osir
+
+    def create_table(self):
+        try:
+            self.db.execute_query("""
+                CREATE TABLE IF NOT EXISTS osir_fair_lanes (
+                    id BIGSERIAL PRIMARY KEY,
+                    case_uuid UUID NOT NULL,
+                    handler_id UUID NOT NULL,
+                    task_id TEXT NOT NULL,
+                    task_name TEXT NOT NULL,
+                    queue TEXT NOT NULL,
+                    args JSONB NOT NULL,
+                    cost INTEGER NOT NULL DEFAULT 1,
+                    created_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+            self.db.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_osir_fair_lanes_task ON osir_fair_lanes (task_id)"
+            )
+            self.db.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_osir_fair_lanes_handler ON osir_fair_lanes (case_uuid, handler_id)"
+            )
+            self.db.execute_query("""
+                CREATE TABLE IF NOT EXISTS osir_fair_weights (
+                    case_uuid UUID PRIMARY KEY REFERENCES osir_case (case_uuid) ON DELETE CASCADE,
+                    weight DOUBLE PRECISION NOT NULL
+                )
+            """)
+        except Exception as e:
+            logger.error(f"Error creating fair lane table: {e}")
+            raise
+
+    def add(self, case_uuid: str, handler_id: str, messages: list):
+        """
+            Stores messages submitted to the lanes of a handler.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                handler_id (str): The handler of the messages.
+                messages (list): FairMessage objects, their args stored as JSON (UUIDs as text).
+        """
+        if not messages:
+            return
+        self.db.execute_values_query("""
+            INSERT INTO osir_fair_lanes (case_uuid, handler_id, task_id, task_name, queue, args, cost)
+            VALUES %s
+        """, [
+            (case_uuid, handler_id, m.task_id, m.task_name, m.queue, json.dumps(m.args, default=str), m.cost)
+            for m in messages
+        ], template="(%s::uuid, %s::uuid, %s, %s, %s, %s::jsonb, %s)")
+
+    def remove(self, task_ids: List[str]):
+        """Deletes the rows of published messages."""
+        if task_ids:
+            self.db.execute_query("DELETE FROM osir_fair_lanes WHERE task_id = ANY(%s)", (list(task_ids),))
+
+    def delete(self, handler_id: Optional[str] = None, case_uuid: Optional[str] = None):
+        """Deletes the waiting messages of a handler or of a case."""
+        if handler_id:
+            self.db.execute_query("DELETE FROM osir_fair_lanes WHERE handler_id = %s::uuid", (str(handler_id),))
+        elif case_uuid:
+            self.db.execute_query("DELETE FROM osir_fair_lanes WHERE case_uuid = %s::uuid", (str(case_uuid),))
+
+    def list(self) -> List[dict]:
+        """
+            Returns every waiting message, in submission order.
+
+            Returns:
+                List[dict]: Rows with case_uuid, handler_id, task_id, task_name, queue, args and cost.
+        """
+        return self.db.execute_query("""
+            SELECT case_uuid::text AS case_uuid, handler_id::text AS handler_id,
+                   task_id, task_name, queue, args, cost
+            FROM osir_fair_lanes
+            ORDER BY id
+        """, fetch="fetchall") or []
+
+    def set_weight(self, case_uuid: str, weight: float):
+        """Stores the weight of a case, 1 (the default) removes it."""
+        if weight == 1.0:
+            self.db.execute_query("DELETE FROM osir_fair_weights WHERE case_uuid = %s::uuid", (str(case_uuid),))
+        else:
+            self.db.execute_query("""
+                INSERT INTO osir_fair_weights (case_uuid, weight) VALUES (%s::uuid, %s)
+                ON CONFLICT (case_uuid) DO UPDATE SET weight = EXCLUDED.weight
+            """, (str(case_uuid), weight))
+
+    def weights(self) -> Dict[str, float]:
+        """Returns the stored case weights, by case UUID."""
+        rows = self.db.execute_query(
+            "SELECT case_uuid::text AS case_uuid, weight FROM osir_fair_weights", fetch="fetchall"
+        ) or []
+        return {row["case_uuid"]: row["weight"] for row in rows}
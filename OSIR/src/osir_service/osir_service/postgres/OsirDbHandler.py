@@ -222,7 +222,11 @@ class OsirDbHandler:
             elif task_id:
                 # Unlink a single task from its handler. The relationship lives on
                 # the task row, so detaching = clearing osir_tasks.handler_id.
-                self.db.execute_query("UPDATE osir_tasks SET handler_id = NULL WHERE task_id = %s", (task_id,))
+                from osir_service.postgres.OsirDbTask import TASK_CASE_SQL
+                self.db.execute_query(
+                    f"UPDATE osir_tasks SET handler_id = NULL WHERE case_uuid = {TASK_CASE_SQL} AND task_id = %s::uuid",
+                    (task_id, task_id),
+                )
                 logger.debug(f"Task ID {task_id} unlinked from its handler.")
             return True
         except Exception as e:
@@ -256,15 +260,19 @@ class OsirDbHandler:
 
         A task present in osir_tasks but missing from celery_taskmeta is treated
         as PENDING/active, because Celery may not have written a result row yet.
+
+        Read from the task counters rollup (see OsirDbTask.create_stats_tables):
+        the watchdog runs this check on every idle iteration, whatever the
+        number of tasks of the handler.
         """
         try:
             result = self.db.execute_query("""
                 SELECT EXISTS (
                     SELECT 1
-                    FROM osir_tasks t
-                    LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
-                    WHERE t.handler_id = %s::uuid
-                    AND COALESCE(m.status, 'PENDING') NOT IN ('SUCCESS', 'FAILURE', 'REVOKED')
+                    FROM osir_task_counter_totals
+                    WHERE handler_id = %s::uuid
+                    AND status IN ('task_created', 'processing_started')
+                    AND count > 0
                 );
             """, (str(handler_uuid),), fetch="fetchone")
 
@@ -293,7 +301,8 @@ class OsirDbHandler:
                 (str(handler_uuid),), fetch="fetchall"
             )
 
-            return [OsirDbTaskModel.model_validate(_decode_result_trace(dict(x))) for x in tasks]
+            rows = self.db.task.load_traces([_decode_result_trace(dict(x)) for x in tasks])
+            return [OsirDbTaskModel.model_validate(row) for row in rows]
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des logs des tâches: {e}")
             raise
@@ -0,0 +1,122 @@
+from typing import List, Optional
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+
+class OsirDbModuleProfile:
+    """
+        Learned resource profiles of the modules.
+
+        Agents add the resources measured for each successful task run (see
+        TaskResourceMeter), aggregated per (module, input size bucket): sample
+        count, sums used for the averages and the highest peak RSS seen. A
+        bucket b covers inputs of [2^(b-1), 2^b) bytes, -1 inputs of unknown
+        size. The master reads the profiles to route heavy tasks (see
+        ModuleProfileRouter) and the client displays them.
+    """
+
+    def __init__(self, db_osir):
+        self.db = db_osir
+
+    def create_table(self):
+        try:
+            self.db.execute_query("""
+                CREATE TABLE IF NOT EXISTS osir_module_profiles (
+                    module TEXT NOT NULL,
+                    size_bucket INT NOT NULL,
+                    samples BIGINT NOT NULL DEFAULT 0,
+                    input_bytes_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    wall_seconds_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    cpu_seconds_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    read_bytes_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    write_bytes_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    peak_rss_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    peak_rss_max BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (module, size_bucket)
+                )
+            """)
+        except Exception as e:
+            logger.error(f"Error creating module profile table: {e}")
+            raise
+
+    def record(self, samples: List[dict]):
+        """
+            Adds measured task runs to the profiles.
+
+            Args:
+                samples (List[dict]): One dict per run with module, size_bucket, input_bytes
+                    and the TaskResourceMeter usage (wall_seconds, cpu_seconds, read_bytes,
+                    write_bytes, peak_rss_bytes).
+        """
+        # One row per key: ON CONFLICT cannot update the same row twice in a statement.
+        rows = {}
+        for s in samples:
+            key = (s["module"], s["size_bucket"])
+            row = rows.setdefault(key, [0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0])
+            row[0] += 1
+            row[1] += s.get("input_bytes") or 0
+            row[2] += s["wall_seconds"]
+            row[3] += s["cpu_seconds"]
+            row[4] += s["read_bytes"]
+            row[5] += s["write_bytes"]
+            row[6] += s["peak_rss_bytes"]
+            row[7] = max(row[7], int(s["peak_rss_bytes"]))
+        if not rows:
+            return
+
+        try:
+            self.db.execute_values_query("""
+                INSERT INTO osir_module_profiles (
+                    module, size_bucket, samples, input_bytes_sum, wall_seconds_sum, cpu_seconds_sum,
+                    read_bytes_sum, write_bytes_sum, peak_rss_sum, peak_rss_max
+                )
+                VALUES %s
+                ON CONFLICT (module, size_bucket) DO UPDATE SET
+                    samples = osir_module_profiles.samples + EXCLUDED.samples,
+                    input_bytes_sum = osir_module_profiles.input_bytes_sum + EXCLUDED.input_bytes_sum,
+                    wall_seconds_sum = osir_module_profiles.wall_seconds_sum + EXCLUDED.wall_seconds_sum,
+                    cpu_seconds_sum = osir_module_profiles.cpu_seconds_sum + EXCLUDED.cpu_seconds_sum,
+                    read_bytes_sum = osir_module_profiles.read_bytes_sum + EXCLUDED.read_bytes_sum,
+                    write_bytes_sum = osir_module_profiles.write_bytes_sum + EXCLUDED.write_bytes_sum,
+                    peak_rss_sum = osir_module_profiles.peak_rss_sum + EXCLUDED.peak_rss_sum,
+                    peak_rss_max = GREATEST(osir_module_profiles.peak_rss_max, EXCLUDED.peak_rss_max),
+                    updated_at = NOW()
+            """, [(module, bucket, *row) for (module, bucket), row in rows.items()])
+        except Exception as e:
+            logger.error(f"Error recording module profiles: {e}")
+
+    def list(self, module: Optional[str] = None) -> list:
+        """
+            Returns the profiles, with per-run averages, ordered by module and size bucket.
+
+            Args:
+                module (str, optional): Only the profiles of this module.
+
+            Returns:
+                list: Rows with module, size_bucket, samples, avg_input_bytes, avg_wall_seconds,
+                avg_cpu_seconds, avg_cpu_cores, avg_read_bytes, avg_write_bytes, avg_io_bytes_per_sec,
+                avg_peak_rss_bytes, peak_rss_max and updated_at.
+        """
+        rows = self.db.execute_query("""
+            SELECT module, size_bucket, samples,
+                   input_bytes_sum / samples AS avg_input_bytes,
+                   wall_seconds_sum / samples AS avg_wall_seconds,
+                   cpu_seconds_sum / samples AS avg_cpu_seconds,
+                   cpu_seconds_sum / NULLIF(wall_seconds_sum, 0) AS avg_cpu_cores,
+                   read_bytes_sum / samples AS avg_read_bytes,
+                   write_bytes_sum / samples AS avg_write_bytes,
+                   (read_bytes_sum + write_bytes_sum) / NULLIF(wall_seconds_sum, 0) AS avg_io_bytes_per_sec,
+                   peak_rss_sum / samples AS avg_peak_rss_bytes,
+                   peak_rss_max,
+                   updated_at
+            FROM osir_module_profiles
+            WHERE samples > 0 AND (%(module)s::text IS NULL OR module = %(module)s)
+            ORDER BY module, size_bucket
+        """, {"module": module}, fetch="fetchall") or []
+        for row in rows:
+            if row.get("updated_at") is not None:
+                row["updated_at"] = row["updated_at"].isoformat()
+        return rows
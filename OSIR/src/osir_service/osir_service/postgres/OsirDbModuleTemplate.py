@@ -0,0 +1,64 @@
+from typing import Optional
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+
+class OsirDbModuleTemplate:
+    """
+        Content-addressed store of the module definitions referenced by tasks.
+
+        Tasks only carry (filename, template hash): the master registers each
+        template once, agents fetch it on a miss of their local cache. A
+        template never changes once stored, a modified module gets a new hash.
+    """
+
+    def __init__(self, db_osir):
+        self.db = db_osir
+
+    def create_table(self):
+        try:
+            self.db.execute_query("""
+                CREATE TABLE IF NOT EXISTS osir_module_templates (
+                    template_hash TEXT PRIMARY KEY,
+                    filename TEXT,
+                    module TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+        except Exception as e:
+            logger.error(f"Error creating module template table: {e}")
+            raise
+
+    def register(self, template_hash: str, filename: Optional[str], module: str, payload: str):
+        """
+            Stores a module template, unless a template with the same hash already exists.
+
+            Args:
+                template_hash (str): Hash of the canonical payload.
+                filename (str, optional): Module file name, for troubleshooting.
+                module (str): Module name.
+                payload (str): Canonical JSON of the module, without input.match.
+        """
+        try:
+            self.db.execute_query("""
+                INSERT INTO osir_module_templates (template_hash, filename, module, payload)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (template_hash) DO NOTHING
+            """, (template_hash, filename, module, payload))
+        except Exception as e:
+            logger.error(f"Error registering module template {template_hash}: {e}")
+            raise
+
+    def get(self, template_hash: str) -> Optional[str]:
+        """
+            Returns the canonical JSON payload of a template, or None when unknown.
+        """
+        row = self.db.execute_query(
+            "SELECT payload FROM osir_module_templates WHERE template_hash = %s",
+            (template_hash,),
+            fetch="fetchone"
+        )
+        return row["payload"] if row else None
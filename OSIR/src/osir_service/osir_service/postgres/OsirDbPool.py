@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+
+class _PooledConnection(extensions.connection):
+    """psycopg2 connection remembering the process that opened it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.osir_pid = os.getpid()
+
+
+class OsirDbPool:
+    """
+        Process-wide pool of PostgreSQL connections, one per (host, dbname, port, user).
+
+        OsirDb contexts borrow a connection on entry and give it back on close
+        instead of opening a new TCP + authentication handshake every time.
+
+        - Size: at most OSIR_DB_POOL_SIZE idle connections are kept. Borrowing
+          never blocks: when none is idle a new connection is opened, and it is
+          closed on release if the idle set is already full.
+        - Health: a connection idle for more than OSIR_DB_POOL_CHECK_AFTER
+          seconds is checked with `SELECT 1` before being handed out; broken or
+          mid-transaction connections are discarded on release.
+        - Fork safety: connections inherited by a forked child (Celery prefork)
+          are never used nor closed there, since closing them would terminate
+          the parent's sessions. The child starts with an empty pool.
+    """
+
+    _pools: dict = {}
+    _pools_lock = threading.Lock()
+
+    # Inherited connections are kept referenced in forked children so that
+    # their garbage collection never sends a Terminate message on the shared
+    # socket.
+    _orphaned: list = []
+
+    def __init__(self, dsn: dict):
+        self.dsn = dsn
+        self.max_idle = int(os.getenv("OSIR_DB_POOL_SIZE", "8"))
+        self.check_after = float(os.getenv("OSIR_DB_POOL_CHECK_AFTER", "30"))
+
+        self._lock = threading.Lock()
+        self._idle: deque = deque()
+        self._pid = os.getpid()
+        self._metrics = {
+            "created": 0,
+            "reused": 0,
+            "closed": 0,
+            "discarded": 0,
+            "health_check_failures": 0,
+            "in_use": 0,
+        }
+
+    @classmethod
+    def get(cls, host, dbname, port, user, password) -> "OsirDbPool":
+        key = (host, dbname, port, user)
+        pool = cls._pools.get(key)
+        if pool is None:
+            with cls._pools_lock:
+                pool = cls._pools.get(key)
+                if pool is None:
+                    pool = cls(dict(dbname=dbname, user=user, password=password, host=host, port=port))
+                    cls._pools[key] = pool
+        return pool
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Returns the metrics of every pool of the current process, keyed by "user@host:port/dbname"."""
+        result = {}
+        for (host, dbname, port, user), pool in list(cls._pools.items()):
+            with pool._lock:
+                metrics = dict(pool._metrics)
+                metrics["idle"] = len(pool._idle)
+            result[f"{user}@{host}:{port}/{dbname}"] = metrics
+        return result
+
+    @classmethod
+    def _reset_after_fork(cls):
+        for pool in cls._pools.values():
+            cls._orphaned.extend(conn for conn, _ in pool._idle)
+            pool._idle.clear()
+            pool._pid = os.getpid()
+            for key in pool._metrics:
+                pool._metrics[key] = 0
+            pool._lock = threading.Lock()
+        cls._pools_lock = threading.Lock()
+
+    def _connect(self):
+        conn = psycopg2.connect(connection_factory=_PooledConnection, **self.dsn)
+        conn.autocommit = True
+        with self._lock:
+            self._metrics["created"] += 1
+        return conn
+
+    def _is_healthy(self, conn) -> bool:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Borrows a healthy connection, opening a new one when none is idle."""
+        if self._pid != os.getpid():
+            # Safety net for forks not covered by register_at_fork.
+            OsirDbPool._reset_after_fork()
+
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, released_at = self._idle.pop()
+
+            if conn.closed != 0:
+                self._discard(conn)
+                continue
+
+            if time.monotonic() - released_at > self.check_after and not self._is_healthy(conn):
+                with self._lock:
+                    self._metrics["health_check_failures"] += 1
+                self._discard(conn)
+                continue
+
+            with self._lock:
+                self._metrics["reused"] += 1
+                self._metrics["in_use"] += 1
+            return conn
+
+        conn = self._connect()
+        with self._lock:
+            self._metrics["in_use"] += 1
+        return conn
+
+    def release(self, conn):
+        """Gives a borrowed connection back, or closes it when it cannot be reused."""
+        with self._lock:
+            self._metrics["in_use"] = max(0, self._metrics["in_use"] - 1)
+
+        if self._is_foreign(conn) or conn.closed != 0:
+            return
+
+        # Notifications collected by a LISTEN must not leak to the next borrower.
+        conn.notifies.clear()
+
+        status = conn.info.transaction_status
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except Exception:
+                self._discard(conn)
+                return
+            if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                self._discard(conn)
+                return
+
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+            self._metrics["closed"] += 1
+
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Failed to close pooled connection: {e}")
+
+    def discard(self, conn):
+        """Drops a borrowed connection known to be broken."""
+        with self._lock:
+            self._metrics["in_use"] = max(0, self._metrics["in_use"] - 1)
+        self._discard(conn)
+
+    @classmethod
+    def _is_foreign(cls, conn) -> bool:
+        """Keeps connections inherited from a parent process away from close()."""
+        if getattr(conn, "osir_pid", os.getpid()) != os.getpid():
+            cls._orphaned.append(conn)
+            return True
+        return False
+
+    def _discard(self, conn):
+        if self._is_foreign(conn):
+            return
+        with self._lock:
+            self._metrics["discarded"] += 1
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Failed to close discarded connection: {e}")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=OsirDbPool._reset_after_fork)
@@ -1,34 +1,99 @@
+import hashlib
 import io
-from sqlite3 import OperationalError
-from typing import List, Tuple
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import psycopg2.extras
+from psycopg2 import OperationalError
 from osir_lib.logger import AppLogger
 
 logger = AppLogger().get_logger()
 
+# Text COPY format escapes: the escape character itself and the field and row delimiters.
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def snapshot_dir_id(path: str) -> int:
+    """
+        Stable 64-bit identifier of a snapshot directory.
+
+        Derived from the path itself so that ids never need to be allocated
+        or synchronized between handlers writing the same case.
+    """
+    digest = hashlib.blake2b(path.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class SnapshotDelta(NamedTuple):
+    """Changes of a case snapshot since it was last stored."""
+    reset: bool
+    dirs: List[Tuple[int, str, Optional[int], int]]
+    dropped_dir_ids: List[int]
+    deleted_entries: List[Tuple[int, str]]
+    inserted_entries: List[Tuple[int, str, bool]]
+
 
 class OsirDbSnapshot:
+    """
+        Compact case snapshot storage.
+
+        A case is stored as one `case_snapshot_root` row (interned as an integer
+        snapshot_id), one `case_snapshot_dir` row per directory and one
+        `case_snapshot_entry` row per directory child holding only its basename.
+        Writes are deltas applied in a single transaction.
+
+        The legacy `case_snapshot` table (one absolute path per row) is only
+        read to migrate cases stored by previous versions.
+    """
     def __init__(self, db_osir):
         self.db = db_osir
 
     def create_table(self):
-        query = """
-            CREATE TABLE IF NOT EXISTS case_snapshot (
-                case_uuid TEXT NOT NULL,
-                case_path TEXT NOT NULL,
-                path TEXT NOT NULL,
-                entry_type TEXT NOT NULL,
-                PRIMARY KEY (case_uuid, path)
-            )
-            """
-        try:
-            self.db.execute_query(query)
-            # logger.debug("Table `case_snapshot` ensured.")
-        except Exception as e:
-            logger.error(f"Error creating `case_snapshot` table: {str(e)}")
+        queries = {
+            "case_snapshot": """
+                CREATE TABLE IF NOT EXISTS case_snapshot (
+                    case_uuid TEXT NOT NULL,
+                    case_path TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    entry_type TEXT NOT NULL,
+                    PRIMARY KEY (case_uuid, path)
+                )
+            """,
+            "case_snapshot_root": """
+                CREATE TABLE IF NOT EXISTS case_snapshot_root (
+                    snapshot_id SERIAL PRIMARY KEY,
+                    case_uuid TEXT NOT NULL UNIQUE,
+                    case_path TEXT NOT NULL
+                )
+            """,
+            "case_snapshot_dir": """
+                CREATE TABLE IF NOT EXISTS case_snapshot_dir (
+                    snapshot_id INTEGER NOT NULL,
+                    dir_id BIGINT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns BIGINT,
+                    child_count INTEGER NOT NULL,
+                    PRIMARY KEY (snapshot_id, dir_id)
+                )
+            """,
+            "case_snapshot_entry": """
+                CREATE TABLE IF NOT EXISTS case_snapshot_entry (
+                    snapshot_id INTEGER NOT NULL,
+                    dir_id BIGINT NOT NULL,
+                    name TEXT NOT NULL,
+                    is_dir BOOLEAN NOT NULL,
+                    PRIMARY KEY (snapshot_id, dir_id, name)
+                )
+            """,
+        }
+        for table, query in queries.items():
+            try:
+                self.db.execute_query(query)
+            except Exception as e:
+                logger.error(f"Error creating `{table}` table: {str(e)}")
 
     def get_stored_case_snapshot(self, case_path: str) -> List[Tuple[str, str]]:
         """
-            Retrieves all file/directory entries stored for a specific case path from the snapshot.
+            Retrieves all file/directory entries stored in the legacy snapshot table.
 
             Args:
                 case_path (str): The path of the case to look up.
@@ -44,64 +109,172 @@ class OsirDbSnapshot:
         """
         try:
             rows = self.db.execute_query(query, (case_path,), fetch="fetchall")
-            logger.debug(f"Retrieved {len(rows)} entries for case_path: {case_path}")
+            logger.debug(f"Retrieved {len(rows)} legacy entries for case_path: {case_path}")
             return [(row['path'], row['entry_type']) for row in rows]
         except Exception as e:
             logger.error(f"Error fetching entries for case_path {case_path}: {str(e)}")
             return []
 
-    def store_case_snapshot(self, case_uuid: str, case_path: str, entries_list: List[Tuple[str, str]]):
+    def get_snapshot_dirs(self, case_uuid: str) -> List[Tuple[int, str, Optional[int], int]]:
         """
-            Performs a bulk update of the case snapshot. Clears existing records for the case 
-            and uses a fast COPY command to insert new unique entries.
+            Retrieves the directory index of a case snapshot. File entries are not loaded.
 
             Args:
                 case_uuid (str): The unique identifier of the case.
-                case_path (str): The root path of the case.
-                entries_list (List[Tuple[str, str]]): A list of (path, entry_type) to be stored.
 
-            Note:
-                This method filters out duplicate paths and paths containing backslashes 
-                before performing the bulk insert via a buffer.
+            Returns:
+                List[Tuple[int, str, Optional[int], int]]: (dir_id, path, st_mtime_ns, child count) tuples.
+        """
+        query = """
+            SELECT d.dir_id, d.path, d.mtime_ns, d.child_count
+            FROM case_snapshot_dir d
+            JOIN case_snapshot_root r USING (snapshot_id)
+            WHERE r.case_uuid = %s
+        """
+        try:
+            rows = self.db.execute_query(query, (str(case_uuid),), fetch="fetchall")
+            logger.debug(f"Retrieved {len(rows)} snapshot directories for case_uuid: {case_uuid}")
+            return [(row['dir_id'], row['path'], row['mtime_ns'], row['child_count']) for row in rows]
+        except Exception as e:
+            logger.error(f"Error fetching snapshot directories for case_uuid {case_uuid}: {str(e)}")
+            return []
 
-            Raises:
-                OperationalError: If the database connection cannot be established.
-                Exception: For any errors during the bulk copy process.
+    def get_snapshot_children(self, case_uuid: str, dir_id: int) -> List[Tuple[str, bool]]:
+        """
+            Retrieves the stored children of one snapshot directory.
+
+            Args:
+                case_uuid (str): The unique identifier of the case.
+                dir_id (int): The directory identifier (see snapshot_dir_id).
+
+            Returns:
+                List[Tuple[str, bool]]: (basename, is_dir) tuples.
+        """
+        query = """
+            SELECT e.name, e.is_dir
+            FROM case_snapshot_entry e
+            JOIN case_snapshot_root r USING (snapshot_id)
+            WHERE r.case_uuid = %s AND e.dir_id = %s
         """
         try:
-            case_path = str(case_path)
-            case_uuid = str(case_uuid)
+            rows = self.db.execute_query(query, (str(case_uuid), dir_id), fetch="fetchall")
+            return [(row['name'], row['is_dir']) for row in rows]
+        except Exception as e:
+            logger.error(f"Error fetching snapshot children for case_uuid {case_uuid}: {str(e)}")
+            return []
 
-            self.db.execute_query("DELETE FROM case_snapshot WHERE case_uuid = %s", (case_uuid,))
+    def store_case_snapshot(self, case_uuid: str, case_path: str, delta: SnapshotDelta):
+        """
+            Applies the changes of a case snapshot in a single transaction.
 
-            seen_paths = set()
-            unique_entries = []
+            Args:
+                case_uuid (str): The unique identifier of the case.
+                case_path (str): The root path of the case.
+                delta (SnapshotDelta): Changes since the last store. With `reset` set,
+                    every stored row of the case is replaced.
 
-            for path, entry_type in entries_list:
-                path = str(path)
-                if '\\' in path:
-                    continue
-                if path not in seen_paths:
-                    seen_paths.add(path)
-                    unique_entries.append((path, entry_type))
+            Note:
+                Legacy `case_snapshot` rows of the case are removed once the
+                snapshot has been written in the compact format.
 
-            output = io.StringIO()
-            for path, entry_type in unique_entries:
-                output.write(f"{case_uuid}\t{case_path}\t{path}\t{entry_type}\n")
-            output.seek(0)
+            Raises:
+                OperationalError: If the database connection cannot be established.
+        """
+        case_uuid = str(case_uuid)
+        case_path = str(case_path)
 
+        try:
             conn = self.db._ensure_connection()
             if not conn:
                 raise OperationalError("Could not establish a database connection.")
 
             with conn.cursor() as cur:
-                cur.copy_from(
-                    file=output,
-                    table='case_snapshot',
-                    columns=('case_uuid', 'case_path', 'path', 'entry_type'),
-                    null=''
-                )
-            conn.commit()
+                # The connection is in autocommit mode: open an explicit
+                # transaction so readers never see a half-applied delta.
+                cur.execute("BEGIN")
+                try:
+                    cur.execute(
+                        """
+                        INSERT INTO case_snapshot_root (case_uuid, case_path)
+                        VALUES (%s, %s)
+                        ON CONFLICT (case_uuid) DO UPDATE SET case_path = EXCLUDED.case_path
+                        RETURNING snapshot_id
+                        """,
+                        (case_uuid, case_path),
+                    )
+                    snapshot_id = cur.fetchone()[0]
+
+                    if delta.reset:
+                        cur.execute("DELETE FROM case_snapshot_entry WHERE snapshot_id = %s", (snapshot_id,))
+                        cur.execute("DELETE FROM case_snapshot_dir WHERE snapshot_id = %s", (snapshot_id,))
+
+                    if delta.dropped_dir_ids:
+                        cur.execute(
+                            "DELETE FROM case_snapshot_entry WHERE snapshot_id = %s AND dir_id = ANY(%s)",
+                            (snapshot_id, delta.dropped_dir_ids),
+                        )
+                        cur.execute(
+                            "DELETE FROM case_snapshot_dir WHERE snapshot_id = %s AND dir_id = ANY(%s)",
+                            (snapshot_id, delta.dropped_dir_ids),
+                        )
+
+                    if delta.deleted_entries:
+                        psycopg2.extras.execute_values(
+                            cur,
+                            # execute_values accepts a single placeholder.
+                            f"""
+                            DELETE FROM case_snapshot_entry e
+                            USING (VALUES %s) AS d (dir_id, name)
+                            WHERE e.snapshot_id = {int(snapshot_id)}
+                              AND e.dir_id = d.dir_id
+                              AND e.name = d.name
+                            """,
+                            delta.deleted_entries,
+                            template="(%s::bigint, %s::text)",
+                            page_size=10000,
+                        )
+
+                    if delta.inserted_entries:
+                        cur.copy_from(
+                            file=self._to_copy_buffer(snapshot_id, delta.inserted_entries),
+                            table='case_snapshot_entry',
+                            columns=('snapshot_id', 'dir_id', 'name', 'is_dir'),
+                        )
+
+                    if delta.dirs:
+                        psycopg2.extras.execute_values(
+                            cur,
+                            """
+                            INSERT INTO case_snapshot_dir (snapshot_id, dir_id, path, mtime_ns, child_count)
+                            VALUES %s
+                            ON CONFLICT (snapshot_id, dir_id) DO UPDATE SET
+                                path = EXCLUDED.path,
+                                mtime_ns = EXCLUDED.mtime_ns,
+                                child_count = EXCLUDED.child_count
+                            """,
+                            [(snapshot_id, *row) for row in delta.dirs],
+                            page_size=10000,
+                        )
+
+                    cur.execute("DELETE FROM case_snapshot WHERE case_uuid = %s", (case_uuid,))
+                    cur.execute("COMMIT")
+                except Exception:
+                    cur.execute("ROLLBACK")
+                    raise
+
+            logger.debug(
+                f"Case snapshot stored for case_uuid {case_uuid}: "
+                f"{len(delta.inserted_entries)} entries inserted, {len(delta.deleted_entries)} deleted, "
+                f"{len(delta.dirs)} directories updated, {len(delta.dropped_dir_ids)} dropped"
+            )
 
         except Exception as e:
-            logger.error(f"Bulk insert error for case_uuid {case_uuid}: {str(e)}")
+            logger.error(f"Snapshot store error for case_uuid {case_uuid}: {str(e)}")
+
+    @staticmethod
+    def _to_copy_buffer(snapshot_id: int, entries: Iterable[Tuple[int, str, bool]]) -> io.StringIO:
+        output = io.StringIO()
+        for dir_id, name, is_dir in entries:
+            output.write(f"{snapshot_id}\t{dir_id}\t{name.translate(_COPY_ESCAPES)}\t{'t' if is_dir else 'f'}\n")
+        output.seek(0)
+        return output
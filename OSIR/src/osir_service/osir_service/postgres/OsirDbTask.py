@@ -1,6 +1,11 @@
+import base64
+import hashlib
+import select
+import time
 import uuid
+from datetime import datetime
 from typing import List, Union, Optional
-from osir_service.postgres.model.OsirDbTaskModel import OsirDbTaskModel
+from osir_service.postgres.model.OsirDbTaskModel import OsirDbTaskModel, OsirDbTaskPageModel
 from osir_lib.logger import AppLogger
 
 logger = AppLogger().get_logger()
@@ -48,21 +53,129 @@ TASK_VIEW_SELECT = """
     LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
 """
 
+# Task list rows: the task view without the trace and the celery result,
+# only read when a single task is opened (get).
+TASK_LIST_SELECT = """
+    SELECT
+        t.task_id,
+        t.case_uuid,
+        t.handler_id,
+        COALESCE(NULLIF(t.agent, 'Null'), m.worker, 'Null') AS agent,
+        t.module,
+        t.input,
+        t.output,
+        """ + STATUS_CASE_SQL + """ AS processing_status,
+        t.timestamp
+    FROM osir_tasks t
+    LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
+"""
+
+# Largest page returned by OsirDbTask.page.
+TASK_PAGE_MAX = 1000
+
 # Celery states meaning "this task is over".
 CELERY_DONE_STATES = "('SUCCESS', 'FAILURE', 'REVOKED')"
 
+# NOTIFY channel raised when a task reaches a final state, with the release
+# key of its input as payload (see input_release_key).
+INPUT_RELEASED_CHANNEL = "osir_input_released"
+
+
+# Task statistics rollup (see OsirDbTask.create_stats_tables): tasks without
+# handler are counted under the nil UUID, the throughput ring keeps one row
+# per minute over the last THROUGHPUT_RING_MINUTES minutes.
+NO_HANDLER_ID = "00000000-0000-0000-0000-000000000000"
+THROUGHPUT_RING_MINUTES = 60
+
+# NOTIFY channel raised on every counter change of the rollup, with a JSON
+# payload {"c": case_uuid, "h": handler_id, "m": module, "d": {status: delta}}
+# (see TaskEventHub).
+TASK_EVENTS_CHANNEL = "osir_task_events"
+
+# celery task ids of osir tasks are UUIDs, batch task ids store no result.
+TASK_ID_REGEX = "^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+
+
+# Case of a task, read from the task -> case map (osir_task_cases): lookups by
+# task id also filter on it, so that they only read the partition of the case.
+TASK_CASE_SQL = "(SELECT k.case_uuid FROM osir_task_cases k WHERE k.task_id = %s::uuid)"
+
+# Tables partitioned by case (see OsirDbTask.create_partition_functions).
+CASE_PARTITIONED_TABLES = ("osir_tasks", "osir_task_outputs", "osir_task_traces")
+
+# (table, case_uuid) of the partitions this process created or found.
+_case_partitions = set()
+
+
+def case_partitions_sql(table: str, case_uuids) -> str:
+    """
+        Statements creating the missing case partitions of a table (osir_tasks,
+        osir_task_outputs, osir_task_traces), sent ahead of an INSERT in the
+        same round trip: a row of a case without partition would land in the
+        default partition.
+
+        Partitions this process already created are skipped: the caller
+        reports them with case_partitions_created once the INSERT succeeded.
+        A partition dropped by another process meanwhile only sends the rows
+        of its case to the default partition, moved out when it is recreated.
+    """
+    return "".join(
+        f"SELECT osir_case_partition('{table}', '{case_uuid}'::uuid); "
+        for case_uuid in sorted({str(uuid.UUID(str(c))) for c in case_uuids})
+        if (table, case_uuid) not in _case_partitions
+    )
+
+
+def case_partitions_created(table: str, case_uuids):
+    """Records the partitions created by a successful case_partitions_sql statement."""
+    _case_partitions.update((table, str(uuid.UUID(str(c)))) for c in case_uuids)
+
+
+def case_partitions_dropped(case_uuid):
+    """Forgets the partitions of a deleted case."""
+    case_uuid = str(uuid.UUID(str(case_uuid)))
+    _case_partitions.difference_update((table, case_uuid) for table in CASE_PARTITIONED_TABLES)
+
+
+def encode_task_cursor(timestamp, task_id) -> str:
+    """Cursor of the page following a task (see OsirDbTask.page)."""
+    value = f"{timestamp.isoformat()}|{task_id}"
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_task_cursor(cursor: str) -> tuple:
+    """
+        Returns the (timestamp, task_id) of a page cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+    """
+    try:
+        value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, task_id = value.split("|", 1)
+        return datetime.fromisoformat(timestamp), str(uuid.UUID(task_id))
+    except Exception as e:
+        raise ValueError(f"Invalid task cursor: {cursor}") from e
+
+
+def input_release_key(case_uuid, input) -> str:
+    """Key identifying an input of a case in input release notifications."""
+    return hashlib.md5(f"{uuid.UUID(str(case_uuid))}\n{input}".encode("utf-8", "surrogateescape")).hexdigest()
+
 
 def _decode_result_trace(row: dict) -> dict:
     """Overlay the module trace stored in the (pickled) celery result onto
     the trace field for detail views. Successful tasks return their log
-    blob as the task result; failures are covered by celery's traceback
-    (or by the pickled exception when no traceback string was stored)."""
+    blob, or its summary when the logs went to osir_task_traces (see
+    OsirDbTask.load_traces), as the task result; failures are covered by
+    celery's traceback (or by the pickled exception when no traceback
+    string was stored)."""
     try:
         blob = row.get("celery_result")
         if blob and (not row.get("trace") or row["trace"] == {}):
             import pickle
             decoded = pickle.loads(bytes(blob))
-            if isinstance(decoded, dict) and "logs" in decoded:
+            if isinstance(decoded, dict) and ("logs" in decoded or decoded.get("trace_stored")):
                 row["trace"] = decoded
             elif isinstance(decoded, BaseException):
                 row["trace"] = {"logs": [f"{type(decoded).__name__}: {decoded}"]}
@@ -80,6 +193,12 @@ class OsirDbTask:
     """
         Manages the lifecycle of tasks stored in the PostgreSQL 'osir_tasks' table,
         including table creation, task creation, retrieval, updates, and deletion.
+
+        osir_tasks is LIST partitioned by case_uuid, one partition per case
+        (osir_tasks_<case uuid hex>), created with the first task of the case:
+        per-case queries only read the partition of the case, and deleting a
+        case drops its partition. Lookups by task id alone (celery joins)
+        probe the task_id index of every partition.
     """
 
     def __init__(self, db_osir):
@@ -88,7 +207,8 @@ class OsirDbTask:
     def create_table(self):
         """
             Creates the 'osir_tasks' table and the custom ENUM type 'processing_status_enum' 
-            if they do not already exist.
+            if they do not already exist. An unpartitioned 'osir_tasks' of an
+            older version is moved into case partitions.
 
             Raises:
                 Exception: If the database query fails.
@@ -108,33 +228,237 @@ class OsirDbTask:
                     );
                 """)
 
-            self.db.execute_query("""
-                CREATE TABLE IF NOT EXISTS osir_tasks (
-                    task_id UUID PRIMARY KEY,
-                    case_uuid UUID,
-                    handler_id UUID,
-                    agent TEXT,
-                    module TEXT,
-                    input TEXT,
-                    output TEXT DEFAULT 'N/A',
-                    processing_status processing_status_enum DEFAULT 'task_created',
-                    timestamp TIMESTAMPTZ DEFAULT NOW(),
-                    trace JSONB DEFAULT '{}'::jsonb
-                )
+            self.create_partition_functions()
+
+            # Add handler_id (link task -> handler) on older tables.
+            self.db.execute_query(
+                "ALTER TABLE IF EXISTS osir_tasks ADD COLUMN IF NOT EXISTS handler_id UUID"
+            )
+
+            # One partition per case (see case_partitions_sql). A table of an
+            # older version is moved into the partitions once, tasks without
+            # case going to the nil UUID case (as counted by the rollup).
+            self.db.execute_query(f"""
+                DO $$
+                DECLARE
+                    c UUID;
+                BEGIN
+                    PERFORM pg_advisory_xact_lock(hashtext('osir_tasks'));
+                    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('osir_tasks')) = 'p' THEN
+                        RETURN;
+                    END IF;
+
+                    IF to_regclass('osir_tasks') IS NOT NULL THEN
+                        LOCK TABLE osir_tasks IN ACCESS EXCLUSIVE MODE;
+                        ALTER TABLE osir_tasks RENAME TO osir_tasks_unpartitioned;
+                    END IF;
+
+                    CREATE TABLE osir_tasks (
+                        task_id UUID NOT NULL,
+                        case_uuid UUID NOT NULL,
+                        handler_id UUID,
+                        agent TEXT,
+                        module TEXT,
+                        input TEXT,
+                        output TEXT DEFAULT 'N/A',
+                        processing_status processing_status_enum DEFAULT 'task_created',
+                        timestamp TIMESTAMPTZ DEFAULT NOW(),
+                        trace JSONB DEFAULT '{{}}'::jsonb
+                    ) PARTITION BY LIST (case_uuid);
+                    CREATE TABLE osir_tasks_default PARTITION OF osir_tasks DEFAULT;
+
+                    IF to_regclass('osir_tasks_unpartitioned') IS NOT NULL THEN
+                        FOR c IN SELECT DISTINCT COALESCE(case_uuid, '{NO_HANDLER_ID}') FROM osir_tasks_unpartitioned LOOP
+                            PERFORM osir_case_partition('osir_tasks', c);
+                        END LOOP;
+                        INSERT INTO osir_tasks (task_id, case_uuid, handler_id, agent, module, input, output,
+                                                processing_status, timestamp, trace)
+                        SELECT task_id, COALESCE(case_uuid, '{NO_HANDLER_ID}'), handler_id, agent, module, input, output,
+                               processing_status, timestamp, trace
+                        FROM osir_tasks_unpartitioned;
+                        DROP TABLE osir_tasks_unpartitioned;
+                    END IF;
+
+                    ALTER TABLE osir_tasks ADD PRIMARY KEY (case_uuid, task_id);
+                END
+                $$
             """)
 
-            # Add handler_id (link task -> handler) on older tables, and index it.
+            # Lookups by task id alone (celery joins) probe every partition.
             self.db.execute_query(
-                "ALTER TABLE osir_tasks ADD COLUMN IF NOT EXISTS handler_id UUID"
+                "CREATE INDEX IF NOT EXISTS idx_osir_tasks_task_id ON osir_tasks (task_id)"
             )
             self.db.execute_query(
                 "CREATE INDEX IF NOT EXISTS idx_osir_tasks_handler_id "
                 "ON osir_tasks (handler_id, processing_status)"
             )
+            # Task list pages (see page), newest first.
+            self.db.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_osir_tasks_case_timestamp "
+                "ON osir_tasks (case_uuid, timestamp DESC, task_id DESC)"
+            )
+            # Input lock lookups (check_input). Inputs are hashed: full paths
+            # can exceed the btree tuple size limit.
+            self.db.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_osir_tasks_case_input "
+                "ON osir_tasks (case_uuid, md5(input))"
+            )
+            self.create_task_case_map()
         except Exception as e:
             logger.error(f"Error creating table: {e}")
             raise
 
+    def create_task_case_map(self):
+        """
+            Creates 'osir_task_cases', the case of every task, maintained by
+            triggers on osir_tasks. Lookups by task id alone (Celery state
+            triggers, single task reads and updates) read the case there first
+            (see TASK_CASE_SQL) and then only the partition of the case.
+
+            The map is filled from the existing tasks when osir_tasks has no
+            map trigger yet (first run, or osir_tasks moved into partitions).
+        """
+        self.db.execute_query("""
+            CREATE OR REPLACE FUNCTION osir_task_cases_insert() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO osir_task_cases (task_id, case_uuid)
+                SELECT DISTINCT ON (n.task_id) n.task_id, n.case_uuid FROM new_rows n
+                ON CONFLICT (task_id) DO UPDATE SET case_uuid = EXCLUDED.case_uuid;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        self.db.execute_query("""
+            CREATE OR REPLACE FUNCTION osir_task_cases_delete() RETURNS trigger AS $$
+            BEGIN
+                DELETE FROM osir_task_cases k
+                USING old_rows o
+                WHERE k.task_id = o.task_id AND k.case_uuid = o.case_uuid;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        self.db.execute_query("""
+            CREATE OR REPLACE FUNCTION osir_task_cases_update() RETURNS trigger AS $$
+            BEGIN
+                UPDATE osir_task_cases SET case_uuid = NEW.case_uuid WHERE task_id = NEW.task_id;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        self.db.execute_query("""
+            DO $$
+            BEGIN
+                PERFORM pg_advisory_xact_lock(hashtext('osir_task_cases'));
+                IF EXISTS (
+                    SELECT 1 FROM pg_trigger
+                    WHERE tgname = 'trg_osir_task_cases_insert' AND tgrelid = 'osir_tasks'::regclass
+                ) THEN
+                    RETURN;
+                END IF;
+
+                LOCK TABLE osir_tasks IN SHARE ROW EXCLUSIVE MODE;
+
+                CREATE TABLE IF NOT EXISTS osir_task_cases (
+                    task_id UUID PRIMARY KEY,
+                    case_uuid UUID NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_osir_task_cases_case ON osir_task_cases (case_uuid);
+                INSERT INTO osir_task_cases (task_id, case_uuid)
+                SELECT task_id, case_uuid FROM osir_tasks
+                ON CONFLICT (task_id) DO NOTHING;
+
+                CREATE OR REPLACE TRIGGER trg_osir_task_cases_insert
+                AFTER INSERT ON osir_tasks
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION osir_task_cases_insert();
+
+                CREATE OR REPLACE TRIGGER trg_osir_task_cases_delete
+                AFTER DELETE ON osir_tasks
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION osir_task_cases_delete();
+
+                CREATE OR REPLACE TRIGGER trg_osir_task_cases_update
+                AFTER UPDATE OF case_uuid ON osir_tasks
+                FOR EACH ROW
+                WHEN (OLD.case_uuid IS DISTINCT FROM NEW.case_uuid)
+                EXECUTE FUNCTION osir_task_cases_update();
+            END
+            $$
+        """)
+
+    def create_partition_functions(self):
+        """
+            Creates the functions managing the case partitions of osir_tasks,
+            osir_task_outputs and osir_task_traces:
+              - osir_case_partition(table, case): creates the partition of a
+                case if missing, moving the rows of the case stored in the
+                default partition meanwhile;
+              - osir_case_drop(case): drops the partitions of a case, deletes
+                its rows left in the default partitions and its statistics.
+        """
+        try:
+            self.db.execute_query("""
+                CREATE OR REPLACE FUNCTION osir_case_partition(p_table TEXT, p_case UUID) RETURNS void AS $$
+                DECLARE
+                    part TEXT := p_table || '_' || replace(p_case::text, '-', '');
+                BEGIN
+                    IF to_regclass(part) IS NOT NULL THEN
+                        RETURN;
+                    END IF;
+                    PERFORM pg_advisory_xact_lock(hashtext(part));
+                    IF to_regclass(part) IS NOT NULL THEN
+                        RETURN;
+                    END IF;
+
+                    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, p_table);
+                    EXECUTE format(
+                        'WITH moved AS (DELETE FROM %I WHERE case_uuid = $1 RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                        p_table || '_default', part
+                    ) USING p_case;
+                    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES IN (%L)', p_table, part, p_case);
+                END
+                $$ LANGUAGE plpgsql
+            """)
+
+            # Dropped partitions fire no trigger: the rollup of the case is
+            # cleared here (notified as decrements, see osir_task_counters_move).
+            self.db.execute_query("""
+                CREATE OR REPLACE FUNCTION osir_case_drop(p_case UUID) RETURNS void AS $$
+                DECLARE
+                    p_table TEXT;
+                BEGIN
+                    FOREACH p_table IN ARRAY ARRAY['osir_task_traces', 'osir_task_outputs', 'osir_tasks'] LOOP
+                        EXECUTE format('DROP TABLE IF EXISTS %I', p_table || '_' || replace(p_case::text, '-', ''));
+                    END LOOP;
+                    IF to_regclass('osir_task_traces') IS NOT NULL THEN
+                        DELETE FROM osir_task_traces WHERE case_uuid = p_case;
+                    END IF;
+                    DELETE FROM osir_task_outputs WHERE case_uuid = p_case;
+                    DELETE FROM osir_tasks WHERE case_uuid = p_case;
+                    IF to_regclass('osir_task_cases') IS NOT NULL THEN
+                        DELETE FROM osir_task_cases WHERE case_uuid = p_case;
+                    END IF;
+
+                    IF to_regclass('osir_task_counter_totals') IS NOT NULL THEN
+                        PERFORM osir_task_counters_move(
+                            c.case_uuid, c.handler_id, c.module, jsonb_object_agg(c.status, -c.count)
+                        )
+                        FROM osir_task_counter_totals c
+                        WHERE c.case_uuid = p_case AND c.count <> 0
+                        GROUP BY c.case_uuid, c.handler_id, c.module;
+                        DELETE FROM osir_task_counters WHERE case_uuid = p_case;
+                        DELETE FROM osir_task_counter_deltas WHERE case_uuid = p_case;
+                        DELETE FROM osir_task_timeline WHERE case_uuid = p_case;
+                        DELETE FROM osir_task_throughput WHERE case_uuid = p_case;
+                    END IF;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+        except Exception as e:
+            logger.error(f"Error creating case partition functions: {e}")
+            raise
+
     def create_celery_tables(self):
         """
             Creates the Celery database result-backend tables if they do not
@@ -170,10 +494,489 @@ class OsirDbTask:
                     date_done TIMESTAMP WITHOUT TIME ZONE
                 )
             """)
+
+            # Wake up tasks waiting on an input (wait_for_input) as soon as the
+            # task holding it reaches a final state. The payload is the input
+            # release key: md5(case_uuid + '\n' + input).
+            self.db.execute_query(f"""
+                CREATE OR REPLACE FUNCTION osir_notify_input_released() RETURNS trigger AS $$
+                DECLARE
+                    task_case UUID;
+                BEGIN
+                    IF NEW.status IN ('SUCCESS', 'FAILURE', 'REVOKED')
+                       AND NEW.task_id ~* '{TASK_ID_REGEX}' THEN
+                        SELECT k.case_uuid INTO task_case FROM osir_task_cases k WHERE k.task_id = NEW.task_id::uuid;
+                        PERFORM pg_notify('{INPUT_RELEASED_CHANNEL}', md5(t.case_uuid::text || E'\\n' || t.input))
+                        FROM osir_tasks t
+                        WHERE t.case_uuid = task_case
+                          AND t.task_id = NEW.task_id::uuid
+                          AND t.input IS NOT NULL;
+                    END IF;
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+            self.db.execute_query("""
+                CREATE OR REPLACE TRIGGER trg_osir_input_released
+                AFTER INSERT OR UPDATE OF status ON celery_taskmeta
+                FOR EACH ROW EXECUTE FUNCTION osir_notify_input_released()
+            """)
         except Exception as e:
             logger.error(f"Error creating celery result tables: {e}")
             raise
 
+    def create_stats_tables(self):
+        """
+            Creates the task statistics rollup, maintained by triggers so that
+            stats() reads a handful of counters instead of aggregating the
+            osir_tasks / celery_taskmeta join:
+              - osir_task_counters: tasks per (case, handler, module, effective
+                status), moved on every state change (task insert, celery state
+                stored or purged, task re-assigned or deleted);
+              - osir_task_timeline: first task created and last task finished
+                per (case, handler);
+              - osir_task_throughput: ring of THROUGHPUT_RING_MINUTES per-minute
+                slots of tasks finished per (case, handler).
+
+            State changes only append rows to osir_task_counter_deltas, so
+            concurrent workers never wait on (or deadlock over) the same
+            counter rows. fold_counters() moves the deltas into the counters,
+            the last finished time and the throughput; readers sum the pending
+            deltas in the meantime (osir_task_counter_totals).
+
+            Counter changes are also notified on TASK_EVENTS_CHANNEL for the
+            status streams: one notification per task transition, or per
+            (case, handler, module) for statements moving many tasks.
+
+            The first run locks both tables and fills the counters and the
+            timeline from the existing rows, in the same transaction as the
+            trigger creation, so no state change is counted twice or missed.
+            They are rebuilt the same way when osir_tasks lost its triggers
+            (moved into case partitions by create_table).
+        """
+        try:
+            self.db.execute_query("""
+                CREATE OR REPLACE FUNCTION osir_task_status(celery_status TEXT, fallback TEXT) RETURNS TEXT AS $$
+                    SELECT """ + STATUS_CASE_SQL.replace("m.status", "celery_status").replace("t.processing_status::text", "fallback") + """
+                $$ LANGUAGE sql IMMUTABLE
+            """)
+            # finished_at is set on the delta of a task reaching a final state.
+            self.db.execute_query("""
+                CREATE TABLE IF NOT EXISTS osir_task_counter_deltas (
+                    case_uuid UUID NOT NULL,
+                    handler_id UUID NOT NULL,
+                    module TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    delta BIGINT NOT NULL,
+                    finished_at TIMESTAMP
+                )
+            """)
+            # Moves the tasks of a (case, handler, module) between statuses:
+            # p_deltas is {status: delta}, notified as a whole. p_finished_at
+            # is kept on the deltas of tasks reaching a final state.
+            self.db.execute_query("DROP FUNCTION IF EXISTS osir_task_counters_add(UUID, UUID, TEXT, TEXT, BIGINT)")
+            self.db.execute_query(f"""
+                CREATE OR REPLACE FUNCTION osir_task_counters_move(
+                    p_case UUID, p_handler UUID, p_module TEXT, p_deltas JSONB, p_finished_at TIMESTAMP DEFAULT NULL
+                ) RETURNS void AS $$
+                BEGIN
+                    INSERT INTO osir_task_counter_deltas (case_uuid, handler_id, module, status, delta, finished_at)
+                    SELECT p_case, p_handler, p_module, d.key, d.value::bigint,
+                           CASE WHEN d.value::bigint > 0 AND d.key IN ('processing_done', 'processing_failed')
+                                THEN p_finished_at END
+                    FROM jsonb_each_text(p_deltas) d
+                    WHERE d.value::bigint <> 0;
+                    PERFORM pg_notify('{TASK_EVENTS_CHANNEL}', json_build_object(
+                        'c', p_case, 'h', p_handler, 'm', p_module, 'd', p_deltas
+                    )::text);
+                END
+                $$ LANGUAGE plpgsql
+            """)
+
+            # osir_tasks INSERT (statement level: bulk pushes are one statement).
+            self.db.execute_query(f"""
+                CREATE OR REPLACE FUNCTION osir_task_stats_insert() RETURNS trigger AS $$
+                DECLARE
+                    d RECORD;
+                BEGIN
+                    FOR d IN
+                        SELECT case_uuid, handler_id, module, jsonb_object_agg(status, delta) AS deltas
+                        FROM (
+                            SELECT COALESCE(n.case_uuid, '{NO_HANDLER_ID}') AS case_uuid,
+                                   COALESCE(n.handler_id, '{NO_HANDLER_ID}') AS handler_id,
+                                   COALESCE(n.module, '') AS module,
+                                   osir_task_status(m.status, n.processing_status::text) AS status,
+                                   COUNT(*) AS delta
+                            FROM new_rows n
+                            LEFT JOIN celery_taskmeta m ON m.task_id = n.task_id::text
+                            GROUP BY 1, 2, 3, 4
+                        ) g
+                        GROUP BY 1, 2, 3
+                    LOOP
+                        PERFORM osir_task_counters_move(d.case_uuid, d.handler_id, d.module, d.deltas);
+                    END LOOP;
+
+                    INSERT INTO osir_task_timeline AS l (case_uuid, handler_id, first_task_at)
+                    SELECT COALESCE(n.case_uuid, '{NO_HANDLER_ID}'), COALESCE(n.handler_id, '{NO_HANDLER_ID}'),
+                           MIN(n.timestamp AT TIME ZONE 'utc')
+                    FROM new_rows n
+                    GROUP BY 1, 2
+                    ON CONFLICT (case_uuid, handler_id)
+                    DO UPDATE SET first_task_at = LEAST(l.first_task_at, EXCLUDED.first_task_at);
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+
+            # osir_tasks UPDATE of a counter key (handler deleted, legacy status).
+            self.db.execute_query(f"""
+                CREATE OR REPLACE FUNCTION osir_task_stats_update() RETURNS trigger AS $$
+                DECLARE
+                    celery_status TEXT;
+                    old_key TEXT[];
+                    new_key TEXT[];
+                    old_status TEXT;
+                    new_status TEXT;
+                BEGIN
+                    SELECT m.status INTO celery_status FROM celery_taskmeta m WHERE m.task_id = NEW.task_id::text;
+                    old_key := ARRAY[COALESCE(OLD.case_uuid, '{NO_HANDLER_ID}')::text,
+                                     COALESCE(OLD.handler_id, '{NO_HANDLER_ID}')::text, COALESCE(OLD.module, '')];
+                    new_key := ARRAY[COALESCE(NEW.case_uuid, '{NO_HANDLER_ID}')::text,
+                                     COALESCE(NEW.handler_id, '{NO_HANDLER_ID}')::text, COALESCE(NEW.module, '')];
+                    old_status := osir_task_status(celery_status, OLD.processing_status::text);
+                    new_status := osir_task_status(celery_status, NEW.processing_status::text);
+                    IF old_key = new_key THEN
+                        IF old_status <> new_status THEN
+                            PERFORM osir_task_counters_move(
+                                old_key[1]::uuid, old_key[2]::uuid, old_key[3],
+                                jsonb_build_object(old_status, -1, new_status, 1)
+                            );
+                        END IF;
+                    ELSE
+                        PERFORM osir_task_counters_move(
+                            old_key[1]::uuid, old_key[2]::uuid, old_key[3], jsonb_build_object(old_status, -1)
+                        );
+                        PERFORM osir_task_counters_move(
+                            new_key[1]::uuid, new_key[2]::uuid, new_key[3], jsonb_build_object(new_status, 1)
+                        );
+                    END IF;
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+
+            # osir_tasks DELETE: counters of the deleted tasks, then the
+            # timeline and throughput of the scopes left without tasks.
+            self.db.execute_query(f"""
+                CREATE OR REPLACE FUNCTION osir_task_stats_delete() RETURNS trigger AS $$
+                DECLARE
+                    d RECORD;
+                BEGIN
+                    FOR d IN
+                        SELECT case_uuid, handler_id, module, jsonb_object_agg(status, delta) AS deltas
+                        FROM (
+                            SELECT COALESCE(o.case_uuid, '{NO_HANDLER_ID}') AS case_uuid,
+                                   COALESCE(o.handler_id, '{NO_HANDLER_ID}') AS handler_id,
+                                   COALESCE(o.module, '') AS module,
+                                   osir_task_status(m.status, o.processing_status::text) AS status,
+                                   -COUNT(*) AS delta
+                            FROM old_rows o
+                            LEFT JOIN celery_taskmeta m ON m.task_id = o.task_id::text
+                            GROUP BY 1, 2, 3, 4
+                        ) g
+                        GROUP BY 1, 2, 3
+                    LOOP
+                        PERFORM osir_task_counters_move(d.case_uuid, d.handler_id, d.module, d.deltas);
+                    END LOOP;
+
+                    DELETE FROM osir_task_timeline l
+                    WHERE (l.case_uuid, l.handler_id) IN (
+                          SELECT COALESCE(o.case_uuid, '{NO_HANDLER_ID}'), COALESCE(o.handler_id, '{NO_HANDLER_ID}')
+                          FROM old_rows o
+                      )
+                      AND NOT EXISTS (
+                          SELECT 1 FROM osir_task_counter_totals c
+                          WHERE c.case_uuid = l.case_uuid AND c.handler_id = l.handler_id AND c.count > 0
+                      );
+                    DELETE FROM osir_task_throughput r
+                    WHERE NOT EXISTS (
+                          SELECT 1 FROM osir_task_timeline l
+                          WHERE l.case_uuid = r.case_uuid AND l.handler_id = r.handler_id
+                      );
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+
+            # celery_taskmeta INSERT / UPDATE of status: Celery stores one
+            # state per statement.
+            self.db.execute_query(f"""
+                CREATE OR REPLACE FUNCTION osir_task_stats_transition() RETURNS trigger AS $$
+                DECLARE
+                    t RECORD;
+                    task_case UUID;
+                    old_status TEXT;
+                    new_status TEXT;
+                    finished_at TIMESTAMP;
+                BEGIN
+                    IF NEW.task_id IS NULL OR NEW.task_id !~* '{TASK_ID_REGEX}' THEN
+                        RETURN NULL;
+                    END IF;
+                    SELECT k.case_uuid INTO task_case FROM osir_task_cases k WHERE k.task_id = NEW.task_id::uuid;
+                    IF NOT FOUND THEN
+                        RETURN NULL;
+                    END IF;
+                    SELECT COALESCE(x.case_uuid, '{NO_HANDLER_ID}') AS case_uuid,
+                           COALESCE(x.handler_id, '{NO_HANDLER_ID}') AS handler_id,
+                           COALESCE(x.module, '') AS module,
+                           x.processing_status::text AS processing_status
+                    INTO t
+                    FROM osir_tasks x
+                    WHERE x.case_uuid = task_case AND x.task_id = NEW.task_id::uuid;
+                    IF NOT FOUND THEN
+                        RETURN NULL;
+                    END IF;
+
+                    IF TG_OP = 'UPDATE' THEN
+                        old_status := osir_task_status(OLD.status, t.processing_status);
+                    ELSE
+                        old_status := t.processing_status;
+                    END IF;
+                    new_status := osir_task_status(NEW.status, t.processing_status);
+                    IF old_status = new_status THEN
+                        RETURN NULL;
+                    END IF;
+
+                    IF new_status IN ('processing_done', 'processing_failed')
+                       AND old_status NOT IN ('processing_done', 'processing_failed') THEN
+                        finished_at := COALESCE(NEW.date_done, now() AT TIME ZONE 'utc');
+                    END IF;
+
+                    PERFORM osir_task_counters_move(
+                        t.case_uuid, t.handler_id, t.module,
+                        jsonb_build_object(old_status, -1, new_status, 1), finished_at
+                    );
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+
+            # Deltas -> counters, timeline and throughput. One folder at a
+            # time: the others skip instead of queueing on the same rows.
+            # Deltas committed during the fold are left for the next one.
+            self.db.execute_query(f"""
+                CREATE OR REPLACE FUNCTION osir_task_counters_fold() RETURNS bigint AS $$
+                DECLARE
+                    folded BIGINT;
+                BEGIN
+                    IF NOT pg_try_advisory_xact_lock(hashtext('osir_task_counters_fold')) THEN
+                        RETURN 0;
+                    END IF;
+
+                    CREATE TEMP TABLE IF NOT EXISTS osir_task_counter_fold (
+                        case_uuid UUID, handler_id UUID, module TEXT, status TEXT, delta BIGINT, finished_at TIMESTAMP
+                    ) ON COMMIT DELETE ROWS;
+                    WITH moved AS (
+                        DELETE FROM osir_task_counter_deltas
+                        RETURNING case_uuid, handler_id, module, status, delta, finished_at
+                    )
+                    INSERT INTO osir_task_counter_fold SELECT * FROM moved;
+                    GET DIAGNOSTICS folded = ROW_COUNT;
+                    IF folded = 0 THEN
+                        RETURN 0;
+                    END IF;
+
+                    INSERT INTO osir_task_counters AS c (case_uuid, handler_id, module, status, count)
+                    SELECT case_uuid, handler_id, module, status, SUM(delta)
+                    FROM osir_task_counter_fold
+                    GROUP BY 1, 2, 3, 4
+                    HAVING SUM(delta) <> 0
+                    ON CONFLICT (case_uuid, handler_id, module, status)
+                    DO UPDATE SET count = c.count + EXCLUDED.count;
+                    DELETE FROM osir_task_counters c
+                    WHERE c.count <= 0
+                      AND (c.case_uuid, c.handler_id, c.module, c.status) IN (
+                          SELECT case_uuid, handler_id, module, status FROM osir_task_counter_fold
+                      );
+
+                    UPDATE osir_task_timeline l
+                    SET last_finished_at = GREATEST(l.last_finished_at, f.finished_at)
+                    FROM (
+                        SELECT case_uuid, handler_id, MAX(finished_at) AS finished_at
+                        FROM osir_task_counter_fold
+                        WHERE finished_at IS NOT NULL
+                        GROUP BY 1, 2
+                    ) f
+                    WHERE l.case_uuid = f.case_uuid AND l.handler_id = f.handler_id;
+
+                    -- Latest minute of each slot only: older ones left the ring.
+                    INSERT INTO osir_task_throughput AS r (case_uuid, handler_id, slot, minute, done, failed)
+                    SELECT DISTINCT ON (case_uuid, handler_id, slot) case_uuid, handler_id, slot, minute, done, failed
+                    FROM (
+                        SELECT f.case_uuid, f.handler_id,
+                               (EXTRACT(EPOCH FROM date_trunc('minute', f.finished_at))::bigint / 60) % {THROUGHPUT_RING_MINUTES} AS slot,
+                               date_trunc('minute', f.finished_at) AS minute,
+                               COUNT(*) FILTER (WHERE f.status = 'processing_done') AS done,
+                               COUNT(*) FILTER (WHERE f.status = 'processing_failed') AS failed
+                        FROM osir_task_counter_fold f
+                        WHERE f.finished_at IS NOT NULL
+                          AND EXISTS (
+                              SELECT 1 FROM osir_task_timeline l
+                              WHERE l.case_uuid = f.case_uuid AND l.handler_id = f.handler_id
+                          )
+                        GROUP BY 1, 2, 3, 4
+                    ) m
+                    ORDER BY case_uuid, handler_id, slot, minute DESC
+                    ON CONFLICT (case_uuid, handler_id, slot) DO UPDATE SET
+                        minute = EXCLUDED.minute,
+                        done = CASE WHEN r.minute = EXCLUDED.minute THEN r.done + EXCLUDED.done ELSE EXCLUDED.done END,
+                        failed = CASE WHEN r.minute = EXCLUDED.minute THEN r.failed + EXCLUDED.failed ELSE EXCLUDED.failed END
+                    WHERE r.minute <= EXCLUDED.minute;
+                    RETURN folded;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+
+            # celery_taskmeta DELETE (task deletion, result expiry): tasks fall
+            # back on their osir_tasks status.
+            self.db.execute_query(f"""
+                CREATE OR REPLACE FUNCTION osir_task_stats_purge() RETURNS trigger AS $$
+                DECLARE
+                    d RECORD;
+                BEGIN
+                    FOR d IN
+                        SELECT case_uuid, handler_id, module, jsonb_object_agg(status, delta) AS deltas
+                        FROM (
+                            SELECT COALESCE(t.case_uuid, '{NO_HANDLER_ID}') AS case_uuid,
+                                   COALESCE(t.handler_id, '{NO_HANDLER_ID}') AS handler_id,
+                                   COALESCE(t.module, '') AS module,
+                                   s.status,
+                                   SUM(s.delta) AS delta
+                            FROM old_rows o
+                            JOIN osir_task_cases k
+                              ON k.task_id = CASE WHEN o.task_id ~* '{TASK_ID_REGEX}' THEN o.task_id::uuid END
+                            JOIN osir_tasks t ON t.case_uuid = k.case_uuid AND t.task_id = k.task_id
+                            CROSS JOIN LATERAL (VALUES
+                                (osir_task_status(o.status, t.processing_status::text), -1),
+                                (t.processing_status::text, 1)
+                            ) AS s(status, delta)
+                            GROUP BY 1, 2, 3, 4
+                            HAVING SUM(s.delta) <> 0
+                        ) g
+                        GROUP BY 1, 2, 3
+                    LOOP
+                        PERFORM osir_task_counters_move(d.case_uuid, d.handler_id, d.module, d.deltas);
+                    END LOOP;
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+
+            self.db.execute_query(f"""
+                DO $$
+                BEGIN
+                    PERFORM pg_advisory_xact_lock(hashtext('osir_task_counters'));
+                    IF EXISTS (
+                        SELECT 1 FROM pg_trigger
+                        WHERE tgname = 'trg_osir_task_stats_insert' AND tgrelid = 'osir_tasks'::regclass
+                    ) THEN
+                        RETURN;
+                    END IF;
+
+                    LOCK TABLE osir_tasks, celery_taskmeta IN SHARE ROW EXCLUSIVE MODE;
+
+                    -- osir_tasks recreated (see create_table): rebuilt from the rows.
+                    IF to_regclass('osir_task_counters') IS NOT NULL THEN
+                        TRUNCATE osir_task_counters, osir_task_counter_deltas, osir_task_timeline;
+                    ELSE
+                        CREATE TABLE osir_task_counters (
+                            case_uuid UUID NOT NULL,
+                            handler_id UUID NOT NULL,
+                            module TEXT NOT NULL,
+                            status TEXT NOT NULL,
+                            count BIGINT NOT NULL DEFAULT 0,
+                            PRIMARY KEY (case_uuid, handler_id, module, status)
+                        );
+                        CREATE TABLE osir_task_timeline (
+                            case_uuid UUID NOT NULL,
+                            handler_id UUID NOT NULL,
+                            first_task_at TIMESTAMP,
+                            last_finished_at TIMESTAMP,
+                            PRIMARY KEY (case_uuid, handler_id)
+                        );
+                        CREATE TABLE osir_task_throughput (
+                            case_uuid UUID NOT NULL,
+                            handler_id UUID NOT NULL,
+                            slot SMALLINT NOT NULL,
+                            minute TIMESTAMP NOT NULL,
+                            done BIGINT NOT NULL DEFAULT 0,
+                            failed BIGINT NOT NULL DEFAULT 0,
+                            PRIMARY KEY (case_uuid, handler_id, slot)
+                        );
+                    END IF;
+
+                    INSERT INTO osir_task_counters (case_uuid, handler_id, module, status, count)
+                    SELECT COALESCE(t.case_uuid, '{NO_HANDLER_ID}'), COALESCE(t.handler_id, '{NO_HANDLER_ID}'),
+                           COALESCE(t.module, ''), osir_task_status(m.status, t.processing_status::text), COUNT(*)
+                    FROM osir_tasks t
+                    LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
+                    GROUP BY 1, 2, 3, 4;
+
+                    INSERT INTO osir_task_timeline (case_uuid, handler_id, first_task_at, last_finished_at)
+                    SELECT COALESCE(t.case_uuid, '{NO_HANDLER_ID}'), COALESCE(t.handler_id, '{NO_HANDLER_ID}'),
+                           MIN(t.timestamp AT TIME ZONE 'utc'),
+                           MAX(m.date_done) FILTER (WHERE m.status IN {CELERY_DONE_STATES})
+                    FROM osir_tasks t
+                    LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
+                    GROUP BY 1, 2;
+
+                    CREATE OR REPLACE TRIGGER trg_osir_task_stats_insert
+                    AFTER INSERT ON osir_tasks
+                    REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION osir_task_stats_insert();
+
+                    CREATE OR REPLACE TRIGGER trg_osir_task_stats_update
+                    AFTER UPDATE OF case_uuid, handler_id, module, processing_status ON osir_tasks
+                    FOR EACH ROW
+                    WHEN (
+                        OLD.case_uuid IS DISTINCT FROM NEW.case_uuid
+                        OR OLD.handler_id IS DISTINCT FROM NEW.handler_id
+                        OR OLD.module IS DISTINCT FROM NEW.module
+                        OR OLD.processing_status IS DISTINCT FROM NEW.processing_status
+                    )
+                    EXECUTE FUNCTION osir_task_stats_update();
+
+                    CREATE OR REPLACE TRIGGER trg_osir_task_stats_delete
+                    AFTER DELETE ON osir_tasks
+                    REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION osir_task_stats_delete();
+
+                    CREATE OR REPLACE TRIGGER trg_osir_task_stats_transition
+                    AFTER INSERT OR UPDATE OF status ON celery_taskmeta
+                    FOR EACH ROW EXECUTE FUNCTION osir_task_stats_transition();
+
+                    CREATE OR REPLACE TRIGGER trg_osir_task_stats_purge
+                    AFTER DELETE ON celery_taskmeta
+                    REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION osir_task_stats_purge();
+                END
+                $$
+            """)
+
+            self.db.execute_query("""
+                CREATE OR REPLACE VIEW osir_task_counter_totals AS
+                SELECT case_uuid, handler_id, module, status, SUM(count)::bigint AS count
+                FROM (
+                    SELECT case_uuid, handler_id, module, status, count FROM osir_task_counters
+                    UNION ALL
+                    SELECT case_uuid, handler_id, module, status, delta FROM osir_task_counter_deltas
+                ) c
+                GROUP BY case_uuid, handler_id, module, status
+            """)
+        except Exception as e:
+            logger.error(f"Error creating task statistics tables: {e}")
+            raise
+
     def create(self, case_uuid: str, agent: str, module: str, input: str, output: str = 'N/A', task_id: Optional[str] = None, handler_id: Optional[str] = None) -> str:        
         """
             Inserts a new task into the database.
@@ -197,7 +1000,7 @@ class OsirDbTask:
             if task_id is None:
                 task_id = str(uuid.uuid4())
 
-            self.db.execute_query("""
+            self.db.execute_query(case_partitions_sql("osir_tasks", [case_uuid]) + """
                 INSERT INTO osir_tasks (
                     task_id,
                     case_uuid,
@@ -211,6 +1014,7 @@ class OsirDbTask:
 
                 VALUES (%s, %s, %s, %s, %s, %s, %s, 'task_created')
             """, (task_id, case_uuid, handler_id, agent, module, input, output))
+            case_partitions_created("osir_tasks", [case_uuid])
 
             logger.debug(f"Task created successfully with task_id: {task_id}")
             return task_id
@@ -238,7 +1042,7 @@ class OsirDbTask:
 
         try:
             self.db.execute_values_query(
-                """
+                case_partitions_sql("osir_tasks", {row[1] for row in rows}) + """
                 INSERT INTO osir_tasks (
                     task_id,
                     case_uuid,
@@ -254,6 +1058,7 @@ class OsirDbTask:
                 rows,
                 template="(%s, %s, %s, %s, %s, %s, 'N/A', 'task_created')",
             )
+            case_partitions_created("osir_tasks", {row[1] for row in rows})
             logger.debug(f"Bulk task insert: {len(rows)} row(s)")
             return len(rows)
         except Exception as e:
@@ -279,18 +1084,30 @@ class OsirDbTask:
 
         try:
             row = self.db.execute_query(
-                TASK_VIEW_SELECT + " WHERE t.task_id = %s",
-                (task_id,), fetch="fetchone"
+                TASK_VIEW_SELECT + " WHERE t.case_uuid = " + TASK_CASE_SQL + " AND t.task_id = %s::uuid",
+                (task_id, task_id), fetch="fetchone"
             )
 
             if not row:
                 return None
 
-            return OsirDbTaskModel.model_validate(_decode_result_trace(dict(row)))
+            return OsirDbTaskModel.model_validate(self.load_traces([_decode_result_trace(dict(row))])[0])
         except Exception as e:
             logger.error(f"Error fetching task {task_id}: {e}")
             raise
     
+    def load_traces(self, rows: List[dict]) -> List[dict]:
+        """
+            Overlays the traces stored in osir_task_traces (see OsirDbTaskTrace)
+            on task rows, whose result only holds a summary of the trace.
+        """
+        traces = self.db.task_trace.get((row["case_uuid"], row["task_id"]) for row in rows)
+        for row in rows:
+            trace = traces.get(str(row["task_id"]))
+            if trace:
+                row["trace"] = trace
+        return rows
+
     def get_by_output(self, output: str) -> OsirDbTaskModel:
         """
             Retrieves a single task's details by its output.
@@ -311,7 +1128,7 @@ class OsirDbTask:
             )
             if not row:
                 return None
-            return OsirDbTaskModel.model_validate(_decode_result_trace(dict(row)))
+            return OsirDbTaskModel.model_validate(self.load_traces([_decode_result_trace(dict(row))])[0])
         except Exception as e:
             logger.error(f"Error fetching task by output {output}: {e}")
             raise
@@ -323,7 +1140,9 @@ class OsirDbTask:
         exclude_status: Optional[Union[str, List[str]]] = None
     ) -> List[OsirDbTaskModel]:
         """
-        Lists tasks based on filtering criteria such as case UUID or status.
+        Lists the 200 latest tasks based on filtering criteria such as case UUID or status.
+
+            Tasks are returned without trace (see page).
 
             Args:
                 case_uuid (str, optional): Filter tasks by a specific case UUID.
@@ -331,49 +1150,116 @@ class OsirDbTask:
                 exclude_status (Union[str, List[str]], optional): Exclude tasks with these statuses.
 
             Returns:
-                list: A list of dictionaries, each representing a task.
+                list: A list of OsirDbTaskModel, newest first.
 
             Raises:
                 Exception: If the database query fails.
         """
-        try:
-            def to_list(value):
-                return [value] if isinstance(value, str) else value
-
-            if processing_status:
-                processing_status = to_list(processing_status)
-            if exclude_status:
-                exclude_status = to_list(exclude_status)
-
-            query = f"SELECT * FROM ({TASK_VIEW_SELECT}) v"
-            conditions = []
-            params = []
+        return self.page(
+            case_uuid=case_uuid,
+            processing_status=processing_status,
+            exclude_status=exclude_status,
+            limit=200
+        ).tasks
+
+    def page(
+        self,
+        case_uuid: Optional[str] = None,
+        handler_id: Optional[str] = None,
+        module: Optional[Union[str, List[str]]] = None,
+        processing_status: Optional[Union[str, List[str]]] = None,
+        exclude_status: Optional[Union[str, List[str]]] = None,
+        agent: Optional[str] = None,
+        input_contains: Optional[str] = None,
+        since: Optional[Union[str, datetime]] = None,
+        until: Optional[Union[str, datetime]] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> OsirDbTaskPageModel:
+        """
+            Returns a page of tasks, newest first, with keyset pagination: the
+            cursor holds the (timestamp, task_id) of the last task returned and
+            the next page starts right after it, so any page costs the same
+            whatever its depth. Rows carry no trace: it is only read when a
+            single task is opened (get).
 
-            if case_uuid:
-                conditions.append("v.case_uuid = %s")
-                params.append(case_uuid)
+            Args:
+                case_uuid (str, optional): Tasks of this case (reads its partition only).
+                handler_id (str, optional): Tasks of this handler.
+                module (Union[str, List[str]], optional): Tasks of these modules.
+                processing_status (Union[str, List[str]], optional): Include only tasks with these statuses.
+                exclude_status (Union[str, List[str]], optional): Exclude tasks with these statuses.
+                agent (str, optional): Tasks run by this agent.
+                input_contains (str, optional): Tasks whose input contains this string.
+                since (Union[str, datetime], optional): Tasks created at or after this time.
+                until (Union[str, datetime], optional): Tasks created before this time.
+                cursor (str, optional): next_cursor of the previous page.
+                limit (int): Page size, at most TASK_PAGE_MAX.
 
-            if processing_status:
-                placeholders = ", ".join(["%s"] * len(processing_status))
-                conditions.append(f"v.processing_status IN ({placeholders})")
-                params.extend(processing_status)
+            Returns:
+                OsirDbTaskPageModel: The tasks and the cursor of the next page.
 
-            if exclude_status:
-                placeholders = ", ".join(["%s"] * len(exclude_status))
-                conditions.append(f"v.processing_status NOT IN ({placeholders})")
-                params.extend(exclude_status)
+            Raises:
+                ValueError: If the cursor is malformed.
+                Exception: If the database query fails.
+        """
+        def to_list(value):
+            return [value] if isinstance(value, str) else list(value)
 
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
+        limit = max(1, min(int(limit), TASK_PAGE_MAX))
+        conditions = []
+        params = []
 
-            query += " ORDER BY v.timestamp DESC LIMIT 200"
-            rows = self.db.execute_query(query, params, fetch="fetchall")
+        if case_uuid:
+            conditions.append("v.case_uuid = %s::uuid")
+            params.append(str(case_uuid))
+        if handler_id:
+            conditions.append("v.handler_id = %s::uuid")
+            params.append(str(handler_id))
+        if module:
+            conditions.append("v.module = ANY(%s)")
+            params.append(to_list(module))
+        if processing_status:
+            conditions.append("v.processing_status = ANY(%s)")
+            params.append(to_list(processing_status))
+        if exclude_status:
+            conditions.append("v.processing_status <> ALL(%s)")
+            params.append(to_list(exclude_status))
+        if agent:
+            conditions.append("v.agent = %s")
+            params.append(agent)
+        if input_contains:
+            conditions.append("strpos(v.input, %s) > 0")
+            params.append(input_contains)
+        if since:
+            conditions.append("v.timestamp >= %s::timestamptz")
+            params.append(since)
+        if until:
+            conditions.append("v.timestamp < %s::timestamptz")
+            params.append(until)
+        if cursor:
+            timestamp, task_id = decode_task_cursor(cursor)
+            conditions.append("(v.timestamp, v.task_id) < (%s::timestamptz, %s::uuid)")
+            params.extend([timestamp, task_id])
+
+        query = f"SELECT * FROM ({TASK_LIST_SELECT}) v"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY v.timestamp DESC, v.task_id DESC LIMIT %s"
+        params.append(limit + 1)
 
-            return [OsirDbTaskModel.model_validate(_decode_result_trace(dict(x))) for x in rows]
+        try:
+            rows = self.db.execute_query(query, params, fetch="fetchall") or []
         except Exception as e:
             logger.error(f"Error listing tasks: {e}")
             raise
 
+        tasks = [OsirDbTaskModel.model_validate(dict(row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_task_cursor(tasks[-1].timestamp, tasks[-1].task_id)
+        return OsirDbTaskPageModel(tasks=tasks, next_cursor=next_cursor)
+
     def set_runtime_info(self, task_id: str, agent: Optional[str] = None, output: Optional[str] = None) -> None:
         """
             Records runtime metadata that only the worker knows (the resolved
@@ -399,16 +1285,43 @@ class OsirDbTask:
         if not updates:
             return
 
-        params.append(task_id)
+        params += [task_id, task_id]
         try:
             self.db.execute_query(
-                f"UPDATE osir_tasks SET {', '.join(updates)} WHERE task_id = %s",
+                f"UPDATE osir_tasks SET {', '.join(updates)} "
+                f"WHERE case_uuid = {TASK_CASE_SQL} AND task_id = %s::uuid",
                 tuple(params)
             )
         except Exception as e:
             logger.error(f"Error setting runtime info for task {task_id}: {e}")
             raise
 
+    def set_runtime_info_bulk(self, rows: List[tuple]) -> None:
+        """
+            Records the runtime metadata of many tasks in a single round trip
+            (used by batched tasks, which resolve every input up front).
+
+            Args:
+                rows: list of tuples (task_id, agent, output)
+        """
+        if not rows:
+            return
+
+        try:
+            self.db.execute_values_query(
+                """
+                UPDATE osir_tasks AS t
+                SET agent = v.agent, output = v.output
+                FROM (VALUES %s) AS v (task_id, agent, output)
+                JOIN osir_task_cases k ON k.task_id = v.task_id::uuid
+                WHERE t.case_uuid = k.case_uuid AND t.task_id = k.task_id
+                """,
+                rows,
+            )
+        except Exception as e:
+            logger.error(f"Error setting runtime info for {len(rows)} task(s): {e}")
+            raise
+
     def check_input(self, case_uuid: str, input: str, exclude_task_id: Optional[str] = None) -> bool:
         """
             Checks if the input is already used by another active task.
@@ -440,13 +1353,14 @@ class OsirDbTask:
                     WITH current_task AS (
                         SELECT task_id, timestamp
                         FROM osir_tasks
-                        WHERE task_id = %s::uuid
+                        WHERE case_uuid = %s AND task_id = %s::uuid
                     )
                     SELECT COUNT(*) AS count
                     FROM osir_tasks t
                     JOIN celery_taskmeta m ON m.task_id = t.task_id::text
                     CROSS JOIN current_task ct
                     WHERE t.case_uuid = %s
+                      AND md5(t.input) = md5(%s)
                       AND t.input = %s
                       AND m.status IN ('STARTED', 'RETRY')
                       AND t.task_id <> ct.task_id
@@ -457,16 +1371,17 @@ class OsirDbTask:
                               AND t.task_id::text < ct.task_id::text
                           )
                       )
-                """, (exclude_task_id, case_uuid, input_str), fetch="fetchone")
+                """, (case_uuid, exclude_task_id, case_uuid, input_str, input_str), fetch="fetchone")
             else:
                 result = self.db.execute_query("""
                     SELECT COUNT(*) AS count
                     FROM osir_tasks t
                     JOIN celery_taskmeta m ON m.task_id = t.task_id::text
                     WHERE t.case_uuid = %s
+                      AND md5(t.input) = md5(%s)
                       AND t.input = %s
                       AND m.status IN ('STARTED', 'RETRY')
-                """, (case_uuid, input_str), fetch="fetchone")
+                """, (case_uuid, input_str, input_str), fetch="fetchone")
         except Exception as e:
             logger.error(f"Error checking active input usage: {e}")
             return False
@@ -476,10 +1391,85 @@ class OsirDbTask:
 
         return result["count"] > 0
 
+    def wait_for_input(self, case_uuid: str, input: str, exclude_task_id: Optional[str] = None, recheck_interval: float = 60.0) -> float:
+        """
+            Blocks until no older active task uses the same input (see check_input).
+
+            Instead of polling, the connection LISTENs on the input release
+            channel: the celery_taskmeta trigger notifies as soon as a task
+            reaches a final state, and the check is only re-run when the
+            released input is this one. recheck_interval is a safety net for
+            holders that die without Celery recording a final state.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                input (str): The input the task is about to use.
+                exclude_task_id (str, optional): Current task UUID (see check_input).
+                recheck_interval (float): Maximum time between two checks, in seconds.
+
+            Returns:
+                float: Time spent waiting, in seconds.
+        """
+        start = time.monotonic()
+        key = input_release_key(case_uuid, input)
+        listening = None
+
+        try:
+            while True:
+                conn = self.db._ensure_connection()
+                if conn is not None and conn is not listening:
+                    # LISTEN before checking, so a release happening right
+                    # after the check is not missed. Redone after a reconnect.
+                    self.db.execute_query(f"LISTEN {INPUT_RELEASED_CHANNEL}")
+                    conn = listening = self.db.conn
+                if conn is not None:
+                    conn.notifies.clear()
+
+                if not self.check_input(case_uuid, input, exclude_task_id=exclude_task_id):
+                    return time.monotonic() - start
+
+                logger.debug(f"Input {input} is used by another module. Waiting for its release...")
+                deadline = time.monotonic() + recheck_interval
+
+                while conn is not None and not any(n.payload == key for n in conn.notifies):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        if select.select([conn], [], [], remaining)[0]:
+                            conn.poll()
+                    except Exception as e:
+                        logger.warning(f"Input release listener lost: {e}")
+                        self.db._discard_connection()
+                        break
+                if conn is None:
+                    time.sleep(min(recheck_interval, 3))
+        finally:
+            if listening is not None and listening is self.db.conn:
+                try:
+                    self.db.execute_query(f"UNLISTEN {INPUT_RELEASED_CHANNEL}")
+                    listening.notifies.clear()
+                except Exception as e:
+                    logger.debug(f"Failed to UNLISTEN {INPUT_RELEASED_CHANNEL}: {e}")
+
+    def fold_counters(self) -> int:
+        """
+            Moves the pending counter deltas into the statistics rollup (see
+            create_stats_tables). Returns the number of deltas folded, 0 when
+            another process is folding.
+        """
+        try:
+            row = self.db.execute_query("SELECT osir_task_counters_fold() AS folded", fetch="fetchone")
+            return row["folded"] if row else 0
+        except Exception as e:
+            logger.error(f"Error folding task counters: {e}")
+            raise
+
     def stats(self, handler_id: Optional[str] = None, case_uuid: Optional[str] = None) -> dict:
         """
-            Aggregated task statistics for a handler or a whole case, computed
-            in SQL on the effective (celery-joined) statuses.
+            Aggregated task statistics for a handler or a whole case, read from
+            the rollup maintained by triggers (see create_stats_tables): the
+            cost depends on the number of handlers and modules, not of tasks.
 
             Args:
                 handler_id (str, optional): Scope to a single handler.
@@ -491,6 +1481,7 @@ class OsirDbTask:
                     total, by_status {status: count},
                     by_module {module: {status: count, total}},
                     done_last_min, failed_last_min,
+                    throughput [{minute, done, failed}] (last minutes, oldest first),
                     first_task_at, last_finished_at, progress_pct
                 }
         """
@@ -498,45 +1489,48 @@ class OsirDbTask:
             raise ValueError("stats() requires handler_id or case_uuid")
 
         if handler_id:
-            cond, params = "t.handler_id = %s::uuid", (str(handler_id),)
+            cond, params = "handler_id = %s::uuid", (str(handler_id),)
         else:
-            cond, params = "t.case_uuid = %s::uuid", (str(case_uuid),)
+            cond, params = "case_uuid = %s::uuid", (str(case_uuid),)
 
         all_statuses = ["task_created", "processing_started", "processing_done", "processing_failed"]
 
         try:
             rows = self.db.execute_query(f"""
-                SELECT t.module AS module, {STATUS_CASE_SQL} AS status, COUNT(*) AS count
-                FROM osir_tasks t
-                LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
-                WHERE {cond}
-                GROUP BY t.module, 2
+                SELECT module, status, SUM(count)::bigint AS count
+                FROM osir_task_counter_totals
+                WHERE {cond} AND count > 0
+                GROUP BY module, status
             """, params, fetch="fetchall")
 
-            extras = self.db.execute_query(f"""
+            # Timestamps are naive UTC (celery's date_done convention). The
+            # deltas not folded yet count as well.
+            timeline = self.db.execute_query(f"""
                 SELECT
-                    COUNT(*) FILTER (
-                        WHERE m.status = 'SUCCESS'
-                          AND m.date_done >= (now() AT TIME ZONE 'utc') - interval '60 seconds'
-                    ) AS done_last_min,
-                    COUNT(*) FILTER (
-                        WHERE m.status IN ('FAILURE', 'REVOKED')
-                          AND m.date_done >= (now() AT TIME ZONE 'utc') - interval '60 seconds'
-                    ) AS failed_last_min,
-                    -- t.timestamp is timestamptz, celery's date_done is a naive
-                    -- UTC timestamp: normalize everything to naive UTC so the
-                    -- duration math is correct regardless of server timezone.
-                    MIN(t.timestamp AT TIME ZONE 'utc') AS first_task_at,
-                    MAX(m.date_done) FILTER (
-                        WHERE m.status IN ('SUCCESS', 'FAILURE', 'REVOKED')
+                    (SELECT MIN(first_task_at) FROM osir_task_timeline WHERE {cond}) AS first_task_at,
+                    GREATEST(
+                        (SELECT MAX(last_finished_at) FROM osir_task_timeline WHERE {cond}),
+                        (SELECT MAX(finished_at) FROM osir_task_counter_deltas WHERE {cond})
                     ) AS last_finished_at,
-                    EXTRACT(EPOCH FROM (
-                        (now() AT TIME ZONE 'utc') - MIN(t.timestamp AT TIME ZONE 'utc')
-                    )) AS elapsed_seconds
-                FROM osir_tasks t
-                LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
-                WHERE {cond}
-            """, params, fetch="fetchone")
+                    now() AT TIME ZONE 'utc' AS now
+            """, params * 3, fetch="fetchone")
+
+            throughput = self.db.execute_query(f"""
+                SELECT minute, SUM(done)::bigint AS done, SUM(failed)::bigint AS failed
+                FROM (
+                    SELECT minute, done, failed
+                    FROM osir_task_throughput
+                    WHERE {cond}
+                    UNION ALL
+                    SELECT date_trunc('minute', finished_at),
+                           (status = 'processing_done')::int, (status = 'processing_failed')::int
+                    FROM osir_task_counter_deltas
+                    WHERE {cond} AND finished_at IS NOT NULL
+                ) r
+                WHERE minute > (now() AT TIME ZONE 'utc') - interval '{THROUGHPUT_RING_MINUTES} minutes'
+                GROUP BY minute
+                ORDER BY minute
+            """, params * 2, fetch="fetchall")
         except Exception as e:
             logger.error(f"Error computing task stats: {e}")
             raise
@@ -555,17 +1549,32 @@ class OsirDbTask:
         pending = by_status["task_created"] + by_status["processing_started"]
         running = total > 0 and pending > 0
 
-        first_task_at = extras["first_task_at"] if extras else None
-        last_finished_at = extras["last_finished_at"] if extras else None
+        first_task_at = timeline["first_task_at"] if timeline else None
+        last_finished_at = timeline["last_finished_at"] if timeline else None
+        now = timeline["now"] if timeline else None
+
+        # Tasks finished over the last 60 seconds: the current minute slot plus
+        # the share of the previous one still inside the window.
+        done_last_min = failed_last_min = 0.0
+        if now is not None:
+            current_minute = now.replace(second=0, microsecond=0)
+            previous_share = 1.0 - (now - current_minute).total_seconds() / 60.0
+            for row in throughput or []:
+                if row["minute"] == current_minute:
+                    done_last_min += row["done"]
+                    failed_last_min += row["failed"]
+                elif (current_minute - row["minute"]).total_seconds() == 60.0:
+                    done_last_min += row["done"] * previous_share
+                    failed_last_min += row["failed"] * previous_share
 
         # Duration of the run: while tasks are still pending/running it is the
         # elapsed time since the first task was created; once everything is
         # finished it is frozen at (last task finished - first task created).
         duration_seconds = None
-        if total:
+        if total and first_task_at is not None:
             if running:
-                duration_seconds = float(extras["elapsed_seconds"]) if extras and extras["elapsed_seconds"] is not None else None
-            elif first_task_at is not None and last_finished_at is not None:
+                duration_seconds = max((now - first_task_at).total_seconds(), 0.0)
+            elif last_finished_at is not None:
                 duration_seconds = max((last_finished_at - first_task_at).total_seconds(), 0.0)
 
         def _iso(value):
@@ -577,8 +1586,12 @@ class OsirDbTask:
             "total": total,
             "by_status": by_status,
             "by_module": by_module,
-            "done_last_min": extras["done_last_min"] if extras else 0,
-            "failed_last_min": extras["failed_last_min"] if extras else 0,
+            "done_last_min": round(done_last_min),
+            "failed_last_min": round(failed_last_min),
+            "throughput": [
+                {"minute": _iso(row["minute"]), "done": row["done"], "failed": row["failed"]}
+                for row in throughput or []
+            ],
             "first_task_at": _iso(first_task_at),
             "last_finished_at": _iso(last_finished_at),
             "running": running,
@@ -607,14 +1620,16 @@ class OsirDbTask:
                 raise ValueError("Au moins un paramètre (task_id, case_uuid ou handler_id) doit être fourni.")
 
             if task_id:
-                cond, params = "task_id = %s", (task_id,)
+                cond, params = f"case_uuid = {TASK_CASE_SQL} AND task_id = %s::uuid", (task_id, task_id)
                 log_msg = f"Tâche avec l'ID {task_id} supprimée."
             elif case_uuid:
-                cond, params = "case_uuid = %s", (case_uuid,)
-                log_msg = f"Tâches associées au cas {case_uuid} supprimées."
+                self._drop_case(case_uuid)
+                logger.debug(f"Tâches associées au cas {case_uuid} supprimées.")
+                return True
             else:
                 cond, params = "handler_id = %s", (handler_id,)
                 log_msg = f"Tâches associées au handler {handler_id} supprimées."
+                self.db.fair_lane.delete(handler_id=handler_id)
 
             # Purge the matching Celery result rows first (they reference
             # osir_tasks by task_id), then the task rows themselves.
@@ -624,6 +1639,20 @@ class OsirDbTask:
                     SELECT task_id::text FROM osir_tasks WHERE {cond}
                 )
             """, params)
+            self.db.execute_query(f"""
+                DELETE FROM osir_task_outputs
+                WHERE task_id IN (
+                    SELECT task_id FROM osir_tasks WHERE {cond}
+                )
+            """, params)
+            # Dedup keys first registered by these tasks: their inputs are
+            # pushed again on the next run instead of being skipped.
+            self.db.execute_query(f"""
+                DELETE FROM osir_dedup_index
+                WHERE (case_uuid, module, first_path) IN (
+                    SELECT case_uuid, module, input FROM osir_tasks WHERE {cond}
+                )
+            """, params)
             self.db.execute_query(f"DELETE FROM osir_tasks WHERE {cond}", params)
             logger.debug(log_msg)
 
@@ -635,3 +1664,36 @@ class OsirDbTask:
         except Exception as e:
             logger.error(f"Erreur lors de la suppression : {e}")
             raise
+
+    def _drop_case(self, case_uuid: str, batch_size: int = 10000):
+        """
+            Deletes every task of a case: its partitions of osir_tasks and
+            osir_task_outputs are dropped (see osir_case_drop) instead of
+            deleting the rows one by one. The dedup keys, cached hashes,
+            dedup counters and fair dispatch lane rows of the case are
+            deleted too.
+
+            celery_taskmeta is owned by the Celery result backend and is not
+            partitioned: the results of the case are deleted first, by
+            batches of task ids read from the case partition, so that no
+            single statement holds millions of row locks.
+        """
+        last_task_id = None
+        while True:
+            rows = self.db.execute_query("""
+                SELECT task_id::text AS task_id
+                FROM osir_tasks
+                WHERE case_uuid = %s AND (%s::uuid IS NULL OR task_id > %s::uuid)
+                ORDER BY task_id
+                LIMIT %s
+            """, (case_uuid, last_task_id, last_task_id, batch_size), fetch="fetchall")
+            if not rows:
+                break
+            task_ids = [row["task_id"] for row in rows]
+            self.db.execute_query("DELETE FROM celery_taskmeta WHERE task_id = ANY(%s)", (task_ids,))
+            last_task_id = task_ids[-1]
+
+        self.db.execute_query("SELECT osir_case_drop(%s::uuid)", (str(case_uuid),))
+        case_partitions_dropped(case_uuid)
+        self.db.dedup.delete(str(case_uuid))
+        self.db.fair_lane.delete(case_uuid=case_uuid)
@@ -0,0 +1,245 @@
+import json
+from typing import Iterable, List, Set, Tuple
+
+from osir_lib.logger import AppLogger
+from osir_service.postgres.OsirDbTask import case_partitions_created, case_partitions_sql
+
+logger = AppLogger().get_logger()
+
+
+class OsirDbTaskOutput:
+    """
+        Per-task output manifests: the files and directories a task wrote.
+
+        Agents add one row when a task ends (failed tasks too, with no entries),
+        the watchdog of the case reads the rows in created_at order and dispatches the
+        entries to the consumer modules right away instead of waiting for the
+        next scan of the case. A row also tells the watchdog that the producer
+        task is over, before Celery has stored its final state.
+    """
+
+    def __init__(self, db_osir):
+        self.db = db_osir
+
+    def create_table(self):
+        """
+            Creates the 'osir_task_outputs' table, LIST partitioned by case_uuid
+            like osir_tasks (see OsirDbTask.create_partition_functions). An
+            unpartitioned table of an older version is moved into case
+            partitions, keeping the manifest ids (the watchdog cursors).
+        """
+        try:
+            self.db.execute_query("""
+                DO $$
+                DECLARE
+                    c UUID;
+                BEGIN
+                    PERFORM pg_advisory_xact_lock(hashtext('osir_task_outputs'));
+                    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('osir_task_outputs')) = 'p' THEN
+                        RETURN;
+                    END IF;
+
+                    CREATE SEQUENCE IF NOT EXISTS osir_task_outputs_id_seq;
+                    IF to_regclass('osir_task_outputs') IS NOT NULL THEN
+                        LOCK TABLE osir_task_outputs IN ACCESS EXCLUSIVE MODE;
+                        ALTER TABLE osir_task_outputs RENAME TO osir_task_outputs_unpartitioned;
+                        ALTER SEQUENCE osir_task_outputs_id_seq OWNED BY NONE;
+                    END IF;
+
+                    CREATE TABLE osir_task_outputs (
+                        id BIGINT NOT NULL DEFAULT nextval('osir_task_outputs_id_seq'),
+                        case_uuid UUID NOT NULL,
+                        task_id UUID NOT NULL,
+                        module TEXT,
+                        succeeded BOOLEAN NOT NULL DEFAULT TRUE,
+                        truncated BOOLEAN NOT NULL DEFAULT FALSE,
+                        entries JSONB NOT NULL DEFAULT '[]'::jsonb,
+                        created_at TIMESTAMPTZ DEFAULT NOW()
+                    ) PARTITION BY LIST (case_uuid);
+                    CREATE TABLE osir_task_outputs_default PARTITION OF osir_task_outputs DEFAULT;
+                    ALTER SEQUENCE osir_task_outputs_id_seq OWNED BY osir_task_outputs.id;
+
+                    IF to_regclass('osir_task_outputs_unpartitioned') IS NOT NULL THEN
+                        FOR c IN SELECT DISTINCT case_uuid FROM osir_task_outputs_unpartitioned LOOP
+                            PERFORM osir_case_partition('osir_task_outputs', c);
+                        END LOOP;
+                        INSERT INTO osir_task_outputs
+                        SELECT id, case_uuid, task_id, module, succeeded, truncated, entries, created_at
+                        FROM osir_task_outputs_unpartitioned;
+                        DROP TABLE osir_task_outputs_unpartitioned;
+                    END IF;
+
+                    -- Also the (case_uuid, id) cursor index of the watchdog feed.
+                    ALTER TABLE osir_task_outputs ADD PRIMARY KEY (case_uuid, id);
+                END
+                $$
+            """)
+            self.db.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_osir_task_outputs_task "
+                "ON osir_task_outputs (task_id)"
+            )
+            self.db.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_osir_task_outputs_case_created "
+                "ON osir_task_outputs (case_uuid, created_at)"
+            )
+        except Exception as e:
+            logger.error(f"Error creating task output table: {e}")
+            raise
+
+    def add(self, rows: List[Tuple[str, str, str, bool, bool, list]]):
+        """
+            Stores the manifests of finished tasks.
+
+            Args:
+                rows (List[Tuple[str, str, str, bool, bool, list]]): (case_uuid, task_id, module,
+                    succeeded, truncated, entries), entries being [path, 'file' | 'directory'] pairs.
+        """
+        if not rows:
+            return
+        try:
+            self.db.execute_values_query(case_partitions_sql("osir_task_outputs", {row[0] for row in rows}) + """
+                INSERT INTO osir_task_outputs (case_uuid, task_id, module, succeeded, truncated, entries)
+                VALUES %s
+            """, [
+                (case_uuid, task_id, module, succeeded, truncated, json.dumps(entries))
+                for case_uuid, task_id, module, succeeded, truncated, entries in rows
+            ], template="(%s::uuid, %s::uuid, %s, %s, %s, %s::jsonb)")
+            case_partitions_created("osir_task_outputs", {row[0] for row in rows})
+        except Exception as e:
+            logger.error(f"Error storing task output manifests: {e}")
+
+    def now(self):
+        """
+            Returns the current time of the database, the start cursor of a feed.
+        """
+        row = self.db.execute_query("SELECT NOW() AS now", fetch="fetchone")
+        return row["now"]
+
+    def ids_since(self, case_uuid: str, since) -> list:
+        """
+            Returns the (id, created_at) of the manifests of a case created at or after since.
+        """
+        return self.db.execute_query("""
+            SELECT id, created_at
+            FROM osir_task_outputs
+            WHERE case_uuid = %s AND created_at >= %s
+        """, (case_uuid, since), fetch="fetchall") or []
+
+    def fetch_since(self, case_uuid: str, since, seen_ids: Iterable[int] = (), limit: int = 1000) -> list:
+        """
+            Returns the manifests of a case created at or after since, oldest first.
+
+            created_at is the start of the inserting transaction, so rows can
+            commit out of created_at (and id) order: readers go back by an
+            overlap window and pass the ids they already read.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                since (datetime): Lower bound of created_at.
+                seen_ids (Iterable[int]): Ids of the manifests already read, skipped.
+                limit (int): Maximum number of manifests returned.
+
+            Returns:
+                list: Rows with id, task_id, module, succeeded, truncated, entries and created_at.
+        """
+        return self.db.execute_query("""
+            SELECT id, task_id, module, succeeded, truncated, entries, created_at
+            FROM osir_task_outputs
+            WHERE case_uuid = %s AND created_at >= %s AND NOT (id = ANY(%s::bigint[]))
+            ORDER BY created_at, id
+            LIMIT %s
+        """, (case_uuid, since, list(seen_ids), limit), fetch="fetchall") or []
+
+    def purge(self, case_uuid: str, retention_hours: float) -> int:
+        """
+            Deletes the manifests of a case older than retention_hours.
+
+            A manifest is only deleted once its task has a final state
+            elsewhere (Celery result or processing status) or no longer
+            exists, as pending_modules/pending_tasks count a task with a
+            manifest as over.
+
+            Returns:
+                int: Number of manifests deleted.
+        """
+        rows = self.db.execute_query("""
+            DELETE FROM osir_task_outputs o
+            WHERE o.case_uuid = %s
+              AND o.created_at < NOW() - make_interval(secs => %s)
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM osir_tasks t
+                  LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
+                  WHERE t.case_uuid = o.case_uuid
+                    AND t.task_id = o.task_id
+                    AND COALESCE(m.status, 'PENDING') NOT IN ('SUCCESS', 'FAILURE', 'REVOKED')
+                    AND NOT (
+                        m.status IS NULL
+                        AND t.processing_status IN ('processing_done', 'processing_failed')
+                    )
+              )
+            RETURNING o.id
+        """, (case_uuid, float(retention_hours) * 3600), fetch="fetchall") or []
+        return len(rows)
+
+    def pending_modules(self, case_uuid: str, modules: Iterable[str]) -> Set[str]:
+        """
+            Returns the modules that still have a task in a non-terminal state for a case.
+
+            A task with a manifest is over, even if Celery has not stored its
+            final state yet.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                modules (Iterable[str]): Modules to check.
+        """
+        modules = list(modules)
+        if not modules:
+            return set()
+        rows = self.db.execute_query("""
+            SELECT DISTINCT t.module
+            FROM osir_tasks t
+            LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
+            WHERE t.case_uuid = %s
+              AND t.module = ANY(%s)
+              AND COALESCE(m.status, 'PENDING') NOT IN ('SUCCESS', 'FAILURE', 'REVOKED')
+              AND NOT (
+                  m.status IS NULL
+                  AND t.processing_status IN ('processing_done', 'processing_failed')
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM osir_task_outputs o WHERE o.case_uuid = t.case_uuid AND o.task_id = t.task_id
+              )
+        """, (case_uuid, modules), fetch="fetchall") or []
+        return {row["module"] for row in rows}
+
+    def pending_tasks(self, case_uuid: str, task_ids: Iterable[str]) -> Set[str]:
+        """
+            Returns the tasks of a case, among task_ids, that are still in a non-terminal state.
+
+            Same rule as pending_modules. Tasks without an osir_tasks row
+            (deleted meanwhile) are not pending.
+
+            Args:
+                case_uuid (str): The UUID of the case.
+                task_ids (Iterable[str]): Task ids to check.
+        """
+        task_ids = list(task_ids)
+        if not task_ids:
+            return set()
+        rows = self.db.execute_query("""
+            SELECT t.task_id::text AS task_id
+            FROM osir_tasks t
+            LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
+            WHERE t.case_uuid = %s
+              AND t.task_id = ANY(%s::uuid[])
+              AND COALESCE(m.status, 'PENDING') NOT IN ('SUCCESS', 'FAILURE', 'REVOKED')
+              AND NOT (
+                  m.status IS NULL
+                  AND t.processing_status IN ('processing_done', 'processing_failed')
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM osir_task_outputs o WHERE o.case_uuid = t.case_uuid AND o.task_id = t.task_id
+              )
+        """, (case_uuid, task_ids), fetch="fetchall") or []
+        return {row["task_id"] for row in rows}
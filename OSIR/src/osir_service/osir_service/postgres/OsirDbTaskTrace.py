@@ -0,0 +1,146 @@
+import json
+import zlib
+from typing import Dict, Iterable, List, Tuple
+
+from osir_lib.logger import AppLogger
+from osir_service.postgres.OsirDbTask import case_partitions_created, case_partitions_sql
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback, traces stay readable by any process
+    zstandard = None
+
+logger = AppLogger().get_logger()
+
+
+def compress_trace(trace: dict) -> Tuple[str, int, bytes]:
+    """Returns (codec, raw size, compressed bytes) of a module trace."""
+    raw = json.dumps(trace, ensure_ascii=False).encode("utf-8", "surrogateescape")
+    if zstandard is not None:
+        return "zstd", len(raw), zstandard.ZstdCompressor(level=3).compress(raw)
+    return "zlib", len(raw), zlib.compress(raw, 6)
+
+
+def decompress_trace(codec: str, data: bytes) -> dict:
+    """
+        Returns the module trace of a stored row.
+
+        Raises:
+            ValueError: If the codec is unknown or unavailable in this process.
+    """
+    data = bytes(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd trace but the zstandard package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    else:
+        raise ValueError(f"Unknown trace codec: {codec}")
+    return json.loads(raw.decode("utf-8", "surrogateescape"))
+
+
+class OsirDbTaskTrace:
+    """
+        Module traces (captured logs and timings) of the tasks, compressed.
+
+        Agents add one row when a task ends and only return a summary of the
+        trace as the Celery result, so celery_taskmeta, joined by every task
+        and stats query, stays small whatever the modules log. Rows are only
+        appended (a restarted task adds a new one, the latest wins) and only
+        read when a single task, or the logs of a handler, are opened.
+    """
+
+    def __init__(self, db_osir):
+        self.db = db_osir
+
+    def create_table(self):
+        """
+            Creates the 'osir_task_traces' table, LIST partitioned by case_uuid
+            like osir_tasks (see OsirDbTask.create_partition_functions).
+        """
+        try:
+            self.db.execute_query("""
+                DO $$
+                BEGIN
+                    PERFORM pg_advisory_xact_lock(hashtext('osir_task_traces'));
+                    IF to_regclass('osir_task_traces') IS NOT NULL THEN
+                        RETURN;
+                    END IF;
+
+                    CREATE TABLE osir_task_traces (
+                        id BIGSERIAL,
+                        case_uuid UUID NOT NULL,
+                        task_id UUID NOT NULL,
+                        codec TEXT NOT NULL,
+                        raw_size INTEGER NOT NULL,
+                        data BYTEA NOT NULL,
+                        created_at TIMESTAMPTZ DEFAULT NOW(),
+                        PRIMARY KEY (case_uuid, id)
+                    ) PARTITION BY LIST (case_uuid);
+                    CREATE TABLE osir_task_traces_default PARTITION OF osir_task_traces DEFAULT;
+                END
+                $$
+            """)
+            self.db.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_osir_task_traces_task "
+                "ON osir_task_traces (task_id, id DESC)"
+            )
+        except Exception as e:
+            logger.error(f"Error creating task trace table: {e}")
+            raise
+
+    def add(self, rows: List[Tuple[str, str, dict]]):
+        """
+            Stores the traces of finished tasks.
+
+            Args:
+                rows (List[Tuple[str, str, dict]]): (case_uuid, task_id, trace).
+
+            Raises:
+                Exception: If the insert fails (the caller keeps the trace in the result).
+        """
+        if not rows:
+            return
+        values = []
+        for case_uuid, task_id, trace in rows:
+            codec, raw_size, data = compress_trace(trace)
+            values.append((str(case_uuid), str(task_id), codec, raw_size, data))
+        try:
+            self.db.execute_values_query(case_partitions_sql("osir_task_traces", {row[0] for row in values}) + """
+                INSERT INTO osir_task_traces (case_uuid, task_id, codec, raw_size, data)
+                VALUES %s
+            """, values, template="(%s::uuid, %s::uuid, %s, %s, %s)")
+            case_partitions_created("osir_task_traces", {row[0] for row in values})
+        except Exception as e:
+            logger.error(f"Error storing task traces: {e}")
+            raise
+
+    def get(self, tasks: Iterable[Tuple[str, str]]) -> Dict[str, dict]:
+        """
+            Returns the latest stored trace of tasks.
+
+            Args:
+                tasks (Iterable[Tuple[str, str]]): (case_uuid, task_id) of the tasks,
+                    the cases restricting the read to their partitions.
+
+            Returns:
+                dict: task_id -> trace, for the tasks with a stored trace.
+        """
+        tasks = [(str(case_uuid), str(task_id)) for case_uuid, task_id in tasks]
+        if not tasks:
+            return {}
+        rows = self.db.execute_query("""
+            SELECT DISTINCT ON (task_id) task_id::text AS task_id, codec, data
+            FROM osir_task_traces
+            WHERE case_uuid = ANY(%s::uuid[]) AND task_id = ANY(%s::uuid[])
+            ORDER BY task_id, id DESC
+        """, (sorted({case for case, _ in tasks}), [task_id for _, task_id in tasks]), fetch="fetchall") or []
+
+        traces = {}
+        for row in rows:
+            try:
+                traces[row["task_id"]] = decompress_trace(row["codec"], row["data"])
+            except Exception as e:
+                logger.warning(f"Could not read the trace of task {row['task_id']}: {e}")
+        return traces
@@ -2,7 +2,7 @@ from pydantic import BaseModel
 from uuid import UUID
 import re
 from datetime import datetime
-from typing import Literal, Dict, Any, Optional
+from typing import Literal, Dict, Any, List, Optional
 from osir_service.postgres.model.OsirDbStatusModel import OsirDbStatusModel
 
 class OsirDbTaskModel(BaseModel):
@@ -38,4 +38,10 @@ class OsirDbTaskModel(BaseModel):
                     "msg":   f"{match.group(3)} {match.group(4).strip()} {match.group(5).strip()}",
                 })
 
-        return parsed
\ No newline at end of file
+        return parsed
+
+
+class OsirDbTaskPageModel(BaseModel):
+    """A page of tasks (without trace), newest first, and the cursor of the next page (None on the last page)."""
+    tasks: List[OsirDbTaskModel] = []
+    next_cursor: Optional[str] = None
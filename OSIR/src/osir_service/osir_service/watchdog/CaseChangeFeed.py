@@ -0,0 +1,279 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger(__name__).get_logger()
+
+
+# inotify(7) constants (linux/inotify.h).
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 1 << 20
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class CaseChangeFeed:
+    """Kernel-driven change feed for a case tree, built on Linux inotify.
+
+    Every directory of the case gets a watch. Created or moved-in entries are
+    collected as (path, 'file' | 'directory') tuples, the same shape as
+    CaseSnapshot entries, so the monitor loop can dispatch them without
+    walking the whole tree.
+
+    The feed is not exhaustive: whenever events may have been lost (kernel
+    queue overflow, local buffer cap, directory moved inside the tree)
+    consume_overflow() returns True and the caller must fall back to a full
+    CaseSnapshot.scan_directory(). If watches cannot be placed at all
+    (fs.inotify.max_user_watches reached, no inotify support) start()
+    returns False and the caller keeps periodic scans.
+    """
+
+    def __init__(self, case_path, max_pending: int = None):
+        self.case_path = str(case_path)
+        self.max_pending = max_pending or int(os.getenv("OSIR_WATCHDOG_MAX_PENDING_EVENTS", "1000000"))
+        self.degraded = False
+
+        self._libc = None
+        self._fd = -1
+        self._wd_to_path: dict[int, str] = {}
+        self._changes: set = set()
+        self._overflow = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, watch_tree: bool = True) -> bool:
+        """Create the inotify instance, watch the whole tree and start the reader thread.
+
+        Without watch_tree, no directory is watched yet: the caller walks the
+        tree itself and calls watch_directory() on every directory, before
+        listing it (see CaseSnapshot.scan_directory(on_directory=...)).
+
+        Returns False when inotify is unavailable or the tree could not be fully watched.
+        """
+        self._libc = _load_libc()
+        if self._libc is None:
+            logger.warning("inotify is not available, falling back to periodic case scans")
+            return False
+
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            logger.warning(f"inotify_init1 failed ({os.strerror(err)}), falling back to periodic case scans")
+            return False
+        self._fd = fd
+
+        # Entries found while placing the initial watches are already covered
+        # by the caller's first full scan.
+        if watch_tree:
+            self._watch_tree(self.case_path, emit=False)
+        if self.degraded:
+            self.close()
+            return False
+
+        self._thread = threading.Thread(target=self._read_loop, name="osir-inotify", daemon=True)
+        self._thread.start()
+        logger.debug(f"inotify change feed started on {self.case_path} ({len(self._wd_to_path)} watches)")
+        return True
+
+    def drain(self) -> set:
+        """Return and clear the entries created since the previous drain."""
+        with self._lock:
+            changes, self._changes = self._changes, set()
+        return changes
+
+    def consume_overflow(self) -> bool:
+        """Return True (once) when events may have been lost since the last call."""
+        with self._lock:
+            overflow, self._overflow = self._overflow, False
+        return overflow
+
+    def watch_directory(self, path: str) -> bool:
+        """Watch a single directory of the tree. Sets degraded when the watch limit is reached."""
+        if self.degraded or self._fd < 0:
+            return False
+        return self._add_watch(str(path))
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._wd_to_path)
+
+    def close(self):
+        """Stop the reader thread and release the inotify descriptor (and every watch with it)."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        if self._fd >= 0:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = -1
+        self._wd_to_path.clear()
+
+    # ------------------------------------------------------------------
+    # Watch management
+    # ------------------------------------------------------------------
+
+    def _add_watch(self, path: str) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.warning(
+                    f"inotify watch limit reached while watching {path}. "
+                    f"Raise fs.inotify.max_user_watches; falling back to periodic case scans"
+                )
+                self.degraded = True
+            elif err not in (errno.ENOENT, errno.ENOTDIR):
+                logger.warning(f"Cannot watch directory: {path}. Error: {os.strerror(err)}")
+            return False
+        # Re-adding a known inode returns its existing wd: this also refreshes
+        # the path of directories that were moved inside the tree.
+        self._wd_to_path[wd] = path
+        return True
+
+    def _watch_tree(self, root: str, emit: bool = True):
+        """Watch root and every directory below it.
+
+        With emit set, entries already present are queued as changes: a
+        directory created mid-extraction is usually populated before its
+        IN_CREATE is read, and those children never raise events of their own.
+        """
+        stack = [root]
+        found = []
+
+        while stack and not self.degraded:
+            current = stack.pop()
+            if not self._add_watch(current):
+                continue
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                found.append((entry.path, 'directory'))
+                                stack.append(entry.path)
+                            elif entry.is_file():
+                                found.append((entry.path, 'file'))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+        if emit:
+            self._emit(found)
+
+    def _emit(self, entries):
+        with self._lock:
+            self._changes.update(entries)
+            if len(self._changes) > self.max_pending:
+                # Bounded memory: drop the buffer and let a full scan catch up.
+                logger.warning(
+                    f"inotify change buffer exceeded {self.max_pending} entries, requesting a full rescan"
+                )
+                self._changes.clear()
+                self._overflow = True
+
+    def _mark_overflow(self):
+        with self._lock:
+            self._overflow = True
+
+    # ------------------------------------------------------------------
+    # Event loop
+    # ------------------------------------------------------------------
+
+    def _read_loop(self):
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+
+        while not self._stop.is_set():
+            try:
+                if not poller.poll(500):
+                    continue
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                if self._stop.is_set():
+                    return
+                logger.warning(f"inotify read failed: {e}, requesting a full rescan")
+                self._mark_overflow()
+                continue
+
+            try:
+                self._handle_events(data)
+            except Exception as e:
+                logger.warning(f"inotify event handling failed: {e}, requesting a full rescan")
+                self._mark_overflow()
+
+    def _handle_events(self, data: bytes):
+        offset = 0
+        created = []
+        header_size = _EVENT_HEADER.size
+
+        while offset + header_size <= len(data):
+            wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + header_size: offset + header_size + name_len].rstrip(b"\0")
+            offset += header_size + name_len
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify queue overflowed, requesting a full rescan")
+                self._mark_overflow()
+                continue
+
+            if mask & IN_IGNORED:
+                self._wd_to_path.pop(wd, None)
+                continue
+
+            parent = self._wd_to_path.get(wd)
+            if parent is None or not name:
+                continue
+
+            path = os.path.join(parent, os.fsdecode(name))
+
+            if mask & IN_MOVED_FROM:
+                # Paths below a moved directory are stale until rewatched.
+                if mask & IN_ISDIR:
+                    self._mark_overflow()
+                continue
+
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                # Follow symlinks like CaseSnapshot does (entry.is_dir/is_file).
+                if os.path.isdir(path):
+                    created.append((path, 'directory'))
+                    self._watch_tree(path)
+                elif os.path.isfile(path):
+                    created.append((path, 'file'))
+
+        if created:
+            self._emit(created)
@@ -0,0 +1,134 @@
+import os
+import re
+from pathlib import Path
+
+from osir_lib.core.OsirUtils import remove_placeholders
+from osir_lib.core.model.OsirModuleModel import OsirModuleModel
+from osir_lib.logger import AppLogger
+
+logger = AppLogger(__name__).get_logger()
+
+_PLACEHOLDER = re.compile(r'\{[^}]+\}')
+
+
+class ModuleDag:
+    """Producer/consumer graph of the modules of a profile.
+
+    Built from the module definitions only:
+      - a producer is a module with an output; its output root comes from the
+        output template ('{case_path}/...' output_dir or <case>/<module>);
+      - a consumer depends on a producer when its input can match what the
+        producer writes: the input names the producer (path or pattern
+        mentioning its output root), the input pattern matches the output_file
+        template of a single_file producer, or the producer writes arbitrary
+        files (multiple_files) the input patterns may select. A '{case_path}'
+        directory input depends on every producer.
+
+    The watchdog uses it to decide when a directory is complete: no upstream
+    producer writing under it still has a pending task.
+    """
+
+    def __init__(self, case_path, module_instances: list[OsirModuleModel]):
+        self.case_path = os.path.abspath(str(case_path))
+        self.output_roots: dict[str, list[str]] = {}
+        self.upstream: dict[str, set[str]] = {}
+
+        for module in module_instances:
+            if module.output is None or module.output.type in (None, 'None'):
+                continue
+            roots = [os.path.join(self.case_path, module.module_name)]
+            output_dir = module.output.output_dir
+            if output_dir and '{case_path}' in output_dir:
+                # Fixed part of the template: everything before the first
+                # placeholder left once {case_path} is resolved.
+                resolved = output_dir.replace('{case_path}', self.case_path)
+                placeholder = _PLACEHOLDER.search(resolved)
+                if placeholder:
+                    resolved = resolved[:placeholder.start()]
+                    if not resolved.endswith('/'):
+                        resolved = os.path.dirname(resolved)
+                roots.append(os.path.abspath(resolved))
+            self.output_roots[module.module_name] = roots
+
+        for module in module_instances:
+            self.upstream[module.module_name] = {
+                producer.module_name
+                for producer in module_instances
+                if producer.module_name != module.module_name
+                and producer.module_name in self.output_roots
+                and self._consumes(module, producer)
+            }
+
+        logger.debug(
+            "Module DAG: " + ("; ".join(
+                f"{', '.join(sorted(producers))} -> {consumer}"
+                for consumer, producers in sorted(self.upstream.items()) if producers
+            ) or "no dependency")
+        )
+
+    @property
+    def producers(self) -> list[str]:
+        return list(self.output_roots)
+
+    def producers_under(self, path: str, consumer: str) -> set[str]:
+        """Upstream producers of `consumer` that may still write below `path`."""
+        path = os.path.abspath(path)
+        producers = set()
+        for producer in self.upstream.get(consumer, ()):
+            for root in self.output_roots[producer]:
+                if self._overlaps(path, root):
+                    producers.add(producer)
+                    break
+        return producers
+
+    @staticmethod
+    def _overlaps(path: str, root: str) -> bool:
+        try:
+            common = os.path.commonpath([path, root])
+        except ValueError:
+            return False
+        return common == path or common == root
+
+    def _consumes(self, consumer: OsirModuleModel, producer: OsirModuleModel) -> bool:
+        consumer_input = consumer.input
+        producer_output = producer.output
+        name = producer.module_name.lower()
+
+        if consumer_input.path and consumer_input.path.strip().rstrip('/') == '{case_path}':
+            return True
+
+        declared = [consumer_input.path or '', consumer_input.name or ''] + list(consumer_input.paths or [])
+        if any(name in text.lower() for text in declared if text):
+            return True
+
+        if producer_output.type == 'multiple_files':
+            return True
+
+        if not producer_output.output_file:
+            return False
+
+        # Probe path built from the single_file output template.
+        probe = os.path.join(
+            self.output_roots[producer.module_name][-1],
+            remove_placeholders(producer_output.output_file.replace('{module}', producer.module_name)),
+        ).replace('\\', '/')
+        probe_name = os.path.basename(probe)
+
+        for pattern in consumer_input.paths or []:
+            pattern = pattern.replace('{case_path}', self.case_path)
+            if pattern.startswith(('r"', "r'")):
+                pattern = pattern[2:-1]
+            elif not any(c in pattern for c in ['^', '$', '(', '|']):
+                pattern = re.escape(Path(pattern).suffix or pattern) + '$'
+            try:
+                if re.search(pattern, probe):
+                    return True
+            except re.error:
+                return True
+
+        if consumer_input.name:
+            try:
+                return re.search(consumer_input.name, probe_name) is not None
+            except re.error:
+                return True
+        return False
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from datetime import timedelta
+
+from osir_lib.logger import AppLogger
+from osir_service.postgres.OsirDb import OsirDb
+
+logger = AppLogger(__name__).get_logger()
+
+
+class TaskOutputFeed:
+    """Feed of the output manifests stored by agents for a case (see OsirDbTaskOutput).
+
+    A reader thread polls osir_task_outputs every OSIR_WATCHDOG_OUTPUT_POLL
+    seconds and collects the manifest entries as (path, 'file' | 'directory')
+    tuples, the same shape as CaseChangeFeed entries, with paths mapped onto
+    the watchdog view of the case. wait() returns as soon as a manifest
+    arrives, so the monitor loop reacts to task completions instead of
+    sleeping for its whole interval.
+
+    Manifests only cover what agents could list: a truncated manifest (or a
+    failed read) makes consume_overflow() return True once, and the caller
+    falls back to a full scan.
+
+    The cursor is the created_at of the manifests: every read goes back by
+    OSIR_WATCHDOG_OUTPUT_OVERLAP seconds, so rows committed out of order by
+    concurrent agents are still read, and skips the ids already read in that
+    window.
+
+    The ids of the finished tasks are kept apart for the task window of the
+    handler (see finished_tasks).
+
+    Manifests older than OSIR_TASK_OUTPUT_RETENTION_HOURS are purged about
+    every hour (0 keeps them).
+    """
+
+    def __init__(self, case_uuid, case_path, case_path_norm):
+        self.case_uuid = str(case_uuid)
+        self.case_path = os.path.abspath(str(case_path))
+        self.case_path_norm = str(case_path_norm).rstrip('/')
+        self.poll_interval = float(os.getenv("OSIR_WATCHDOG_OUTPUT_POLL", "1.0"))
+        self.overlap = timedelta(seconds=float(os.getenv("OSIR_WATCHDOG_OUTPUT_OVERLAP", "30")))
+        self.retention_hours = float(os.getenv("OSIR_TASK_OUTPUT_RETENTION_HOURS", "24"))
+        self.purge_interval = 3600.0
+
+        self._since = None
+        self._seen: dict = {}
+        self._purged_at = 0.0
+        self._entries: set = set()
+        self._completed: list[str] = []
+        self._finished: list[str] = []
+        self._overflow = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> bool:
+        """Skip the manifests already stored (covered by the first full scan) and start the reader thread."""
+        try:
+            with OsirDb() as db:
+                self._since = db.task_output.now()
+                self._seen = {
+                    int(row["id"]): row["created_at"]
+                    for row in db.task_output.ids_since(self.case_uuid, self._since - self.overlap)
+                }
+        except Exception as e:
+            logger.warning(f"Task output feed unavailable ({e}), consumers rely on case scans only")
+            return False
+
+        self._thread = threading.Thread(target=self._read_loop, name="osir-task-outputs", daemon=True)
+        self._thread.start()
+        return True
+
+    def drain(self) -> tuple[set, list]:
+        """Return and clear the entries and the producer modules of the tasks finished since the previous drain."""
+        with self._lock:
+            entries, self._entries = self._entries, set()
+            completed, self._completed = self._completed, []
+            self._wake.clear()
+        return entries, completed
+
+    def finished_tasks(self) -> list[str]:
+        """Return and clear the ids of the tasks whose manifest was read since the previous call."""
+        with self._lock:
+            finished, self._finished = self._finished, []
+        return finished
+
+    def consume_overflow(self) -> bool:
+        """Return True (once) when a manifest could not be used as is."""
+        with self._lock:
+            overflow, self._overflow = self._overflow, False
+        return overflow
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a manifest arrives or timeout expires."""
+        return self._wake.wait(timeout)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _read_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                with OsirDb() as db:
+                    rows = db.task_output.fetch_since(self.case_uuid, self._since - self.overlap, self._seen)
+                    self._purge(db)
+            except Exception as e:
+                logger.warning(f"Reading task output manifests failed: {e}, requesting a full rescan")
+                with self._lock:
+                    self._overflow = True
+                continue
+
+            if rows:
+                self._collect(rows)
+
+    def _purge(self, db):
+        if self.retention_hours <= 0 or time.monotonic() - self._purged_at < self.purge_interval:
+            return
+        self._purged_at = time.monotonic()
+        try:
+            purged = db.task_output.purge(self.case_uuid, self.retention_hours)
+        except Exception as e:
+            logger.warning(f"Purging task output manifests failed: {e}")
+            return
+        if purged:
+            logger.debug(f"{purged} task output manifest(s) older than {self.retention_hours}h purged")
+
+    def _collect(self, rows):
+        entries = []
+        completed = []
+        finished = []
+        overflow = False
+
+        for row in rows:
+            self._seen[int(row["id"])] = row["created_at"]
+            self._since = max(self._since, row["created_at"])
+            completed.append(row["module"])
+            finished.append(str(row["task_id"]))
+            if row["truncated"]:
+                overflow = True
+            for path, entry_type in row["entries"] or []:
+                local_path = self._to_local(path)
+                if local_path is not None:
+                    entries.append((local_path, entry_type))
+
+        horizon = self._since - self.overlap
+        self._seen = {row_id: created_at for row_id, created_at in self._seen.items() if created_at >= horizon}
+
+        with self._lock:
+            self._entries.update(entries)
+            self._completed.extend(completed)
+            self._finished.extend(finished)
+            self._overflow = self._overflow or overflow
+            self._wake.set()
+
+        logger.debug(f"{len(rows)} task output manifest(s) read: {len(entries)} entries")
+
+    def _to_local(self, path: str):
+        """Map a manifest path (agent view, under /OSIR/share) onto the case path watched here."""
+        if path == self.case_path_norm:
+            return self.case_path
+        if path.startswith(self.case_path_norm + '/'):
+            return self.case_path + path[len(self.case_path_norm):]
+        if path == self.case_path or path.startswith(self.case_path + os.sep):
+            return path
+        return None
@@ -0,0 +1,128 @@
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from collections import deque
+
+from osir_lib.logger import AppLogger
+
+logger = AppLogger(__name__).get_logger()
+
+# Record header: key index (u16), path length in bytes (u32).
+_RECORD = struct.Struct("<HI")
+
+
+class TaskSpillQueue:
+    """On-disk FIFO of the file matches of a handler waiting for task credit.
+
+    A record is the index of its key (the module name, kept in memory) and
+    the encoded path, about the size of the path itself, against several
+    hundred bytes for the (path, rule) tuple held in the pending buffer.
+    Records are appended to segment files of OSIR_WATCHDOG_SPILL_SEGMENT
+    records under OSIR_WATCHDOG_SPILL_DIR/<name> (default: the system temp
+    directory); a segment is deleted as soon as it has been read.
+
+    The queue only lives as long as the handler run: close() removes its
+    files, and a master restart starts over from the case scan like any
+    other lost in-memory state.
+    """
+
+    def __init__(self, name: str):
+        base_dir = os.getenv("OSIR_WATCHDOG_SPILL_DIR") or os.path.join(tempfile.gettempdir(), "osir_spill")
+        self.directory = os.path.join(base_dir, str(name))
+        self.segment_records = max(1, int(os.getenv("OSIR_WATCHDOG_SPILL_SEGMENT", "100000")))
+
+        self._keys: list[str] = []
+        self._key_index: dict[str, int] = {}
+        self._segments: deque[str] = deque()
+        self._sequence = 0
+        self._writer = None
+        self._writer_path = None
+        self._writer_records = 0
+        self._reader = None
+        self._length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def push(self, items) -> int:
+        """Append (key, path) items. Returns the number of items appended."""
+        count = 0
+        with self._lock:
+            for key, path in items:
+                index = self._key_index.get(key)
+                if index is None:
+                    index = self._key_index[key] = len(self._keys)
+                    self._keys.append(key)
+
+                if self._writer is None or self._writer_records >= self.segment_records:
+                    self._roll_segment()
+
+                data = os.fsencode(path)
+                self._writer.write(_RECORD.pack(index, len(data)))
+                self._writer.write(data)
+                self._writer_records += 1
+                count += 1
+            self._length += count
+        return count
+
+    def pop(self, count: int) -> list[tuple[str, str]]:
+        """Remove and return up to count (key, path) items, oldest first."""
+        items = []
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush()
+
+            while len(items) < count and self._length > 0:
+                if self._reader is None:
+                    self._reader = open(self._segments[0], "rb")
+
+                header = self._reader.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    self._drop_head_segment()
+                    continue
+
+                index, size = _RECORD.unpack(header)
+                items.append((self._keys[index], os.fsdecode(self._reader.read(size))))
+                self._length -= 1
+
+            if self._length == 0 and self._segments:
+                # Fully read: start the next push on a fresh segment.
+                self._drop_head_segment()
+        return items
+
+    def close(self):
+        """Drop the remaining items and remove the spill files."""
+        with self._lock:
+            for f in (self._reader, self._writer):
+                if f is not None:
+                    f.close()
+            self._reader = self._writer = self._writer_path = None
+            self._segments.clear()
+            self._length = 0
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _roll_segment(self):
+        if self._writer is not None:
+            self._writer.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self._sequence += 1
+        self._writer_path = os.path.join(self.directory, f"{self._sequence:08d}.spill")
+        self._writer = open(self._writer_path, "wb")
+        self._writer_records = 0
+        self._segments.append(self._writer_path)
+
+    def _drop_head_segment(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        path = self._segments.popleft()
+        if path == self._writer_path:
+            self._writer.close()
+            self._writer = self._writer_path = None
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not remove spill segment {path}: {e}")
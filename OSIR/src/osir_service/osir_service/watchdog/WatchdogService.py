@@ -1,7 +1,6 @@
 import re
 import time
 import os
-import json
 import threading
 import copy
 
@@ -20,7 +19,12 @@ from watchdog.events import DirCreatedEvent, FileCreatedEvent
 from watchdog.events import FileSystemEventHandler
 from osir_lib.core.OsirUtils import remove_placeholders
 from osir_service.orchestration.TaskService import TaskService
+from osir_service.watchdog.CaseChangeFeed import CaseChangeFeed
+from osir_service.watchdog.ModuleDag import ModuleDag
+from osir_service.watchdog.TaskOutputFeed import TaskOutputFeed
+from osir_service.watchdog.TaskSpillQueue import TaskSpillQueue
 from osir_service.postgres.OsirDb import OsirDb
+from osir_service.postgres.OsirDbSnapshot import SnapshotDelta, snapshot_dir_id
 from osir_lib.logger import AppLogger
 
 from collections import defaultdict
@@ -28,7 +32,11 @@ from collections import defaultdict
 logger = AppLogger(__name__).get_logger()
 
 
-HASH_DEDUP_ENABLED = False # manual switch to disable xxh3_128 hash of input files to detect duplicates
+# Switch for the xxh3_128 hash of input files to detect duplicates
+# (OSIR_HASH_DEDUP=1 to enable). Hashes are cached per (path, size, mtime)
+# and dedup keys are persisted per case, see OsirDbDedup.
+HASH_DEDUP_ENABLED = os.getenv("OSIR_HASH_DEDUP", "0") == "1"
+DEDUP_PREFIX_SIZE = 81920
 
 class _CompiledRule:
     """Pre-compiled module rule for O(1) hot-path dispatch."""
@@ -39,7 +47,7 @@ class _CompiledRule:
         'patterns',
         'ext_anchors', 'basename_anchors',
         'output_dir_pref', 'alt_output_dir_pref',
-        'task_name', 'queue', 'processor_os', 'base_dump',
+        'task_name', 'queue', 'processor_os', 'template_ref', 'batch_size',
     )
 
     def __init__(
@@ -57,7 +65,8 @@ class _CompiledRule:
         task_name=None,
         queue=None,
         processor_os=None,
-        base_dump=None,
+        template_ref=None,
+        batch_size=1,
     ):
         self.module = module
         self.module_name = module_name
@@ -83,7 +92,8 @@ class _CompiledRule:
         self.task_name = task_name
         self.queue = queue
         self.processor_os = processor_os
-        self.base_dump = base_dump
+        self.template_ref = template_ref
+        self.batch_size = batch_size
 
 
 class _LegacyRule:
@@ -128,8 +138,37 @@ class _LegacyRule:
         self.regex_has_pattern = bool(file_regex is not None and file_regex.pattern)
 
 
+class _DirState:
+    """Known state of one case directory."""
+    __slots__ = ('dir_id', 'mtime_ns', 'children', 'loaded')
+
+    def __init__(self, path, mtime_ns=None, children=None, loaded=True):
+        self.dir_id = snapshot_dir_id(path)
+        # None: unknown, the directory is re-listed on the next scan.
+        self.mtime_ns = mtime_ns
+        # child path -> 'file' | 'directory'. While not loaded, only the
+        # subdirectories known from the stored directory index are present.
+        self.children: dict[str, str] = children if children is not None else {}
+        self.loaded = loaded
+
+
 class CaseSnapshot:
-    """Iterative directory snapshot used for change detection between scan cycles."""
+    """Incremental directory snapshot used for change detection between scan cycles.
+
+    Each known directory keeps its st_mtime_ns and its direct children. A
+    directory mtime only changes when an entry is added, removed or renamed
+    directly inside it, so a rescan stats every known directory but only
+    re-lists the ones whose mtime moved: scan cost follows the amount of
+    change instead of the number of files. Directories modified less than
+    OSIR_SNAPSHOT_RACY_WINDOW seconds before they were listed keep no mtime
+    and are re-listed by the next scan, since a second change within the same
+    mtime tick would go unnoticed.
+
+    After scan_directory(), `added` and `removed` hold the entries that
+    appeared or disappeared since the previous scan (or since seed()).
+    Changes are also accumulated until pop_changes() so the stored snapshot
+    is updated with a delta instead of being rewritten.
+    """
 
     def __init__(self, case_path):
         # Normalize to str: os.scandir yields str paths, so the synthetic
@@ -138,34 +177,257 @@ class CaseSnapshot:
         # legacy dispatch ("'PosixPath' is not iterable"), and would also
         # mismatch entries persisted from previous runs.
         self.case_path = str(case_path)
-        self.entries: set = set()
+        self._case_path_stripped = self.case_path.rstrip(os.sep) or os.sep
+        self.added: set = set()
+        self.removed: set = set()
+
+        self._dirs: dict[str, _DirState] = {}
+        self._load_children = None
+        self._racy_window_ns = int(float(os.getenv("OSIR_SNAPSHOT_RACY_WINDOW", "2.0")) * 1_000_000_000)
+
+        # Pending delta for the stored snapshot. Until seeded, the stored
+        # snapshot (if any) is replaced as a whole.
+        self._reset = True
+        self._changed_paths: set = set()
+        self._dirty_dirs: set = set()
+        self._dropped_dirs: set = set()
+
+        self.listed_dirs = 0
+        self.pruned_dirs = 0
+
+    def _parent(self, path: str) -> str:
+        parent = os.path.dirname(path)
+        # Entries of a root given with a trailing separator are built by
+        # os.path.join(root, name) and do not dirname() back to the root.
+        if parent == self._case_path_stripped:
+            return self.case_path
+        return parent
+
+    def seed(self, dirs, load_children):
+        """Load the directory index persisted by a previous run.
+
+        Only directories are loaded up front. The stored children of a
+        directory are fetched through load_children(dir_id) -> [(name, is_dir)]
+        when that directory has to be re-listed, so resuming a handler never
+        materializes the whole stored snapshot.
+
+        Args:
+            dirs: Stored (dir_id, path, st_mtime_ns, child count) tuples.
+            load_children: Callable returning the stored children of a directory.
+        """
+        subdirs: dict[str, dict] = defaultdict(dict)
+        states: dict[str, _DirState] = {}
+
+        for _dir_id, path, mtime_ns, _child_count in dirs:
+            states[path] = _DirState(path, mtime_ns, loaded=False)
+            if path != self.case_path:
+                subdirs[self._parent(path)][path] = 'directory'
+
+        for path, state in states.items():
+            state.children = subdirs.get(path, {})
+
+        self._dirs = states
+        self._load_children = load_children
+        self._reset = False
+
+    def seed_entries(self, entries):
+        """Load a flat list of (path, entry_type) stored by previous versions.
+
+        Every entry is marked as changed so that the next store migrates it
+        to the compact format.
+        """
+        children: dict[str, dict] = defaultdict(dict)
+        dirs = {self.case_path}
+
+        for path, entry_type in entries:
+            path = str(path)
+            if path == self.case_path:
+                continue
+            children[self._parent(path)][path] = entry_type
+            self._changed_paths.add(path)
+            if entry_type == 'directory':
+                dirs.add(path)
+
+        for path in dirs:
+            self._dirs[path] = _DirState(path, None, children.get(path, {}))
+            self._dirty_dirs.add(path)
+        self._reset = True
+
+    def _ensure_loaded(self, path: str, state: _DirState):
+        if state.loaded:
+            return
+        if self._load_children is not None:
+            for name, is_dir in self._load_children(state.dir_id):
+                state.children[os.path.join(path, name)] = 'directory' if is_dir else 'file'
+        state.loaded = True
+
+    def scan_directory(self, on_directory=None):
+        """Rescan the tree, re-listing only directories whose mtime changed.
+
+        on_directory(path), when given, is called on every directory of the
+        tree (listed or not) before it is looked at: CaseChangeFeed places
+        its initial watches this way instead of walking the tree again.
+        """
+        added: set = set()
+        removed: set = set()
+        listed = pruned = 0
+        now_ns = time.time_ns()
+
+        if self.case_path not in self._dirs:
+            self._dirs[self.case_path] = _DirState(self.case_path)
+            self._dirty_dirs.add(self.case_path)
+            added.add((self.case_path, 'directory'))
 
-    def scan_directory(self):
-        """Scan the full directory tree iteratively and store as a set."""
-        entries: set = set()
-        entries.add((self.case_path, 'directory'))
         stack = [self.case_path]
 
         while stack:
             current = stack.pop()
+            state = self._dirs[current]
+            if on_directory is not None:
+                on_directory(current)
+
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError as e:
+                logger.warning(f"Cannot scan directory: {current}. Error: {e}")
+                continue
+
+            if state.mtime_ns is not None and state.mtime_ns == mtime_ns:
+                pruned += 1
+                stack.extend(path for path, entry_type in state.children.items() if entry_type == 'directory')
+                continue
+
+            fresh: dict[str, str] = {}
             try:
                 with os.scandir(current) as it:
                     for entry in it:
                         try:
                             if entry.is_dir():
-                                entries.add((entry.path, 'directory'))
-                                stack.append(entry.path)
+                                fresh[entry.path] = 'directory'
                             elif entry.is_file():
-                                entries.add((entry.path, 'file'))
+                                fresh[entry.path] = 'file'
                         except OSError as e:
                             logger.warning(f"Unreadable entry: {entry}. Error: {e}")
             except OSError as e:
                 logger.warning(f"Cannot scan directory: {current}. Error: {e}")
+                continue
+            listed += 1
+
+            self._ensure_loaded(current, state)
+            known = state.children
+            for path, entry_type in known.items():
+                if fresh.get(path) != entry_type:
+                    self._forget(path, entry_type, removed)
+
+            for path, entry_type in fresh.items():
+                if known.get(path) != entry_type:
+                    added.add((path, entry_type))
+                    self._changed_paths.add(path)
+                if entry_type == 'directory':
+                    if path not in self._dirs:
+                        self._dirs[path] = _DirState(path)
+                        self._dirty_dirs.add(path)
+                    stack.append(path)
+
+            self._dirty_dirs.add(current)
+            # An mtime within the racy window when the directory was listed
+            # may hide a later change in the same tick: it is not kept (nor
+            # stored), so the directory is listed again next time.
+            state.mtime_ns = mtime_ns if now_ns - mtime_ns > self._racy_window_ns else None
+            state.children = fresh
+
+        self.added = added
+        self.removed = removed
+        self.listed_dirs = listed
+        self.pruned_dirs = pruned
+
+    def _forget(self, path: str, entry_type: str, removed: set):
+        """Drop an entry, and the whole subtree of a directory, from the state."""
+        removed.add((path, entry_type))
+        self._changed_paths.add(path)
+        if entry_type != 'directory':
+            return
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            # Rows below a dropped directory are deleted by dir_id, loaded or not.
+            self._dropped_dirs.add(current)
+            self._dirty_dirs.discard(current)
+            state = self._dirs.pop(current, None)
+            if state is None:
+                continue
+            for child, child_type in state.children.items():
+                removed.add((child, child_type))
+                if child_type == 'directory':
+                    stack.append(child)
 
-        self.entries = entries
+    def record(self, entries) -> set:
+        """Register entries reported by a change feed and return the unknown ones.
 
-    def get_entries_set(self) -> set:
-        return self.entries
+        Parents keep their cached mtime, so the next scan re-lists them and
+        finds these children already known instead of reporting them again.
+        Entries whose parent is not known yet are left to the next scan.
+        """
+        new: set = set()
+        for path, entry_type in sorted(entries, key=lambda e: len(e[0])):
+            parent_path = self._parent(path)
+            parent = self._dirs.get(parent_path)
+            if parent is None:
+                continue
+            self._ensure_loaded(parent_path, parent)
+
+            previous_type = parent.children.get(path)
+            if previous_type == entry_type:
+                continue
+            if previous_type is not None:
+                self._forget(path, previous_type, set())
+
+            parent.children[path] = entry_type
+            self._changed_paths.add(path)
+            self._dirty_dirs.add(parent_path)
+            if entry_type == 'directory':
+                self._dirs[path] = _DirState(path)
+                self._dirty_dirs.add(path)
+
+            new.add((path, entry_type))
+        return new
+
+    def pop_changes(self) -> SnapshotDelta:
+        """Return the changes to apply to the stored snapshot and start a new delta."""
+        dropped_dir_ids = [] if self._reset else [snapshot_dir_id(path) for path in self._dropped_dirs]
+        deleted_entries = []
+        inserted_entries = []
+
+        for path in self._changed_paths:
+            parent = self._dirs.get(self._parent(path))
+            if parent is None:
+                continue
+            name = os.path.basename(path)
+            if not self._reset:
+                deleted_entries.append((parent.dir_id, name))
+            entry_type = parent.children.get(path)
+            if entry_type is not None:
+                inserted_entries.append((parent.dir_id, name, entry_type == 'directory'))
+
+        dirs = []
+        for path in self._dirty_dirs:
+            state = self._dirs.get(path)
+            if state is not None:
+                dirs.append((state.dir_id, path, state.mtime_ns, len(state.children)))
+
+        delta = SnapshotDelta(
+            reset=self._reset,
+            dirs=dirs,
+            dropped_dir_ids=dropped_dir_ids,
+            deleted_entries=deleted_entries,
+            inserted_entries=inserted_entries,
+        )
+
+        self._reset = False
+        self._changed_paths = set()
+        self._dirty_dirs = set()
+        self._dropped_dirs = set()
+        return delta
 
 
 class ModuleHandler(FileSystemEventHandler):
@@ -214,12 +476,31 @@ class ModuleHandler(FileSystemEventHandler):
         self._flush_futures: list = []
         self._flush_futures_lock = threading.Lock()
 
+        # Task window (credit based flow control):
+        # at most OSIR_WATCHDOG_TASK_WINDOW file tasks of this handler are
+        # outstanding (pushed and not finished yet). Matches beyond the
+        # credit left are spilled to a compact on-disk queue and released,
+        # oldest first, as tasks finish (manifests, checked against the task
+        # states every OSIR_WATCHDOG_WINDOW_REFRESH seconds). Hashing and
+        # dedup only run when a match is released. Directory and legacy rule
+        # tasks are not windowed. OSIR_WATCHDOG_TASK_WINDOW=0 disables it.
+        self._task_window = int(os.getenv("OSIR_WATCHDOG_TASK_WINDOW", "20000"))
+        self._window_refresh = float(os.getenv("OSIR_WATCHDOG_WINDOW_REFRESH", "30"))
+        self._window_checked_at = time.monotonic()
+        self._window_lock = threading.Lock()
+        self._outstanding_tasks: set[str] = set()
+        self._reserved_credit = 0
+        self._spill = TaskSpillQueue(self.handler_uuid) if self._task_window > 0 else None
+
         # Dedup cache:
         # key:
         #   (module_name, file_size, hash_mode, file_hash)
         # value:
         #   first file path seen with this same key
+        # In-run first level of the persistent per-case index (db.dedup).
+        # The persistent index is only consulted when not reprocessing.
         self._seen_prefix: dict[tuple, str] = {}
+        self._dedup_use_index = True
 
         # File stability gate:
         # Do not push file tasks as soon as a path appears in the case tree.
@@ -232,11 +513,44 @@ class ModuleHandler(FileSystemEventHandler):
         self._unstable_file_tasks: dict[tuple[str, str, str], tuple[str, object]] = {}
         self._unstable_lock = threading.Lock()
 
+        # Change feed:
+        # inotify events replace the per-iteration full tree walk. A full
+        # CaseSnapshot scan is still run on start, after a feed overflow,
+        # every OSIR_WATCHDOG_RESCAN_INTERVAL seconds and before exiting, as
+        # a consistency backstop. OSIR_WATCHDOG_INOTIFY=0 restores scan-only.
+        self._inotify_enabled = os.getenv("OSIR_WATCHDOG_INOTIFY", "1") != "0"
+        self._full_rescan_interval = float(os.getenv("OSIR_WATCHDOG_RESCAN_INTERVAL", "300"))
+
+        # Task state changes are appended as counter deltas by the workers;
+        # the running watchdogs fold them into the statistics rollup (see
+        # OsirDbTask.create_stats_tables), one of them at a time.
+        self._counters_fold_interval = float(os.getenv("OSIR_COUNTERS_FOLD_INTERVAL", "5"))
+
         self.active_timers: set = set()
         self.timers_lock = threading.Lock()
+        # path -> {module_name: module_instance} of the directories waiting
+        # for their idle timer.
+        self._idle_waiting: dict[str, dict] = {}
 
-        # Directory events deferred behind a hold_consumers barrier.
+        # Directory events deferred behind a hold_consumers barrier. Re-checked
+        # when tasks finish and at least every OSIR_WATCHDOG_BARRIER_POLL
+        # seconds, as producers may end without a manifest (crash, revoke).
         self._deferred: dict = {}
+        self._barrier_poll = float(os.getenv("OSIR_WATCHDOG_BARRIER_POLL", "10"))
+        self._barrier_checked_at = 0.0
+
+        # Producer/consumer scheduling:
+        # agents store the output manifest of every finished task; its entries
+        # are dispatched on the next loop iteration, which wakes up as soon
+        # as a manifest arrives. Files of a manifest still go through the
+        # stability gate (a task may list files a concurrent task of the same
+        # module is writing); directories skip the idle timer once no upstream
+        # producer (ModuleDag) can still write below them. Scans, stability
+        # windows and idle timers remain the fallback for everything else.
+        # OSIR_WATCHDOG_TASK_OUTPUTS=0 restores scan-only discovery.
+        self._task_outputs_enabled = os.getenv("OSIR_WATCHDOG_TASK_OUTPUTS", "1") != "0"
+        self._reported_dirs: set[str] = set()
+        self._pending_producers_cache: set[str] | None = None
 
         self._virtual_dir = (Path(case_path) / 'virtual').resolve()
         self._virtual_dir_str = os.path.abspath(str(Path(case_path) / 'virtual'))
@@ -251,6 +565,16 @@ class ModuleHandler(FileSystemEventHandler):
         self._legacy_dir_rules: list[_LegacyRule] = []
 
         self._compile_rules(case_path, module_instances)
+        # Spilled matches only keep the module name of their rule.
+        self._rules_by_module: dict[str, _CompiledRule] = {}
+        for rules in (
+            self._file_rules_unindexed,
+            *self._file_rules_by_ext.values(),
+            *self._file_rules_by_basename.values(),
+        ):
+            for rule in rules:
+                self._rules_by_module[rule.module_name] = rule
+        self._dag = ModuleDag(case_path, module_instances)
 
         # For some modules, duplicate detection requires full-file hash.
         self._full_hash_dedup_modules = {
@@ -521,41 +845,45 @@ class ModuleHandler(FileSystemEventHandler):
         if not self._barrier_modules:
             return False
 
-        with OsirDb() as db:
-            row = db.execute_query(
-                """
-                SELECT COUNT(*) AS pending_count
-                FROM osir_tasks t
-                LEFT JOIN celery_taskmeta m ON m.task_id = t.task_id::text
-                WHERE t.case_uuid = %s
-                  AND t.module = ANY(%s)
-                  AND COALESCE(m.status, 'PENDING') NOT IN ('SUCCESS', 'FAILURE', 'REVOKED')
-                  AND NOT (
-                      m.status IS NULL
-                      AND t.processing_status IN ('processing_done', 'processing_failed')
-                  )
-                """,
-                (str(self.case_uuid), self._barrier_modules),
-                fetch="fetchone",
-            )
+        pending = self._pending_producers() & set(self._barrier_modules)
+        logger.debug(
+            f"hold_consumers barrier status: "
+            f"pending producer module(s)={sorted(pending)} "
+            f"for modules={self._barrier_modules}"
+        )
+        return bool(pending)
 
-        if not row:
-            return False
+    def _barriers_pending_checked(self) -> bool:
+        """_barriers_pending(), recording the time of the check for the periodic poll."""
+        self._barrier_checked_at = time.monotonic()
+        return self._barriers_pending()
 
-        try:
-            pending_count = int(row.get("pending_count", 0)) if isinstance(row, dict) else int(row[0] or 0)
-
-            logger.debug(
-                f"hold_consumers barrier status: "
-                f"{pending_count} pending producer task(s) "
-                f"for modules={self._barrier_modules}"
-            )
+    def _pending_producers(self) -> set[str]:
+        """
+        Producer modules with a task still running or queued for this case.
 
-            return pending_count > 0
+        Read at most once per loop iteration: the cache is dropped at the start
+        of every iteration and whenever task completions are received.
+        """
+        if self._pending_producers_cache is None:
+            modules = set(self._dag.producers) | set(self._barrier_modules)
+            try:
+                with OsirDb() as db:
+                    self._pending_producers_cache = db.task_output.pending_modules(
+                        str(self.case_uuid), sorted(modules)
+                    )
+            except Exception as e:
+                # Unknown state: behave as if every producer were running.
+                logger.warning(f"Unable to read pending producer tasks: {e}")
+                return modules
+        return self._pending_producers_cache
 
-        except Exception as e:
-            logger.warning(f"Unable to parse hold_consumers barrier status: row={row!r}, error={e}")
-            return False
+    def _directory_ready(self, path: str, module_instance: OsirModuleModel) -> bool:
+        """
+        True when no upstream producer of the module can still write below path.
+        """
+        upstream = self._dag.producers_under(path, module_instance.module_name)
+        return not upstream or not (upstream & self._pending_producers())
 
     def _compile_rules(self, case_path: Path, module_instances: list[OsirModuleModel]):
         """
@@ -662,7 +990,8 @@ class ModuleHandler(FileSystemEventHandler):
                 task_name=TaskService.get_task_name(module),
                 queue=TaskService.get_queue_name(module),
                 processor_os=module.configuration.processor_os,
-                base_dump=module.model_dump(mode="json"),
+                template_ref=TaskService.get_module_ref(module.model_dump(mode="json")),
+                batch_size=module.configuration.batch_size or 1,
             )
 
             if module.input.type == "dir":
@@ -728,37 +1057,112 @@ class ModuleHandler(FileSystemEventHandler):
         """
         Monitors the directory for changes at specified intervals.
         """
+        self._dedup_use_index = not reprocess
         casesnapshot = CaseSnapshot(case_path)
+        # Kept open for the whole run: stored children are fetched lazily.
+        snapshot_db = OsirDb()
 
         if not reprocess:
             logger.debug(f"Fetching previously stored entries for case_uuid={self.case_uuid}")
-            with OsirDb() as db:
-                previous_entries = set(db.snapshot.get_stored_case_snapshot(case_path))
+            stored_dirs = snapshot_db.snapshot.get_snapshot_dirs(self.case_uuid)
 
-            if not previous_entries:
-                logger.debug("No previous entries found, starting with an empty set.")
-        else:
-            previous_entries = set()
+            if stored_dirs:
+                casesnapshot.seed(
+                    stored_dirs,
+                    lambda dir_id: snapshot_db.snapshot.get_snapshot_children(self.case_uuid, dir_id),
+                )
+            else:
+                legacy_entries = snapshot_db.snapshot.get_stored_case_snapshot(case_path)
+                if legacy_entries:
+                    casesnapshot.seed_entries(legacy_entries)
+                else:
+                    logger.debug("No previous entries found, starting with an empty set.")
+
+        # Started before the first scan, which places the watches while it
+        # walks the tree: nothing created in between is lost, and entries
+        # reported twice are filtered by the set difference below.
+        feed = None
+        if self._inotify_enabled:
+            feed = CaseChangeFeed(case_path)
+            if not feed.start(watch_tree=False):
+                feed = None
+        watch_tree = feed is not None
+
+        outputs = None
+        if self._task_outputs_enabled:
+            outputs = TaskOutputFeed(self.case_uuid, case_path, self._case_path_norm)
+            if not outputs.start():
+                outputs = None
 
         scan_iterations = 0
+        last_full_scan = 0.0
+        last_counters_fold = 0.0
+        force_full_scan = True
 
         while True:
             scan_iterations += 1
             iteration_start_time = time.time()
-            logger.debug("Scanning for new files/folders")
+
+            if feed is not None and feed.degraded:
+                feed.close()
+                feed = None
+
+            self._pending_producers_cache = None
+            output_entries, completed_modules = outputs.drain() if outputs is not None else (set(), [])
+            self._update_task_window(outputs.finished_tasks() if outputs is not None else [])
+            self._reported_dirs.update(path for path, entry_type in output_entries if entry_type == 'directory')
+
+            full_scan = (
+                force_full_scan
+                or feed is None
+                or feed.consume_overflow()
+                or (outputs is not None and outputs.consume_overflow())
+                or iteration_start_time - last_full_scan >= self._full_rescan_interval
+            )
+            force_full_scan = False
 
             scan_case_start_time = time.time()
-            casesnapshot.scan_directory()
-            current_entries = casesnapshot.get_entries_set()
+            if full_scan:
+                logger.debug("Scanning for new files/folders")
+                if feed is not None:
+                    # Everything queued so far is covered by the scan.
+                    feed.drain()
+                casesnapshot.scan_directory(on_directory=feed.watch_directory if watch_tree else None)
+                if watch_tree:
+                    watch_tree = False
+                    logger.debug(f"inotify change feed watching {feed.watch_count} directories")
+                last_full_scan = time.time()
+                new_entries = casesnapshot.added
+            else:
+                logger.debug("Reading new files/folders from the change feed")
+                new_entries = casesnapshot.record(feed.drain())
+            if output_entries:
+                # Known entries were already dispatched: they are only
+                # released below (stability gate, idle timers).
+                new_entries = new_entries | casesnapshot.record(output_entries)
+                logger.debug(
+                    f"{len(completed_modules)} task(s) finished "
+                    f"({', '.join(sorted(set(filter(None, completed_modules))))}), "
+                    f"{len(output_entries)} output entries reported"
+                )
             scan_case_duration = time.time() - scan_case_start_time
 
-            logger.debug(f"Time taken to scan case: {scan_case_duration:.4} seconds.")
+            if full_scan:
+                logger.debug(
+                    f"Time taken to scan case: {scan_case_duration:.4} seconds "
+                    f"({casesnapshot.listed_dirs} directories listed, {casesnapshot.pruned_dirs} unchanged)."
+                )
+            else:
+                logger.debug(f"Time taken to read change feed: {scan_case_duration:.4} seconds.")
 
-            new_entries = current_entries - previous_entries
             n_new_entries = len(new_entries)
             new_entries_duration = 0.0
 
             released_stable_files = self._release_stable_file_tasks()
+            if completed_modules:
+                released_directories = self._release_completed_directories()
+                if released_directories:
+                    logger.debug(f"Released {released_directories} directory task(s) after producer completion")
 
             if new_entries or released_stable_files:
                 new_entries_start_time = time.time()
@@ -795,33 +1199,58 @@ class ModuleHandler(FileSystemEventHandler):
                     logger.debug(
                         f"{self._unstable_file_task_count()} unstable file task(s) still waiting"
                     )
+                elif self._spill is not None and len(self._spill):
+                    logger.debug(
+                        f"{len(self._spill)} spilled file task(s) waiting for task credit "
+                        f"({len(self._outstanding_tasks)} outstanding)"
+                    )
                 else:
                     with OsirDb() as db:
                         if not db.handler.is_processing_active(self.handler_uuid):
                             with self.timers_lock:
                                 if not self._deferred and not self.active_timers:
-                                    logger.debug("Case snapshot is being saved before exiting...")
-                                    db.snapshot.store_case_snapshot(
-                                        self.case_uuid,
-                                        case_path,
-                                        list(current_entries),
-                                    )
-
-                                    if db.handler.check_handler_failure(self.handler_uuid):
-                                        db.handler.update(self.handler_uuid, "processing_failed")
+                                    if not full_scan:
+                                        # Only a full scan may confirm the tree
+                                        # is settled: the feed can miss entries.
+                                        logger.debug("Idle on change feed, confirming with a full scan before exiting")
+                                        force_full_scan = True
                                     else:
-                                        db.handler.update(self.handler_uuid, "processing_done")
-
-                                    # Monitor runs in a non-main thread: exit()
-                                    # only kills this thread, so release the
-                                    # executor's worker threads explicitly.
-                                    self._flush_executor.shutdown(wait=True)
-
-                                    exit()
+                                        logger.debug("Case snapshot is being saved before exiting...")
+                                        db.snapshot.store_case_snapshot(
+                                            self.case_uuid,
+                                            case_path,
+                                            casesnapshot.pop_changes(),
+                                        )
+
+                                        if db.handler.check_handler_failure(self.handler_uuid):
+                                            db.handler.update(self.handler_uuid, "processing_failed")
+                                        else:
+                                            db.handler.update(self.handler_uuid, "processing_done")
+
+                                        # Monitor runs in a non-main thread: exit()
+                                        # only kills this thread, so release the
+                                        # executor's worker threads explicitly.
+                                        self._flush_executor.shutdown(wait=True)
+                                        if self._spill is not None:
+                                            self._spill.close()
+                                        if feed is not None:
+                                            feed.close()
+                                        if outputs is not None:
+                                            outputs.close()
+                                        snapshot_db.close()
+
+                                        exit()
 
             # Release directory events deferred behind a hold_consumers
             # barrier, once every barrier producer task has finished.
-            if self._deferred and not self._barriers_pending():
+            # Re-checked when tasks finished, on full scans and every
+            # OSIR_WATCHDOG_BARRIER_POLL seconds.
+            barrier_due = time.monotonic() - self._barrier_checked_at >= self._barrier_poll
+            if (
+                self._deferred
+                and (completed_modules or full_scan or outputs is None or barrier_due)
+                and not self._barriers_pending_checked()
+            ):
                 for key, (d_event, d_module) in list(self._deferred.items()):
                     del self._deferred[key]
                     logger.debug(
@@ -830,6 +1259,21 @@ class ModuleHandler(FileSystemEventHandler):
                     )
                     self.handle_directory_event(d_event, d_module)
 
+            # Reported directories only matter while a consumer still waits on them.
+            if self._reported_dirs:
+                with self.timers_lock:
+                    waiting_dirs = {os.path.abspath(path) for path in self._idle_waiting}
+                waiting_dirs.update(os.path.abspath(d_event.src_path) for d_event, _ in self._deferred.values())
+                self._reported_dirs &= waiting_dirs
+
+            if iteration_start_time - last_counters_fold >= self._counters_fold_interval:
+                last_counters_fold = iteration_start_time
+                try:
+                    with OsirDb() as db:
+                        db.task.fold_counters()
+                except Exception as e:
+                    logger.warning(f"Could not fold task counters: {e}")
+
             iteration_duration = time.time() - iteration_start_time
 
             tasks_pushed_by_module = self._consume_tasks_pushed_by_module()
@@ -844,13 +1288,14 @@ class ModuleHandler(FileSystemEventHandler):
 
             logger.info(
                 f"Scan iteration {scan_iterations}: {iteration_duration:.2f}s total "
-                f"(dir scan: {scan_case_duration:.2f}s, entry processing: {new_entries_duration:.2f}s, "
+                f"({'dir scan' if full_scan else 'change feed'}: {scan_case_duration:.2f}s, entry processing: {new_entries_duration:.2f}s, "
                 f"{n_new_entries} new entries, tasks pushed: {tasks_summary})"
             )
 
-            previous_entries = current_entries
-
-            time.sleep(interval)
+            if outputs is not None:
+                outputs.wait(interval)
+            else:
+                time.sleep(interval)
 
     # ------------------------------------------------------------------
     # File stability gate
@@ -1227,6 +1672,14 @@ class ModuleHandler(FileSystemEventHandler):
             )
             return
 
+        if src_abs in self._reported_dirs and self._directory_ready(src_abs, module_instance):
+            logger.debug(
+                f"{module_instance.module_name} Directory '{event.src_path}' written by a finished "
+                f"producer task, no upstream producer pending"
+            )
+            self.process(event.src_path, module_instance)
+            return
+
         self.last_modified_times[event.src_path] = time.time()
         self.last_mtime[event.src_path] = self._get_directory_mtime(event.src_path)
 
@@ -1240,6 +1693,7 @@ class ModuleHandler(FileSystemEventHandler):
 
             with self.timers_lock:
                 self.active_timers.add(event.src_path)
+                self._idle_waiting.setdefault(event.src_path, {})[module_instance.module_name] = module_instance
 
             timer.start()
 
@@ -1283,17 +1737,22 @@ class ModuleHandler(FileSystemEventHandler):
         """
         logger.debug(f"Starting _check_for_idle for {path} - {module_instance.module_name}")
 
+        with self.timers_lock:
+            if module_instance.module_name not in self._idle_waiting.get(path, {}):
+                logger.debug(
+                    f"{module_instance.module_name} Directory '{path}' already released by its producer"
+                )
+                return
+
         current_mtime = self._get_directory_mtime(path)
         previous_mtime = self.last_mtime.get(path, 0.0)
 
         if current_mtime == previous_mtime and self._check_parent(path, module_instance):
+            if not self._stop_waiting(path, module_instance):
+                return
             logger.debug(f"{module_instance.module_name} Directory '{path}' is now idle")
             self.process(path, module_instance)
 
-            with self.timers_lock:
-                if path in self.active_timers:
-                    self.active_timers.remove(path)
-
         else:
             logger.debug(
                 f"{module_instance.module_name} Directory '{path}' is still busy, "
@@ -1304,6 +1763,48 @@ class ModuleHandler(FileSystemEventHandler):
             timer = Timer(self.cooldown, self._check_for_idle, [path, module_instance])
             timer.start()
 
+    def _stop_waiting(self, path, module_instance: OsirModuleModel) -> bool:
+        """
+        Removes a directory from the idle wait list. Returns False when it was
+        already removed (released by the idle timer or by a producer manifest).
+        """
+        with self.timers_lock:
+            waiting = self._idle_waiting.get(path)
+            if not waiting or waiting.pop(module_instance.module_name, None) is None:
+                return False
+            if not waiting:
+                del self._idle_waiting[path]
+                self.active_timers.discard(path)
+        return True
+
+    def _release_completed_directories(self) -> int:
+        """
+        Processes the directories waiting for their idle timer that a finished
+        task reported in its manifest, when no upstream producer is pending.
+        """
+        with self.timers_lock:
+            waiting = [
+                (path, module_instance)
+                for path, modules in self._idle_waiting.items()
+                if os.path.abspath(path) in self._reported_dirs
+                for module_instance in modules.values()
+            ]
+
+        released = 0
+        for path, module_instance in waiting:
+            if not self._directory_ready(os.path.abspath(path), module_instance):
+                continue
+            if not self._stop_waiting(path, module_instance):
+                continue
+            logger.debug(
+                f"{module_instance.module_name} Directory '{path}' released: "
+                f"producer task finished, no upstream producer pending"
+            )
+            self.process(path, module_instance)
+            released += 1
+
+        return released
+
     # ------------------------------------------------------------------
     # Task dispatch
     # ------------------------------------------------------------------
@@ -1344,8 +1845,11 @@ class ModuleHandler(FileSystemEventHandler):
     # Batched file-task flush
     # ------------------------------------------------------------------
 
-    def _hash_for_dedup(self, item: tuple[str, '_CompiledRule']):
-        """Compute (path, rule, size, hash_mode, hash) for one pending file.
+    def _hash_for_dedup(self, item: tuple[str, '_CompiledRule'], cached: dict | None = None):
+        """Compute (path, rule, size, mtime_ns, hash_mode, hash, from_cache) for one pending file.
+
+        `cached` maps (path, hash_mode) -> (size, mtime_ns, hash) as stored in
+        the hash cache; the cached hash is reused when size and mtime match.
 
         Returns hash fields as None on failure; the file is then pushed
         anyway (same behavior as before: dedup failure never drops a task).
@@ -1353,23 +1857,29 @@ class ModuleHandler(FileSystemEventHandler):
         path, rule = item
 
         try:
-            file_size = os.path.getsize(path)
+            st = os.stat(path)
+            file_size, mtime_ns = st.st_size, st.st_mtime_ns
         except Exception:
-            file_size = -1
+            file_size, mtime_ns = -1, None
+
+        if rule.module_name in self._full_hash_dedup_modules:
+            hash_mode = "full"
+        else:
+            hash_mode = f"prefix:{DEDUP_PREFIX_SIZE}"
+
+        hit = (cached or {}).get((path, hash_mode))
+        if hit is not None and mtime_ns is not None and hit[0] == file_size and hit[1] == mtime_ns:
+            return path, rule, file_size, mtime_ns, hash_mode, hit[2], True
 
         try:
-            if rule.module_name in self._full_hash_dedup_modules:
-                return path, rule, file_size, "full", compute_file_xxh3_128_full(path)
-
-            prefix_size = 81920
-            return (
-                path, rule, file_size,
-                f"prefix:{prefix_size}",
-                compute_file_xxh3_128_prefix(path, prefix_size=prefix_size),
-            )
+            if hash_mode == "full":
+                file_hash = compute_file_xxh3_128_full(path)
+            else:
+                file_hash = compute_file_xxh3_128_prefix(path, prefix_size=DEDUP_PREFIX_SIZE)
+            return path, rule, file_size, mtime_ns, hash_mode, file_hash, False
         except Exception as e:
             logger.warning(f"{rule.module_name} - Hash dedup failed for {path}: {e}")
-            return path, rule, file_size, None, None
+            return path, rule, file_size, mtime_ns, None, None, False
 
     def _flush_pending_file_tasks(self, wait: bool = False) -> None:
         """Hand the pending buffer to the background flush executor.
@@ -1383,8 +1893,13 @@ class ModuleHandler(FileSystemEventHandler):
             pending = self._pending_file_tasks
             self._pending_file_tasks = []
 
+        if self._spill is not None:
+            pending = self._apply_task_window(pending)
+
         if pending:
             future = self._flush_executor.submit(self._process_pending_batch, pending)
+            if self._spill is not None:
+                future.add_done_callback(lambda _, reserved=len(pending): self._release_reserved_credit(reserved))
             with self._flush_futures_lock:
                 self._flush_futures = [f for f in self._flush_futures if not f.done()]
                 self._flush_futures.append(future)
@@ -1392,6 +1907,70 @@ class ModuleHandler(FileSystemEventHandler):
         if wait:
             self._drain_flushes()
 
+    def _apply_task_window(self, pending: list) -> list:
+        """Return the matches that fit in the task credit left, oldest first.
+
+        Once the credit is used up (or while older matches are still
+        spilled), new matches go to the spill queue and the credit is taken
+        from its head, so matches are released in discovery order. The
+        matches returned hold their credit until their batch is processed.
+        """
+        with self._window_lock:
+            credit = self._task_window - len(self._outstanding_tasks) - self._reserved_credit
+            if not len(self._spill) and len(pending) <= credit:
+                self._reserved_credit += len(pending)
+                return pending
+
+            if pending:
+                self._spill.push((rule.module_name, path) for path, rule in pending)
+            released = [
+                (path, self._rules_by_module[module_name])
+                for module_name, path in self._spill.pop(max(0, credit))
+            ]
+            self._reserved_credit += len(released)
+
+        if pending or released:
+            logger.debug(
+                f"Task window: {len(pending)} new match(es) spilled, {len(released)} released, "
+                f"{len(self._spill)} waiting, {len(self._outstanding_tasks)} task(s) outstanding"
+            )
+        return released
+
+    def _release_reserved_credit(self, reserved: int) -> None:
+        # Pushed tasks are outstanding by now, skipped duplicates and failed batches give their credit back.
+        with self._window_lock:
+            self._reserved_credit -= reserved
+
+    def _update_task_window(self, finished_task_ids) -> None:
+        """Give back the credit of finished tasks.
+
+        Manifests are the fast path. Every OSIR_WATCHDOG_WINDOW_REFRESH
+        seconds the outstanding tasks are also checked against the task
+        states, for tasks that finished without a manifest (Celery failure,
+        revoked, deleted).
+        """
+        if self._spill is None:
+            return
+
+        with self._window_lock:
+            self._outstanding_tasks.difference_update(finished_task_ids)
+            outstanding = list(self._outstanding_tasks)
+
+        if not outstanding or time.monotonic() - self._window_checked_at < self._window_refresh:
+            return
+        self._window_checked_at = time.monotonic()
+
+        try:
+            with OsirDb() as db:
+                pending = db.task_output.pending_tasks(str(self.case_uuid), outstanding)
+        except Exception as e:
+            logger.warning(f"Task window: task states unavailable ({e}), keeping {len(outstanding)} outstanding task(s)")
+            return
+
+        with self._window_lock:
+            # Tasks pushed meanwhile are not in the checked list.
+            self._outstanding_tasks.difference_update(set(outstanding) - pending)
+
     def _drain_flushes(self) -> None:
         """Wait for all in-flight flush batches; surface their errors."""
         with self._flush_futures_lock:
@@ -1411,61 +1990,111 @@ class ModuleHandler(FileSystemEventHandler):
 
         duplicates = 0
         duplicates_by_module: dict[str, int] = {}
+        claimed = set()
 
         if not HASH_DEDUP_ENABLED:
             hash_duration = 0.0
             to_push = list(pending)
         else:
+            with OsirDb() as db:
+                cached = db.dedup.get_cached_hashes(self.case_uuid, [path for path, _ in pending])
+
             # 1) Hashing is I/O + C-extension bound: parallelize it.
+            #    Unchanged files are served from the hash cache.
             with ThreadPoolExecutor(max_workers=self._hash_workers) as pool:
-                hashed = list(pool.map(self._hash_for_dedup, pending, chunksize=8))
+                hashed = list(pool.map(lambda item: self._hash_for_dedup(item, cached), pending, chunksize=8))
 
             hash_duration = time.time() - flush_start
 
-            # 2) Serial dedup against the shared cache.
+            # 2) Serial dedup against the in-run cache, then the persistent
+            #    per-case index.
             to_push = []
+            candidates = []
+            fresh_hashes = []
+            counters: dict = defaultdict(lambda: defaultdict(int))
 
             with self._seen_prefix_lock:
-                for path, rule, file_size, hash_mode, file_hash in hashed:
+                for path, rule, file_size, mtime_ns, hash_mode, file_hash, from_cache in hashed:
                     if file_hash is None:
                         to_push.append((path, rule))
                         continue
 
+                    stats = counters[(rule.module_name, hash_mode)]
+                    if from_cache:
+                        stats["cache_hits"] += 1
+                    else:
+                        stats["cache_misses"] += 1
+                        stats["bytes_hashed"] += file_size if hash_mode == "full" else min(file_size, DEDUP_PREFIX_SIZE)
+                        if mtime_ns is not None:
+                            fresh_hashes.append((path, hash_mode, file_size, mtime_ns, file_hash))
+
                     key = (rule.module_name, file_size, hash_mode, file_hash)
                     duplicate_of = self._seen_prefix.get(key)
 
                     if duplicate_of is not None:
                         duplicates += 1
                         duplicates_by_module[rule.module_name] = duplicates_by_module.get(rule.module_name, 0) + 1
+                        stats["index_hits"] += 1
                     else:
                         self._seen_prefix[key] = path
+                        candidates.append((path, rule, key))
+
+            with OsirDb() as db:
+                db.dedup.store_hashes(self.case_uuid, fresh_hashes)
+                claimed = db.dedup.claim(
+                    self.case_uuid,
+                    self.handler_uuid,
+                    [(*key, path) for path, _, key in candidates],
+                )
+
+                for path, rule, key in candidates:
+                    stats = counters[(rule.module_name, key[2])]
+                    if (*key, path) in claimed or not self._dedup_use_index:
+                        stats["index_misses"] += 1
                         to_push.append((path, rule))
+                    else:
+                        duplicates += 1
+                        duplicates_by_module[rule.module_name] = duplicates_by_module.get(rule.module_name, 0) + 1
+                        stats["index_hits"] += 1
+
+                db.dedup.add_stats(self.case_uuid, counters)
 
-        # 3) Build payloads from the precompiled dump (no pydantic
-        #    deepcopy/serialization on the hot path).
+        # 3) Build items from the precompiled template reference (no pydantic
+        #    deepcopy/serialization on the hot path): the path travels as
+        #    the task's input argument.
         items = []
         for path, rule in to_push:
-            base = rule.base_dump
-            payload = dict(base)
-            payload["input"] = dict(base["input"])
-            payload["input"]["match"] = path
-
             items.append({
                 "task_name": rule.task_name,
                 "queue": rule.queue,
                 "module_name": rule.module_name,
                 "match": path,
-                "payload_json": json.dumps(payload),
+                "payload_json": rule.template_ref,
                 "processor_os": rule.processor_os,
+                "batch_size": rule.batch_size,
             })
 
-        # 4) Bulk DB insert + bulk publish.
-        TaskService.push_tasks_bulk(
-            self._case_path_norm,
-            self.case_uuid,
-            self.handler_uuid,
-            items,
-        )
+        # 4) Bulk DB insert + bulk publish. Keys claimed above belong to
+        #    tasks that were never pushed if this fails: release them, so
+        #    the artifacts are not skipped as duplicates by the next runs.
+        try:
+            task_ids = TaskService.push_tasks_bulk(
+                self._case_path_norm,
+                self.case_uuid,
+                self.handler_uuid,
+                items,
+            )
+        except Exception:
+            if claimed:
+                with self._seen_prefix_lock:
+                    for module, file_size, hash_mode, file_hash, _ in claimed:
+                        self._seen_prefix.pop((module, file_size, hash_mode, file_hash), None)
+                with OsirDb() as db:
+                    db.dedup.release(self.case_uuid, self.handler_uuid, claimed)
+            raise
+        if self._spill is not None:
+            with self._window_lock:
+                self._outstanding_tasks.update(task_ids)
 
         with self._task_counter_lock:
             for it in items:
@@ -1,4 +1,5 @@
 import os
+import json
 import yaml
 import pandas as pd
 import streamlit as st
@@ -7,7 +8,8 @@ from typing import List
 from osir_lib.core.FileManager import FileManager
 from osir_lib.core.model.OsirProfileModel import OsirProfileModel
 from osir_lib.core.model.OsirModuleModel import OsirModuleModel
-from osir_service.watchdog.MonitorCase import MonitorCase
+from osir_service.ipc.OsirSocket import OsirSocket
+from osir_service.ipc.model.OsirIpcRequest import OsirIpcRequest
 from osir_web.pages.OsirWebHeader import OsirWebHeader
 from osir_web.pages.OsirWebFlower import OsirWebFlower
 
@@ -16,6 +18,9 @@ from osir_lib.logger import AppLogger
 
 logger = AppLogger().get_logger()
 
+# The IPC service is started by the web process itself (OSIR.py --web).
+IPC_HOST = os.getenv("OSIR_IPC_HOST", "127.0.0.1")
+
 
 class OsirWebCase:
 
@@ -315,50 +320,55 @@ class OsirWebCase:
 
         logger.debug(f"Case path: {case_path}")
 
+        modified_modules = OsirWebCase._modified_modules()
+        if modified_modules is None:
+            return
+
+        # The handler runs in the master (create_handler), so its tasks go
+        # through the fair dispatcher reported by the dispatch stats.
         with st.spinner("Settings Up Handler... If you see this message it's likely that you have made a mistake in agent.yml configuration, the master can't reach the DB."):
-            monitor_case = MonitorCase(case_path, profile_instance.modules, reprocess_case)
+            response = json.loads(OsirSocket(host=IPC_HOST).send(OsirIpcRequest(
+                action="create_handler",
+                params={
+                    "case_name": selected_case,
+                    "modules": profile_instance.modules,
+                    "reprocess": reprocess_case,
+                    "modified_modules": modified_modules,
+                },
+            )))
 
-        if OsirWebCase._override_module_instances(monitor_case):
-            monitor_case.start()
+        if response.get("status") != 200:
+            st.error(f"Handler creation failed: {response.get('message') or response.get('response')}")
+            return
 
-            st.info(f"Modules selected:\n\n{"\n".join([f"- {module._rel_path}" for module in monitor_case.module_instances])}")
-            st.success("Processing started.")
+        modules = "\n".join(f"- {module}" for module in response["response"]["modules"])
+        st.info(f"Modules selected:\n\n{modules}")
+        st.success("Processing started.")
 
-            st.page_link(
-                st.Page(OsirWebFlower.render, title="Flower Monitoring", url_path="OsirWebFlower"),
-                label="You can follow the status of your task in Status !",
-                icon="📡",
-            )
+        st.page_link(
+            st.Page(OsirWebFlower.render, title="Flower Monitoring", url_path="OsirWebFlower"),
+            label="You can follow the status of your task in Status !",
+            icon="📡",
+        )
 
     @staticmethod
-    def _override_module_instances(monitor_case: MonitorCase):
+    def _modified_modules():
         """
-        Apply in-memory YAML overrides (edited_modules) to each live module instance.
-        This does NOT touch files on disk; it only mutates the in-memory objects that
-        MonitorCase will use during this run.
-        Args:
-            monitor_case: a MonitorCase.MonitorCase instance with module_instances loaded.
+        Parse the in-memory YAML overrides (edited_modules) of the modules.
+        This does NOT touch files on disk: the master applies them to the
+        module instances of this run only (create_handler modified_modules).
+
+        Returns:
+            list[dict] | None: The overridden modules, None when one is invalid.
         """
-        if not getattr(st.session_state, "edited_modules", None):
-            return True
-        
-        module_instances = getattr(monitor_case, "module_instances", [])
-        
-        for i, instance in enumerate(module_instances):
-            key = getattr(instance, "filename", None)
-            if not key:
-                continue
-            if key not in st.session_state["edited_modules"]:
-                continue
+        modified = []
+        for key, text in (getattr(st.session_state, "edited_modules", None) or {}).items():
             try:
-                parsed = yaml.safe_load(st.session_state["edited_modules"][key]) or {}
-                modify_instance = OsirModuleModel(**parsed)
-                # CORRECTION: Remplacer l'instance dans la liste
-                monitor_case.module_instances[i] = modify_instance
-                st.success("Modified !")
-
+                parsed = yaml.safe_load(text) or {}
+                parsed.setdefault("filename", key)
+                OsirModuleModel(**parsed)
             except Exception as e:
                 st.error(f"[Override] Invalid YAML for {key}: {e}")
-                return False    
-
-        return True
\ No newline at end of file
+                return None
+            modified.append(parsed)
+        return modified
@@ -7,6 +7,7 @@ from osir_web.pages.OsirWebHeader import OsirWebHeader
 from osir_web.pages.OsirWebUtils import OsirWebUtils
 from osir_service.postgres.OsirDb import OsirDb
 from osir_service.orchestration.TaskService import TaskService
+from osir_service.orchestration.TaskEventHub import TaskEventHub
 from osir_lib.core.model.OsirModuleModel import OsirModuleModel
 from osir_lib.core.OsirConstants import OSIR_PATHS
 from osir_lib.logger import AppLogger
@@ -180,6 +181,14 @@ class OsirWebMonitoring:
                 key="tab2"
             )
 
+            if filters.handler_id:
+                OsirWebMonitoring.tab2_live_stats(handler_id=filters.handler_id)
+            elif filters.case_name:
+                with OsirDb() as db:
+                    case = db.case.get(name=filters.case_name)
+                if case:
+                    OsirWebMonitoring.tab2_live_stats(case_uuid=str(case.case_uuid))
+
             # --- Display Results ---
             OsirWebMonitoring.tab2_tasks_by_case_table(
                 selected_case_name=filters.case_name,
@@ -203,39 +212,71 @@ class OsirWebMonitoring:
                             st.rerun()
                         st.success(f"✅ All data related to '{filters.handler_id}' was deleted from the database.")
     
+    @staticmethod
+    @st.fragment(run_every=2)
+    def tab2_live_stats(handler_id=None, case_uuid=None):
+        """Task counts of the selected handler (or case), read from the task event stream: no query per refresh."""
+        try:
+            view = TaskEventHub.get().view(handler_id=handler_id, case_uuid=case_uuid)
+        except ValueError:
+            return
+        if not view.synced:
+            st.caption("Loading task statistics...")
+            return
+
+        stats = view.snapshot()
+        by_status = stats["by_status"]
+        cols = st.columns(5)
+        cols[0].metric("Tasks", stats["total"])
+        cols[1].metric("Running", by_status["processing_started"])
+        cols[2].metric("Waiting", by_status["task_created"])
+        cols[3].metric("Done", by_status["processing_done"], delta=stats["done_last_min"] or None)
+        cols[4].metric("Failed", by_status["processing_failed"], delta=stats["failed_last_min"] or None, delta_color="inverse")
+        st.progress(min(stats["progress_pct"] / 100.0, 1.0), text=f"{stats['progress_pct']}%")
+
     @staticmethod
     def tab2_tasks_by_case_table(selected_case_name, selected_task_status=None, selected_handler_id=None, selected_module=None):
         if selected_case_name:
             with OsirDb() as db:
                 case_uuid = db.case.get(name=selected_case_name).case_uuid
-                tasks_by_case = db.task.list(
+
+                # Keyset pages: cursors of the pages already seen, reset when the filters change.
+                filters = (selected_case_name, str(selected_task_status), selected_handler_id, str(selected_module))
+                if st.session_state.get("tasks_page_filters") != filters:
+                    st.session_state.tasks_page_filters = filters
+                    st.session_state.tasks_page_cursors = [None]
+                cursors = st.session_state.tasks_page_cursors
+
+                page = db.task.page(
                     case_uuid=case_uuid,
-                    processing_status=selected_task_status if selected_task_status else None
+                    handler_id=selected_handler_id or None,
+                    module=selected_module or None,
+                    processing_status=selected_task_status if selected_task_status else None,
+                    cursor=cursors[-1],
+                    limit=200
                 )
+                tasks_by_case = page.tasks
                 js_trigger = st.empty()
+
+                previous_col, page_col, next_col = st.columns([1, 4, 1])
+                with previous_col:
+                    if st.button("◀ Newer", disabled=len(cursors) == 1, key="tasks_page_newer"):
+                        cursors.pop()
+                        st.rerun()
+                with page_col:
+                    st.caption(f"Page {len(cursors)}")
+                with next_col:
+                    if st.button("Older ▶", disabled=page.next_cursor is None, key="tasks_page_older"):
+                        cursors.append(page.next_cursor)
+                        st.rerun()
+
                 if tasks_by_case:
-                    df = pd.DataFrame([x.model_dump(mode='json') for x in tasks_by_case])
+                    df = pd.DataFrame([x.model_dump(mode='json', exclude={'trace'}) for x in tasks_by_case])
 
                     for col in df.columns:
                         if df[col].dtype == 'object':
                             df[col] = df[col].apply(lambda x: str(x) if x is not None else "")
 
-                    if selected_handler_id:
-                        handler_info = db.handler.get(handler_id=selected_handler_id)
-
-                        if handler_info:
-                            if handler_info.task_id:
-                                target_task_ids = [str(tid) for tid in handler_info.task_id]
-                            else:
-                                target_task_ids = []
-                            if "task_id" in df.columns:
-                                df = df[df["task_id"].isin(target_task_ids)]
-                        else:
-                            df = pd.DataFrame()
-
-                    if selected_module and not df.empty and "module" in df.columns:
-                        df = df[df["module"].apply(lambda x: selected_module in x if isinstance(x, list) else x == selected_module)]
-
                     if not df.empty:
                         if 'agent' in df.columns:
                             df.drop(columns=['agent'], inplace=True)
@@ -182,12 +182,8 @@ class OsirWebUtils:
                     if filter_case:
                         with OsirDb() as db:
                             case_uuid = db.case.get(name=filter_case).case_uuid
-                            task_list = db.task.list(case_uuid=case_uuid)
-                    else:
-                        task_list = []
+                            modules = sorted(db.task.stats(case_uuid=case_uuid)["by_module"])
 
-                    modules = list(set([str(t.module) for t in task_list]))
-                    
                     filter_module = st.selectbox(
                         "Filter by Module :",
                         options=[""] + modules,
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+from osir_service.orchestration.FairDispatcher import FairDispatcher, FairMessage
+
+QUEUE = "q"
+
+
+def _dispatcher(quantum):
+    # No dispatcher thread, no broker, no database: only the lane state.
+    dispatcher = FairDispatcher.__new__(FairDispatcher)
+    dispatcher.quantum = quantum
+    dispatcher.durable = False
+    dispatcher._queues = {}
+    dispatcher._deficits = {}
+    dispatcher._stats = {}
+    dispatcher._stats_ttl = 3600.0
+    dispatcher._pruned_at = time.monotonic()
+    dispatcher._cond = threading.Condition()
+    return dispatcher
+
+
+def _messages(name, costs):
+    return [FairMessage("task", (), f"{name}-{i}", QUEUE, cost) for i, cost in enumerate(costs)]
+
+
+def _ids(selected):
+    return [message.task_id for _, _, message in selected]
+
+
+def test_deficit_carries_over_between_turns():
+    dispatcher = _dispatcher(quantum=4)
+    dispatcher._enqueue("case-a", "h", _messages("a", [3, 3, 3]))
+    dispatcher._enqueue("case-b", "h", _messages("b", [1] * 8))
+
+    selected = dispatcher._select(QUEUE, 6)
+
+    # a: 4 -> one message, 1 left over; b: 4 -> four messages; a: 1 + 4 -> one message.
+    assert _ids(selected) == ["a-0", "b-0", "b-1", "b-2", "b-3", "a-1"]
+    assert dispatcher._deficits[(QUEUE, "case-a")] == 2
+    assert dispatcher._deficits[(QUEUE, "case-b")] == 0
+
+
+def test_batch_costlier_than_the_quantum_is_sent_after_enough_turns():
+    dispatcher = _dispatcher(quantum=2)
+    dispatcher._enqueue("case-a", "h", _messages("a", [5]))
+    dispatcher._enqueue("case-b", "h", _messages("b", [1, 1, 1]))
+
+    selected = dispatcher._select(QUEUE, 10)
+
+    # The batch of 5 inputs waits three turns of case a, case b goes on meanwhile.
+    assert _ids(selected) == ["b-0", "b-1", "b-2", "a-0"]
+    assert dispatcher._queues[QUEUE] == OrderedDict()
+    assert dispatcher._deficits == {}
+
+
+def test_handlers_of_a_case_take_turns():
+    dispatcher = _dispatcher(quantum=10)
+    dispatcher._enqueue("case-a", "h1", _messages("h1", [1, 1, 1]))
+    dispatcher._enqueue("case-a", "h2", _messages("h2", [1, 1, 1]))
+
+    assert _ids(dispatcher._select(QUEUE, 4)) == ["h1-0", "h2-0", "h1-1", "h2-1"]
+
+
+def test_unsent_messages_are_requeued_at_the_head_of_their_lane():
+    dispatcher = _dispatcher(quantum=10)
+    dispatcher._enqueue("case-a", "h", _messages("a", [1, 2, 1, 1]))
+
+    selected = dispatcher._select(QUEUE, 3)
+    dispatcher._account(selected[:1], selected[1:])
+
+    lane = dispatcher._queues[QUEUE]["case-a"]["h"]
+    assert [message.task_id for message in lane] == ["a-1", "a-2", "a-3"]
+    stats = dispatcher._stats[("case-a", "h")]
+    assert stats.published == 1
+
+
+def test_unsent_messages_of_a_dropped_handler_are_not_requeued():
+    dispatcher = _dispatcher(quantum=10)
+    dispatcher._enqueue("case-a", "h", _messages("a", [1, 1]))
+
+    selected = dispatcher._select(QUEUE, 2)
+    dispatcher.drop(handler_id="h")
+    dispatcher._account([], selected)
+
+    assert not dispatcher._queues[QUEUE]
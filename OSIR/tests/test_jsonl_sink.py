@@ -0,0 +1,67 @@
+import gzip
+import json
+
+import pytest
+from osir_lib.core.JsonlSink import JsonlSink, encode_record
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8", errors="surrogateescape") as f:
+        return [json.loads(line) for line in f.read().splitlines()]
+
+
+def test_encode_record_falls_back_to_stdlib():
+    assert json.loads(encode_record({"a": 1, 2: "b"})) == {"a": 1, "2": "b"}
+    assert encode_record({"big": 2 ** 70}).endswith(b"\n")
+    assert json.loads(encode_record({"s": "\ud800"}).decode("utf-8", "surrogateescape")) == {"s": "\ud800"}
+
+
+def test_sink_writes_every_record_in_order(tmp_path, monkeypatch):
+    monkeypatch.setenv("OSIR_SINK_BATCH", "7")
+    monkeypatch.setenv("OSIR_SINK_BUFFER_BYTES", "64")
+    sink = JsonlSink(str(tmp_path / "out.jsonl"), compression="none")
+    for i in range(100):
+        sink.put({"n": i})
+    sink.put_many([{"n": 100}, {"n": 101}])
+    sink.write_raw('{"n": 102}\n')
+    sink.put(None)
+
+    assert sink.path == str(tmp_path / "out.jsonl")
+    assert sink.records == 102
+    assert [record["n"] for record in read_lines(sink.path)] == list(range(103))
+
+
+def test_sink_appends_to_existing_output(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    with JsonlSink(path, compression="none") as sink:
+        sink.put({"n": 0})
+    with JsonlSink(path, compression="none") as sink:
+        sink.put({"n": 1})
+    assert [record["n"] for record in read_lines(path)] == [0, 1]
+
+
+def test_gzip_sink_is_complete_after_close(tmp_path):
+    sink = JsonlSink(str(tmp_path / "out.jsonl"), compression="gzip", fsync="close")
+    sink.put_many({"n": i} for i in range(10))
+    sink.close()
+    sink.close()
+
+    assert sink.path.endswith(".jsonl.gz")
+    with gzip.open(sink.path, "rt") as f:
+        assert [json.loads(line)["n"] for line in f] == list(range(10))
+
+
+def test_sink_options_are_validated(tmp_path):
+    with pytest.raises(ValueError):
+        JsonlSink(str(tmp_path / "out.jsonl"), compression="lz4")
+    with pytest.raises(ValueError):
+        JsonlSink(str(tmp_path / "out.jsonl"), fsync="always")
+
+
+def test_write_error_is_raised_by_close(tmp_path):
+    sink = JsonlSink(str(tmp_path / "out.jsonl"), compression="none")
+    sink.put({"value": object()})
+    with pytest.raises(TypeError):
+        sink.close()
+    assert not sink._thread.is_alive()
+    assert sink._raw.closed
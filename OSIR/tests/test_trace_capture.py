@@ -0,0 +1,51 @@
+import logging
+
+from osir_lib.core.OsirDecorator import TraceCapture
+
+
+def test_trace_under_budget_is_kept_whole(monkeypatch):
+    monkeypatch.setenv("OSIR_TRACE_MAX_CHARS", "1000")
+    capture = TraceCapture()
+    for i in range(10):
+        assert capture.write(f"line {i}\n") == len(f"line {i}\n")
+    assert capture.dropped == 0
+    assert capture.getvalue() == "".join(f"line {i}\n" for i in range(10))
+
+
+def test_trace_over_budget_keeps_head_and_tail(monkeypatch):
+    monkeypatch.setenv("OSIR_TRACE_MAX_CHARS", "200")
+    capture = TraceCapture()
+    lines = [f"line {i:04d}\n" for i in range(1000)]
+    for line in lines:
+        capture.write(line)
+
+    assert capture._head_size == 100
+    assert capture._tail_size == 100
+    head, rest = capture.getvalue().split("\n[... ", 1)
+    marker, tail = rest.split(" ...]\n", 1)
+    assert marker.endswith("characters of trace dropped")
+    # Only whole lines on both sides of the marker, the first and last ones kept.
+    assert head.split("\n")[0] == "line 0000"
+    assert all(line + "\n" in lines for line in head.split("\n"))
+    assert tail.endswith("line 0999\n")
+    assert all(line + "\n" in lines for line in tail.splitlines())
+    assert int(marker.split()[0]) >= sum(map(len, lines)) - 200
+
+
+def test_trace_capture_as_logging_stream(monkeypatch):
+    monkeypatch.setenv("OSIR_TRACE_MAX_CHARS", "64")
+    capture = TraceCapture()
+    handler = logging.StreamHandler(capture)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    test_logger = logging.getLogger("test_trace_capture")
+    test_logger.addHandler(handler)
+    try:
+        for i in range(100):
+            test_logger.warning(f"message {i}")
+    finally:
+        test_logger.removeHandler(handler)
+
+    value = capture.getvalue()
+    assert value.startswith("message 0\n")
+    assert value.endswith("message 99\n")
+    assert "characters of trace dropped" in value